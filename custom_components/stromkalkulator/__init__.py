@@ -3,64 +3,88 @@
 from __future__ import annotations
 
 import logging
+from functools import cache
 from pathlib import Path
 from typing import TYPE_CHECKING
 
-from homeassistant import data_entry_flow
 from homeassistant.const import Platform
+from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers import issue_registry as ir
 
 from .const import CONF_TSO, DOMAIN
-from .coordinator import NettleieCoordinator
-from .tso import TSO_LIST, TSO_MIGRATIONS, TSOFusjon
 
 if TYPE_CHECKING:
     from homeassistant.config_entries import ConfigEntry
     from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.typing import ConfigType
+
+    from .coordinator import NettleieCoordinator
+    from .tso import TSOFusjon
 
 _LOGGER: logging.Logger = logging.getLogger(__name__)
 
 PLATFORMS: list[Platform] = [Platform.SENSOR]
 
-type StromkalkulatorConfigEntry = ConfigEntry[NettleieCoordinator]
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
-# Build migration lookup once at import time
-_MIGRATION_INDEX: dict[str, TSOFusjon] = {m.gammel: m for m in TSO_MIGRATIONS}
+# Storage files per TSO: f"{DOMAIN}_{tso_id}{suffix}"
+STORAGE_SUFFIXES: tuple[str, ...] = ("", "_ledger", "_history")
 
+type StromkalkulatorConfigEntry = ConfigEntry[NettleieCoordinator]
 
+
+@cache
 def _build_migration_index() -> dict[str, TSOFusjon]:
-    """Return the migration index (for testing)."""
-    return _MIGRATION_INDEX
+    """Build the migration lookup on first use.
+
+    tso.py holds the full TSO table, so it is only imported once a config
+    entry is actually set up (not when diagnostics or repairs load the package).
+    """
+    from .tso import TSO_MIGRATIONS
+
+    return {m.gammel: m for m in TSO_MIGRATIONS}
 
 
 def _check_tso_migration(tso_id: str) -> TSOFusjon | None:
     """Check if a TSO key needs migration. Returns TSOFusjon or None."""
-    return _MIGRATION_INDEX.get(tso_id)
+    return _build_migration_index().get(tso_id)
 
 
 async def _migrate_storage_file(storage_dir: str, old_tso: str, new_tso: str) -> None:
-    """Rename storage file from old TSO key to new TSO key."""
-    old_path = Path(storage_dir) / f"{DOMAIN}_{old_tso}"
-    new_path = Path(storage_dir) / f"{DOMAIN}_{new_tso}"
-
-    if not old_path.exists():
-        _LOGGER.debug("No storage file to migrate: %s", old_path)
-        return
-
-    if new_path.exists():
-        _LOGGER.warning(
-            "Storage file already exists for %s, skipping migration from %s",
-            new_tso,
-            old_tso,
-        )
-        return
+    """Rename storage files (data, cost ledger, history) from old TSO key to new TSO key."""
+    for suffix in STORAGE_SUFFIXES:
+        old_path = Path(storage_dir) / f"{DOMAIN}_{old_tso}{suffix}"
+        new_path = Path(storage_dir) / f"{DOMAIN}_{new_tso}{suffix}"
+
+        if not old_path.exists():
+            _LOGGER.debug("No storage file to migrate: %s", old_path)
+            continue
+
+        if new_path.exists():
+            _LOGGER.warning(
+                "Storage file already exists for %s, skipping migration from %s",
+                new_tso,
+                old_tso,
+            )
+            continue
+
+        old_path.rename(new_path)
+        _LOGGER.info("Migrated storage file: %s → %s", old_path.name, new_path.name)
 
-    old_path.rename(new_path)
-    _LOGGER.info("Migrated storage file: %s → %s", old_path.name, new_path.name)
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the integration's services."""
+    from .services import async_setup_services
+
+    async_setup_services(hass)
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: StromkalkulatorConfigEntry) -> bool:
     """Set up Nettleie from a config entry."""
+    from .coordinator import NettleieCoordinator
+    from .tso import TSO_LIST
+
     # Check for TSO migration (merger)
     tso_id = entry.data.get(CONF_TSO, "bkk")
     migration = _check_tso_migration(tso_id)
@@ -99,6 +123,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: StromkalkulatorConfigEnt
         )
 
     coordinator: NettleieCoordinator = NettleieCoordinator(hass, entry)
+    entry.async_on_unload(coordinator.async_track_price_sensors())
     await coordinator.async_config_entry_first_refresh()
 
     entry.runtime_data = coordinator
@@ -113,24 +138,3 @@ async def async_unload_entry(hass: HomeAssistant, entry: StromkalkulatorConfigEn
     unload_ok: bool = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
     return unload_ok
-
-
-class TsoMigrationRepairFlow(data_entry_flow.FlowHandler):
-    """Handler for TSO migration repair flow."""
-
-    async def async_step_confirm(
-        self, user_input: dict[str, str] | None = None
-    ) -> data_entry_flow.FlowResult:
-        """Handle the confirm step."""
-        if user_input is not None:
-            return self.async_create_entry(data={})
-        return self.async_show_form(step_id="confirm")
-
-
-async def async_create_fix_flow(
-    hass: HomeAssistant,
-    issue_id: str,
-    data: dict[str, str] | None,
-) -> TsoMigrationRepairFlow:
-    """Create flow to fix a repair issue."""
-    return TsoMigrationRepairFlow()
@@ -0,0 +1,132 @@
+"""Month- and year-to-date comparison of spot price and Norgespris.
+
+Every booked interval adds what its energy cost under both regimes, with
+the prices and caps that applied then:
+
+- Spot price: spot price minus strømstøtte for the first 5000 kWh of the
+  month, spot price above that.
+- Norgespris: fixed price for the first 5000 kWh (1000 kWh for
+  fritidsbolig), spot price above that.
+
+Nettleie and avgifter are the same under both regimes and are left out.
+Totals are running sums (O(1) per interval) in whole µWh and µøre, so the
+comparison never replays history and stays exact. It is stored with the
+coordinator's data.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+from .fixedpoint import kr_to_uore, kwh_to_uwh, uore_to_kr, uwh_to_kwh
+
+
+def split_at_cap(used_kwh: float, kwh: float, cap_kwh: float) -> tuple[float, float]:
+    """Split kwh into the part under and over a monthly cap, given kWh used so far."""
+    under = min(kwh, max(cap_kwh - used_kwh, 0.0))
+    return under, kwh - under
+
+
+@dataclass(slots=True)
+class RegimeComparison:
+    """Running cost of the energy under spot price and Norgespris.
+
+    Totals are whole µWh and µøre (fixedpoint.py); the *_kwh and *_kr
+    properties give kWh and NOK.
+    """
+
+    month: str = ""  # "YYYY-MM" of the month-to-date totals
+    month_uwh: int = 0
+    month_spot_uore: int = 0
+    month_norgespris_uore: int = 0
+    year_uwh: int = 0
+    year_spot_uore: int = 0
+    year_norgespris_uore: int = 0
+
+    def add(self, month: str, kwh: float, spot_kr: float, norgespris_kr: float) -> None:
+        """Add one interval's energy cost under both regimes.
+
+        A later month starts new month totals (and new year totals in a new
+        year). Intervals from an earlier month (booked after the month
+        change) only count towards the year.
+        """
+        self.roll(month)
+        uwh, spot, norgespris = kwh_to_uwh(kwh), kr_to_uore(spot_kr), kr_to_uore(norgespris_kr)
+        if month == self.month:
+            self.month_uwh += uwh
+            self.month_spot_uore += spot
+            self.month_norgespris_uore += norgespris
+        if month[:4] == self.month[:4]:
+            self.year_uwh += uwh
+            self.year_spot_uore += spot
+            self.year_norgespris_uore += norgespris
+
+    def roll(self, month: str) -> None:
+        """Start new month (and year) totals if month is later than the current one."""
+        if month <= self.month:
+            return
+        if month[:4] != self.month[:4]:
+            self.year_uwh = self.year_spot_uore = self.year_norgespris_uore = 0
+        self.month = month
+        self.month_uwh = self.month_spot_uore = self.month_norgespris_uore = 0
+
+    @property
+    def month_kwh(self) -> float:
+        """Energy this month."""
+        return uwh_to_kwh(self.month_uwh)
+
+    @property
+    def month_spot_kr(self) -> float:
+        """Cost with spot price this month."""
+        return uore_to_kr(self.month_spot_uore)
+
+    @property
+    def month_norgespris_kr(self) -> float:
+        """Cost with Norgespris this month."""
+        return uore_to_kr(self.month_norgespris_uore)
+
+    @property
+    def month_difference_kr(self) -> float:
+        """Spot price minus Norgespris this month (positive: Norgespris is cheaper)."""
+        return uore_to_kr(self.month_spot_uore - self.month_norgespris_uore)
+
+    @property
+    def year_kwh(self) -> float:
+        """Energy this year."""
+        return uwh_to_kwh(self.year_uwh)
+
+    @property
+    def year_spot_kr(self) -> float:
+        """Cost with spot price this year."""
+        return uore_to_kr(self.year_spot_uore)
+
+    @property
+    def year_norgespris_kr(self) -> float:
+        """Cost with Norgespris this year."""
+        return uore_to_kr(self.year_norgespris_uore)
+
+    @property
+    def year_difference_kr(self) -> float:
+        """Spot price minus Norgespris this year (positive: Norgespris is cheaper)."""
+        return uore_to_kr(self.year_spot_uore - self.year_norgespris_uore)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the totals for storage."""
+        return {
+            "month": self.month,
+            "month_uwh": self.month_uwh,
+            "month_spot_uore": self.month_spot_uore,
+            "month_norgespris_uore": self.month_norgespris_uore,
+            "year_uwh": self.year_uwh,
+            "year_spot_uore": self.year_spot_uore,
+            "year_norgespris_uore": self.year_norgespris_uore,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any] | None) -> RegimeComparison:
+        """Restore totals from storage (empty if missing)."""
+        if not data:
+            return cls()
+        totals = {key: int(data[key]) for key in cls.__slots__ if key != "month" and key in data}
+        return cls(month=data.get("month", ""), **totals)
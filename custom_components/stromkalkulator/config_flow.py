@@ -17,17 +17,25 @@ from .const import (
     CONF_ELECTRICITY_PROVIDER_PRICE_SENSOR,
     CONF_ENERGILEDD_DAG,
     CONF_ENERGILEDD_NATT,
+    CONF_ENERGY_SENSOR,
+    CONF_FRITIDSBOLIG,
     CONF_HAR_NORGESPRIS,
+    CONF_INTEGRATION_METHOD,
+    CONF_MAX_GAP_MINUTES,
     CONF_POWER_SENSOR,
+    CONF_PRICE_FILE,
     CONF_SPOT_PRICE_SENSOR,
     CONF_TSO,
     DEFAULT_ENERGILEDD_DAG,
     DEFAULT_ENERGILEDD_NATT,
+    DEFAULT_MAX_GAP_MINUTES,
     DEFAULT_NAME,
     DEFAULT_TSO,
     DOMAIN,
-    TSO_LIST,
+    INTEGRATION_OPTIONS,
+    INTEGRATION_TRAPEZOIDAL,
 )
+from .tso import TSO_LIST
 
 if TYPE_CHECKING:
     from homeassistant.data_entry_flow import FlowResult
@@ -83,6 +91,7 @@ class NettleieConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):  # type: ign
                         ),
                     ),
                     vol.Optional(CONF_HAR_NORGESPRIS, default=False): selector.BooleanSelector(),
+                    vol.Optional(CONF_FRITIDSBOLIG, default=False): selector.BooleanSelector(),
                 }
             ),
             errors=errors,
@@ -104,6 +113,9 @@ class NettleieConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):  # type: ign
                 errors[CONF_POWER_SENSOR] = "sensor_not_found"
             if spot_state is None:
                 errors[CONF_SPOT_PRICE_SENSOR] = "sensor_not_found"
+            energy_sensor: Any = user_input.get(CONF_ENERGY_SENSOR)
+            if energy_sensor and self.hass.states.get(energy_sensor) is None:
+                errors[CONF_ENERGY_SENSOR] = "sensor_not_found"
 
             if not errors:
                 self._data.update(user_input)
@@ -129,6 +141,12 @@ class NettleieConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):  # type: ign
                             device_class="power",
                         ),
                     ),
+                    vol.Optional(CONF_ENERGY_SENSOR): selector.EntitySelector(
+                        selector.EntitySelectorConfig(
+                            domain="sensor",
+                            device_class="energy",
+                        ),
+                    ),
                     vol.Required(CONF_SPOT_PRICE_SENSOR): selector.EntitySelector(
                         selector.EntitySelectorConfig(domain="sensor"),
                     ),
@@ -205,6 +223,10 @@ class NettleieOptionsFlow(config_entries.OptionsFlow):  # type: ignore[misc]
         if user_input is not None:
             # Update config entry data
             new_data: dict[str, Any] = {**self.config_entry.data, **user_input}
+            # Cleared optional fields are left out of user_input
+            for key in (CONF_ENERGY_SENSOR, CONF_PRICE_FILE):
+                if not user_input.get(key):
+                    new_data.pop(key, None)
             self.hass.config_entries.async_update_entry(self.config_entry, data=new_data)
             return self.async_create_entry(title="", data={})
 
@@ -218,6 +240,9 @@ class NettleieOptionsFlow(config_entries.OptionsFlow):  # type: ignore[misc]
         avgiftssone_options: list[selector.SelectOptionDict] = [
             selector.SelectOptionDict(value=key, label=label) for key, label in AVGIFTSSONE_OPTIONS.items()
         ]
+        integration_options: list[selector.SelectOptionDict] = [
+            selector.SelectOptionDict(value=key, label=label) for key, label in INTEGRATION_OPTIONS.items()
+        ]
 
         # Build schema with defaults from current config
         options_schema: vol.Schema = vol.Schema(
@@ -244,12 +269,22 @@ class NettleieOptionsFlow(config_entries.OptionsFlow):  # type: ignore[misc]
                     CONF_HAR_NORGESPRIS,
                     default=current.get(CONF_HAR_NORGESPRIS, False),
                 ): selector.BooleanSelector(),
+                vol.Optional(
+                    CONF_FRITIDSBOLIG,
+                    default=current.get(CONF_FRITIDSBOLIG, False),
+                ): selector.BooleanSelector(),
                 vol.Required(
                     CONF_POWER_SENSOR,
                     default=current.get(CONF_POWER_SENSOR),
                 ): selector.EntitySelector(
                     selector.EntitySelectorConfig(domain="sensor"),
                 ),
+                vol.Optional(
+                    CONF_ENERGY_SENSOR,
+                    description={"suggested_value": current.get(CONF_ENERGY_SENSOR)},
+                ): selector.EntitySelector(
+                    selector.EntitySelectorConfig(domain="sensor", device_class="energy"),
+                ),
                 vol.Required(
                     CONF_SPOT_PRICE_SENSOR,
                     default=current.get(CONF_SPOT_PRICE_SENSOR),
@@ -280,6 +315,29 @@ class NettleieOptionsFlow(config_entries.OptionsFlow):  # type: ignore[misc]
                         max=2,
                     ),
                 ),
+                vol.Required(
+                    CONF_INTEGRATION_METHOD,
+                    default=current.get(CONF_INTEGRATION_METHOD, INTEGRATION_TRAPEZOIDAL),
+                ): selector.SelectSelector(
+                    selector.SelectSelectorConfig(
+                        options=integration_options,
+                        mode=selector.SelectSelectorMode.DROPDOWN,
+                    ),
+                ),
+                vol.Required(
+                    CONF_MAX_GAP_MINUTES,
+                    default=current.get(CONF_MAX_GAP_MINUTES, DEFAULT_MAX_GAP_MINUTES),
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=2,
+                        max=180,
+                        unit_of_measurement="min",
+                    ),
+                ),
+                vol.Optional(
+                    CONF_PRICE_FILE,
+                    description={"suggested_value": current.get(CONF_PRICE_FILE)},
+                ): selector.TextSelector(),
             }
         )
 
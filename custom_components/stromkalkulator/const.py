@@ -1,21 +1,24 @@
 """Constants for Strømkalkulator integration."""
 
-from typing import Final
+from __future__ import annotations
 
-from .tso import TSO_LIST
-
-__all__ = ["TSO_LIST"]
+from typing import Any, Final
 
 DOMAIN: Final[str] = "stromkalkulator"
 
 # Config keys
 CONF_POWER_SENSOR: Final[str] = "power_sensor"
 CONF_SPOT_PRICE_SENSOR: Final[str] = "spot_price_sensor"
+CONF_ENERGY_SENSOR: Final[str] = "energy_sensor"
 CONF_ELECTRICITY_PROVIDER_PRICE_SENSOR: Final[str] = "electricity_provider_price_sensor"
 CONF_TSO: Final[str] = "tso"
 CONF_ENERGILEDD_DAG: Final[str] = "energiledd_dag"
 CONF_ENERGILEDD_NATT: Final[str] = "energiledd_natt"
 CONF_AVGIFTSSONE: Final[str] = "avgiftssone"
+CONF_INTEGRATION_METHOD: Final[str] = "integration_method"
+CONF_MAX_GAP_MINUTES: Final[str] = "max_gap_minutes"
+# Optional file with historical spot prices; replaces the spot price sensor
+CONF_PRICE_FILE: Final[str] = "price_file"
 
 # Avgiftssoner for forbruksavgift og mva
 # - standard: Full forbruksavgift + mva (Sør-Norge: NO1, NO2, NO5)
@@ -31,6 +34,19 @@ AVGIFTSSONE_OPTIONS: Final[dict[str, str]] = {
     AVGIFTSSONE_TILTAKSSONE: "Tiltakssonen (avgiftsfritak, mva-fritak)",
 }
 
+# Integrasjon av effekt til energi (Riemann-sum)
+# - trapezoidal: snitt av forrige og nåværende måling (nøyaktigst)
+# - left: forrige måling holdes til neste (som HA sin Riemann-integral "left")
+# Hull lengre enn max_gap fylles fra recorder-historikk i stedet for å smøre én måling over hele hullet.
+INTEGRATION_TRAPEZOIDAL: Final[str] = "trapezoidal"
+INTEGRATION_LEFT: Final[str] = "left"
+
+INTEGRATION_OPTIONS: Final[dict[str, str]] = {
+    INTEGRATION_TRAPEZOIDAL: "Trapes (snitt av to målinger)",
+    INTEGRATION_LEFT: "Venstre (forrige måling holdes)",
+}
+
+DEFAULT_MAX_GAP_MINUTES: Final[int] = 15
 
 # Default values (BKK)
 DEFAULT_ENERGILEDD_DAG: Final[float] = 0.4613
@@ -75,7 +91,8 @@ STROMSTOTTE_KILDE: Final[str] = "https://lovdata.no/dokument/SF/forskrift/2025-0
 #
 # Grenser:
 # - Bolig: 5000 kWh/mnd (støttet)
-# - Fritidsbolig: 1000 kWh/mnd (IKKE støttet i denne integrasjonen)
+# - Fritidsbolig: 1000 kWh/mnd (valg i oppsettet)
+# - Forbruk over grensen betales med spotpris
 #
 # Regler:
 # - Norgespris er et alternativ til strømstøtte - kan IKKE kombineres
@@ -86,11 +103,13 @@ NORGESPRIS_EKS_MVA: Final[float] = 0.40  # 40 øre/kWh eks. mva
 NORGESPRIS_INKL_MVA_STANDARD: Final[float] = 0.50  # 50 øre inkl. 25% mva (Sør-Norge)
 NORGESPRIS_INKL_MVA_NORD: Final[float] = 0.40  # 40 øre (Nord-Norge/Tiltakssonen, mva-fritak)
 NORGESPRIS_MAX_KWH_BOLIG: Final[int] = 5000  # Maks 5000 kWh/mnd for bolig
-NORGESPRIS_MAX_KWH_FRITID: Final[int] = 1000  # Maks 1000 kWh/mnd for fritidsbolig (ikke støttet)
+NORGESPRIS_MAX_KWH_FRITID: Final[int] = 1000  # Maks 1000 kWh/mnd for fritidsbolig
 NORGESPRIS_KILDE: Final[str] = "https://www.regjeringen.no/no/tema/energi/strom/regjeringens-stromtiltak/id2900232/"
 
 # Config key for Norgespris
 CONF_HAR_NORGESPRIS: Final[str] = "har_norgespris"
+# Config key for fritidsbolig (lower Norgespris cap)
+CONF_FRITIDSBOLIG: Final[str] = "fritidsbolig"
 
 
 def get_norgespris_inkl_mva(avgiftssone: str) -> float:
@@ -110,6 +129,25 @@ def get_norgespris_inkl_mva(avgiftssone: str) -> float:
     return NORGESPRIS_INKL_MVA_STANDARD
 
 
+def get_monthly_cap_kwh(har_norgespris: bool, fritidsbolig: bool) -> int:
+    """Returnerer maks kWh per måned med Norgespris eller strømstøtte.
+
+    Norgespris: 5000 kWh for bolig, 1000 kWh for fritidsbolig.
+    Strømstøtte: 5000 kWh per målepunkt (Forskrift § 5).
+    Forbruk over grensen betales med spotpris uten strømstøtte.
+
+    Args:
+        har_norgespris: Whether the Norgespris cap applies (else strømstøtte)
+        fritidsbolig: Whether the metering point is a fritidsbolig
+
+    Returns:
+        Monthly cap in kWh
+    """
+    if not har_norgespris:
+        return STROMSTOTTE_MAX_KWH
+    return NORGESPRIS_MAX_KWH_FRITID if fritidsbolig else NORGESPRIS_MAX_KWH_BOLIG
+
+
 # Offentlige avgifter (NOK/kWh eks. mva, oppdateres årlig)
 # Kilde: https://www.skatteetaten.no/bedrift-og-organisasjon/avgifter/saravgifter/om/elektrisk-kraft/
 #
@@ -230,3 +268,16 @@ SENSOR_TOTAL_PRICE: Final[str] = "total_price"
 
 # Defaults
 DEFAULT_NAME: Final[str] = "Strømkalkulator"
+
+
+def __getattr__(name: str) -> Any:
+    """Re-export TSO_LIST lazily (PEP 562).
+
+    tso.py is by far the largest module in the package. Loading it on first
+    access keeps `import .const` cheap for diagnostics and repairs.
+    """
+    if name == "TSO_LIST":
+        from .tso import TSO_LIST
+
+        return TSO_LIST
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -3,66 +3,131 @@
 from __future__ import annotations
 
 import logging
-from datetime import datetime, timedelta
+import time
+from datetime import UTC, datetime, timedelta
+from types import MappingProxyType
 from typing import TYPE_CHECKING, Any, cast
 
+from homeassistant.helpers.event import async_track_state_change_event
 from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
+from .comparison import RegimeComparison, split_at_cap
 from .const import (
     AVGIFTSSONE_STANDARD,
     CONF_AVGIFTSSONE,
     CONF_ELECTRICITY_PROVIDER_PRICE_SENSOR,
     CONF_ENERGILEDD_DAG,
     CONF_ENERGILEDD_NATT,
+    CONF_ENERGY_SENSOR,
+    CONF_FRITIDSBOLIG,
     CONF_HAR_NORGESPRIS,
+    CONF_INTEGRATION_METHOD,
+    CONF_MAX_GAP_MINUTES,
     CONF_POWER_SENSOR,
+    CONF_PRICE_FILE,
     CONF_SPOT_PRICE_SENSOR,
     CONF_TSO,
+    DEFAULT_MAX_GAP_MINUTES,
     DOMAIN,
     ENOVA_AVGIFT,
     HELLIGDAGER_BEVEGELIGE,
     HELLIGDAGER_FASTE,
+    INTEGRATION_TRAPEZOIDAL,
     STROMSTOTTE_LEVEL,
+    STROMSTOTTE_MAX_KWH,
     STROMSTOTTE_RATE,
-    TSO_LIST,
     get_forbruksavgift,
+    get_monthly_cap_kwh,
     get_mva_sats,
     get_norgespris_inkl_mva,
 )
+from .coststats import CostStatistics
+from .cumulative import CumulativeCost
+from .fixedpoint import kr_to_uore, uore_to_kr
+from .forecast import DayProfile, MonthForecast, MonthSimulation, measured_days
+from .importer import ImportStats, read_consumption
+from .instrumentation import HotPathStats
+from .integrator import PowerIntegrator, integrate_history
+from .ledger import TOTAL_FIELDS, CostLedger, IntervalPrices
+from .meter import EnergyMeter
+from .monthstate import MonthState
+from .pricefeed import PriceFeed, PriceSourceError, prices_from_states, read_price_file
+from .rangeindex import RangeIndex, hour_index, hour_of_key, key_of_hour, row_values
+from .reconcile import Invoice, Reconciliation, ledger_lines, reconcile
+from .rollups import TIER_DAY, TIER_MONTH, TIER_YEAR, Rollups
+from .snapshot import CoordinatorSnapshot
+from .summaries import MonthSummaries, MonthSummary, PeriodTotals, previous_month
+from .tariff import TariffCalendar
+from .tso import TSO_LIST
 
 if TYPE_CHECKING:
+    from collections.abc import Callable, Mapping
+
     from homeassistant.config_entries import ConfigEntry
-    from homeassistant.core import HomeAssistant
+    from homeassistant.core import Event, EventStateChangedData, HomeAssistant, State
 
     from .tso import TSOEntry
 
 _LOGGER = logging.getLogger(__name__)
 
+# The hourly ledger is larger than the main store; coalesce its writes
+LEDGER_SAVE_DELAY_S: int = 300
+
+# Energy register units accepted from the energy sensor
+ENERGY_UNIT_TO_KWH: dict[str, float] = {"Wh": 0.001, "kWh": 1.0, "MWh": 1000.0}
+
 
-class NettleieCoordinator(DataUpdateCoordinator[dict[str, Any]]):  # type: ignore[misc]
+class NettleieCoordinator(DataUpdateCoordinator[CoordinatorSnapshot]):  # type: ignore[misc]
     """Coordinator for Nettleie data."""
 
+    data: CoordinatorSnapshot
     entry: ConfigEntry
     power_sensor: str | None
     spot_price_sensor: str | None
+    price_file: str | None
+    energy_sensor: str | None
     electricity_company_price_sensor: str | None
     tso: TSOEntry
     _tso_id: str
     avgiftssone: str
     har_norgespris: bool
+    fritidsbolig: bool
+    monthly_cap_kwh: int
+    norgespris_max_kwh: int
     energiledd_dag: float
     energiledd_natt: float
     kapasitetstrinn: list[tuple[float, int]]
-    _daily_max_power: dict[str, float]
     _current_month: int
-    _monthly_consumption: dict[str, float]
-    _last_update: datetime | None
-    _previous_month_consumption: dict[str, float]
-    _previous_month_top_3: dict[str, float]
+    _month: MonthState
+    _integrator: PowerIntegrator
+    _meter: EnergyMeter
+    _previous_month: MonthState
     _previous_month_name: str | None
+    _ledger: CostLedger
+    _previous_ledger: CostLedger | None
+    _skipped_month: str
+    _summaries: MonthSummaries
+    _rollups: Rollups
+    _range_index: RangeIndex | None
+    _range_changed_from: int
+    _cost_statistics: CostStatistics
+    _comparison: RegimeComparison
+    _cumulative: CumulativeCost
+    _forecast: MonthForecast | None
+    _forecast_hour: int
+    _simulation: MonthSimulation | None
+    _tariff_calendars: list[TariffCalendar]
+    _spot_feed: PriceFeed
+    _provider_feed: PriceFeed
+    _price_sensor_feeds: dict[str, PriceFeed]
+    _price_feeds_tracked: bool
     _store: Store[dict[str, Any]]
+    _ledger_store: Store[dict[str, Any]]
+    _history: dict[str, CostLedger] | None
+    _history_store: Store[dict[str, Any]]
     _store_loaded: bool
+    stats: HotPathStats
 
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
         """Initialize the coordinator."""
@@ -75,6 +140,10 @@ class NettleieCoordinator(DataUpdateCoordinator[dict[str, Any]]):  # type: ignor
         self.entry = entry
         self.power_sensor = entry.data.get(CONF_POWER_SENSOR)
         self.spot_price_sensor = entry.data.get(CONF_SPOT_PRICE_SENSOR)
+        # Optional file with historical spot prices (offline simulation); replaces the spot sensor
+        self.price_file = entry.data.get(CONF_PRICE_FILE) or None
+        # Optional cumulative kWh register; replaces integration of the power sensor
+        self.energy_sensor = entry.data.get(CONF_ENERGY_SENSOR) or None
         self.electricity_company_price_sensor = entry.data.get(CONF_ELECTRICITY_PROVIDER_PRICE_SENSOR)
 
         # Get TSO config
@@ -87,6 +156,10 @@ class NettleieCoordinator(DataUpdateCoordinator[dict[str, Any]]):  # type: ignor
 
         # Get Norgespris setting from config
         self.har_norgespris = entry.data.get(CONF_HAR_NORGESPRIS, False)
+        self.fritidsbolig = entry.data.get(CONF_FRITIDSBOLIG, False)
+        # Norgespris/strømstøtte only covers the first kWh of the month
+        self.monthly_cap_kwh = get_monthly_cap_kwh(self.har_norgespris, self.fritidsbolig)
+        self.norgespris_max_kwh = get_monthly_cap_kwh(True, self.fritidsbolig)
 
         # Get energiledd from config (allows override)
         self.energiledd_dag = float(entry.data.get(CONF_ENERGILEDD_DAG, self.tso["energiledd_dag"]))
@@ -96,103 +169,237 @@ class NettleieCoordinator(DataUpdateCoordinator[dict[str, Any]]):  # type: ignor
         # Type: list of tuples (kW_threshold, NOK_per_month)
         self.kapasitetstrinn = cast("list[tuple[float, int]]", self.tso["kapasitetstrinn"])
 
-        # Track max power for capacity calculation
-        # Format: {date_str: max_power_kw}
-        self._daily_max_power = {}
-        self._current_month = datetime.now().month
-
-        # Track energy consumption for monthly utility meter
-        # Format: {"dag": kwh, "natt": kwh}
-        self._monthly_consumption = {"dag": 0.0, "natt": 0.0}
-        self._last_update = None
+        # Month-to-date daily peaks (capacity calculation) and kWh per hour and tariff
+        now = datetime.now()
+        self._current_month = now.month
+        self._month = MonthState(self._month_key(now))
+        self._integrator = PowerIntegrator(
+            method=entry.data.get(CONF_INTEGRATION_METHOD, INTEGRATION_TRAPEZOIDAL),
+            max_gap_s=float(entry.data.get(CONF_MAX_GAP_MINUTES, DEFAULT_MAX_GAP_MINUTES)) * 60,
+        )
+        self._meter = EnergyMeter()
 
         # Track previous month's data for invoice verification
-        self._previous_month_consumption = {"dag": 0.0, "natt": 0.0}
-        self._previous_month_top_3 = {}
+        self._previous_month = MonthState(self._month_key(now.replace(day=1) - timedelta(days=1)))
         self._previous_month_name = None  # e.g., "januar 2026"
 
+        # Cost ledger: month-to-date cost components and hourly rows
+        self._ledger = CostLedger(self._month_key(now))
+        self._previous_ledger = None
+        # Last month consumption was read for that is no longer measured (warned once)
+        self._skipped_month = ""
+        # Summaries of the last closed months (year to date, rolling 12 months)
+        self._summaries = MonthSummaries()
+        # Running totals per hour, day, week, month and year
+        self._rollups = Rollups(now)
+        # Prefix sums over the hourly rows for range queries (built on first query)
+        self._range_index = None
+        self._range_changed_from = 0
+        # Hourly cost pushed to the recorder as external statistics (Energy Dashboard)
+        self._cost_statistics = CostStatistics(self._month_key(now))
+        # Running spot price vs Norgespris cost, month and year to date
+        self._comparison = RegimeComparison()
+        # Cost per component since the counters started, for cumulative sensors
+        self._cumulative = CumulativeCost()
+        # Month-end forecast: days after today simulated once a day, the rest of today every hour
+        self._forecast = None
+        self._forecast_hour = -1
+        self._simulation = None
+        # Tariff per hour for the months being booked (current and previous)
+        self._tariff_calendars = []
+
+        # Parsed prices; sensor feeds are kept current by state change events once tracked
+        self._spot_feed = PriceFeed()
+        self._provider_feed = PriceFeed()
+        self._price_sensor_feeds = {
+            entity_id: feed
+            for entity_id, feed in (
+                (self.spot_price_sensor, self._spot_feed),
+                (self.electricity_company_price_sensor, self._provider_feed),
+            )
+            if entity_id
+        }
+        self._price_feeds_tracked = False
+
         # Persistent storage - use TSO id for stable storage across reinstalls
         self._store = Store(hass, 1, f"{DOMAIN}_{tso_id}")
+        self._ledger_store = Store(hass, 1, f"{DOMAIN}_{tso_id}_ledger")
+        # Imported consumption history (loaded on first use)
+        self._history = None
+        self._history_store = Store(hass, 1, f"{DOMAIN}_{tso_id}_history")
         self._store_loaded = False
 
-    async def _async_update_data(self) -> dict[str, Any]:
+        # Runtime counters for diagnostics
+        self.stats = HotPathStats()
+
+    async def _async_update_data(self) -> CoordinatorSnapshot:
         """Fetch data from sensors and calculate values."""
-        now = datetime.now()
+        started = time.perf_counter()
+        try:
+            return await self._async_update(datetime.now())
+        finally:
+            self.stats.record_update(time.perf_counter() - started)
+
+    def _get_state(self, entity_id: str | None) -> State | None:
+        """Read a state from the state machine (counted for diagnostics)."""
+        self.stats.state_reads += 1
+        return self.hass.states.get(entity_id)
+
+    def async_track_price_sensors(self) -> Callable[[], None]:
+        """Parse the price sensors when they publish instead of on every update.
+
+        Returns:
+            Callback that stops tracking
+        """
+        feeds = self._price_sensor_feeds
+        for entity_id, feed in feeds.items():
+            feed.update(self.hass.states.get(entity_id))
+
+        def _state_changed(event: Event[EventStateChangedData]) -> None:
+            # A feed loaded from a price file no longer follows its sensor
+            if (feed := feeds.get(event.data["entity_id"])) is not None:
+                feed.update(event.data["new_state"])
 
+        unsubscribe = async_track_state_change_event(self.hass, list(feeds), _state_changed)
+        self._price_feeds_tracked = True
+
+        def _untrack() -> None:
+            self._price_feeds_tracked = False
+            unsubscribe()
+
+        return _untrack
+
+    def _price_at(self, feed: PriceFeed, entity_id: str | None, now: datetime) -> float | None:
+        """Price from a price feed for now (None if unavailable)."""
+        if not self._price_feeds_tracked and entity_id in self._price_sensor_feeds:
+            # Not subscribed (yet): parse the state if it changed since last time
+            feed.update(self._get_state(entity_id))
+        return feed.price_at(now.timestamp())
+
+    @property
+    def _spot_from_file(self) -> bool:
+        """Whether spot prices come from the price file instead of the spot sensor."""
+        return self.price_file is not None and self.spot_price_sensor not in self._price_sensor_feeds
+
+    async def _async_load_price_file(self) -> None:
+        """Load spot prices from the configured price file instead of the spot sensor."""
+        if self.price_file is None:
+            return
+        path = self.hass.config.path(self.price_file)
+        try:
+            prices = await self.hass.async_add_executor_job(read_price_file, path)
+        except (PriceSourceError, OSError) as err:
+            _LOGGER.warning("Could not read price file %s, using %s instead: %s", path, self.spot_price_sensor, err)
+            return
+        self._spot_feed.load(prices)
+        self._price_sensor_feeds.pop(self.spot_price_sensor or "", None)
+        _LOGGER.debug(
+            "Loaded %d spot prices at %.0f minute intervals from %s",
+            len(prices),
+            (self._spot_feed.interval_s or 0) / 60,
+            path,
+        )
+
+    async def _async_update(self, now: datetime) -> CoordinatorSnapshot:
+        """Calculate all values for the given point in time."""
         # Load stored data on first run
         if not self._store_loaded:
             await self._load_stored_data()
+            await self._async_load_price_file()
             self._store_loaded = True
 
         # Reset at new month
         if now.month != self._current_month:
-            # Save previous month's data before reset
-            self._previous_month_consumption = self._monthly_consumption.copy()
-            self._previous_month_top_3 = self._get_top_3_days()
+            # Keep previous month's data for invoice verification
+            self._previous_month = self._month
             # Format: "januar 2026" (Norwegian month name)
             prev_month_date = now.replace(day=1) - timedelta(days=1)
             self._previous_month_name = self._format_month_name(prev_month_date)
 
-            # Reset current month data
-            self._daily_max_power = {}
-            self._monthly_consumption = {"dag": 0.0, "natt": 0.0}
+            # Start the new month
+            self._month = MonthState(self._month_key(now))
             self._current_month = now.month
+            self._previous_ledger = self._ledger
+            self._ledger = CostLedger(self._month_key(now))
+            self._close_month(self._previous_month, self._previous_ledger)
+            # The month before the previous one is no longer measured
+            self._range_index = None
             await self._save_stored_data()
+            self._schedule_ledger_save()
+
+        # Get spot price (needed to book the interval that closes now)
+        spot_price = self._price_at(self._spot_feed, self.spot_price_sensor, now) or 0.0
 
         # Get current power consumption
-        power_state = self.hass.states.get(self.power_sensor)
-        current_power_w = (
-            float(power_state.state) if power_state and power_state.state not in ("unknown", "unavailable") else 0
-        )
+        power_state = self._get_state(self.power_sensor)
+        current_power_w: float
+        power_available = False
+        if power_state and power_state.state not in ("unknown", "unavailable"):
+            current_power_w = float(power_state.state)
+            power_available = True
+        else:
+            # No usable sample this tick
+            current_power_w = 0
+            if not self.energy_sensor:
+                self.stats.skipped_updates += 1
         current_power_kw = current_power_w / 1000
 
-        # Calculate energy consumption since last update (riemann sum)
+        # Calculate energy consumption since the previous reading
         consumption_updated = False
-        if self._last_update is not None and current_power_kw > 0:
-            elapsed_hours = (now - self._last_update).total_seconds() / 3600
-            energy_kwh = current_power_kw * elapsed_hours
-            # Add to appropriate tariff bucket
-            tariff = "dag" if self._is_day_rate(now) else "natt"
-            self._monthly_consumption[tariff] += energy_kwh
-            consumption_updated = True
-        self._last_update = now
+        peak_kw = current_power_kw
+        if self.energy_sensor:
+            # Meter register deltas; daily peaks are booked as hourly energy
+            consumption_updated = self._update_from_meter(now, spot_price)
+            peak_kw = 0.0
+        elif power_available:
+            # Gap-aware Riemann sum of the power sensor
+            self.stats.record_gap(self._integrator.elapsed_s(now))
+            gap_start = self._integrator.last_time
+            segments = self._integrator.add_split(now, max(current_power_kw, 0.0))
+            if segments is None:
+                if gap_start is not None:
+                    # Gap longer than the cap: use recorder history instead of one sample
+                    consumption_updated = await self._async_backfill_gap(gap_start, now, spot_price)
+            else:
+                # One segment per clock hour: tariff, day, month and price of the segment, not of now
+                for start_ts, energy_kwh in segments:
+                    if energy_kwh:
+                        price = self._spot_feed.price_at(start_ts)
+                        self._book(datetime.fromtimestamp(start_ts), energy_kwh, spot_price if price is None else price)
+                        consumption_updated = True
 
         # Update daily max
-        today_str = now.strftime("%Y-%m-%d")
-        old_max = self._daily_max_power.get(today_str, 0)
-        new_max = max(old_max, current_power_kw)
-        if new_max > old_max:
-            self._daily_max_power[today_str] = new_max
+        peak_updated = self._add_peak(now, peak_kw)
+        self._rollups.roll(now)
 
         # Save if anything changed
-        if new_max > old_max or consumption_updated:
+        if peak_updated or consumption_updated:
             await self._save_stored_data()
+        if consumption_updated:
+            self._schedule_ledger_save()
 
         # Get top 3 days
-        top_3 = self._get_top_3_days()
+        top_3 = self._month.top_days()
         avg_power = sum(top_3.values()) / 3 if len(top_3) >= 3 else sum(top_3.values()) / max(len(top_3), 1)
 
+        previous_top_3 = self._previous_month.top_days()
+
         # Calculate capacity tier
         kapasitetsledd, trinn_nummer, trinn_intervall = self._get_kapasitetsledd(avg_power)
 
+        # Cost of the hours closed since the last push, for the Energy Dashboard
+        if self._cost_statistics.due(now.timestamp()) and "recorder" in self.hass.config.components:
+            self._push_cost_statistics(now, kapasitetsledd)
+
         # Calculate energiledd
         energiledd = self._get_energiledd(now)
 
-        # Get spot price
-        spot_state = self.hass.states.get(self.spot_price_sensor)
-        spot_price = float(spot_state.state) if spot_state and spot_state.state not in ("unknown", "unavailable") else 0
+        # Month-to-date kWh against the Norgespris/strømstøtte cap
+        monthly_kwh = self._month.total_kwh
+        under_cap = monthly_kwh < self.monthly_cap_kwh
 
-        # Calculate strømstøtte
-        # Forskrift § 5: 90% av spotpris over 77 øre/kWh eks. mva (96,25 øre inkl. mva) i 2026
-        # Kilde: https://lovdata.no/dokument/SF/forskrift/2025-09-08-1791
-        stromstotte: float
-        if self.har_norgespris:
-            # Norgespris: Ingen strømstøtte (kan ikke kombineres)
-            stromstotte = 0.0
-        elif spot_price > STROMSTOTTE_LEVEL:
-            stromstotte = (spot_price - STROMSTOTTE_LEVEL) * STROMSTOTTE_RATE
-        else:
-            stromstotte = 0.0
+        # Calculate strømstøtte (none above the cap)
+        stromstotte = self._get_stromstotte(spot_price) if under_cap else 0.0
 
         # Spotpris etter strømstøtte
         spotpris_etter_stotte = spot_price - stromstotte
@@ -212,16 +419,18 @@ class NettleieCoordinator(DataUpdateCoordinator[dict[str, Any]]):  # type: ignor
 
         # Total price calculation depends on whether user has Norgespris
         if self.har_norgespris:
-            # Bruker har Norgespris: bruk fast pris i stedet for spotpris
-            total_price = norgespris + energiledd + fastledd_per_kwh
-            total_price_uten_stotte = norgespris + energiledd + fastledd_per_kwh  # Samme som total_price
+            # Bruker har Norgespris: bruk fast pris i stedet for spotpris (spotpris over grensen)
+            strompris = norgespris if under_cap else spot_price
+            total_price = strompris + energiledd + fastledd_per_kwh
+            total_price_uten_stotte = total_price  # Samme som total_price
         else:
             # Standard: spotpris minus strømstøtte
             total_price = spot_price - stromstotte + energiledd + fastledd_per_kwh
             total_price_uten_stotte = spot_price + energiledd + fastledd_per_kwh
 
-        # Total pris med norgespris (for sammenligning)
-        total_pris_norgespris = norgespris + energiledd + fastledd_per_kwh
+        # Total pris med norgespris (for sammenligning), spotpris over Norgespris-grensen
+        norgespris_strompris = norgespris if monthly_kwh < self.norgespris_max_kwh else spot_price
+        total_pris_norgespris = norgespris_strompris + energiledd + fastledd_per_kwh
 
         # Offentlige avgifter (for Energy Dashboard)
         # Forbruksavgift og Enova-avgift inkl. mva
@@ -234,6 +443,12 @@ class NettleieCoordinator(DataUpdateCoordinator[dict[str, Any]]):  # type: ignor
         # Totalpris inkl. alle avgifter (for Energy Dashboard)
         total_price_inkl_avgifter = total_price + offentlige_avgifter
 
+        # Month-end bill and kapasitetstrinn, simulated again when the hour changes
+        if (hour := hour_index(now)) != self._forecast_hour:
+            self._forecast_hour = hour
+            self._forecast = await self._async_forecast(now, total_price_inkl_avgifter - fastledd_per_kwh)
+        forecast = self._forecast
+
         # Kroner spart/tapt per kWh (sammenligning)
         # Positiv = du betaler mer enn Norgespris
         # Negativ = du betaler mindre enn Norgespris
@@ -247,71 +462,496 @@ class NettleieCoordinator(DataUpdateCoordinator[dict[str, Any]]):  # type: ignor
         electricity_company_price = None
         electricity_company_total = None
         if self.electricity_company_price_sensor:
-            electricity_company_state = self.hass.states.get(self.electricity_company_price_sensor)
-            if electricity_company_state and electricity_company_state.state not in ("unknown", "unavailable"):
-                electricity_company_price = float(electricity_company_state.state)
+            electricity_company_price = self._price_at(self._provider_feed, self.electricity_company_price_sensor, now)
+            if electricity_company_price is not None:
                 # Electricity company total = strømpris + nettleie (energiledd + kapasitetsledd per kWh)
                 electricity_company_total = electricity_company_price + energiledd + fastledd_per_kwh
 
-        return {
-            "energiledd": round(energiledd, 4),
-            "energiledd_dag": self.energiledd_dag,
-            "energiledd_natt": self.energiledd_natt,
-            "kapasitetsledd": kapasitetsledd,
-            "kapasitetstrinn_nummer": trinn_nummer,
-            "kapasitetstrinn_intervall": trinn_intervall,
-            "kapasitetsledd_per_kwh": round(fastledd_per_kwh, 4),
-            "spot_price": round(spot_price, 4),
-            "stromstotte": round(stromstotte, 4),
-            "spotpris_etter_stotte": round(spotpris_etter_stotte, 4),
-            "norgespris": round(norgespris, 4),
-            "norgespris_stromstotte": norgespris_stromstotte,
-            "total_pris_norgespris": round(total_pris_norgespris, 4),
-            "kroner_spart_per_kwh": round(kroner_spart_per_kwh, 4),
-            "total_price": round(total_price, 4),
-            "total_price_uten_stotte": round(total_price_uten_stotte, 4),
-            "total_price_inkl_avgifter": round(total_price_inkl_avgifter, 4),
-            "forbruksavgift_inkl_mva": round(forbruksavgift_inkl_mva, 4),
-            "enova_inkl_mva": round(enova_inkl_mva, 4),
-            "offentlige_avgifter": round(offentlige_avgifter, 4),
-            "electricity_company_price": round(electricity_company_price, 4)
-            if electricity_company_price is not None
-            else None,
-            "electricity_company_total": round(electricity_company_total, 4)
-            if electricity_company_total is not None
-            else None,
-            "current_power_kw": round(current_power_kw, 2),
-            "avg_top_3_kw": round(avg_power, 2),
-            "top_3_days": top_3,
-            "is_day_rate": self._is_day_rate(now),
-            "tso": self.tso["name"],
-            "har_norgespris": self.har_norgespris,
-            "avgiftssone": self.avgiftssone,
+        ledger_totals = self._ledger.totals
+        comparison = self._comparison
+        comparison.roll(self._month_key(now))
+
+        # Closed months from the summaries plus the running month
+        month_to_date = PeriodTotals.month_to_date(self._month, self._ledger, kapasitetsledd)
+        previous_sums, previous_kapasitetsledd = self._previous_month_costs(previous_top_3)
+        previous = PeriodTotals.of_month(0, previous_sums, previous_kapasitetsledd)
+        last_closed = previous_month(self._month.month)
+        year_to_date = self._summaries.totals(f"{self._month.month[:4]}-01", last_closed) + month_to_date
+        rolling_12 = self._summaries.totals(previous_month(self._month.month, 11), last_closed) + month_to_date
+        rollups = self._rollups
+        today = rollups.running(TIER_DAY)
+        this_year = rollups.running(TIER_YEAR)
+        cumulative = self._cumulative
+        return CoordinatorSnapshot(
+            energiledd=energiledd,
+            energiledd_dag=self.energiledd_dag,
+            energiledd_natt=self.energiledd_natt,
+            kapasitetsledd=kapasitetsledd,
+            kapasitetstrinn_nummer=trinn_nummer,
+            kapasitetstrinn_intervall=trinn_intervall,
+            kapasitetsledd_per_kwh=fastledd_per_kwh,
+            spot_price=spot_price,
+            stromstotte=stromstotte,
+            spotpris_etter_stotte=spotpris_etter_stotte,
+            norgespris=norgespris,
+            norgespris_stromstotte=norgespris_stromstotte,
+            total_pris_norgespris=total_pris_norgespris,
+            kroner_spart_per_kwh=kroner_spart_per_kwh,
+            total_price=total_price,
+            total_price_uten_stotte=total_price_uten_stotte,
+            total_price_inkl_avgifter=total_price_inkl_avgifter,
+            forbruksavgift_inkl_mva=forbruksavgift_inkl_mva,
+            enova_inkl_mva=enova_inkl_mva,
+            offentlige_avgifter=offentlige_avgifter,
+            electricity_company_price=electricity_company_price,
+            electricity_company_total=electricity_company_total,
+            current_power_kw=current_power_kw,
+            avg_top_3_kw=avg_power,
+            top_3_days=MappingProxyType(top_3),
+            is_day_rate=self._is_day_rate(now),
+            tso=self.tso["name"],
+            har_norgespris=self.har_norgespris,
+            fritidsbolig=self.fritidsbolig,
+            monthly_cap_kwh=self.monthly_cap_kwh,
+            monthly_cap_remaining_kwh=max(self.monthly_cap_kwh - monthly_kwh, 0.0),
+            norgespris_max_kwh=self.norgespris_max_kwh,
+            avgiftssone=self.avgiftssone,
             # Monthly consumption tracking
-            "monthly_consumption_dag_kwh": round(self._monthly_consumption["dag"], 3),
-            "monthly_consumption_natt_kwh": round(self._monthly_consumption["natt"], 3),
-            "monthly_consumption_total_kwh": round(
-                self._monthly_consumption["dag"] + self._monthly_consumption["natt"], 3
-            ),
+            monthly_consumption_dag_kwh=self._month.dag_kwh,
+            monthly_consumption_natt_kwh=self._month.natt_kwh,
+            monthly_consumption_total_kwh=self._month.total_kwh,
             # Previous month data for invoice verification
-            "previous_month_consumption_dag_kwh": round(self._previous_month_consumption["dag"], 3),
-            "previous_month_consumption_natt_kwh": round(self._previous_month_consumption["natt"], 3),
-            "previous_month_consumption_total_kwh": round(
-                self._previous_month_consumption["dag"] + self._previous_month_consumption["natt"], 3
-            ),
-            "previous_month_top_3": self._previous_month_top_3,
-            "previous_month_avg_top_3_kw": round(
-                sum(self._previous_month_top_3.values()) / max(len(self._previous_month_top_3), 1), 2
+            previous_month_consumption_dag_kwh=self._previous_month.dag_kwh,
+            previous_month_consumption_natt_kwh=self._previous_month.natt_kwh,
+            previous_month_consumption_total_kwh=self._previous_month.total_kwh,
+            previous_month_top_3=MappingProxyType(previous_top_3),
+            previous_month_avg_top_3_kw=sum(previous_top_3.values()) / len(previous_top_3) if previous_top_3 else 0.0,
+            previous_month_name=self._previous_month_name,
+            previous_month_energiledd_dag_kr=uore_to_kr(previous_sums["energiledd_dag"]),
+            previous_month_energiledd_natt_kr=uore_to_kr(previous_sums["energiledd_natt"]),
+            previous_month_kapasitetsledd=previous_kapasitetsledd,
+            previous_month_nettleie_kr=previous.nettleie_kr,
+            # Month-to-date costs from the ledger (exact per interval)
+            monthly_energiledd_dag_kr=ledger_totals["energiledd_dag"],
+            monthly_energiledd_natt_kr=ledger_totals["energiledd_natt"],
+            monthly_spot_kr=ledger_totals["spot"],
+            monthly_stromstotte_kr=ledger_totals["stromstotte"],
+            monthly_stromstotte_kwh=ledger_totals["stromstotte_kwh"],
+            monthly_forbruksavgift_kr=ledger_totals["forbruksavgift"],
+            monthly_enova_kr=ledger_totals["enova"],
+            monthly_mva_kr=ledger_totals["mva"],
+            monthly_nettleie_kr=month_to_date.nettleie_kr,
+            monthly_avgifter_kr=month_to_date.avgifter_kr,
+            monthly_total_kr=month_to_date.total_kr,
+            # Spot price vs Norgespris for the energy used (positive: Norgespris is cheaper)
+            comparison_month_kwh=comparison.month_kwh,
+            comparison_month_spot_kr=comparison.month_spot_kr,
+            comparison_month_norgespris_kr=comparison.month_norgespris_kr,
+            comparison_month_difference_kr=comparison.month_difference_kr,
+            comparison_year_kwh=comparison.year_kwh,
+            comparison_year_spot_kr=comparison.year_spot_kr,
+            comparison_year_norgespris_kr=comparison.year_norgespris_kr,
+            comparison_year_difference_kr=comparison.year_difference_kr,
+            # Year to date and the last 12 months, including the running month
+            year_to_date_months=year_to_date.months,
+            year_to_date_kwh=year_to_date.kwh,
+            year_to_date_nettleie_kr=year_to_date.nettleie_kr,
+            year_to_date_avgifter_kr=year_to_date.avgifter_kr,
+            year_to_date_stromstotte_kr=year_to_date.stromstotte_kr,
+            year_to_date_spot_kr=year_to_date.spot_kr,
+            year_to_date_total_kr=year_to_date.total_kr,
+            rolling_12_months=rolling_12.months,
+            rolling_12_kwh=rolling_12.kwh,
+            rolling_12_nettleie_kr=rolling_12.nettleie_kr,
+            rolling_12_avgifter_kr=rolling_12.avgifter_kr,
+            rolling_12_stromstotte_kr=rolling_12.stromstotte_kr,
+            rolling_12_spot_kr=rolling_12.spot_kr,
+            rolling_12_total_kr=rolling_12.total_kr,
+            # Today and this year, read from the running rollups
+            today_kwh=today.kwh,
+            today_spot_kr=today.spot_kr,
+            today_energiledd_kr=today.energiledd_kr,
+            today_avgifter_kr=today.avgifter_kr,
+            today_stromstotte_kr=today.stromstotte_kr,
+            today_total_kr=today.total_kr,
+            today_peak_kw=today.peak_kw,
+            today_bookings=today.bookings,
+            today_previous_total_kr=rollups.previous[TIER_DAY].total_kr,
+            this_year_kwh=this_year.kwh,
+            this_year_spot_kr=this_year.spot_kr,
+            this_year_energiledd_kr=this_year.energiledd_kr,
+            this_year_avgifter_kr=this_year.avgifter_kr,
+            this_year_stromstotte_kr=this_year.stromstotte_kr,
+            this_year_total_kr=this_year.total_kr,
+            this_year_peak_kw=this_year.peak_kw,
+            this_year_bookings=this_year.bookings,
+            this_year_previous_total_kr=rollups.previous[TIER_YEAR].total_kr,
+            cumulative_nettleie_kr=cumulative.nettleie_kr,
+            cumulative_strompris_kr=cumulative.strompris_kr,
+            cumulative_avgifter_kr=cumulative.avgifter_kr,
+            cumulative_stromstotte_kr=cumulative.stromstotte_kr,
+            cumulative_total_kr=cumulative.total_kr,
+            forecast_bill_kr=forecast.bill_kr if forecast else None,
+            forecast_bill_low_kr=forecast.bill_low_kr if forecast else None,
+            forecast_bill_high_kr=forecast.bill_high_kr if forecast else None,
+            forecast_kwh=forecast.kwh if forecast else None,
+            forecast_trinn_nummer=forecast.trinn_nummer if forecast else None,
+            forecast_trinn_probabilities=forecast.trinn_probabilities if forecast else (),
+            forecast_simulations=forecast.simulations if forecast else 0,
+        )
+
+    def _update_from_meter(self, now: datetime, spot_price: float) -> bool:
+        """Book consumption and hourly peaks from the cumulative kWh register.
+
+        Returns True if anything changed.
+        """
+        state = self._get_state(self.energy_sensor)
+        if not state or state.state in ("unknown", "unavailable"):
+            self.stats.skipped_updates += 1
+            return False
+        unit = state.attributes.get("unit_of_measurement", "kWh")
+        value_kwh = float(state.state) * ENERGY_UNIT_TO_KWH.get(unit, 1.0)
+
+        # Split at the spot price intervals, so each piece gets the price that applied then
+        split_s = 3600.0
+        if (interval_s := self._spot_feed.interval_s) and 3600 % interval_s == 0:
+            split_s = interval_s
+        changed = False
+        for start, energy_kwh, hour_total_kwh in self._meter.add(now, value_kwh, split_s):
+            # Energy read after a month change may belong to the previous month
+            price = self._spot_feed.price_at(start.timestamp())
+            self._book(start, energy_kwh, spot_price if price is None else price)
+            changed = True
+            if self._month_key(start) != self._month.month:
+                continue
+            # Kapasitetstrinn uses the highest hourly energy (kWh/h = kW) per day
+            self._add_peak(start, hour_total_kwh)
+        return changed
+
+    async def _async_backfill_gap(self, start: datetime, end: datetime, spot_price: float) -> bool:
+        """Book consumption for a gap longer than the cap from recorder history.
+
+        Returns True if anything was booked.
+        """
+        samples = await self._async_power_history(start, end)
+        if not samples:
+            _LOGGER.warning(
+                "No recorder history for %s in a %.0f minute gap; consumption in the gap is not counted",
+                self.power_sensor,
+                (end.timestamp() - start.timestamp()) / 60,
             )
-            if self._previous_month_top_3
-            else 0.0,
-            "previous_month_name": self._previous_month_name,
+            return False
+
+        # Each interval gets the spot price that applied then, if known
+        prices = await self._async_price_history(start, end)
+        split_s = 3600.0
+        if prices is not None and (interval_s := prices.interval_s) and 3600 % interval_s == 0:
+            split_s = min(split_s, interval_s)
+        booked = False
+        for start_ts, _end_ts, energy_kwh in integrate_history(samples, end.timestamp(), split_s):
+            if energy_kwh <= 0:
+                continue
+            price = prices.price_at(start_ts) if prices is not None else None
+            self._book(datetime.fromtimestamp(start_ts), energy_kwh, spot_price if price is None else price)
+            booked = True
+
+        # Peaks during the gap count towards kapasitetstrinn
+        for ts, power_kw in samples:
+            local = datetime.fromtimestamp(ts)
+            if self._month_key(local) == self._month.month and self._add_peak(local, power_kw):
+                booked = True
+
+        _LOGGER.debug("Backfilled gap %s - %s from %d recorder states", start, end, len(samples))
+        return booked
+
+    async def _async_power_history(self, start: datetime, end: datetime) -> list[tuple[float, float]]:
+        """Read power samples as (epoch_seconds, kW) from the recorder.
+
+        Unavailable states count as 0 kW. Returns an empty list if the
+        recorder is not loaded.
+        """
+        if self.power_sensor is None:
+            return []
+        start_ts = start.timestamp()
+        samples: list[tuple[float, float]] = []
+        for state in await self._async_recorder_states(self.power_sensor, start, end):
+            power_kw = 0.0
+            if state.state not in ("unknown", "unavailable"):
+                power_kw = max(float(state.state) / 1000, 0.0)
+            # The first state may have changed before the gap started
+            samples.append((max(state.last_changed.timestamp(), start_ts), power_kw))
+        return samples
+
+    async def _async_price_history(self, start: datetime, end: datetime) -> PriceFeed | None:
+        """Spot prices for a past period: the price file, or the spot sensor's recorder history."""
+        if self._spot_from_file:
+            return self._spot_feed
+        if self.spot_price_sensor is None:
+            return None
+        states = await self._async_recorder_states(self.spot_price_sensor, start, end)
+        if not states:
+            return None
+        prices = prices_from_states(states)
+        feed = PriceFeed()
+        # The last recorded price holds until the end of the period
+        feed.load(prices, prices[max(prices)] if prices else None)
+        return feed
+
+    async def _async_recorder_states(self, entity_id: str, start: datetime, end: datetime) -> list[State]:
+        """Read an entity's states in a period from the recorder (empty if not loaded)."""
+        if "recorder" not in self.hass.config.components:
+            return []
+
+        from homeassistant.components.recorder import get_instance, history
+
+        states = await get_instance(self.hass).async_add_executor_job(
+            history.state_changes_during_period,
+            self.hass,
+            datetime.fromtimestamp(start.timestamp(), UTC),
+            datetime.fromtimestamp(end.timestamp(), UTC),
+            entity_id,
+        )
+        return cast("list[State]", states.get(entity_id, []))
+
+    def _book(self, when: datetime, energy_kwh: float, spot_price: float) -> None:
+        """Book consumption on its tariff bucket and cost ledger.
+
+        Consumption in an earlier month than the current one (read after the
+        month change) goes to the previous month, and its summary is updated.
+        Consumption in a month before that (after downtime over more than one
+        month change) is not measured and is dropped with a warning.
+
+        The interval that crosses the monthly Norgespris/strømstøtte cap is
+        split: the part under the cap gets Norgespris or strømstøtte, the rest
+        is booked at spot price without strømstøtte.
+        """
+        key = self._month_key(when)
+        ledger: CostLedger | None = self._ledger
+        month = self._month
+        if key != month.month:
+            if key != self._previous_month.month:
+                if key != self._skipped_month:
+                    self._skipped_month = key
+                    _LOGGER.warning("Consumption read for %s, which is no longer measured, is not counted", key)
+                return
+            month = self._previous_month
+            ledger = self._previous_ledger
+        is_day = self._is_day_at(when.timestamp())
+        used_kwh = month.total_kwh
+        month.add_energy(when, is_day, energy_kwh)
+        self._book_comparison(when, used_kwh, energy_kwh, spot_price)
+        if ledger is not None:
+            self._range_changed_from = min(self._range_changed_from, hour_index(when))
+            under_cap_kwh, over_cap_kwh = split_at_cap(used_kwh, energy_kwh, self.monthly_cap_kwh)
+            if under_cap_kwh > 0:
+                under_cap = self._interval_prices(when, is_day, spot_price)
+                booked = ledger.add(when, is_day, under_cap_kwh, under_cap)
+                self._rollups.add(when, booked)
+                self._cumulative.add(booked)
+            if over_cap_kwh > 0:
+                over_cap = self._interval_prices(when, is_day, spot_price, under_cap=False)
+                booked = ledger.add(when, is_day, over_cap_kwh, over_cap)
+                self._rollups.add(when, booked)
+                self._cumulative.add(booked)
+        if month is self._previous_month:
+            self._close_month(month, ledger)
+
+    def _add_peak(self, when: datetime, kw: float) -> bool:
+        """Raise the day's peak in the month and the rollup peaks. Returns True if the day's peak rose."""
+        self._rollups.add_peak(when, kw)
+        return self._month.add_peak(when.day, kw)
+
+    def _book_comparison(self, when: datetime, used_kwh: float, energy_kwh: float, spot_price: float) -> None:
+        """Add the interval's energy cost under spot price and under Norgespris."""
+        stotte_kwh, _ = split_at_cap(used_kwh, energy_kwh, STROMSTOTTE_MAX_KWH)
+        norgespris_kwh, spot_kwh = split_at_cap(used_kwh, energy_kwh, self.norgespris_max_kwh)
+        spot_kr = energy_kwh * spot_price - stotte_kwh * self._stromstotte_for_spot(spot_price)
+        norgespris_kr = norgespris_kwh * get_norgespris_inkl_mva(self.avgiftssone) + spot_kwh * spot_price
+        self._comparison.add(self._month_key(when), energy_kwh, spot_kr, norgespris_kr)
+
+    def _interval_prices(
+        self, when: datetime, is_day: bool, spot_price: float, under_cap: bool = True
+    ) -> IntervalPrices:
+        """Prices in effect for an interval.
+
+        Under the monthly cap the strømpris is Norgespris (if chosen) or spot
+        price with strømstøtte; above it, spot price without strømstøtte.
+        """
+        strompris = spot_price
+        if under_cap and self.har_norgespris:
+            strompris = get_norgespris_inkl_mva(self.avgiftssone)
+        return IntervalPrices(
+            energiledd=self.energiledd_dag if is_day else self.energiledd_natt,
+            spot=strompris,
+            stromstotte=self._get_stromstotte(spot_price) if under_cap else 0.0,
+            forbruksavgift=get_forbruksavgift(self.avgiftssone, when.month),
+            enova=ENOVA_AVGIFT,
+            mva_sats=get_mva_sats(self.avgiftssone),
+        )
+
+    async def async_reconcile_invoice(self, invoice: Invoice) -> Reconciliation | None:
+        """Compare an invoice with the cost ledger for its month (None if not stored).
+
+        Measured months (current and previous) are used first, then imported history.
+        """
+        ledger = self._measured_ledger(invoice.month) or (await self._async_history()).get(invoice.month)
+        if ledger is None:
+            return None
+        return reconcile(ledger, invoice, self.kapasitetstrinn, get_mva_sats(self.avgiftssone))
+
+    async def async_import_consumption(
+        self, path: str, timezone: str, timestamps: str, price_file: str | None = None
+    ) -> dict[str, Any]:
+        """Import an hourly consumption export into the history store.
+
+        The file is read and priced in the executor. Spot prices come from
+        price_file if given, else from the configured price file; without
+        either only nettleie and avgifter are priced. Months that were also
+        measured are compared with the import (the grid company's numbers).
+        """
+        ledgers, stats = await self.hass.async_add_executor_job(
+            self._price_import, path, timezone, timestamps, price_file
+        )
+        history = await self._async_history()
+        history.update(ledgers)
+        self._range_index = None
+        await self._history_store.async_save({"months": {month: ledger.as_dict() for month, ledger in history.items()}})
+
+        comparison: list[dict[str, Any]] = []
+        mva_sats = get_mva_sats(self.avgiftssone)
+        for month, imported in sorted(ledgers.items()):
+            measured = self._measured_ledger(month)
+            if measured is None:
+                continue
+            # Spot price and strømstøtte are not part of consumption exports
+            lines = {k: v for k, v in ledger_lines(imported, self.kapasitetstrinn).items() if "stromstotte" not in k}
+            invoice = Invoice.from_dict({"month": month, **lines})
+            comparison.append(reconcile(measured, invoice, self.kapasitetstrinn, mva_sats).as_dict())
+
+        return {
+            "months": {
+                month: {
+                    "hours": len(ledger.rows),
+                    "kwh": round(ledger.kwh, 3),
+                }
+                for month, ledger in sorted(ledgers.items())
+            },
+            "rows": stats.rows,
+            "skipped": stats.skipped,
+            "comparison": comparison,
         }
 
-    def _get_top_3_days(self) -> dict[str, float]:
-        """Get the top 3 days with highest power consumption."""
-        sorted_days = sorted(self._daily_max_power.items(), key=lambda x: x[1], reverse=True)
-        return dict(sorted_days[:3])
+    def _price_import(
+        self, path: str, timezone: str, timestamps: str, price_file: str | None = None
+    ) -> tuple[dict[str, CostLedger], ImportStats]:
+        """Read an export and book every hour on a ledger per month (runs in the executor)."""
+        spot: PriceFeed | None = None
+        if price_file is not None:
+            spot = PriceFeed()
+            spot.load(read_price_file(price_file, timezone, timestamps))
+        elif self._spot_from_file:
+            spot = self._spot_feed
+        stats = ImportStats()
+        ledgers: dict[str, CostLedger] = {}
+        prices: dict[tuple[int, bool], IntervalPrices] = {}
+        for hour_utc, kwh in read_consumption(path, timezone, timestamps, stats):
+            local = datetime.fromtimestamp(hour_utc.timestamp())
+            key = self._month_key(local)
+            ledger = ledgers.get(key)
+            if ledger is None:
+                ledger = ledgers[key] = CostLedger(key)
+            is_day = self._is_day_rate(local)
+            spot_price = spot.price_at(hour_utc.timestamp()) if spot is not None else None
+            if spot_price is not None:
+                # Priced like measured consumption, with the monthly cap
+                under, over = split_at_cap(ledger.kwh, kwh, self.monthly_cap_kwh)
+                if under > 0:
+                    ledger.add(local, is_day, under, self._interval_prices(local, is_day, spot_price))
+                if over > 0:
+                    ledger.add(local, is_day, over, self._interval_prices(local, is_day, spot_price, under_cap=False))
+                continue
+            # Fixed rates only change per month and tariff; strømpris is unknown (0)
+            interval_prices = prices.get((local.month, is_day))
+            if interval_prices is None:
+                interval_prices = self._interval_prices(local, is_day, 0.0, under_cap=False)
+                prices[(local.month, is_day)] = interval_prices
+            ledger.add(local, is_day, kwh, interval_prices)
+        return ledgers, stats
+
+    async def async_query_range(self, start: datetime, end: datetime) -> dict[str, Any]:
+        """Energy, cost lines and peak hour between two naive local times.
+
+        Read from prefix sums over the hourly rows of the measured months and
+        imported history; kapasitetsledd is per month and not included.
+        """
+        index = await self._async_range_index()
+        return index.query(start, end)
+
+    async def _async_range_index(self) -> RangeIndex:
+        """Get the range index, brought up to date with the hours booked since the last query."""
+        history = await self._async_history()
+        index = self._range_index
+        if index is None or self._range_changed_from < index.first:
+            index = self._range_index = self._build_range_index(history)
+        else:
+            # Hours booked since the last query are appended again
+            index.truncate(self._range_changed_from)
+            for hour in range(index.end, hour_index(datetime.now()) + 1):
+                key = key_of_hour(hour)
+                ledger = self._measured_ledger(key[:7]) or history.get(key[:7])
+                row = ledger.rows.get(key) if ledger is not None else None
+                if row is not None:
+                    index.append(hour, row_values(row))
+        self._range_changed_from = index.end
+        return index
+
+    def _build_range_index(self, history: dict[str, CostLedger]) -> RangeIndex:
+        """Index the hourly rows of imported history and the measured months, oldest first."""
+        months = {**history}
+        for ledger in (self._previous_ledger, self._ledger):
+            if ledger is not None:
+                months[ledger.month] = ledger
+        rows = [(hour_of_key(key), row) for month in sorted(months) for key, row in sorted(months[month].rows.items())]
+        index = RangeIndex(rows[0][0] if rows else hour_index(datetime.now()))
+        for hour, row in rows:
+            index.append(hour, row_values(row))
+        return index
+
+    def _measured_ledger(self, month: str) -> CostLedger | None:
+        """Get the measured cost ledger for a month (current or previous)."""
+        for ledger in (self._ledger, self._previous_ledger):
+            if ledger is not None and ledger.month == month:
+                return ledger
+        return None
+
+    async def _async_history(self) -> dict[str, CostLedger]:
+        """Get imported history, loading it from storage on first use."""
+        if self._history is None:
+            data: dict[str, Any] = await self._history_store.async_load() or {}
+            self._history = {}
+            for month, ledger_data in data.get("months", {}).items():
+                ledger = CostLedger.from_dict(ledger_data)
+                if ledger is not None:
+                    self._history[month] = ledger
+        return self._history
+
+    def _get_stromstotte(self, spot_price: float) -> float:
+        """Get strømstøtte per kWh for a spot price (0 with Norgespris)."""
+        if self.har_norgespris:
+            # Norgespris: Ingen strømstøtte (kan ikke kombineres)
+            return 0.0
+        return self._stromstotte_for_spot(spot_price)
+
+    @staticmethod
+    def _stromstotte_for_spot(spot_price: float) -> float:
+        """Get strømstøtte per kWh for a spot price without Norgespris.
+
+        Forskrift § 5: 90% av spotpris over 77 øre/kWh eks. mva (96,25 øre inkl. mva) i 2026
+        Kilde: https://lovdata.no/dokument/SF/forskrift/2025-09-08-1791
+        """
+        if spot_price > STROMSTOTTE_LEVEL:
+            return (spot_price - STROMSTOTTE_LEVEL) * STROMSTOTTE_RATE
+        return 0.0
 
     def _get_kapasitetsledd(self, avg_power: float) -> tuple[int, int, str]:
         """Get kapasitetsledd based on average power.
@@ -331,6 +971,130 @@ class NettleieCoordinator(DataUpdateCoordinator[dict[str, Any]]):  # type: ignor
         last_price = self.kapasitetstrinn[-1][1]
         return last_price, last_idx, f">{prev:.0f} kW"
 
+    def _previous_month_costs(self, top_3: dict[str, float]) -> tuple[Mapping[str, int], int]:
+        """Ledger sums and kapasitetsledd of the previous month.
+
+        A previous month stored before the ledger existed gets energiledd at
+        the configured rates. No peaks: no kapasitetsledd.
+        """
+        ledger = self._previous_ledger
+        sums: Mapping[str, int]
+        if ledger is not None:
+            sums = ledger.sums
+        else:
+            month = self._previous_month
+            sums = {
+                **dict.fromkeys(TOTAL_FIELDS, 0),
+                "energiledd_dag": kr_to_uore(month.dag_kwh * self.energiledd_dag),
+                "energiledd_natt": kr_to_uore(month.natt_kwh * self.energiledd_natt),
+            }
+        kapasitetsledd = self._get_kapasitetsledd(sum(top_3.values()) / len(top_3))[0] if top_3 else 0
+        return sums, kapasitetsledd
+
+    def _push_cost_statistics(self, now: datetime, kapasitetsledd: int) -> None:
+        """Send the cost of the closed hours (and of hours computed again) to the recorder."""
+
+        def kapasitetsledd_of(month: str) -> int | None:
+            if month == self._month.month:
+                return kapasitetsledd
+            summary = self._summaries.get(month)
+            return summary.kapasitetsledd if summary is not None else None
+
+        batch = self._cost_statistics.collect(now.timestamp(), self._measured_ledger, kapasitetsledd_of)
+        if batch:
+            self._add_cost_statistics(batch)
+        self._schedule_ledger_save()
+
+    def _add_cost_statistics(self, batch: list[tuple[float, int, int]]) -> None:
+        """Import hourly cost (start, cost, running sum in µøre) as one batch of external statistics."""
+        from homeassistant.components.recorder.statistics import async_add_external_statistics
+
+        metadata = {
+            "has_mean": False,
+            "has_sum": True,
+            "name": f"Strømkostnad ({self.tso['name']})",
+            "source": DOMAIN,
+            "statistic_id": f"{DOMAIN}:stromkostnad_{self._tso_id}",
+            "unit_of_measurement": "NOK",
+        }
+        statistics = [
+            {"start": datetime.fromtimestamp(start, UTC), "state": uore_to_kr(cost), "sum": uore_to_kr(total)}
+            for start, cost, total in batch
+        ]
+        async_add_external_statistics(self.hass, metadata, statistics)
+
+    def _reprice_energiledd(self) -> None:
+        """Book the month's hours again at the configured energiledd and re-import their cost."""
+        changes = self._ledger.reprice_energiledd(
+            self.energiledd_dag, self.energiledd_natt, get_mva_sats(self.avgiftssone)
+        )
+        for key, changed in changes:
+            self._rollups.add(datetime.strptime(key, "%Y-%m-%dT%H"), changed, bookings=0)
+        if self._cost_statistics.month == self._ledger.month:
+            self._cost_statistics.restart_month()
+        _LOGGER.info("Energiledd changed: %d hours of %s booked again", len(changes), self._ledger.month)
+
+    async def _async_forecast(self, now: datetime, price_per_kwh: float) -> MonthForecast | None:
+        """Forecast the end of the month from the days measured this month and the previous one.
+
+        The remaining energy is priced at the month's cost per kWh so far, or
+        at price_per_kwh (the current price without fastledd) before any is booked.
+        """
+        month = self._month
+        past_peaks = month.daily_max_kw[: now.day - 1]
+        simulation = self._simulation
+        if simulation is None or simulation.key != MonthSimulation.key_for(now.date(), past_peaks):
+            profile = DayProfile([*measured_days(self._previous_month), *measured_days(month, now.day)])
+            if not profile.days:
+                self._simulation = None
+                return None
+            simulation = self._simulation = await self.hass.async_add_executor_job(
+                MonthSimulation, profile, now.date(), self._days_in_month(now), past_peaks
+            )
+        sums = self._ledger.sums
+        cost_uore = (
+            sums["energiledd_dag"]
+            + sums["energiledd_natt"]
+            + sums["spot"]
+            + sums["forbruksavgift"]
+            + sums["enova"]
+            - sums["stromstotte"]
+        )
+        if (ledger_kwh := self._ledger.kwh) > 0:
+            price_per_kwh = uore_to_kr(cost_uore) / ledger_kwh
+        return simulation.forecast(
+            now,
+            month.daily_max_kw[now.day - 1],
+            month.total_kwh,
+            uore_to_kr(cost_uore),
+            price_per_kwh,
+            self.kapasitetstrinn,
+        )
+
+    def _close_month(self, month: MonthState, ledger: CostLedger | None) -> None:
+        """Store the summary of a closed month and count its kapasitetsledd."""
+        summary = self._summarize(month, ledger)
+        self._summaries.add(summary)
+        self._cumulative.close_month(summary.month, summary.kapasitetsledd)
+
+    def _summarize(self, month: MonthState, ledger: CostLedger | None) -> MonthSummary:
+        """Summary of a closed month, with the kapasitetstrinn its peaks reached."""
+        top_3 = month.top_days()
+        avg_power = sum(top_3.values()) / len(top_3) if top_3 else 0.0
+        kapasitetsledd, trinn_nummer, _ = self._get_kapasitetsledd(avg_power)
+        return MonthSummary.from_month(month, ledger, trinn_nummer, kapasitetsledd)
+
+    def monthly_summaries(self, year: int | None = None) -> dict[str, Any]:
+        """Closed-month summaries (optionally one year) with year-to-date and rolling 12-month totals."""
+        data = self.data
+        return {
+            "months": [
+                summary.as_dict() for summary in self._summaries if year is None or summary.month[:4] == str(year)
+            ],
+            "year_to_date": data.period("year_to_date") if data else None,
+            "rolling_12": data.period("rolling_12") if data else None,
+        }
+
     def _get_energiledd(self, now: datetime) -> float:
         """Get energiledd based on time of day."""
         if self._is_day_rate(now):
@@ -349,11 +1113,27 @@ class NettleieCoordinator(DataUpdateCoordinator[dict[str, Any]]):  # type: ignor
 
         return not (is_fixed_holiday or is_moving_holiday or is_weekend or is_night)
 
+    def _is_day_at(self, ts: float) -> bool:
+        """Tariff at an epoch timestamp, from the precomputed calendar of its month."""
+        for calendar in self._tariff_calendars:
+            if ts in calendar:
+                return calendar.is_day(ts)
+        month_start = datetime.fromtimestamp(ts).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        calendar = TariffCalendar(month_start, self._is_day_rate)
+        # Keep the two most recent months (bookings after a month change)
+        self._tariff_calendars = [calendar, *self._tariff_calendars[:1]]
+        return calendar.is_day(ts)
+
     def _days_in_month(self, now: datetime) -> int:
         """Get number of days in current month."""
         next_month = (now.replace(day=1) + timedelta(days=32)).replace(day=1)
         return (next_month - now.replace(day=1)).days
 
+    @staticmethod
+    def _month_key(dt: datetime) -> str:
+        """Ledger key for the month of dt ("YYYY-MM")."""
+        return f"{dt.year}-{dt.month:02d}"
+
     def _format_month_name(self, dt: datetime) -> str:
         """Format date as Norwegian month name with year."""
         months: list[str] = [
@@ -386,27 +1166,123 @@ class NettleieCoordinator(DataUpdateCoordinator[dict[str, Any]]):  # type: ignor
                 await self._store.async_save(data)
 
         if data:
-            self._daily_max_power = data.get("daily_max_power", {})
-            self._monthly_consumption = data.get("monthly_consumption", {"dag": 0.0, "natt": 0.0})
-            self._previous_month_consumption = data.get("previous_month_consumption", {"dag": 0.0, "natt": 0.0})
-            self._previous_month_top_3 = data.get("previous_month_top_3", {})
+            self._load_month_states(data)
             self._previous_month_name = data.get("previous_month_name")
-            stored_month = data.get("current_month")
-            # If stored month is different, clear data
-            if stored_month and stored_month != self._current_month:
-                self._daily_max_power = {}
-                self._monthly_consumption = {"dag": 0.0, "natt": 0.0}
-            _LOGGER.debug("Loaded stored data: %s", self._daily_max_power)
+            self._integrator.restore(data.get("last_power_sample"))
+            self._meter.restore(data.get("meter"))
+            self._comparison = RegimeComparison.from_dict(data.get("norgespris_comparison"))
+            self._cumulative = CumulativeCost.from_dict(data.get("cumulative_cost"))
+            _LOGGER.debug("Loaded stored data for %s", self._month.month)
+
+        await self._load_ledger()
+
+    def _load_month_states(self, data: dict[str, Any]) -> None:
+        """Restore the current and previous month, also from the dicts of earlier versions."""
+        current = MonthState.from_dict(data.get("month_state"))
+        previous = MonthState.from_dict(data.get("previous_month_state"))
+        if current is None and "month_state" not in data:
+            current = MonthState.from_legacy(
+                self._month.month, data.get("monthly_consumption"), data.get("daily_max_power")
+            )
+            previous = MonthState.from_legacy(
+                self._previous_month.month, data.get("previous_month_consumption"), data.get("previous_month_top_3")
+            )
+            # Earlier versions only stored the month number
+            if data.get("current_month") not in (None, self._current_month):
+                current = None
+        # A month stored before a month change becomes the previous month
+        for state in (previous, current):
+            if state is None:
+                continue
+            if state.month == self._month.month:
+                self._month = state
+            elif state.month == self._previous_month.month:
+                self._previous_month = state
+
+    async def _load_ledger(self) -> None:
+        """Load the cost ledgers, seeding the current month when upgrading."""
+        data: dict[str, Any] = await self._ledger_store.async_load() or {}
+        current_key = self._ledger.month
+        for ledger in (CostLedger.from_dict(data.get("current")), CostLedger.from_dict(data.get("previous"))):
+            if ledger is None:
+                continue
+            if ledger.month == current_key:
+                self._ledger = ledger
+            elif self._previous_ledger is None or ledger.month > self._previous_ledger.month:
+                self._previous_ledger = ledger
+        # Hourly consumption is saved with the ledgers, not on every update
+        for hourly in data.get("hourly", []):
+            if not self._month.restore_hourly(hourly):
+                self._previous_month.restore_hourly(hourly)
+
+        self._summaries = MonthSummaries.from_dict(data.get("summaries"))
+        previous = self._previous_month
+        if self._summaries.get(previous.month) is None and (previous.total_kwh or previous.top_days(1)):
+            # Month closed before summaries were kept
+            self._summaries.add(self._summarize(previous, self._previous_ledger))
+
+        now = datetime.now()
+        if not self._ledger.rows and not any(self._ledger.sums.values()):
+            # Consumption booked before the ledger existed (mid-month upgrade)
+            self._ledger.seed(
+                self._month.dag_kwh,
+                self._month.natt_kwh,
+                self._interval_prices(now, True, 0.0),
+                self._interval_prices(now, False, 0.0),
+            )
+
+        rollups = Rollups.from_dict(data.get("rollups"), now)
+        if rollups is None:
+            # Stored before rollups were kept: month and year from the ledger and summaries
+            rollups = Rollups(now)
+            month_peak = max(self._month.daily_max_kw)
+            rollups.seed(TIER_MONTH, self._ledger.sums, month_peak)
+            year_sums = dict(self._ledger.sums)
+            year_peak = month_peak
+            for summary in self._summaries:
+                if summary.month[:4] == self._ledger.month[:4]:
+                    for name, value in summary.ledger_sums.items():
+                        year_sums[name] += value
+                    year_peak = max((year_peak, *(kw for _, kw in summary.peaks)))
+            rollups.seed(TIER_YEAR, year_sums, year_peak)
+        self._rollups = rollups
+
+        self._cost_statistics = CostStatistics.from_dict(data.get("statistics"), current_key)
+        booked_rates = data.get("energiledd")
+        if booked_rates is not None and list(booked_rates) != [self.energiledd_dag, self.energiledd_natt]:
+            # Energiledd corrected (options or a new price list): the month is booked again
+            self._reprice_energiledd()
+            self._schedule_ledger_save()
 
     async def _save_stored_data(self) -> None:
         """Save data to disk."""
         data: dict[str, Any] = {
-            "daily_max_power": self._daily_max_power,
-            "monthly_consumption": self._monthly_consumption,
+            "month_state": self._month.as_dict(),
             "current_month": self._current_month,
-            "previous_month_consumption": self._previous_month_consumption,
-            "previous_month_top_3": self._previous_month_top_3,
+            "previous_month_state": self._previous_month.as_dict(),
             "previous_month_name": self._previous_month_name,
+            "last_power_sample": self._integrator.as_dict(),
+            "meter": self._meter.as_dict(),
+            "norgespris_comparison": self._comparison.as_dict(),
+            "cumulative_cost": self._cumulative.as_dict(),
         }
+        started = time.perf_counter()
         await self._store.async_save(data)
+        self.stats.record_save(time.perf_counter() - started)
         _LOGGER.debug("Saved data: %s", data)
+
+    def _schedule_ledger_save(self) -> None:
+        """Schedule a coalesced write of the cost ledgers (flushed by HA on shutdown)."""
+        self._ledger_store.async_delay_save(self._ledger_data, LEDGER_SAVE_DELAY_S)
+
+    def _ledger_data(self) -> dict[str, Any]:
+        """Return the cost ledgers and hourly consumption for storage."""
+        return {
+            "current": self._ledger.as_dict(),
+            "previous": self._previous_ledger.as_dict() if self._previous_ledger else None,
+            "hourly": [self._month.hourly_as_dict(), self._previous_month.hourly_as_dict()],
+            "summaries": self._summaries.as_dict(),
+            "rollups": self._rollups.as_dict(),
+            "energiledd": [self.energiledd_dag, self.energiledd_natt],
+            "statistics": self._cost_statistics.as_dict(),
+        }
@@ -0,0 +1,156 @@
+"""Exact hourly cost for the Energy Dashboard (long-term external statistics).
+
+Home Assistant prices energy from a price entity by sampling the price and
+multiplying by the energy used. That gets strømstøtte (monthly cap, spot
+price per interval) and kapasitetsledd (a monthly amount, not a price per
+kWh) wrong. Instead, the cost of every closed hour is computed from the
+cost ledger's hourly row and pushed as a statistic with a running sum:
+
+    hour cost = strømpris + energiledd + forbruksavgift + Enova - strømstøtte
+                + the hour's share of the month's kapasitetsledd
+
+Kapasitetsledd is spread evenly over the hours of the month in whole µøre,
+so the month's hours sum to it exactly. The trinn is not known until the
+month is over: when the month's kapasitetsledd changes (a higher trinn, or
+the final trinn at the month change), or the energiledd is corrected, the
+month's hours are computed again from its first hour and sent in the same
+batch as the new hours. Sums are kept in µøre (see fixedpoint.py).
+
+Hours are whole UTC hours (epoch seconds), looked up in the ledger by local
+hour. When summer time ends, the repeated local hour is one ledger row; it
+is counted in the first of the two hours.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Final
+
+from .fixedpoint import UORE_PER_KR, kr_to_uore
+from .ledger import ROW_ENERGILEDD, ROW_ENOVA, ROW_FORBRUKSAVGIFT, ROW_SPOT, ROW_STOTTE, hour_key
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator, Mapping, Sequence
+
+    from .ledger import CostLedger
+
+HOUR_S: Final[int] = 3600
+
+
+def month_key(ts: float) -> str:
+    """Month ("YYYY-MM") of the local time at epoch seconds ts."""
+    return datetime.fromtimestamp(ts).strftime("%Y-%m")
+
+
+def month_bounds(month: str) -> tuple[float, float]:
+    """Epoch seconds of the local start of month ("YYYY-MM") and of the month after."""
+    year, number = int(month[:4]), int(month[5:7])
+    start = datetime(year, number, 1).timestamp()
+    end = datetime(year + number // 12, number % 12 + 1, 1).timestamp()
+    return start, end
+
+
+def row_cost(row: Sequence[float]) -> int:
+    """Cost of a ledger hour row in µøre (no kapasitetsledd)."""
+    return kr_to_uore(row[ROW_SPOT] + row[ROW_ENERGILEDD] + row[ROW_FORBRUKSAVGIFT] + row[ROW_ENOVA] - row[ROW_STOTTE])
+
+
+def hourly_costs(
+    rows: Mapping[str, Sequence[float]], month: str, first: float, until: float, kapasitetsledd: int
+) -> Iterator[tuple[float, int]]:
+    """Cost in µøre of each whole hour of month from first up to until (epoch seconds)."""
+    start, end = month_bounds(month)
+    hours = round((end - start) / HOUR_S)
+    total = kapasitetsledd * UORE_PER_KR
+    previous_key = hour_key(datetime.fromtimestamp(first - HOUR_S)) if first > start else None
+    ts = first
+    while ts + HOUR_S <= min(until, end):
+        position = round((ts - start) / HOUR_S)
+        cost = total * (position + 1) // hours - total * position // hours
+        key = hour_key(datetime.fromtimestamp(ts))
+        if key != previous_key and (row := rows.get(key)) is not None:
+            cost += row_cost(row)
+        yield ts, cost
+        previous_key = key
+        ts += HOUR_S
+
+
+class CostStatistics:
+    """Where the pushed cost statistics stand: the month, its kapasitetsledd and the running sum."""
+
+    __slots__ = ("base_uore", "kapasitetsledd", "month", "next_ts", "sum_uore")
+
+    def __init__(self, month: str) -> None:
+        """Initialize statistics that start at the first hour of month."""
+        self.month = month
+        self.next_ts = month_bounds(month)[0]  # start of the next hour to push
+        self.base_uore = 0  # running sum before the month's first hour
+        self.sum_uore = 0  # running sum through the hour before next_ts
+        self.kapasitetsledd = 0  # kr the month's pushed hours were given
+
+    def due(self, now_ts: float) -> bool:
+        """Whether an hour has closed since the last push."""
+        return now_ts >= self.next_ts + HOUR_S
+
+    def restart_month(self) -> None:
+        """Compute the month's hours again from its first hour (energiledd corrected)."""
+        self.next_ts = month_bounds(self.month)[0]
+        self.sum_uore = self.base_uore
+
+    def collect(
+        self,
+        now_ts: float,
+        ledger_for: Callable[[str], CostLedger | None],
+        kapasitetsledd_for: Callable[[str], int | None],
+    ) -> list[tuple[float, int, int]]:
+        """Closed hours to push as (start, cost, running sum), in µøre.
+
+        Hours of a month whose kapasitetsledd has changed are computed again
+        from the month's first hour. kapasitetsledd_for returns None for a
+        month that is no longer measured (its kapasitetsledd is kept).
+        """
+        batch: list[tuple[float, int, int]] = []
+        until = now_ts - now_ts % HOUR_S
+        while True:
+            kapasitetsledd = kapasitetsledd_for(self.month)
+            if kapasitetsledd is not None and kapasitetsledd != self.kapasitetsledd:
+                self.kapasitetsledd = kapasitetsledd
+                self.restart_month()
+                batch = [entry for entry in batch if entry[0] < self.next_ts]
+            ledger = ledger_for(self.month)
+            rows = ledger.rows if ledger is not None else {}
+            for ts, cost in hourly_costs(rows, self.month, self.next_ts, until, self.kapasitetsledd):
+                self.sum_uore += cost
+                batch.append((ts, cost, self.sum_uore))
+                self.next_ts = ts + HOUR_S
+            if self.next_ts < month_bounds(self.month)[1] or self.next_ts >= until:
+                return batch
+            # The month is pushed; its final trinn is checked once more before the next month
+            final = kapasitetsledd_for(self.month)
+            if final is not None and final != self.kapasitetsledd:
+                continue
+            self.month = month_key(self.next_ts)
+            self.base_uore = self.sum_uore
+            self.kapasitetsledd = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        """State for storage."""
+        return {
+            "month": self.month,
+            "next": self.next_ts,
+            "base": self.base_uore,
+            "sum": self.sum_uore,
+            "kapasitetsledd": self.kapasitetsledd,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any] | None, month: str) -> CostStatistics:
+        """Restore stored state, or start at the first hour of month."""
+        statistics = cls(month)
+        if data:
+            statistics.month = data["month"]
+            statistics.next_ts = float(data["next"])
+            statistics.base_uore = int(data["base"])
+            statistics.sum_uore = int(data["sum"])
+            statistics.kapasitetsledd = int(data["kapasitetsledd"])
+        return statistics
@@ -0,0 +1,131 @@
+"""Cumulative cost since the counters started, per cost component.
+
+Every booked interval adds exactly what the ledger booked for it (the same
+µøre as the month sums), so the counters never jump backwards when a price
+changes. Kapasitetsledd is a monthly amount, not a cost per interval: it is
+added when the month is closed, with the trinn the month reached. If a late
+booking raises the closed month's trinn, the difference is added.
+
+    nettleie  = energiledd + kapasitetsledd
+    strømpris = spot price or Norgespris paid
+    avgifter  = forbruksavgift + Enova, inkl. mva
+    total     = nettleie + strømpris + avgifter - strømstøtte
+
+Strømpris and total fall in an interval with a negative spot price; the
+other counters only increase. A corrected energiledd (see coststats.py) is
+not applied to what has already been counted.
+
+The counters are whole µøre (fixedpoint.py), stored with the coordinator's
+data, which is saved whenever consumption is booked.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Final
+
+from .fixedpoint import UORE_PER_KR, uore_to_kr
+from .ledger import TOTAL_FIELDS
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+COMPONENTS: Final[tuple[str, ...]] = ("nettleie", "strompris", "avgifter", "stromstotte", "total")
+
+_ENERGILEDD_DAG = TOTAL_FIELDS.index("energiledd_dag")
+_ENERGILEDD_NATT = TOTAL_FIELDS.index("energiledd_natt")
+_SPOT = TOTAL_FIELDS.index("spot")
+_STOTTE = TOTAL_FIELDS.index("stromstotte")
+_FORBRUKSAVGIFT = TOTAL_FIELDS.index("forbruksavgift")
+_ENOVA = TOTAL_FIELDS.index("enova")
+
+
+@dataclass(slots=True)
+class CumulativeCost:
+    """Running cost per component since the counters started, in µøre."""
+
+    energiledd_uore: int = 0
+    kapasitetsledd_uore: int = 0
+    spot_uore: int = 0
+    avgifter_uore: int = 0
+    stromstotte_uore: int = 0
+    closed_month: str = ""  # "YYYY-MM" of the last month whose kapasitetsledd was added
+    closed_kapasitetsledd: int = 0  # kr added for closed_month
+
+    def add(self, booked: Sequence[int]) -> None:
+        """Add one booking's ledger sums (TOTAL_FIELDS order, as returned by CostLedger.add)."""
+        if not booked:
+            return
+        self.energiledd_uore += booked[_ENERGILEDD_DAG] + booked[_ENERGILEDD_NATT]
+        self.spot_uore += booked[_SPOT]
+        self.avgifter_uore += booked[_FORBRUKSAVGIFT] + booked[_ENOVA]
+        self.stromstotte_uore += booked[_STOTTE]
+
+    def close_month(self, month: str, kapasitetsledd: int) -> None:
+        """Add a closed month's kapasitetsledd (kr), or what it rose by since it was added."""
+        if month < self.closed_month:
+            return
+        if month > self.closed_month:
+            self.closed_month = month
+            self.closed_kapasitetsledd = 0
+        if kapasitetsledd > self.closed_kapasitetsledd:
+            self.kapasitetsledd_uore += (kapasitetsledd - self.closed_kapasitetsledd) * UORE_PER_KR
+            self.closed_kapasitetsledd = kapasitetsledd
+
+    @property
+    def nettleie_kr(self) -> float:
+        """Energiledd + kapasitetsledd."""
+        return uore_to_kr(self.energiledd_uore + self.kapasitetsledd_uore)
+
+    @property
+    def strompris_kr(self) -> float:
+        """Strømpris paid."""
+        return uore_to_kr(self.spot_uore)
+
+    @property
+    def avgifter_kr(self) -> float:
+        """Forbruksavgift + Enova, inkl. mva."""
+        return uore_to_kr(self.avgifter_uore)
+
+    @property
+    def stromstotte_kr(self) -> float:
+        """Strømstøtte received."""
+        return uore_to_kr(self.stromstotte_uore)
+
+    @property
+    def total_kr(self) -> float:
+        """Nettleie + strømpris + avgifter - strømstøtte."""
+        return uore_to_kr(
+            self.energiledd_uore
+            + self.kapasitetsledd_uore
+            + self.spot_uore
+            + self.avgifter_uore
+            - self.stromstotte_uore
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters for storage."""
+        return {
+            "energiledd_uore": self.energiledd_uore,
+            "kapasitetsledd_uore": self.kapasitetsledd_uore,
+            "spot_uore": self.spot_uore,
+            "avgifter_uore": self.avgifter_uore,
+            "stromstotte_uore": self.stromstotte_uore,
+            "closed_month": self.closed_month,
+            "closed_kapasitetsledd": self.closed_kapasitetsledd,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any] | None) -> CumulativeCost:
+        """Restore counters from storage (zero if missing)."""
+        if not data:
+            return cls()
+        return cls(
+            energiledd_uore=int(data.get("energiledd_uore", 0)),
+            kapasitetsledd_uore=int(data.get("kapasitetsledd_uore", 0)),
+            spot_uore=int(data.get("spot_uore", 0)),
+            avgifter_uore=int(data.get("avgifter_uore", 0)),
+            stromstotte_uore=int(data.get("stromstotte_uore", 0)),
+            closed_month=str(data.get("closed_month", "")),
+            closed_kapasitetsledd=int(data.get("closed_kapasitetsledd", 0)),
+        )
@@ -15,8 +15,10 @@ from .const import (
     CONF_ELECTRICITY_PROVIDER_PRICE_SENSOR,
     CONF_ENERGILEDD_DAG,
     CONF_ENERGILEDD_NATT,
+    CONF_ENERGY_SENSOR,
     CONF_HAR_NORGESPRIS,
     CONF_POWER_SENSOR,
+    CONF_PRICE_FILE,
     CONF_SPOT_PRICE_SENSOR,
     CONF_TSO,
 )
@@ -26,7 +28,8 @@ async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigE
     """Return diagnostics for a config entry.
 
     This includes integration version, configuration, sensor entity IDs,
-    TSO data, and coordinator data (sanitized).
+    TSO data, coordinator data (sanitized) and runtime counters for the
+    update hot path (latency, storage saves, state reads, sensor writes).
     """
     coordinator: NettleieCoordinator = entry.runtime_data
 
@@ -42,12 +45,14 @@ async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigE
                 "tso": entry.data.get(CONF_TSO),
                 "avgiftssone": entry.data.get(CONF_AVGIFTSSONE),
                 "har_norgespris": entry.data.get(CONF_HAR_NORGESPRIS),
+                "price_file": entry.data.get(CONF_PRICE_FILE),
                 "energiledd_dag_override": entry.data.get(CONF_ENERGILEDD_DAG),
                 "energiledd_natt_override": entry.data.get(CONF_ENERGILEDD_NATT),
             },
         },
         "sensor_entity_ids": {
             "power_sensor": entry.data.get(CONF_POWER_SENSOR),
+            "energy_sensor": entry.data.get(CONF_ENERGY_SENSOR),
             "spot_price_sensor": entry.data.get(CONF_SPOT_PRICE_SENSOR),
             "electricity_provider_price_sensor": entry.data.get(CONF_ELECTRICITY_PROVIDER_PRICE_SENSOR),
         },
@@ -58,5 +63,6 @@ async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigE
             "energiledd_natt": coordinator.energiledd_natt,
             "kapasitetstrinn_count": len(coordinator.kapasitetstrinn),
         },
-        "coordinator_data": coordinator.data if coordinator.data else {},
+        "coordinator_data": coordinator.data.as_dict() if coordinator.data else {},
+        "runtime_stats": coordinator.stats.as_dict(),
     }
@@ -0,0 +1,41 @@
+"""Fixed-point units for running energy and cost totals.
+
+Month and year totals are sums of very many small intervals (one per power
+sample). They are kept as integers, so a total is exact and the same
+whatever the order of the additions, and it is stored as a plain integer.
+Each interval is rounded once, to the unit, when it is added; totals are
+converted to kWh and kr only for display.
+
+- Energy: µWh (10^9 per kWh). One second at 1 kW is 277 778 µWh.
+- Cost: µøre (10^8 per kr).
+
+The units are this small because an interval is small: at one sample per
+second, integer Wh or øre would round away a large share of every interval.
+"""
+
+from __future__ import annotations
+
+from typing import Final
+
+UWH_PER_KWH: Final[int] = 1_000_000_000
+UORE_PER_KR: Final[int] = 100_000_000
+
+
+def kwh_to_uwh(kwh: float) -> int:
+    """kWh as a whole number of µWh."""
+    return round(kwh * UWH_PER_KWH)
+
+
+def uwh_to_kwh(uwh: int) -> float:
+    """µWh as kWh."""
+    return uwh / UWH_PER_KWH
+
+
+def kr_to_uore(kr: float) -> int:
+    """kr as a whole number of µøre."""
+    return round(kr * UORE_PER_KR)
+
+
+def uore_to_kr(uore: int) -> float:
+    """µøre as kr."""
+    return uore / UORE_PER_KR
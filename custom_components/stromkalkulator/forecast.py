@@ -0,0 +1,233 @@
+"""Month-end forecast of the bill and the kapasitetstrinn (Monte Carlo).
+
+The rest of the month is simulated a few thousand times by drawing whole
+days from the days already measured (this month and the previous one), from
+the days with the same weekday: a drawn day brings its 24 hourly kWh and its
+peak. The rest of today is the part of a drawn day after the current time.
+Each simulation ends with the month's three highest daily peaks, which give
+the kapasitetstrinn, and the month's energy:
+
+    bill = cost so far + remaining kWh x cost per kWh so far + kapasitetsledd
+
+Cost is strømpris + energiledd + avgifter - strømstøtte, as booked in the
+ledger; the remaining energy is priced at the month's average so far.
+
+The simulations advance together, one day at a time, with each day's draws
+for all simulations taken in one random.choices call. The days after today
+are drawn once a day (tens of milliseconds) and kept; every hour only the
+rest of today is drawn again and added (a few milliseconds). The random
+generators are seeded with the day and the hour, so a forecast is
+reproducible.
+"""
+
+from __future__ import annotations
+
+import random
+import statistics
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import date
+from typing import TYPE_CHECKING, Final
+
+from .monthstate import HOURS_PER_DAY
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+    from datetime import datetime
+
+    from .monthstate import MonthState
+
+SIMULATIONS: Final[int] = 2000
+# Fewer measured days with the weekday than this: draw from all measured days
+MIN_WEEKDAY_DAYS: Final[int] = 2
+
+
+@dataclass(frozen=True, slots=True)
+class DaySample:
+    """A measured day: energy and peak from each hour to midnight."""
+
+    rest_kwh: tuple[float, ...]  # kWh from hour h to midnight, 25 entries (the last is 0)
+    rest_peak_kw: tuple[float, ...]  # highest peak from hour h to midnight, 24 entries
+
+    @classmethod
+    def from_hours(cls, hourly_kwh: Sequence[float], peak_kw: float) -> DaySample:
+        """Build from the day's hourly kWh and its peak (kW, or hourly kWh with a meter)."""
+        rest_kwh = [0.0] * (HOURS_PER_DAY + 1)
+        rest_peak = [0.0] * HOURS_PER_DAY
+        peak_hour = max(range(HOURS_PER_DAY), key=hourly_kwh.__getitem__)
+        highest = 0.0
+        for hour in range(HOURS_PER_DAY - 1, -1, -1):
+            rest_kwh[hour] = rest_kwh[hour + 1] + hourly_kwh[hour]
+            highest = max(highest, hourly_kwh[hour])
+            # The day's peak counts if it fell in the hour that uses the most
+            rest_peak[hour] = max(peak_kw, highest) if hour <= peak_hour else highest
+        return cls(tuple(rest_kwh), tuple(rest_peak))
+
+
+def measured_days(month: MonthState, before_day: int = 32) -> Iterable[tuple[int, DaySample]]:
+    """Days of month with consumption, before day of month before_day, with their weekday."""
+    year, number = int(month.month[:4]), int(month.month[5:7])
+    hourly = month.hourly_kwh
+    for day in range(1, before_day):
+        start = (day - 1) * HOURS_PER_DAY
+        hours = hourly[start : start + HOURS_PER_DAY]
+        if len(hours) < HOURS_PER_DAY or not any(hours):
+            continue
+        try:
+            weekday = date(year, number, day).weekday()
+        except ValueError:  # past the end of the month
+            break
+        yield weekday, DaySample.from_hours(hours, month.daily_max_kw[day - 1])
+
+
+class DayProfile:
+    """Measured days by weekday, to draw simulated days from."""
+
+    __slots__ = ("by_weekday", "days")
+
+    def __init__(self, samples: Iterable[tuple[int, DaySample]]) -> None:
+        """Initialize from (weekday, day) pairs."""
+        self.days: list[DaySample] = []
+        self.by_weekday: list[list[DaySample]] = [[] for _ in range(7)]
+        for weekday, sample in samples:
+            self.days.append(sample)
+            self.by_weekday[weekday].append(sample)
+
+    def pool(self, weekday: int) -> list[DaySample]:
+        """Days to draw a day with this weekday from."""
+        days = self.by_weekday[weekday]
+        return days if len(days) >= MIN_WEEKDAY_DAYS else self.days
+
+
+@dataclass(frozen=True, slots=True)
+class MonthForecast:
+    """Simulated end of the month."""
+
+    bill_kr: float  # median
+    bill_low_kr: float  # 10th percentile
+    bill_high_kr: float  # 90th percentile
+    kwh: float  # median month energy
+    trinn_nummer: int  # most likely kapasitetstrinn (from 1)
+    trinn_probabilities: tuple[float, ...]  # per kapasitetstrinn
+    simulations: int
+
+
+class MonthSimulation:
+    """Simulated days after today, drawn once a day and reused every hour.
+
+    Each simulation holds the energy of the days after today and the three
+    highest peaks among them and the month's days before today (kept as the
+    sum of the two highest, the third and how many are above zero).
+    forecast() adds the rest of today, which is drawn again every hour.
+    """
+
+    __slots__ = ("counted", "energy", "key", "profile", "third", "top_two")
+
+    def __init__(
+        self,
+        profile: DayProfile,
+        today: date,
+        days_in_month: int,
+        past_peaks_kw: Sequence[float],
+        simulations: int = SIMULATIONS,
+    ) -> None:
+        """Simulate the days after today (profile must have measured days)."""
+        self.key = self.key_for(today, past_peaks_kw)
+        self.profile = profile
+        top = self.key[1]
+        first = [top[0]] * simulations
+        second = [top[1]] * simulations
+        third = [top[2]] * simulations
+        energy = [0.0] * simulations
+        rng = random.Random(today.toordinal())
+        weekday = today.weekday()
+        for _ in range(today.day, days_in_month):
+            weekday = (weekday + 1) % 7
+            samples = rng.choices(profile.pool(weekday), k=simulations)
+            energy = [kwh + sample.rest_kwh[0] for kwh, sample in zip(energy, samples, strict=True)]
+            _raise_top(first, second, third, [sample.rest_peak_kw[0] for sample in samples])
+        self.energy = energy
+        self.top_two = [a + b for a, b in zip(first, second, strict=True)]
+        self.third = third
+        self.counted = [(a > 0) + (b > 0) + (c > 0) for a, b, c in zip(first, second, third, strict=True)]
+
+    @staticmethod
+    def key_for(today: date, past_peaks_kw: Sequence[float]) -> tuple[date, tuple[float, ...]]:
+        """What the simulated days depend on: the day, and the three highest peaks before it."""
+        top = sorted((kw for kw in past_peaks_kw if kw > 0), reverse=True)[:3]
+        return today, (*top, *(0.0,) * (3 - len(top)))
+
+    def forecast(
+        self,
+        now: datetime,
+        today_peak_kw: float,
+        kwh_so_far: float,
+        cost_so_far_kr: float,
+        price_per_kwh: float,
+        kapasitetstrinn: Sequence[tuple[float, int]],
+    ) -> MonthForecast:
+        """Add the rest of today (the part of a drawn day after now) and summarize the month."""
+        simulations = len(self.energy)
+        hour = now.hour
+        left_of_hour = 1 - (now.minute * 60 + now.second) / 3600
+        # Rest of today and today's peak per measured day in the pool, then drawn
+        pool = self.profile.pool(now.weekday())
+        rest = [
+            (
+                sample.rest_kwh[hour + 1] + (sample.rest_kwh[hour] - sample.rest_kwh[hour + 1]) * left_of_hour,
+                max(today_peak_kw, sample.rest_peak_kw[hour]),
+            )
+            for sample in pool
+        ]
+        draws = random.Random(now.toordinal() * 24 + now.hour).choices(rest, k=simulations)
+
+        # A peak today above the third highest replaces it
+        thresholds = [threshold for threshold, _ in kapasitetstrinn]
+        last = len(thresholds) - 1
+        trinn = [
+            min(bisect_left(thresholds, (two + (peak if peak > third else third)) / min(counted + (peak > 0), 3)), last)
+            for (_, peak), two, third, counted in zip(draws, self.top_two, self.third, self.counted, strict=True)
+        ]
+        energy = [future + kwh for future, (kwh, _) in zip(self.energy, draws, strict=True)]
+        prices = [price for _, price in kapasitetstrinn]
+        bills = sorted(
+            cost_so_far_kr + kwh * price_per_kwh + prices[index] for kwh, index in zip(energy, trinn, strict=True)
+        )
+        counts = [0] * len(thresholds)
+        for index in trinn:
+            counts[index] += 1
+        return MonthForecast(
+            bill_kr=bills[simulations // 2],
+            bill_low_kr=bills[simulations // 10],
+            bill_high_kr=bills[simulations - 1 - simulations // 10],
+            kwh=kwh_so_far + statistics.median(energy),
+            trinn_nummer=max(range(len(counts)), key=counts.__getitem__) + 1,
+            trinn_probabilities=tuple(count / simulations for count in counts),
+            simulations=simulations,
+        )
+
+
+def _raise_top(first: list[float], second: list[float], third: list[float], peaks: Sequence[float]) -> None:
+    """Add one day's peak to each simulation's three highest peaks."""
+    for index, peak in enumerate(peaks):
+        if peak <= third[index]:
+            continue
+        if peak <= second[index]:
+            third[index] = peak
+        elif peak <= first[index]:
+            third[index] = second[index]
+            second[index] = peak
+        else:
+            third[index] = second[index]
+            second[index] = first[index]
+            first[index] = peak
+
+
+def trinn_ranges(kapasitetstrinn: Sequence[tuple[float, int]]) -> list[str]:
+    """Power range of each kapasitetstrinn ("0-2 kW", ..., ">50 kW")."""
+    ranges: list[str] = []
+    previous = 0.0
+    for threshold, _ in kapasitetstrinn:
+        ranges.append(f">{previous:.0f} kW" if threshold == float("inf") else f"{previous:.0f}-{threshold:.0f} kW")
+        previous = threshold
+    return ranges
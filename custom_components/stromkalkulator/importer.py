@@ -0,0 +1,311 @@
+"""Streaming import of hourly consumption exports (Elhub and grid companies).
+
+Elhub (Min side > Måleverdier) and the grid companies export metered
+consumption as CSV or XLSX: one row per hour (or per 15 minutes from 2025)
+with a start time and a kWh value. Layouts differ, so the header row is
+found by column names (fra/start/tidspunkt + kwh/volum/forbruk).
+
+Rows are read one at a time and yielded as (hour_start_utc, kwh), so
+memory use does not grow with the file. Only the XLSX shared-strings table
+is held in memory.
+
+Timestamps are local time in the configured time zone unless they carry an
+offset, or the export is declared as UTC. The repeated hour when DST ends
+(02:00 twice) is resolved by order: the second occurrence is the later hour.
+Rows at a local time that does not exist (the hour skipped when DST starts)
+are counted as skipped.
+
+The same row reader serves price files (pricefeed.py); Parquet files need
+pyarrow, which is only imported when such a file is read.
+
+This module only depends on the standard library, so scripts/ can use it
+without Home Assistant.
+"""
+
+from __future__ import annotations
+
+import csv
+import re
+import zipfile
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta, tzinfo
+from pathlib import Path
+from typing import TYPE_CHECKING, Final
+from xml.etree.ElementTree import iterparse
+from zoneinfo import ZoneInfo
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+DEFAULT_TIMEZONE: Final[str] = "Europe/Oslo"
+TIMESTAMPS_LOCAL: Final[str] = "local"
+TIMESTAMPS_UTC: Final[str] = "utc"
+
+# Header keywords (lowercase substrings) for the start time and the kWh columns
+START_KEYWORDS: Final[tuple[str, ...]] = ("fra", "from", "start", "tidspunkt", "timestamp", "dato", "date")
+KWH_KEYWORDS: Final[tuple[str, ...]] = ("kwh", "volum", "forbruk", "mengde", "verdi", "value", "consumption")
+
+DATE_FORMATS: Final[tuple[str, ...]] = (
+    "%d.%m.%Y %H:%M",
+    "%d.%m.%Y %H:%M:%S",
+    "%d.%m.%Y %H",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%d %H:%M:%S",
+)
+
+# Excel stores dates as days since 1899-12-30
+EXCEL_EPOCH: Final[datetime] = datetime(1899, 12, 30)
+
+XLSX_NS: Final[str] = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_CELL_COLUMN = re.compile(r"[A-Z]+")
+
+
+class ConsumptionImportError(ValueError):
+    """The export could not be read."""
+
+
+@dataclass(slots=True)
+class ImportStats:
+    """Counters for one import."""
+
+    rows: int = 0
+    hours: int = 0
+    skipped: int = 0
+    kwh: float = 0.0
+    months: set[str] = field(default_factory=set)
+
+
+def read_consumption(
+    path: str | Path,
+    timezone: str = DEFAULT_TIMEZONE,
+    timestamps: str = TIMESTAMPS_LOCAL,
+    stats: ImportStats | None = None,
+) -> Iterator[tuple[datetime, float]]:
+    """Read a CSV or XLSX export and yield (hour_start_utc, kwh) per hour.
+
+    Args:
+        path: CSV (; , or tab separated) or XLSX file
+        timezone: IANA time zone of timestamps without an offset
+        timestamps: TIMESTAMPS_LOCAL or TIMESTAMPS_UTC
+        stats: Updated while reading, if given
+    """
+    yield from hourly(parse_rows(read_rows(path), timezone, timestamps, stats), stats)
+
+
+def read_rows(path: str | Path) -> Iterator[list[str]]:
+    """Stream the rows of a CSV, XLSX or Parquet file as lists of strings."""
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".xlsx":
+        return _xlsx_rows(path)
+    if suffix == ".parquet":
+        return _parquet_rows(path)
+    return _csv_rows(path)
+
+
+def parse_rows(
+    rows: Iterable[list[str]],
+    timezone: str = DEFAULT_TIMEZONE,
+    timestamps: str = TIMESTAMPS_LOCAL,
+    stats: ImportStats | None = None,
+    value_keywords: tuple[str, ...] = KWH_KEYWORDS,
+) -> Iterator[tuple[datetime, float]]:
+    """Turn export rows into (start_utc, value), one per data row.
+
+    The value column is found by value_keywords (kWh by default).
+    """
+    if timestamps not in (TIMESTAMPS_LOCAL, TIMESTAMPS_UTC):
+        raise ConsumptionImportError(f"Unknown timestamp mode: {timestamps}")
+    clock = _LocalClock(ZoneInfo(timezone) if timestamps == TIMESTAMPS_LOCAL else UTC)
+    stats = stats if stats is not None else ImportStats()
+    columns: tuple[int, int] | None = None
+    for row in rows:
+        if columns is None:
+            columns = _find_columns(row, value_keywords)
+            continue
+        start_col, kwh_col = columns
+        if len(row) <= max(start_col, kwh_col) or not row[start_col].strip():
+            continue
+        stats.rows += 1
+        start = clock.to_utc(_parse_time(row[start_col]))
+        kwh = _parse_number(row[kwh_col])
+        if start is None or kwh is None:
+            stats.skipped += 1
+            continue
+        yield start, kwh
+    if columns is None:
+        raise ConsumptionImportError(f"No header row with a start time and a {value_keywords[0]} column")
+
+
+def hourly(
+    readings: Iterable[tuple[datetime, float]], stats: ImportStats | None = None
+) -> Iterator[tuple[datetime, float]]:
+    """Sum consecutive readings within the same clock hour (15-minute exports)."""
+    current: datetime | None = None
+    total = 0.0
+    for start, kwh in readings:
+        hour = start.replace(minute=0, second=0, microsecond=0)
+        if hour != current:
+            if current is not None:
+                yield _counted(current, total, stats)
+            current, total = hour, 0.0
+        total += kwh
+    if current is not None:
+        yield _counted(current, total, stats)
+
+
+def _counted(hour: datetime, kwh: float, stats: ImportStats | None) -> tuple[datetime, float]:
+    if stats is not None:
+        stats.hours += 1
+        stats.kwh += kwh
+        stats.months.add(hour.strftime("%Y-%m"))
+    return hour, kwh
+
+
+class _LocalClock:
+    """Convert local timestamps to UTC, resolving the repeated DST hour by order."""
+
+    __slots__ = ("_last", "_tz")
+
+    def __init__(self, tz: tzinfo) -> None:
+        self._tz = tz
+        self._last: datetime | None = None
+
+    def to_utc(self, when: datetime | None) -> datetime | None:
+        if when is None:
+            return None
+        if when.tzinfo is not None:
+            utc = when.astimezone(UTC)
+        else:
+            first = when.replace(tzinfo=self._tz).astimezone(UTC)
+            second = when.replace(tzinfo=self._tz, fold=1).astimezone(UTC)
+            if first.astimezone(self._tz).replace(tzinfo=None) != when:
+                # Local time skipped when DST starts
+                return None
+            utc = second if first != second and self._last is not None and self._last >= first else first
+        self._last = utc
+        return utc
+
+
+def _find_columns(row: list[str], value_keywords: tuple[str, ...] = KWH_KEYWORDS) -> tuple[int, int] | None:
+    """Find the start-time and value column indexes in a header row."""
+    names = [cell.strip().lower() for cell in row]
+    start = next((i for i, name in enumerate(names) if any(k in name for k in START_KEYWORDS)), None)
+    value = next(
+        (i for i, name in enumerate(names) if i != start and any(k in name for k in value_keywords)),
+        None,
+    )
+    if start is None or value is None:
+        return None
+    return start, value
+
+
+def _parse_time(value: str) -> datetime | None:
+    """Parse a timestamp (ISO 8601, Norwegian date formats or an Excel serial)."""
+    value = value.strip().strip('"')
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        pass
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    try:
+        serial = float(value)
+    except ValueError:
+        return None
+    # Round to whole minutes; the serial is a float fraction of a day
+    return EXCEL_EPOCH + timedelta(minutes=round(serial * 24 * 60))
+
+
+def _parse_number(value: str) -> float | None:
+    """Parse a kWh value with decimal comma or point ("1 234,5" or "1234.5")."""
+    value = value.strip().strip('"').replace("\xa0", "").replace(" ", "")
+    if "," in value:
+        value = value.replace(".", "").replace(",", ".")
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def _csv_rows(path: Path) -> Iterator[list[str]]:
+    """Stream CSV rows, detecting the delimiter from the start of the file.
+
+    Semicolon wins over comma: exports with decimal comma use ; as delimiter.
+    """
+    with path.open(encoding="utf-8-sig", newline="") as file:
+        sample = file.read(4096)
+        file.seek(0)
+        delimiter = next((d for d in (";", "\t") if d in sample), ",")
+        yield from csv.reader(file, delimiter=delimiter)
+
+
+def _xlsx_rows(path: Path) -> Iterator[list[str]]:
+    """Stream rows from the first worksheet of an XLSX file."""
+    try:
+        archive = zipfile.ZipFile(path)
+    except zipfile.BadZipFile as err:
+        raise ConsumptionImportError(f"Not an XLSX file: {path.name}") from err
+    with archive:
+        shared = _xlsx_shared_strings(archive)
+        sheets = sorted(name for name in archive.namelist() if name.startswith("xl/worksheets/sheet"))
+        if not sheets:
+            raise ConsumptionImportError(f"No worksheet in {path.name}")
+        with archive.open(sheets[0]) as sheet:
+            for _event, element in iterparse(sheet):
+                if element.tag != f"{XLSX_NS}row":
+                    continue
+                cells: dict[int, str] = {}
+                for cell in element.iter(f"{XLSX_NS}c"):
+                    column = _xlsx_column(cell.get("r", ""), len(cells))
+                    if cell.get("t") == "inlineStr":
+                        text = "".join(cell.itertext())
+                    else:
+                        value = cell.findtext(f"{XLSX_NS}v") or ""
+                        text = shared[int(value)] if cell.get("t") == "s" and value else value
+                    cells[column] = text
+                element.clear()
+                yield [cells.get(i, "") for i in range(max(cells, default=-1) + 1)]
+
+
+def _parquet_rows(path: Path) -> Iterator[list[str]]:
+    """Stream rows from a Parquet file in record batches (needs pyarrow)."""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as err:
+        raise ConsumptionImportError(f"Reading {path.name} needs pyarrow (pip install pyarrow)") from err
+    parquet = pq.ParquetFile(path)
+    yield parquet.schema_arrow.names
+    for batch in parquet.iter_batches():
+        columns = batch.to_pydict().values()
+        for row in zip(*columns, strict=True):
+            yield [
+                "" if cell is None else cell.isoformat() if isinstance(cell, datetime) else str(cell) for cell in row
+            ]
+
+
+def _xlsx_shared_strings(archive: zipfile.ZipFile) -> list[str]:
+    """Read the shared-strings table (cell text is stored there by index)."""
+    if "xl/sharedStrings.xml" not in archive.namelist():
+        return []
+    strings: list[str] = []
+    with archive.open("xl/sharedStrings.xml") as file:
+        for _event, element in iterparse(file):
+            if element.tag == f"{XLSX_NS}si":
+                strings.append("".join(element.itertext()))
+                element.clear()
+    return strings
+
+
+def _xlsx_column(ref: str, default: int) -> int:
+    """Column index from a cell reference ("C12" -> 2)."""
+    match = _CELL_COLUMN.match(ref)
+    if not match:
+        return default
+    index = 0
+    for char in match.group():
+        index = index * 26 + ord(char) - ord("A") + 1
+    return index - 1
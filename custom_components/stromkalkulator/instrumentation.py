@@ -0,0 +1,120 @@
+"""Lightweight runtime counters for the coordinator hot path.
+
+Everything here is O(1) per event and allocation-free after construction,
+so it can stay enabled in production. Exposed via diagnostics and optional
+diagnostic sensors to tell whether the integration is what slows HA down.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Any, Final
+
+# Bucket upper bounds in seconds (last bucket is open-ended)
+LATENCY_BUCKETS_S: Final[tuple[float, ...]] = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+)
+
+
+class Histogram:
+    """Fixed-bucket histogram with count, sum and max."""
+
+    __slots__ = ("bounds", "count", "counts", "max", "total")
+
+    def __init__(self, bounds: tuple[float, ...] = LATENCY_BUCKETS_S) -> None:
+        """Initialize an empty histogram."""
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value: float) -> None:
+        """Record one observation."""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def mean(self) -> float:
+        """Mean of all observations (0 when empty)."""
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Upper bucket bound containing quantile q (max for the open bucket)."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return self.bounds[i] if i < len(self.bounds) else self.max
+        return self.max
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON-serializable summary in milliseconds."""
+        buckets = {f"<={bound * 1000:g} ms": n for bound, n in zip(self.bounds, self.counts, strict=False)}
+        buckets[f">{self.bounds[-1] * 1000:g} ms"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "mean_ms": round(self.mean * 1000, 3),
+            "p95_ms": round(self.quantile(0.95) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+            "buckets": buckets,
+        }
+
+
+@dataclass(slots=True)
+class HotPathStats:
+    """Counters and histograms kept by the coordinator."""
+
+    update_latency: Histogram = field(default_factory=Histogram)
+    save_latency: Histogram = field(default_factory=Histogram)
+    updates: int = 0
+    saves: int = 0
+    state_reads: int = 0
+    sensor_writes: int = 0
+    skipped_updates: int = 0
+    max_sample_gap_s: float = 0.0
+
+    def record_update(self, seconds: float) -> None:
+        """Record the duration of one coordinator update."""
+        self.updates += 1
+        self.update_latency.record(seconds)
+
+    def record_save(self, seconds: float) -> None:
+        """Record the duration of one storage save."""
+        self.saves += 1
+        self.save_latency.record(seconds)
+
+    def record_gap(self, seconds: float) -> None:
+        """Track the largest gap between two power samples."""
+        if seconds > self.max_sample_gap_s:
+            self.max_sample_gap_s = seconds
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON-serializable snapshot for diagnostics."""
+        return {
+            "updates": self.updates,
+            "skipped_updates": self.skipped_updates,
+            "state_reads": self.state_reads,
+            "sensor_writes": self.sensor_writes,
+            "saves": self.saves,
+            "max_sample_gap_s": round(self.max_sample_gap_s, 1),
+            "update_latency": self.update_latency.as_dict(),
+            "save_latency": self.save_latency.as_dict(),
+        }
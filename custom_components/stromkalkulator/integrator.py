@@ -0,0 +1,156 @@
+"""Gap-aware Riemann integration of a power sensor.
+
+Turns a stream of power samples (kW) into energy (kWh), O(1) per sample.
+Elapsed time is taken from epoch timestamps, so naive local datetimes (what
+datetime.now() returns in HA) give the real duration across DST changes.
+
+A gap longer than the configured cap (HA restart, stalled sensor) is not
+smeared with a single sample: add() returns None and the caller backfills
+the gap from recorder history, see integrate_history().
+
+add_split() returns the energy split at whole hours, so an interval across
+06:00, 22:00, midnight or a month change is booked on the right tariff, day
+and month. The trapezoid is split at the power interpolated at the boundary.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import TYPE_CHECKING, Final
+
+from .const import INTEGRATION_LEFT, INTEGRATION_TRAPEZOIDAL
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+SECONDS_PER_HOUR: Final[int] = 3600
+
+
+class PowerIntegrator:
+    """Integrate power samples with the left or trapezoidal rule."""
+
+    __slots__ = ("_last_kw", "_last_ts", "last_time", "max_gap_s", "method")
+
+    def __init__(self, method: str = INTEGRATION_TRAPEZOIDAL, max_gap_s: float = 900.0) -> None:
+        """Initialize the integrator.
+
+        Args:
+            method: INTEGRATION_TRAPEZOIDAL or INTEGRATION_LEFT
+            max_gap_s: Longest gap (seconds) bridged without recorder history
+        """
+        if method not in (INTEGRATION_TRAPEZOIDAL, INTEGRATION_LEFT):
+            raise ValueError(f"Unknown integration method: {method}")
+        self.method = method
+        self.max_gap_s = max_gap_s
+        self.last_time: datetime | None = None
+        self._last_ts = 0.0
+        self._last_kw = 0.0
+
+    def elapsed_s(self, time: datetime) -> float:
+        """Seconds since the previous sample (0 if there is none)."""
+        if self.last_time is None:
+            return 0.0
+        return time.timestamp() - self._last_ts
+
+    def add(self, time: datetime, power_kw: float) -> float | None:
+        """Add a sample and return kWh since the previous sample.
+
+        Returns 0.0 for the first sample (or a clock that went backwards)
+        and None when the gap is longer than max_gap_s. In both cases the
+        sample becomes the new starting point.
+        """
+        ts = time.timestamp()
+        previous_ts = self._last_ts
+        previous_kw = self._last_kw
+        has_previous = self.last_time is not None
+        self.last_time = time
+        self._last_ts = ts
+        self._last_kw = power_kw
+
+        if not has_previous or ts <= previous_ts:
+            return 0.0
+        elapsed_s = ts - previous_ts
+        if elapsed_s > self.max_gap_s:
+            return None
+        if self.method == INTEGRATION_LEFT:
+            return previous_kw * elapsed_s / SECONDS_PER_HOUR
+        return (previous_kw + power_kw) / 2 * elapsed_s / SECONDS_PER_HOUR
+
+    def add_split(self, time: datetime, power_kw: float) -> list[tuple[float, float]] | None:
+        """Add a sample and return kWh since the previous sample per clock hour.
+
+        Returns:
+            [(segment_start_ts, kwh)], one per clock hour the interval touches
+            (empty for the first sample), or None for a gap (see add())
+        """
+        previous_ts = self._last_ts
+        previous_kw = self._last_kw
+        energy_kwh = self.add(time, power_kw)
+        if not energy_kwh:
+            return None if energy_kwh is None else []
+        ts = self._last_ts
+        boundary = (previous_ts // SECONDS_PER_HOUR + 1) * SECONDS_PER_HOUR
+        if boundary >= ts:
+            return [(previous_ts, energy_kwh)]
+
+        segments: list[tuple[float, float]] = []
+        slope = 0.0 if self.method == INTEGRATION_LEFT else (power_kw - previous_kw) / (ts - previous_ts)
+        start, start_kw = previous_ts, previous_kw
+        while start < ts:
+            end = min(boundary, ts)
+            if self.method == INTEGRATION_LEFT:
+                end_kw = previous_kw
+            else:
+                end_kw = previous_kw + slope * (end - previous_ts)
+            segments.append((start, (start_kw + end_kw) / 2 * (end - start) / SECONDS_PER_HOUR))
+            start, start_kw = end, end_kw
+            boundary += SECONDS_PER_HOUR
+        return segments
+
+    def as_dict(self) -> dict[str, float] | None:
+        """Return the previous sample for storage (None if there is none)."""
+        if self.last_time is None:
+            return None
+        return {"ts": self._last_ts, "kw": self._last_kw}
+
+    def restore(self, data: dict[str, float] | None) -> None:
+        """Restore the previous sample from storage, so a restart gap is detected."""
+        if not data:
+            return
+        self._last_ts = float(data["ts"])
+        self._last_kw = float(data["kw"])
+        self.last_time = datetime.fromtimestamp(self._last_ts)
+
+
+def integrate_history(
+    samples: Iterable[tuple[float, float]], end_ts: float, split_s: float = SECONDS_PER_HOUR
+) -> Iterator[tuple[float, float, float]]:
+    """Integrate recorder history (state held until the next change).
+
+    Recorder history only stores state changes, so each value is held
+    (left rule) until the next one. Segments are split at whole hours so
+    each piece can be booked on the right tariff.
+
+    Args:
+        samples: (epoch_seconds, power_kw) sorted by time
+        end_ts: Epoch seconds where the last value stops
+        split_s: Split length; a divisor of an hour (900 for 15-minute prices)
+
+    Yields:
+        (start_ts, end_ts, kwh) per piece
+    """
+    previous: tuple[float, float] | None = None
+    for ts, kw in samples:
+        if previous is not None:
+            yield from _split(previous[0], min(ts, end_ts), previous[1], split_s)
+        previous = (ts, kw)
+    if previous is not None:
+        yield from _split(previous[0], end_ts, previous[1], split_s)
+
+
+def _split(start_ts: float, end_ts: float, kw: float, split_s: float) -> Iterator[tuple[float, float, float]]:
+    """Split a constant-power segment at whole split_s (UTC offsets in Norway are whole hours)."""
+    while start_ts < end_ts:
+        boundary = min(end_ts, (start_ts // split_s + 1) * split_s)
+        yield start_ts, boundary, kw * (boundary - start_ts) / SECONDS_PER_HOUR
+        start_ts = boundary
@@ -0,0 +1,226 @@
+"""Per-interval cost ledger with month-to-date totals.
+
+Every booked interval adds its exact cost components to running
+month-to-date totals (O(1)), using the prices that applied in that
+interval. Monthly sensors read the totals instead of multiplying kWh by
+today's price. The interval costs are also summed per clock hour, and the
+hourly rows are kept for invoice reconciliation.
+
+All amounts are NOK. Energiledd and spot price are taken as given (TSO and
+Nord Pool prices include mva where mva applies); forbruksavgift and Enova
+are eks. mva in const.py, so mva is added here. The mva total is the mva
+share of everything booked.
+
+The month-to-date sums are integers (µWh and µøre, see fixedpoint.py), so
+they stay exact however many intervals are booked; totals converts them to
+kWh and kr. Hourly rows are short sums and stay floats.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Final
+
+from .fixedpoint import UORE_PER_KR, UWH_PER_KWH, kr_to_uore, kwh_to_uwh
+
+if TYPE_CHECKING:
+    from datetime import datetime
+
+# Columns of an hourly row (stored as a plain list to keep storage compact)
+ROW_FIELDS: Final[tuple[str, ...]] = (
+    "is_day",
+    "kwh",
+    "energiledd",
+    "spot",
+    "stromstotte",
+    "stromstotte_kwh",
+    "forbruksavgift",
+    "enova",
+    "mva",
+)
+ROW_IS_DAY, ROW_KWH, ROW_ENERGILEDD, ROW_SPOT, ROW_STOTTE, ROW_STOTTE_KWH, ROW_FORBRUKSAVGIFT, ROW_ENOVA, ROW_MVA = (
+    range(len(ROW_FIELDS))
+)
+
+TOTAL_FIELDS: Final[tuple[str, ...]] = (
+    "kwh_dag",
+    "kwh_natt",
+    "energiledd_dag",
+    "energiledd_natt",
+    "spot",
+    "stromstotte",
+    "stromstotte_kwh",
+    "forbruksavgift",
+    "enova",
+    "mva",
+)
+# Fixed-point units per kWh or kr, per total
+TOTAL_SCALES: Final[dict[str, int]] = {
+    name: UWH_PER_KWH if name.startswith("kwh") or name.endswith("_kwh") else UORE_PER_KR for name in TOTAL_FIELDS
+}
+
+
+@dataclass(frozen=True, slots=True)
+class IntervalPrices:
+    """Prices in effect for one interval (NOK/kWh)."""
+
+    energiledd: float
+    spot: float  # strømpris paid: spot price, or Norgespris under the monthly cap
+    stromstotte: float
+    forbruksavgift: float  # eks. mva
+    enova: float  # eks. mva
+    mva_sats: float
+
+
+def hour_key(when: datetime) -> str:
+    """Ledger key for the clock hour containing when (local time)."""
+    return when.strftime("%Y-%m-%dT%H")
+
+
+class CostLedger:
+    """Month-to-date cost accumulators and hourly rows for one month."""
+
+    __slots__ = ("month", "rows", "sums")
+
+    def __init__(self, month: str) -> None:
+        """Initialize an empty ledger for month ("YYYY-MM")."""
+        self.month = month
+        # Month to date in µWh (kwh_*, stromstotte_kwh) and µøre (the rest)
+        self.sums: dict[str, int] = dict.fromkeys(TOTAL_FIELDS, 0)
+        self.rows: dict[str, list[float]] = {}
+
+    @property
+    def totals(self) -> dict[str, float]:
+        """Month-to-date totals in kWh and kr."""
+        return {name: value / TOTAL_SCALES[name] for name, value in self.sums.items()}
+
+    @property
+    def kwh(self) -> float:
+        """Energy dag + natt month to date."""
+        return (self.sums["kwh_dag"] + self.sums["kwh_natt"]) / UWH_PER_KWH
+
+    def add(self, when: datetime, is_day_rate: bool, kwh: float, prices: IntervalPrices) -> tuple[int, ...]:
+        """Book kwh consumed in an interval at the given prices.
+
+        Returns what was added to the sums, in TOTAL_FIELDS order (empty if
+        nothing was booked), for the day/week/year rollups.
+        """
+        if kwh <= 0:
+            return ()
+        energiledd = kwh * prices.energiledd
+        spot = kwh * prices.spot
+        stromstotte = kwh * prices.stromstotte
+        stromstotte_kwh = kwh if prices.stromstotte > 0 else 0.0
+        forbruksavgift = kwh * prices.forbruksavgift * (1 + prices.mva_sats)
+        enova = kwh * prices.enova * (1 + prices.mva_sats)
+        mva = (energiledd + spot - stromstotte + forbruksavgift + enova) * prices.mva_sats / (1 + prices.mva_sats)
+
+        uwh = kwh_to_uwh(kwh)
+        energiledd_uore = kr_to_uore(energiledd)
+        booked = (
+            uwh if is_day_rate else 0,
+            0 if is_day_rate else uwh,
+            energiledd_uore if is_day_rate else 0,
+            0 if is_day_rate else energiledd_uore,
+            kr_to_uore(spot),
+            kr_to_uore(stromstotte),
+            kwh_to_uwh(stromstotte_kwh),
+            kr_to_uore(forbruksavgift),
+            kr_to_uore(enova),
+            kr_to_uore(mva),
+        )
+        sums = self.sums
+        for name, value in zip(TOTAL_FIELDS, booked, strict=True):
+            sums[name] += value
+
+        key = hour_key(when)
+        row = self.rows.get(key)
+        if row is None:
+            row = self.rows[key] = [1.0 if is_day_rate else 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0]
+        row[ROW_KWH] += kwh
+        row[ROW_ENERGILEDD] += energiledd
+        row[ROW_SPOT] += spot
+        row[ROW_STOTTE] += stromstotte
+        row[ROW_STOTTE_KWH] += stromstotte_kwh
+        row[ROW_FORBRUKSAVGIFT] += forbruksavgift
+        row[ROW_ENOVA] += enova
+        row[ROW_MVA] += mva
+        return booked
+
+    def seed(self, kwh_dag: float, kwh_natt: float, day: IntervalPrices, night: IntervalPrices) -> None:
+        """Open the ledger with consumption booked before the ledger existed.
+
+        Used once when upgrading mid-month. Energiledd and avgifter are exact
+        (fixed rates); spot and strømstøtte for that part are unknown and left out.
+        """
+        for kwh, prices, is_day in ((kwh_dag, day, True), (kwh_natt, night, False)):
+            if kwh <= 0:
+                continue
+            energiledd = kwh * prices.energiledd
+            forbruksavgift = kwh * prices.forbruksavgift * (1 + prices.mva_sats)
+            enova = kwh * prices.enova * (1 + prices.mva_sats)
+            mva = (energiledd + forbruksavgift + enova) * prices.mva_sats / (1 + prices.mva_sats)
+            self.sums["kwh_dag" if is_day else "kwh_natt"] += kwh_to_uwh(kwh)
+            self.sums["energiledd_dag" if is_day else "energiledd_natt"] += kr_to_uore(energiledd)
+            self.sums["forbruksavgift"] += kr_to_uore(forbruksavgift)
+            self.sums["enova"] += kr_to_uore(enova)
+            self.sums["mva"] += kr_to_uore(mva)
+
+    def reprice_energiledd(self, dag: float, natt: float, mva_sats: float) -> list[tuple[str, tuple[int, ...]]]:
+        """Book the hourly rows again at corrected energiledd rates (NOK/kWh).
+
+        Returns what was added to the sums per changed hour (row key and
+        TOTAL_FIELDS order), for the rollups. Consumption seeded before the
+        ledger existed has no rows and keeps its energiledd.
+        """
+        changes: list[tuple[str, tuple[int, ...]]] = []
+        sums = self.sums
+        for key, row in self.rows.items():
+            is_day = bool(row[ROW_IS_DAY])
+            difference = row[ROW_KWH] * (dag if is_day else natt) - row[ROW_ENERGILEDD]
+            if not difference:
+                continue
+            mva = difference * mva_sats / (1 + mva_sats)
+            row[ROW_ENERGILEDD] += difference
+            row[ROW_MVA] += mva
+            difference_uore = kr_to_uore(difference)
+            changed = (
+                0,
+                0,
+                difference_uore if is_day else 0,
+                0 if is_day else difference_uore,
+                0,
+                0,
+                0,
+                0,
+                0,
+                kr_to_uore(mva),
+            )
+            for name, value in zip(TOTAL_FIELDS, changed, strict=True):
+                sums[name] += value
+            changes.append((key, changed))
+        return changes
+
+    @property
+    def energiledd(self) -> float:
+        """Energiledd dag + natt month to date."""
+        return (self.sums["energiledd_dag"] + self.sums["energiledd_natt"]) / UORE_PER_KR
+
+    @property
+    def avgifter(self) -> float:
+        """Forbruksavgift + Enova (inkl. mva) month to date."""
+        return (self.sums["forbruksavgift"] + self.sums["enova"]) / UORE_PER_KR
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the ledger for storage."""
+        return {"month": self.month, "sums": self.sums, "rows": self.rows}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any] | None) -> CostLedger | None:
+        """Restore a ledger from storage (None if missing)."""
+        if not data:
+            return None
+        ledger = cls(data["month"])
+        ledger.sums.update({name: int(value) for name, value in data.get("sums", {}).items() if name in TOTAL_SCALES})
+        ledger.rows = data.get("rows", {})
+        return ledger
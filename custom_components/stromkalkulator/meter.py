@@ -0,0 +1,127 @@
+"""Cumulative energy register (kWh meter) input.
+
+AMS/HAN readers and Tibber publish the meter's cumulative kWh register. Taking
+deltas of the register gives the same energy as the utility meter, no matter
+how often it is sampled, so nothing has to be integrated. Each delta is split
+at whole hours, which gives exact hourly energy (kWh/h = average kW) for the
+kapasitetstrinn peaks, and optionally at the spot price intervals inside the
+hour, so each piece can be booked at its own price.
+
+Many meters only update the register every few seconds, some only once an
+hour. A reading equal to the previous one is therefore not a new starting
+point: each delta is spread over the time since the register last changed.
+
+Register resets (reader restarted at 0) and rollovers (register wrapped at a
+power of ten) are detected. Implausible jumps, such as a replaced meter, are
+discarded and the new value becomes the starting point.
+"""
+
+from __future__ import annotations
+
+import math
+from datetime import datetime
+from typing import Any, Final
+
+SECONDS_PER_HOUR: Final[int] = 3600
+
+# Largest average load a household meter can plausibly register (kW).
+# Deltas above this (plus slack for meters that report in whole kWh) are discarded.
+MAX_PLAUSIBLE_KW: Final[float] = 100.0
+PLAUSIBLE_SLACK_KWH: Final[float] = 1.0
+
+
+class EnergyMeter:
+    """Turn a cumulative kWh register into hourly energy."""
+
+    __slots__ = ("_hour_start", "_last_ts", "hour_kwh", "last_value", "resets")
+
+    def __init__(self) -> None:
+        """Initialize without a previous reading."""
+        self.last_value: float | None = None
+        self._last_ts = 0.0
+        self._hour_start = 0.0
+        self.hour_kwh = 0.0
+        self.resets = 0
+
+    def add(
+        self, time: datetime, value_kwh: float, split_s: float = SECONDS_PER_HOUR
+    ) -> list[tuple[datetime, float, float]]:
+        """Add a register reading and return the energy since the register last changed.
+
+        Returns a list of (interval_start, kwh, hour_total_kwh) per interval
+        of split_s seconds (a divisor of an hour) the delta touches, with
+        interval_start as naive local time and hour_total_kwh the clock hour's
+        energy so far. Empty for the first reading, an unchanged register, a
+        discarded jump or no consumption.
+        """
+        ts = time.timestamp()
+        if value_kwh == self.last_value and ts > self._last_ts:
+            # Keep the last change as the start of the next delta
+            return []
+        previous_value = self.last_value
+        previous_ts = self._last_ts
+        self.last_value = value_kwh
+        self._last_ts = ts
+
+        if previous_value is None or ts <= previous_ts:
+            self._start_hour(ts)
+            return []
+
+        delta = self._delta(previous_value, value_kwh, ts - previous_ts)
+        if delta <= 0:
+            return []
+
+        # Split the delta over the intervals it spans, proportional to time
+        pieces: list[tuple[datetime, float, float]] = []
+        per_second = delta / (ts - previous_ts)
+        start = previous_ts
+        while start < ts:
+            interval_start = start // split_s * split_s
+            end = min(ts, interval_start + split_s)
+            if start // SECONDS_PER_HOUR * SECONDS_PER_HOUR != self._hour_start:
+                self._start_hour(start)
+            kwh = per_second * (end - start)
+            self.hour_kwh += kwh
+            pieces.append((datetime.fromtimestamp(interval_start), kwh, self.hour_kwh))
+            start = end
+        return pieces
+
+    def _delta(self, previous: float, value: float, elapsed_s: float) -> float:
+        """Energy between two readings, handling resets, rollovers and jumps."""
+        limit = MAX_PLAUSIBLE_KW * elapsed_s / SECONDS_PER_HOUR + PLAUSIBLE_SLACK_KWH
+        delta = value - previous
+        if delta < 0:
+            self.resets += 1
+            # Rollover: the register wrapped at the next power of ten
+            wrap = 10 ** math.ceil(math.log10(previous)) if previous >= 1 else 0.0
+            rollover = wrap - previous + value
+            delta = rollover if 0 <= rollover <= limit else value
+        if delta > limit:
+            # Implausible jump (meter replaced, wrong unit); start over from the new value
+            return 0.0
+        return delta
+
+    def _start_hour(self, ts: float) -> None:
+        """Start a new clock hour at ts (UTC offsets in Norway are whole hours)."""
+        self._hour_start = ts // SECONDS_PER_HOUR * SECONDS_PER_HOUR
+        self.hour_kwh = 0.0
+
+    def as_dict(self) -> dict[str, Any] | None:
+        """Return the meter state for storage (None before the first reading)."""
+        if self.last_value is None:
+            return None
+        return {
+            "value": self.last_value,
+            "ts": self._last_ts,
+            "hour_start": self._hour_start,
+            "hour_kwh": self.hour_kwh,
+        }
+
+    def restore(self, data: dict[str, Any] | None) -> None:
+        """Restore the meter state from storage."""
+        if not data:
+            return
+        self.last_value = float(data["value"])
+        self._last_ts = float(data["ts"])
+        self._hour_start = float(data["hour_start"])
+        self.hour_kwh = float(data["hour_kwh"])
@@ -0,0 +1,191 @@
+"""Month-to-date consumption and daily peaks in fixed-size arrays.
+
+A month is held as flat float arrays indexed by day of month and hour:
+
+- daily_max_kw: highest power (or hourly energy with a meter) per day, 31 slots
+- hourly_kwh: energy per local clock hour, 31 x 24 slots (single precision)
+- tariff_uwh: energy per tariff, [natt, dag], in whole µWh (fixedpoint.py)
+
+Booking an interval and raising a daily peak are index operations, with no
+date strings formatted or hashed on the hot path. Dates are only formatted
+for the three highest days shown in sensor attributes.
+
+Hours are naive local clock hours. On the night clocks go back, both 02:00
+hours land in the same slot; the spring-forward hour stays empty.
+
+For storage the arrays are packed little-endian and base64 encoded, so the
+stored size is constant however many updates the month has had:
+
+- as_dict: tariff totals and daily peaks, a version byte, two 64-bit
+  integers and 31 doubles (265 bytes), small enough to save on every
+  update. The encoding is kept until the month changes again, so the
+  previous month is encoded once.
+- hourly_as_dict: the hourly slots (2976 bytes), saved with the delayed
+  ledger writes. Single precision is plenty for hourly views; the month
+  totals come from tariff_uwh.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import heapq
+import sys
+from array import array
+from typing import TYPE_CHECKING, Any, Final
+
+from .fixedpoint import kwh_to_uwh, uwh_to_kwh
+
+if TYPE_CHECKING:
+    from datetime import datetime
+
+DAYS: Final[int] = 31
+HOURS_PER_DAY: Final[int] = 24
+TARIFF_NATT, TARIFF_DAG = 0, 1
+
+# Storage layout version (first byte of the packed state)
+FORMAT_VERSION: Final[int] = 1
+_PACKED_SIZE: Final[int] = 1 + 8 * (2 + DAYS)  # tariff_uwh, daily_max_kw
+_HOURLY_SIZE: Final[int] = 4 * DAYS * HOURS_PER_DAY
+
+
+class MonthState:
+    """Consumption and daily peaks for one month."""
+
+    __slots__ = ("_stored", "daily_max_kw", "hourly_kwh", "month", "tariff_uwh")
+
+    def __init__(self, month: str) -> None:
+        """Initialize an empty month ("YYYY-MM")."""
+        self.month = month
+        self.tariff_uwh = array("q", [0, 0])
+        self.daily_max_kw = array("d", [0.0]) * DAYS
+        self.hourly_kwh = array("f", [0.0]) * (DAYS * HOURS_PER_DAY)
+        self._stored: dict[str, str] | None = None
+
+    @property
+    def dag_kwh(self) -> float:
+        """Energy on the dag tariff."""
+        return uwh_to_kwh(self.tariff_uwh[TARIFF_DAG])
+
+    @property
+    def natt_kwh(self) -> float:
+        """Energy on the natt tariff."""
+        return uwh_to_kwh(self.tariff_uwh[TARIFF_NATT])
+
+    @property
+    def total_kwh(self) -> float:
+        """Energy on both tariffs."""
+        return uwh_to_kwh(self.tariff_uwh[TARIFF_NATT] + self.tariff_uwh[TARIFF_DAG])
+
+    def add_energy(self, when: datetime, is_day: bool, kwh: float) -> None:
+        """Book energy at a naive local time in this month."""
+        self.tariff_uwh[is_day] += kwh_to_uwh(kwh)
+        self.hourly_kwh[(when.day - 1) * HOURS_PER_DAY + when.hour] += kwh
+        self._stored = None
+
+    def add_peak(self, day: int, kw: float) -> bool:
+        """Raise a day's peak (day of month from 1). Returns True if it rose."""
+        if kw <= self.daily_max_kw[day - 1]:
+            return False
+        self.daily_max_kw[day - 1] = kw
+        self._stored = None
+        return True
+
+    def top_days(self, count: int = 3) -> dict[str, float]:
+        """The count days with the highest peaks, {"YYYY-MM-DD": kW}, highest first."""
+        peaks = self.daily_max_kw
+        days = heapq.nlargest(count, (day for day in range(DAYS) if peaks[day] > 0), key=peaks.__getitem__)
+        return {f"{self.month}-{day + 1:02d}": peaks[day] for day in days}
+
+    def to_bytes(self) -> bytes:
+        """Pack the tariff totals and daily peaks: version byte, then little-endian int64 and doubles."""
+        return bytes((FORMAT_VERSION,)) + _little_endian(self.tariff_uwh) + _little_endian(self.daily_max_kw)
+
+    @classmethod
+    def from_bytes(cls, month: str, data: bytes) -> MonthState | None:
+        """Unpack a month packed by to_bytes (None if the data is unusable)."""
+        if len(data) != _PACKED_SIZE or data[0] != FORMAT_VERSION:
+            return None
+        state = cls(month)
+        state.tariff_uwh = _from_little_endian("q", data[1:17])
+        state.daily_max_kw = _from_little_endian("d", data[17:])
+        return state
+
+    def as_dict(self) -> dict[str, str]:
+        """Return the tariff totals and daily peaks for storage."""
+        if self._stored is None:
+            self._stored = {"month": self.month, "data": _encode(self.to_bytes())}
+        return self._stored
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any] | None) -> MonthState | None:
+        """Restore a month from storage (None if missing or unusable)."""
+        if not data or "month" not in data:
+            return None
+        packed = _decode(data.get("data"))
+        return cls.from_bytes(data["month"], packed) if packed is not None else None
+
+    def hourly_as_dict(self) -> dict[str, str]:
+        """Return the hourly slots for storage."""
+        return {"month": self.month, "hourly": _encode(_little_endian(self.hourly_kwh))}
+
+    def restore_hourly(self, data: dict[str, Any] | None) -> bool:
+        """Restore hourly slots stored by hourly_as_dict for this month. Returns True if restored."""
+        if not data or data.get("month") != self.month:
+            return False
+        packed = _decode(data.get("hourly"))
+        if packed is None or len(packed) != _HOURLY_SIZE:
+            return False
+        self.hourly_kwh = _from_little_endian("f", packed)
+        return True
+
+    @classmethod
+    def from_legacy(
+        cls, month: str, consumption: dict[str, float] | None, daily_max: dict[str, float] | None
+    ) -> MonthState:
+        """Build a month from the dicts stored by earlier versions.
+
+        Args:
+            month: "YYYY-MM"
+            consumption: {"dag": kWh, "natt": kWh}
+            daily_max: {"YYYY-MM-DD": kW}; days in other months are ignored
+        """
+        state = cls(month)
+        consumption = consumption or {}
+        state.tariff_uwh[TARIFF_DAG] = kwh_to_uwh(float(consumption.get("dag", 0.0)))
+        state.tariff_uwh[TARIFF_NATT] = kwh_to_uwh(float(consumption.get("natt", 0.0)))
+        for date, kw in (daily_max or {}).items():
+            if date[:7] == month and date[8:10].isdigit() and 1 <= int(date[8:10]) <= DAYS:
+                state.add_peak(int(date[8:10]), float(kw))
+        return state
+
+
+def _little_endian(values: array[Any]) -> bytes:
+    """Bytes of an array in little-endian order."""
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_little_endian(typecode: str, data: bytes) -> array[Any]:
+    """Array from little-endian bytes."""
+    values = array(typecode, data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def _encode(data: bytes) -> str:
+    """Base64 text for JSON storage."""
+    return base64.b64encode(data).decode("ascii")
+
+
+def _decode(text: Any) -> bytes | None:
+    """Bytes from base64 text (None if it is not valid base64)."""
+    if not isinstance(text, str):
+        return None
+    try:
+        return base64.b64decode(text, validate=True)
+    except (binascii.Error, ValueError):
+        return None
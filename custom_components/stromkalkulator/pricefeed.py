@@ -0,0 +1,252 @@
+"""Price feed adapter for spot price sensors and other price sources.
+
+Price sensors publish the current price as their state and, depending on
+the integration, the prices for today and tomorrow as attribute arrays:
+
+- Nord Pool (custom integration): raw_today / raw_tomorrow with
+  {"start", "end", "value"}
+- ENTSO-E: prices_today / prices_tomorrow / prices with {"time", "price"}
+- Tibber: today / tomorrow with {"startsAt", "total"}
+
+A PriceFeed parses a published state once into a compact array of prices
+on a fixed time grid (the shortest interval in the data, e.g. 15 minutes),
+so looking up the price for a point in time is one index calculation.
+Sparse data (long gaps, or one short interval among long ones) would give a
+grid mostly of repeated slots; it is kept as sorted interval starts and
+looked up by bisection instead. Points outside the arrays, and sensors
+without them, use the state.
+
+Other price sources fill the same array with PriceFeed.load:
+
+- Recorder history of the price sensor (prices_from_states), for
+  consumption booked after a gap
+- A local file with historical prices (read_price_file; CSV, XLSX or
+  Parquet with a start time and a price column), for offline replay and
+  imports
+
+Only needs the standard library (Parquet needs pyarrow).
+"""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_right
+from collections.abc import Iterable, Mapping
+from datetime import datetime
+from itertools import pairwise
+from typing import TYPE_CHECKING, Any
+
+from .importer import DEFAULT_TIMEZONE, TIMESTAMPS_LOCAL, ConsumptionImportError, parse_rows, read_rows
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+# Attribute arrays, in the order they are read (the first price for an interval wins)
+PRICE_ARRAY_ATTRIBUTES: tuple[str, ...] = (
+    "raw_today",
+    "raw_tomorrow",
+    "prices_today",
+    "prices_tomorrow",
+    "prices",
+    "today",
+    "tomorrow",
+)
+START_KEYS: tuple[str, ...] = ("start", "time", "startsAt")
+PRICE_KEYS: tuple[str, ...] = ("value", "price", "total")
+
+# Largest grid relative to the number of prices (hourly prices among 15-minute
+# prices fill 4 slots each); sparser data is looked up by bisection
+MAX_SLOTS_PER_PRICE: int = 4
+
+# Price column names in price files (lowercase substrings)
+PRICE_KEYWORDS: tuple[str, ...] = ("pris", "price", "nok", "verdi", "value")
+
+# Recorder states are placed on the quarter hour they changed in
+STATE_INTERVAL_S: int = 900
+
+UNAVAILABLE_STATES: frozenset[str] = frozenset({"unknown", "unavailable"})
+
+
+class PriceSourceError(ValueError):
+    """Prices could not be read from a price source."""
+
+
+def _timestamp(value: Any) -> float | None:
+    """Epoch seconds for a datetime or ISO 8601 string (naive means local time)."""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return None
+
+
+def _entry(item: Any) -> tuple[float, float] | None:
+    """(start, price) from one attribute array entry, or None if unusable."""
+    if not isinstance(item, Mapping):
+        return None
+    start = next((item[key] for key in START_KEYS if key in item), None)
+    price = next((item[key] for key in PRICE_KEYS if key in item), None)
+    if start is None or price is None:
+        return None
+    start_ts = _timestamp(start)
+    if start_ts is None:
+        return None
+    try:
+        return start_ts, float(price)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_price_arrays(attributes: Mapping[str, Any]) -> dict[float, float]:
+    """Collect {interval start: price} from all known attribute arrays."""
+    prices: dict[float, float] = {}
+    for name in PRICE_ARRAY_ATTRIBUTES:
+        items = attributes.get(name)
+        if not isinstance(items, Iterable) or isinstance(items, str | bytes | Mapping):
+            continue
+        for item in items:
+            if (entry := _entry(item)) is not None:
+                prices.setdefault(*entry)
+    return prices
+
+
+def build_grid(prices: Mapping[float, float]) -> tuple[float, float, array[float]] | None:
+    """Resample prices onto a fixed grid: (first start, step seconds, prices).
+
+    The step is the shortest interval in the data; longer intervals (hourly
+    prices next to 15-minute prices) fill several slots. The last interval
+    is assumed to be one step long. None for fewer than two prices, or data
+    too sparse for a grid (more than MAX_SLOTS_PER_PRICE slots per price).
+    """
+    if len(prices) < 2:
+        return None
+    starts = sorted(prices)
+    step = min(b - a for a, b in pairwise(starts))
+    first = starts[0]
+    slots = round((starts[-1] - first) / step) + 1
+    if slots > MAX_SLOTS_PER_PRICE * len(prices):
+        return None
+    grid = array("d", [0.0]) * slots
+    for i, start in enumerate(starts):
+        end = starts[i + 1] if i + 1 < len(starts) else start + step
+        price = prices[start]
+        for slot in range(round((start - first) / step), round((end - first) / step)):
+            grid[slot] = price
+    return first, step, grid
+
+
+def _state_price(state: Any) -> float | None:
+    """Price in a state's value (None if unavailable)."""
+    if state.state in UNAVAILABLE_STATES:
+        return None
+    try:
+        return float(state.state)
+    except (TypeError, ValueError):
+        return None
+
+
+def prices_from_states(states: Iterable[Any]) -> dict[float, float]:
+    """Collect {interval start: price} from recorder states of a price sensor.
+
+    The attribute arrays are used if the states have them (later states win).
+    Otherwise each state's value counts from the quarter hour it changed in.
+    """
+    arrays: dict[float, float] = {}
+    values: dict[float, float] = {}
+    for state in states:
+        arrays.update(parse_price_arrays(state.attributes or {}))
+        if (price := _state_price(state)) is not None:
+            changed = state.last_changed.timestamp()
+            values[changed - changed % STATE_INTERVAL_S] = price
+    return arrays or values
+
+
+def read_price_file(
+    path: str | Path, timezone: str = DEFAULT_TIMEZONE, timestamps: str = TIMESTAMPS_LOCAL
+) -> dict[float, float]:
+    """Read {interval start: price} from a CSV, XLSX or Parquet price file.
+
+    The file needs a start time column and a price column in the same unit
+    as the spot price sensor (NOK/kWh), with at least two prices (one gives
+    no interval length).
+    """
+    try:
+        prices = {
+            start.timestamp(): price
+            for start, price in parse_rows(read_rows(path), timezone, timestamps, value_keywords=PRICE_KEYWORDS)
+        }
+    except ConsumptionImportError as err:
+        raise PriceSourceError(str(err)) from err
+    if len(prices) < 2:
+        raise PriceSourceError(f"{path}: need at least two prices, found {len(prices)}")
+    return prices
+
+
+class PriceFeed:
+    """Current and upcoming prices from one price sensor."""
+
+    __slots__ = ("_first", "_grid", "_starts", "_state", "_state_price", "_step", "parses")
+
+    def __init__(self) -> None:
+        """Initialize an empty feed."""
+        self._state: Any = None
+        self._state_price: float | None = None
+        self._first = 0.0
+        self._step = 0.0
+        self._grid: array[float] = array("d")
+        self._starts: array[float] = array("d")
+        self.parses = 0
+
+    def update(self, state: Any) -> None:
+        """Parse a published state (skipped if it is the state already parsed).
+
+        State objects are replaced on every change, so the same object means
+        nothing new was published.
+        """
+        if state is self._state:
+            return
+        if state is None:
+            self.load({})
+        else:
+            self.load(parse_price_arrays(state.attributes or {}), _state_price(state))
+        self._state = state
+
+    def load(self, prices: Mapping[float, float], state_price: float | None = None) -> None:
+        """Replace the prices with {interval start: price} from any price source.
+
+        Args:
+            prices: Interval start (epoch seconds) to price
+            state_price: Price outside the intervals, if any
+        """
+        self._state = None
+        self.parses += 1
+        self._state_price = state_price
+        self._grid = array("d")
+        self._starts = array("d")
+        if (grid := build_grid(prices)) is not None:
+            self._first, self._step, self._grid = grid
+        elif len(prices) >= 2:
+            # Too sparse for a grid: one slot per interval start
+            self._starts = array("d", sorted(prices))
+            self._grid = array("d", [prices[start] for start in self._starts])
+            self._step = min(b - a for a, b in pairwise(self._starts))
+
+    @property
+    def interval_s(self) -> float | None:
+        """Length of the price intervals in seconds (None without arrays)."""
+        return self._step if self._grid else None
+
+    def price_at(self, timestamp: float) -> float | None:
+        """Price for a point in time (epoch seconds), falling back to the state."""
+        if self._starts:
+            i = bisect_right(self._starts, timestamp) - 1
+            if i >= 0 and (i + 1 < len(self._starts) or timestamp < self._starts[i] + self._step):
+                return self._grid[i]
+        elif self._grid:
+            slot = int((timestamp - self._first) // self._step)
+            if 0 <= slot < len(self._grid):
+                return self._grid[slot]
+        return self._state_price
@@ -0,0 +1,199 @@
+"""Prefix sums over the hourly ledger rows for cost queries over any range.
+
+The hourly rows (measured months and imported history) are laid out as one
+dense run of hours, and each column is kept as a running sum: the sum over
+hours a..b is prefix[b] - prefix[a], whatever the length of the range. A
+sparse table of the highest hour per power-of-two span gives the peak hour
+of a range the same way, from two overlapping spans.
+
+A range that starts or ends inside an hour takes that hour in proportion to
+the part covered (consumption is taken as even within the hour).
+
+Hours are integer indexes from the naive local time (day ordinal * 24 +
+hour), as the hour tier in rollups.py. Hours are appended in order; when an
+hour already indexed changes (a late booking), the index is truncated to
+that hour and the hours after it are appended again.
+"""
+
+from __future__ import annotations
+
+import math
+from array import array
+from datetime import date
+from typing import TYPE_CHECKING, Any, Final
+
+from .ledger import ROW_ENERGILEDD, ROW_IS_DAY, ROW_KWH
+from .rollups import TIER_HOUR, period_label
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+    from datetime import datetime
+
+COLUMNS: Final[tuple[str, ...]] = (
+    "kwh_dag",
+    "kwh_natt",
+    "energiledd",
+    "spot",
+    "stromstotte",
+    "stromstotte_kwh",
+    "forbruksavgift",
+    "enova",
+    "mva",
+)
+_KWH_DAG, _KWH_NATT, _ENERGILEDD, _SPOT, _STOTTE, _STOTTE_KWH, _FORBRUKSAVGIFT, _ENOVA, _MVA = range(len(COLUMNS))
+_EMPTY: Final[tuple[float, ...]] = (0.0,) * len(COLUMNS)
+
+
+def hour_index(when: datetime) -> int:
+    """Index of the hour containing a naive local time."""
+    return when.toordinal() * 24 + when.hour
+
+
+def hour_position(when: datetime) -> float:
+    """Hour index of a naive local time, with the part of the hour passed."""
+    return hour_index(when) + (when.minute * 60 + when.second + when.microsecond / 1e6) / 3600
+
+
+def hour_of_key(key: str) -> int:
+    """Hour index of a ledger row key ("YYYY-MM-DDTHH")."""
+    return date(int(key[:4]), int(key[5:7]), int(key[8:10])).toordinal() * 24 + int(key[11:13])
+
+
+def key_of_hour(hour: int) -> str:
+    """Ledger row key of an hour index."""
+    return f"{date.fromordinal(hour // 24).isoformat()}T{hour % 24:02d}"
+
+
+def row_values(row: Sequence[float]) -> tuple[float, ...]:
+    """A ledger hour row as index columns (kWh split on the row's tariff)."""
+    kwh = row[ROW_KWH]
+    if row[ROW_IS_DAY]:
+        return (kwh, 0.0, *row[ROW_ENERGILEDD:])
+    return (0.0, kwh, *row[ROW_ENERGILEDD:])
+
+
+class RangeIndex:
+    """Running column sums and peak spans over a dense run of hours."""
+
+    __slots__ = ("first", "kwh", "prefix", "sparse")
+
+    def __init__(self, first: int) -> None:
+        """Initialize an empty index starting at hour index first."""
+        self.first = first
+        # prefix[column][i]: sum of the hours before position i
+        self.prefix = [array("d", (0.0,)) for _ in COLUMNS]
+        self.kwh = array("d")
+        # sparse[level][i]: position of the highest hour in [i, i + 2**level)
+        self.sparse: list[array[int]] = []
+
+    @property
+    def end(self) -> int:
+        """Hour index after the last indexed hour."""
+        return self.first + len(self.kwh)
+
+    def append(self, hour: int, values: Sequence[float]) -> None:
+        """Add an hour after the last one (the hours between are empty)."""
+        if hour < self.end:
+            raise ValueError(f"hour {hour} is before the end of the index ({self.end})")
+        while self.end < hour:
+            self._push(_EMPTY)
+        self._push(values)
+
+    def _push(self, values: Sequence[float]) -> None:
+        """Add the next hour to the prefix sums and the peak spans ending at it."""
+        for column, value in zip(self.prefix, values, strict=True):
+            column.append(column[-1] + value)
+        kwh = self.kwh
+        position = len(kwh)
+        kwh.append(values[_KWH_DAG] + values[_KWH_NATT])
+        sparse = self.sparse
+        if not sparse:
+            sparse.append(array("q"))
+        sparse[0].append(position)
+        level = 1
+        while (width := 1 << level) <= position + 1:
+            if level == len(sparse):
+                sparse.append(array("q"))
+            below = sparse[level - 1]
+            left = below[position - width + 1]
+            right = below[position - width // 2 + 1]
+            sparse[level].append(left if kwh[left] >= kwh[right] else right)
+            level += 1
+
+    def truncate(self, hour: int) -> None:
+        """Drop the hours from hour index hour on."""
+        keep = max(hour - self.first, 0)
+        if keep >= len(self.kwh):
+            return
+        for column in self.prefix:
+            del column[keep + 1 :]
+        del self.kwh[keep:]
+        for level, positions in enumerate(self.sparse):
+            del positions[max(keep - (1 << level) + 1, 0) :]
+        while self.sparse and not self.sparse[-1]:
+            self.sparse.pop()
+
+    def _position(self, hour: int) -> int:
+        """Position of an hour index, clipped to the index."""
+        return min(max(hour - self.first, 0), len(self.kwh))
+
+    def _hour(self, hour: int) -> list[float]:
+        """Column values of one hour (zero outside the index)."""
+        position = hour - self.first
+        if 0 <= position < len(self.kwh):
+            return [column[position + 1] - column[position] for column in self.prefix]
+        return list(_EMPTY)
+
+    def sums(self, start: float, end: float) -> list[float]:
+        """Column sums over [start, end) in hour positions."""
+        if end <= start:
+            return list(_EMPTY)
+        first_whole = math.ceil(start)
+        last_whole = math.floor(end)
+        if first_whole > last_whole:
+            return [value * (end - start) for value in self._hour(last_whole)]
+        low = self._position(first_whole)
+        high = max(self._position(last_whole), low)
+        totals = [column[high] - column[low] for column in self.prefix]
+        for hour, share in ((first_whole - 1, first_whole - start), (last_whole, end - last_whole)):
+            if share > 0:
+                for index, value in enumerate(self._hour(hour)):
+                    totals[index] += value * share
+        return totals
+
+    def peak(self, start: float, end: float) -> tuple[int, float] | None:
+        """Hour with the most consumption among those [start, end) touches (hour index, kWh)."""
+        low = self._position(math.floor(start))
+        high = self._position(math.ceil(end))
+        if high <= low:
+            return None
+        level = (high - low).bit_length() - 1
+        positions = self.sparse[level]
+        left = positions[low]
+        right = positions[high - (1 << level)]
+        best = left if self.kwh[left] >= self.kwh[right] else right
+        return self.first + best, self.kwh[best]
+
+    def query(self, start: datetime, end: datetime) -> dict[str, Any]:
+        """Energy, cost lines and peak hour from start to end (naive local times)."""
+        start_position = hour_position(start)
+        end_position = hour_position(end)
+        sums = self.sums(start_position, end_position)
+        peak = self.peak(start_position, end_position)
+        avgifter = sums[_FORBRUKSAVGIFT] + sums[_ENOVA]
+        return {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "forbruk_kwh": round(sums[_KWH_DAG] + sums[_KWH_NATT], 3),
+            "forbruk_dag_kwh": round(sums[_KWH_DAG], 3),
+            "forbruk_natt_kwh": round(sums[_KWH_NATT], 3),
+            "strompris_kr": round(sums[_SPOT], 2),
+            "energiledd_kr": round(sums[_ENERGILEDD], 2),
+            "avgifter_kr": round(avgifter, 2),
+            "stromstotte_kr": round(sums[_STOTTE], 2),
+            "stromstotte_kwh": round(sums[_STOTTE_KWH], 3),
+            "mva_kr": round(sums[_MVA], 2),
+            "total_kr": round(sums[_SPOT] + sums[_ENERGILEDD] + avgifter - sums[_STOTTE], 2),
+            "toppeffekt_kw": round(peak[1], 2) if peak else 0.0,
+            "topptime": period_label(TIER_HOUR, peak[0]) if peak and peak[1] > 0 else None,
+        }
@@ -0,0 +1,209 @@
+"""Invoice reconciliation against the hourly cost ledger.
+
+An invoice from the grid company is given as its line items (energiledd
+dag/natt, strømstøtte, kapasitetsledd, forbruksavgift, Enova). The same
+lines are computed from the ledger's hourly rows in a single pass over the
+month and compared line by line.
+
+Kapasitetsledd is computed like on the invoice: the highest hourly energy
+(kWh/h = average kW) per day, averaged over the top 3 days.
+
+Invoices may list amounts with or without mva. The ledger books amounts
+inkl. mva, so they are converted when the invoice is eks. mva.
+"""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, fields
+from typing import TYPE_CHECKING, Any, Final
+
+from .ledger import (
+    ROW_ENERGILEDD,
+    ROW_ENOVA,
+    ROW_FORBRUKSAVGIFT,
+    ROW_IS_DAY,
+    ROW_KWH,
+    ROW_STOTTE,
+    ROW_STOTTE_KWH,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+    from .ledger import CostLedger
+
+# Invoice lines and their unit, in invoice order
+INVOICE_LINES: Final[dict[str, str]] = {
+    "energiledd_dag_kwh": "kWh",
+    "energiledd_dag_kr": "kr",
+    "energiledd_natt_kwh": "kWh",
+    "energiledd_natt_kr": "kr",
+    "stromstotte_kwh": "kWh",
+    "stromstotte_ore": "øre/kWh",
+    "stromstotte_kr": "kr",
+    "kapasitet_kr": "kr",
+    "forbruksavgift_kr": "kr",
+    "enova_kr": "kr",
+}
+
+
+@dataclass(frozen=True, slots=True)
+class Invoice:
+    """Line items from one monthly invoice. Lines not on the invoice are None."""
+
+    month: str  # "YYYY-MM"
+    energiledd_dag_kwh: float | None = None
+    energiledd_dag_kr: float | None = None
+    energiledd_natt_kwh: float | None = None
+    energiledd_natt_kr: float | None = None
+    stromstotte_kwh: float | None = None
+    stromstotte_ore: float | None = None  # average øre/kWh
+    stromstotte_kr: float | None = None
+    kapasitet_kr: float | None = None
+    forbruksavgift_kr: float | None = None
+    enova_kr: float | None = None
+    inkl_mva: bool = True
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> Invoice:
+        """Create an invoice from a mapping, ignoring unknown keys."""
+        known = {f.name for f in fields(cls)}
+        return cls(**{key: value for key, value in data.items() if key in known})
+
+
+@dataclass(frozen=True, slots=True)
+class LineDiff:
+    """One invoice line compared with the ledger."""
+
+    line: str
+    unit: str
+    invoice: float
+    calculated: float
+
+    @property
+    def diff(self) -> float:
+        """Calculated minus invoice."""
+        return self.calculated - self.invoice
+
+    @property
+    def diff_pct(self) -> float | None:
+        """Difference in percent of the invoice amount (None if the invoice line is 0)."""
+        if self.invoice == 0:
+            return None
+        return self.diff / self.invoice * 100
+
+
+@dataclass(slots=True)
+class Reconciliation:
+    """Result of reconciling one invoice."""
+
+    month: str
+    hours: int
+    lines: list[LineDiff]
+
+    def line(self, name: str) -> LineDiff | None:
+        """Get the comparison for an invoice line."""
+        return next((line for line in self.lines if line.line == name), None)
+
+    @property
+    def max_abs_diff_kr(self) -> float:
+        """Largest absolute difference among the kr lines."""
+        return max((abs(line.diff) for line in self.lines if line.unit == "kr"), default=0.0)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the result for a service response or diagnostics."""
+        return {
+            "month": self.month,
+            "hours": self.hours,
+            "max_abs_diff_kr": round(self.max_abs_diff_kr, 2),
+            "lines": [
+                {
+                    **asdict(line),
+                    "diff": round(line.diff, 3),
+                    "diff_pct": round(line.diff_pct, 2) if line.diff_pct is not None else None,
+                }
+                for line in self.lines
+            ],
+        }
+
+
+def ledger_lines(
+    ledger: CostLedger, kapasitetstrinn: list[tuple[float, int]], mva_sats: float = 0.0
+) -> dict[str, float]:
+    """Compute the invoice lines from the ledger's hourly rows in one pass.
+
+    Args:
+        ledger: Cost ledger for the invoice month
+        kapasitetstrinn: (threshold_kw, kr_per_month) from the TSO
+        mva_sats: Divide kr amounts by (1 + mva_sats); 0 keeps them inkl. mva
+
+    Returns:
+        Value per line in INVOICE_LINES
+    """
+    kwh_dag = kwh_natt = energiledd_dag = energiledd_natt = 0.0
+    stotte = stotte_kwh = forbruksavgift = enova = 0.0
+    daily_max: dict[str, float] = {}
+    for key, row in ledger.rows.items():
+        kwh = row[ROW_KWH]
+        if row[ROW_IS_DAY]:
+            kwh_dag += kwh
+            energiledd_dag += row[ROW_ENERGILEDD]
+        else:
+            kwh_natt += kwh
+            energiledd_natt += row[ROW_ENERGILEDD]
+        stotte += row[ROW_STOTTE]
+        stotte_kwh += row[ROW_STOTTE_KWH]
+        forbruksavgift += row[ROW_FORBRUKSAVGIFT]
+        enova += row[ROW_ENOVA]
+        # Row keys are "YYYY-MM-DDTHH"; the date part groups the day
+        day = key[:10]
+        if kwh > daily_max.get(day, 0.0):
+            daily_max[day] = kwh
+
+    top_3 = sorted(daily_max.values(), reverse=True)[:3]
+    avg_top_3 = sum(top_3) / len(top_3) if top_3 else 0.0
+    # Above the last threshold: the last trinn (as the coordinator does)
+    kapasitet = next(
+        (price for threshold, price in kapasitetstrinn if avg_top_3 <= threshold),
+        kapasitetstrinn[-1][1] if kapasitetstrinn else 0,
+    )
+
+    factor = 1 / (1 + mva_sats)
+    stotte *= factor
+    return {
+        "energiledd_dag_kwh": kwh_dag,
+        "energiledd_dag_kr": energiledd_dag * factor,
+        "energiledd_natt_kwh": kwh_natt,
+        "energiledd_natt_kr": energiledd_natt * factor,
+        "stromstotte_kwh": stotte_kwh,
+        "stromstotte_ore": stotte / stotte_kwh * 100 if stotte_kwh else 0.0,
+        "stromstotte_kr": stotte,
+        "kapasitet_kr": kapasitet * factor,
+        "forbruksavgift_kr": forbruksavgift * factor,
+        "enova_kr": enova * factor,
+    }
+
+
+def reconcile(
+    ledger: CostLedger,
+    invoice: Invoice,
+    kapasitetstrinn: list[tuple[float, int]],
+    mva_sats: float,
+) -> Reconciliation:
+    """Compare an invoice with the ledger for the same month.
+
+    Args:
+        ledger: Cost ledger for invoice.month
+        invoice: Invoice line items
+        kapasitetstrinn: (threshold_kw, kr_per_month) from the TSO
+        mva_sats: Mva rate of the avgiftssone (used when the invoice is eks. mva)
+    """
+    if ledger.month != invoice.month:
+        raise ValueError(f"Ledger month {ledger.month} does not match invoice month {invoice.month}")
+    calculated = ledger_lines(ledger, kapasitetstrinn, 0.0 if invoice.inkl_mva else mva_sats)
+    lines = [
+        LineDiff(name, unit, float(invoice_value), calculated[name])
+        for name, unit in INVOICE_LINES.items()
+        if (invoice_value := getattr(invoice, name)) is not None
+    ]
+    return Reconciliation(invoice.month, len(ledger.rows), lines)
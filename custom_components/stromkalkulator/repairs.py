@@ -0,0 +1,33 @@
+"""Repairs platform for Strømkalkulator."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from homeassistant import data_entry_flow
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+
+class TsoMigrationRepairFlow(data_entry_flow.FlowHandler):
+    """Handler for TSO migration repair flow."""
+
+    async def async_step_init(self, user_input: dict[str, str] | None = None) -> data_entry_flow.FlowResult:
+        """Handle the first step of the fix flow."""
+        return await self.async_step_confirm()
+
+    async def async_step_confirm(self, user_input: dict[str, str] | None = None) -> data_entry_flow.FlowResult:
+        """Handle the confirm step."""
+        if user_input is not None:
+            return self.async_create_entry(data={})
+        return self.async_show_form(step_id="confirm")
+
+
+async def async_create_fix_flow(
+    hass: HomeAssistant,
+    issue_id: str,
+    data: dict[str, str] | None,
+) -> TsoMigrationRepairFlow:
+    """Create flow to fix a repair issue."""
+    return TsoMigrationRepairFlow()
@@ -0,0 +1,288 @@
+"""Running totals per hour, day, ISO week, month and year.
+
+The tiers are kept hierarchically as intervals close: a booked interval is
+added to the open hour only, and when the hour closes it is folded into the
+day, week, month and year containing it. Both steps are O(1), so a day's
+or a year's cost is read (the folded period plus the open hour), never
+summed from hourly data.
+
+A bucket holds the ledger sums of its period (kWh per tariff and the cost
+lines, in µWh and µøre as in ledger.py), the number of bookings and the
+highest peak. Each tier keeps the running period and the one before it.
+An interval booked for an hour that has already closed is added to the
+buckets that contain it; one older than the previous period is left to
+the ledger.
+
+Periods are integer keys computed from the local time without formatting:
+hour (day ordinal * 24 + hour), day (ordinal), ISO week (ordinal of its
+Monday), month (year * 12 + month - 1) and year.
+
+For storage the ten buckets are packed into fixed-size little-endian
+records and base64 encoded behind a version byte (about 1.4 kB).
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import struct
+from array import array
+from datetime import date
+from typing import TYPE_CHECKING, Any, Final
+
+from .fixedpoint import uore_to_kr, uwh_to_kwh
+from .ledger import TOTAL_FIELDS
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Mapping, Sequence
+    from datetime import datetime
+
+TIERS: Final[tuple[str, ...]] = ("hour", "day", "week", "month", "year")
+TIER_HOUR, TIER_DAY, TIER_WEEK, TIER_MONTH, TIER_YEAR = range(len(TIERS))
+# Key distance between consecutive periods, per tier
+_STEPS: Final[tuple[int, ...]] = (1, 1, 7, 1, 1)
+
+_KWH_DAG, _KWH_NATT, _ENERGILEDD_DAG, _ENERGILEDD_NATT, _SPOT, _STOTTE, _STOTTE_KWH, _FORBRUKSAVGIFT, _ENOVA, _MVA = (
+    range(len(TOTAL_FIELDS))
+)
+
+# Storage layout: version byte, then current and previous bucket per tier:
+# key, bookings, peak kW, the ledger sums
+FORMAT_VERSION: Final[int] = 1
+_RECORD: Final[struct.Struct] = struct.Struct(f"<qqd{len(TOTAL_FIELDS)}q")
+
+
+def period_keys(when: datetime) -> tuple[int, int, int, int, int]:
+    """Period key per tier for a naive local time."""
+    day = when.toordinal()
+    return day * 24 + when.hour, day, day - when.weekday(), when.year * 12 + when.month - 1, when.year
+
+
+def _hour_period_keys(hour_key: int) -> tuple[int, int, int, int, int]:
+    """Period key per tier for the hour with this key."""
+    day = hour_key // 24
+    when = date.fromordinal(day)
+    return hour_key, day, day - when.weekday(), when.year * 12 + when.month - 1, when.year
+
+
+def period_label(tier: int, key: int) -> str:
+    """Readable period: "2026-01-05T13", "2026-01-05", "2026-W02", "2026-01" or "2026"."""
+    if tier == TIER_HOUR:
+        return f"{date.fromordinal(key // 24).isoformat()}T{key % 24:02d}"
+    if tier == TIER_DAY:
+        return date.fromordinal(key).isoformat()
+    if tier == TIER_WEEK:
+        year, week, _ = date.fromordinal(key).isocalendar()
+        return f"{year}-W{week:02d}"
+    if tier == TIER_MONTH:
+        return f"{key // 12:04d}-{key % 12 + 1:02d}"
+    return str(key)
+
+
+class Rollup:
+    """Running totals for one period of one tier."""
+
+    __slots__ = ("bookings", "key", "peak_kw", "sums")
+
+    def __init__(self, key: int) -> None:
+        """Initialize an empty period."""
+        self.key = key
+        # Ledger sums in TOTAL_FIELDS order (µWh and µøre)
+        self.sums = array("q", bytes(8 * len(TOTAL_FIELDS)))
+        self.bookings = 0
+        self.peak_kw = 0.0
+
+    def add(self, booked: Sequence[int], bookings: int = 1) -> None:
+        """Add one booking's ledger sums (bookings=0 for a correction)."""
+        sums = self.sums
+        for index, value in enumerate(booked):
+            sums[index] += value
+        self.bookings += bookings
+
+    def merge(self, other: Rollup) -> None:
+        """Add another period's totals (a closed hour) to this one."""
+        sums = self.sums
+        for index, value in enumerate(other.sums):
+            sums[index] += value
+        self.bookings += other.bookings
+        self.peak_kw = max(self.peak_kw, other.peak_kw)
+
+    @property
+    def kwh(self) -> float:
+        """Energy dag + natt."""
+        return uwh_to_kwh(self.sums[_KWH_DAG] + self.sums[_KWH_NATT])
+
+    @property
+    def energiledd_kr(self) -> float:
+        """Energiledd dag + natt (no kapasitetsledd, which is per month)."""
+        return uore_to_kr(self.sums[_ENERGILEDD_DAG] + self.sums[_ENERGILEDD_NATT])
+
+    @property
+    def spot_kr(self) -> float:
+        """Strømpris paid."""
+        return uore_to_kr(self.sums[_SPOT])
+
+    @property
+    def avgifter_kr(self) -> float:
+        """Forbruksavgift + Enova, inkl. mva."""
+        return uore_to_kr(self.sums[_FORBRUKSAVGIFT] + self.sums[_ENOVA])
+
+    @property
+    def stromstotte_kr(self) -> float:
+        """Strømstøtte."""
+        return uore_to_kr(self.sums[_STOTTE])
+
+    @property
+    def total_kr(self) -> float:
+        """Strømpris + energiledd + avgifter - strømstøtte."""
+        sums = self.sums
+        return uore_to_kr(
+            sums[_SPOT]
+            + sums[_ENERGILEDD_DAG]
+            + sums[_ENERGILEDD_NATT]
+            + sums[_FORBRUKSAVGIFT]
+            + sums[_ENOVA]
+            - sums[_STOTTE]
+        )
+
+    def as_dict(self, tier: int) -> dict[str, Any]:
+        """The period in kWh and kr."""
+        return {
+            "period": period_label(tier, self.key),
+            "forbruk_kwh": round(self.kwh, 3),
+            "strompris_kr": round(self.spot_kr, 2),
+            "energiledd_kr": round(self.energiledd_kr, 2),
+            "avgifter_kr": round(self.avgifter_kr, 2),
+            "stromstotte_kr": round(self.stromstotte_kr, 2),
+            "total_kr": round(self.total_kr, 2),
+            "toppeffekt_kw": round(self.peak_kw, 2),
+            "bokforinger": self.bookings,
+        }
+
+
+class Rollups:
+    """The running and previous period of every tier.
+
+    current[TIER_HOUR] is the open hour; the current buckets of the other
+    tiers hold their closed hours.
+    """
+
+    __slots__ = ("current", "previous")
+
+    def __init__(self, now: datetime) -> None:
+        """Initialize empty periods around a naive local time."""
+        keys = period_keys(now)
+        self.current = [Rollup(key) for key in keys]
+        self.previous = [Rollup(key - step) for key, step in zip(keys, _STEPS, strict=True)]
+
+    def roll(self, now: datetime) -> None:
+        """Close the open hour if now is past it."""
+        if now.toordinal() * 24 + now.hour > self.current[TIER_HOUR].key:
+            self._advance(period_keys(now))
+
+    def _advance(self, keys: tuple[int, int, int, int, int]) -> None:
+        """Fold the open hour into its periods, then start the periods of keys."""
+        hour = self.current[TIER_HOUR]
+        if hour.bookings or hour.peak_kw:
+            self._each_bucket(_hour_period_keys(hour.key), TIER_DAY, lambda bucket: bucket.merge(hour))
+        current = self.current
+        for tier, key in enumerate(keys):
+            running = current[tier]
+            if key > running.key:
+                step = _STEPS[tier]
+                self.previous[tier] = running if running.key == key - step else Rollup(key - step)
+                current[tier] = Rollup(key)
+
+    def _each_bucket(self, keys: tuple[int, ...], first_tier: int, apply: Callable[[Rollup], None]) -> None:
+        """Apply to the held bucket (current or previous) of each period in keys."""
+        for tier in range(first_tier, len(TIERS)):
+            key = keys[tier]
+            if key == self.current[tier].key:
+                apply(self.current[tier])
+            elif key == self.previous[tier].key:
+                apply(self.previous[tier])
+
+    def add(self, when: datetime, booked: Sequence[int], bookings: int = 1) -> None:
+        """Add a booking (ledger sums at naive local time when); bookings=0 for a correction."""
+        if not booked:
+            return
+        key = when.toordinal() * 24 + when.hour
+        hour = self.current[TIER_HOUR]
+        if key > hour.key:
+            self._advance(period_keys(when))
+            hour = self.current[TIER_HOUR]
+        if key == hour.key:
+            hour.add(booked, bookings)
+        else:
+            # The hour has closed: add to every held period containing it
+            self._each_bucket(period_keys(when), TIER_HOUR, lambda bucket: bucket.add(booked, bookings))
+
+    def add_peak(self, when: datetime, kw: float) -> None:
+        """Raise the peak of the periods containing when."""
+        key = when.toordinal() * 24 + when.hour
+        hour = self.current[TIER_HOUR]
+        if key > hour.key:
+            self._advance(period_keys(when))
+            hour = self.current[TIER_HOUR]
+        if key == hour.key:
+            hour.peak_kw = max(hour.peak_kw, kw)
+        else:
+            self._each_bucket(period_keys(when), TIER_HOUR, lambda bucket: _raise_peak(bucket, kw))
+
+    def running(self, tier: int) -> Rollup:
+        """Totals of the running period of a tier, including the open hour."""
+        folded = self.current[tier]
+        if tier == TIER_HOUR:
+            return folded
+        running = Rollup(folded.key)
+        running.sums = array("q", folded.sums)
+        running.bookings = folded.bookings
+        running.peak_kw = folded.peak_kw
+        running.merge(self.current[TIER_HOUR])
+        return running
+
+    def seed(self, tier: int, sums: Mapping[str, int], peak_kw: float = 0.0) -> None:
+        """Set the closed part of a running period from ledger sums (upgrade without stored rollups)."""
+        bucket = self.current[tier]
+        bucket.sums = array("q", (sums.get(name, 0) for name in TOTAL_FIELDS))
+        bucket.peak_kw = peak_kw
+
+    def as_dict(self) -> dict[str, str]:
+        """The packed buckets for storage."""
+        records = b"".join(
+            _RECORD.pack(bucket.key, bucket.bookings, bucket.peak_kw, *bucket.sums)
+            for pair in zip(self.current, self.previous, strict=True)
+            for bucket in pair
+        )
+        return {"data": base64.b64encode(bytes((FORMAT_VERSION,)) + records).decode("ascii")}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any] | None, now: datetime) -> Rollups | None:
+        """Restore stored buckets, rolled to now (None if missing or unusable)."""
+        text = (data or {}).get("data")
+        if not isinstance(text, str):
+            return None
+        try:
+            packed = base64.b64decode(text, validate=True)
+        except (binascii.Error, ValueError):
+            return None
+        if len(packed) != 1 + 2 * len(TIERS) * _RECORD.size or packed[0] != FORMAT_VERSION:
+            return None
+        buckets: list[Rollup] = []
+        for offset in range(1, len(packed), _RECORD.size):
+            key, bookings, peak_kw, *sums = _RECORD.unpack_from(packed, offset)
+            bucket = Rollup(key)
+            bucket.bookings = bookings
+            bucket.peak_kw = peak_kw
+            bucket.sums = array("q", sums)
+            buckets.append(bucket)
+        rollups = cls(now)
+        rollups.current = buckets[0::2]
+        rollups.previous = buckets[1::2]
+        rollups.roll(now)
+        return rollups
+
+
+def _raise_peak(bucket: Rollup, kw: float) -> None:
+    """Raise a bucket's peak to kw."""
+    bucket.peak_kw = max(bucket.peak_kw, kw)
@@ -3,7 +3,8 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import TYPE_CHECKING, Any, cast
+from operator import attrgetter
+from typing import TYPE_CHECKING, Any
 
 from homeassistant.components.sensor import (
     SensorDeviceClass,
@@ -11,26 +12,31 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.const import EntityCategory
+from homeassistant.core import callback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import (
     AVGIFTSSONE_STANDARD,
     CONF_AVGIFTSSONE,
-    CONF_TSO,
     DOMAIN,
     ENOVA_AVGIFT,
     STROMSTOTTE_LEVEL,
-    TSO_LIST,
     get_forbruksavgift,
     get_mva_sats,
 )
+from .cumulative import COMPONENTS
+from .forecast import trinn_ranges
+from .snapshot import KR_DECIMALS, KW_DECIMALS, KWH_DECIMALS, PRICE_DECIMALS
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
+
     from homeassistant.config_entries import ConfigEntry
     from homeassistant.core import HomeAssistant
     from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
     from .coordinator import NettleieCoordinator
+    from .snapshot import CoordinatorSnapshot
     from .tso import TSOEntry
 
 # Device group constants
@@ -83,6 +89,8 @@ async def async_setup_entry(
         TotalPrisNorgesprisSensor(coordinator, entry),
         PrisforskjellNorgesprisSensor(coordinator, entry),
         NorgesprisAktivSensor(coordinator, entry),
+        NorgesprisDifferanseSensor(coordinator, entry, "month"),
+        NorgesprisDifferanseSensor(coordinator, entry, "year"),
         # Månedlig forbruk og kostnad
         MaanedligForbrukDagSensor(coordinator, entry),
         MaanedligForbrukNattSensor(coordinator, entry),
@@ -91,20 +99,31 @@ async def async_setup_entry(
         MaanedligAvgifterSensor(coordinator, entry),
         MaanedligStromstotteSensor(coordinator, entry),
         MaanedligTotalSensor(coordinator, entry),
+        PeriodeKostnadSensor(coordinator, entry, "year_to_date"),
+        PeriodeKostnadSensor(coordinator, entry, "rolling_12"),
+        StromkostnadSensor(coordinator, entry, "today"),
+        StromkostnadSensor(coordinator, entry, "this_year"),
+        *(AkkumulertKostnadSensor(coordinator, entry, component) for component in COMPONENTS),
+        PrognoseSensor(coordinator, entry),
         # Forrige måned sensors
         ForrigeMaanedForbrukDagSensor(coordinator, entry),
         ForrigeMaanedForbrukNattSensor(coordinator, entry),
         ForrigeMaanedForbrukTotalSensor(coordinator, entry),
         ForrigeMaanedNettleieSensor(coordinator, entry),
         ForrigeMaanedToppforbrukSensor(coordinator, entry),
+        # Ytelse (diagnostikk, deaktivert som standard)
+        OppdateringstidSensor(coordinator, entry),
+        LagringerSensor(coordinator, entry),
+        StorsteGapSensor(coordinator, entry),
     ]
 
     async_add_entities(entities)
 
 
-class NettleieBaseSensor(CoordinatorEntity, SensorEntity):  # type: ignore[misc]
+class NettleieBaseSensor(CoordinatorEntity["NettleieCoordinator"], SensorEntity):  # type: ignore[misc]
     """Base class for Strømkalkulator sensors."""
 
+    coordinator: NettleieCoordinator
     _attr_has_entity_name = True
     _device_group: str = DEVICE_NETTLEIE
     _attr_unique_id: str
@@ -125,9 +144,14 @@ class NettleieBaseSensor(CoordinatorEntity, SensorEntity):  # type: ignore[misc]
         self._attr_translation_key = translation_key
         self._entry = entry
 
-        # Get TSO name for device info
-        tso_id = entry.data.get(CONF_TSO, "bkk")
-        self._tso = TSO_LIST.get(tso_id, TSO_LIST["bkk"])
+        # TSO name for device info (resolved once by the coordinator)
+        self._tso = coordinator.tso
+
+    @callback  # type: ignore[untyped-decorator]
+    def _handle_coordinator_update(self) -> None:
+        """Count the state write for diagnostics, then write state."""
+        self.coordinator.stats.sensor_writes += 1
+        super()._handle_coordinator_update()
 
     @property
     def device_info(self) -> dict[str, Any]:
@@ -165,20 +189,20 @@ class EnergileddSensor(NettleieBaseSensor):
     @property
     def native_value(self) -> float | None:
         """Return the state."""
-        if self.coordinator.data:
-            return cast("float | None", self.coordinator.data.get("energiledd"))
+        if data := self.coordinator.data:
+            return round(data.energiledd, PRICE_DECIMALS)
         return None
 
     @property
     def extra_state_attributes(self) -> dict[str, Any] | None:
         """Return extra attributes."""
-        if self.coordinator.data:
+        if data := self.coordinator.data:
             return {
-                "is_day_rate": self.coordinator.data.get("is_day_rate"),
-                "rate_type": "dag" if self.coordinator.data.get("is_day_rate") else "natt/helg",
-                "energiledd_dag": self.coordinator.data.get("energiledd_dag"),
-                "energiledd_natt": self.coordinator.data.get("energiledd_natt"),
-                "tso": self.coordinator.data.get("tso"),
+                "is_day_rate": data.is_day_rate,
+                "rate_type": "dag" if data.is_day_rate else "natt/helg",
+                "energiledd_dag": data.energiledd_dag,
+                "energiledd_natt": data.energiledd_natt,
+                "tso": data.tso,
             }
         return None
 
@@ -201,25 +225,25 @@ class KapasitetstrinnSensor(NettleieBaseSensor):
     @property
     def native_value(self) -> float | int | None:
         """Return the state."""
-        if self.coordinator.data:
-            return cast("float | int | None", self.coordinator.data.get("kapasitetsledd"))
+        if data := self.coordinator.data:
+            return data.kapasitetsledd
         return None
 
     @property
     def extra_state_attributes(self) -> dict[str, Any] | None:
         """Return extra attributes."""
-        if self.coordinator.data:
-            top_3 = self.coordinator.data.get("top_3_days", {})
+        if data := self.coordinator.data:
+            top_3 = data.top_3_days
             attrs: dict[str, Any] = {
-                "trinn": self.coordinator.data.get("kapasitetstrinn_nummer"),
-                "intervall": self.coordinator.data.get("kapasitetstrinn_intervall"),
-                "gjennomsnitt_kw": self.coordinator.data.get("avg_top_3_kw"),
-                "current_power_kw": self.coordinator.data.get("current_power_kw"),
-                "tso": self.coordinator.data.get("tso"),
+                "trinn": data.kapasitetstrinn_nummer,
+                "intervall": data.kapasitetstrinn_intervall,
+                "gjennomsnitt_kw": round(data.avg_top_3_kw, KW_DECIMALS),
+                "current_power_kw": round(data.current_power_kw, KW_DECIMALS),
+                "tso": data.tso,
             }
             for i, (date, power) in enumerate(top_3.items(), 1):
                 attrs[f"maks_{i}_dato"] = date
-                attrs[f"maks_{i}_kw"] = round(power, 2)
+                attrs[f"maks_{i}_kw"] = round(power, KW_DECIMALS)
             return attrs
         return None
 
@@ -244,19 +268,19 @@ class TotalPriceSensor(NettleieBaseSensor):
     @property
     def native_value(self) -> float | None:
         """Return the state."""
-        if self.coordinator.data:
-            return cast("float | None", self.coordinator.data.get("total_price_uten_stotte"))
+        if data := self.coordinator.data:
+            return round(data.total_price_uten_stotte, PRICE_DECIMALS)
         return None
 
     @property
     def extra_state_attributes(self) -> dict[str, Any] | None:
         """Return extra attributes."""
-        if self.coordinator.data:
+        if data := self.coordinator.data:
             return {
-                "spot_price": self.coordinator.data.get("spot_price"),
-                "energiledd": self.coordinator.data.get("energiledd"),
-                "kapasitetsledd_per_kwh": self.coordinator.data.get("kapasitetsledd_per_kwh"),
-                "tso": self.coordinator.data.get("tso"),
+                "spot_price": round(data.spot_price, PRICE_DECIMALS),
+                "energiledd": round(data.energiledd, PRICE_DECIMALS),
+                "kapasitetsledd_per_kwh": round(data.kapasitetsledd_per_kwh, PRICE_DECIMALS),
+                "tso": data.tso,
             }
         return None
 
@@ -282,18 +306,18 @@ class MaksForbrukSensor(NettleieBaseSensor):
     @property
     def native_value(self) -> float | None:
         """Return the state."""
-        if self.coordinator.data:
-            top_3 = self.coordinator.data.get("top_3_days", {})
+        if data := self.coordinator.data:
+            top_3 = data.top_3_days
             if len(top_3) >= self._rank:
                 values = list(top_3.values())
-                return round(cast("float", values[self._rank - 1]), 2)
+                return round(values[self._rank - 1], KW_DECIMALS)
         return None
 
     @property
     def extra_state_attributes(self) -> dict[str, Any] | None:
         """Return extra attributes."""
-        if self.coordinator.data:
-            top_3 = self.coordinator.data.get("top_3_days", {})
+        if data := self.coordinator.data:
+            top_3 = data.top_3_days
             if len(top_3) >= self._rank:
                 dates = list(top_3.keys())
                 return {"dato": dates[self._rank - 1]}
@@ -319,19 +343,17 @@ class GjsForbrukSensor(NettleieBaseSensor):
     @property
     def native_value(self) -> float | None:
         """Return the state."""
-        if self.coordinator.data:
-            avg = self.coordinator.data.get("avg_top_3_kw")
-            if avg is not None:
-                return round(cast("float", avg), 2)
+        if data := self.coordinator.data:
+            return round(data.avg_top_3_kw, KW_DECIMALS)
         return None
 
     @property
     def extra_state_attributes(self) -> dict[str, Any] | None:
         """Return extra attributes."""
-        if self.coordinator.data:
+        if data := self.coordinator.data:
             return {
-                "kapasitetstrinn": self.coordinator.data.get("kapasitetsledd"),
-                "tso": self.coordinator.data.get("tso"),
+                "kapasitetstrinn": data.kapasitetsledd,
+                "tso": data.tso,
             }
         return None
 
@@ -350,8 +372,8 @@ class TrinnNummerSensor(NettleieBaseSensor):
     @property
     def native_value(self) -> int | None:
         """Return the state."""
-        if self.coordinator.data:
-            return cast("int | None", self.coordinator.data.get("kapasitetstrinn_nummer"))
+        if data := self.coordinator.data:
+            return data.kapasitetstrinn_nummer
         return None
 
 
@@ -369,8 +391,8 @@ class TrinnIntervallSensor(NettleieBaseSensor):
     @property
     def native_value(self) -> str | None:
         """Return the state."""
-        if self.coordinator.data:
-            return cast("str | None", self.coordinator.data.get("kapasitetstrinn_intervall"))
+        if data := self.coordinator.data:
+            return data.kapasitetstrinn_intervall
         return None
 
 
@@ -454,20 +476,20 @@ class ElectricityCompanyTotalSensor(NettleieBaseSensor):
     @property
     def native_value(self) -> float | None:
         """Return the state."""
-        if self.coordinator.data:
-            electricity_company_total = self.coordinator.data.get("electricity_company_total")
-            if electricity_company_total is not None:
-                return round(cast("float", electricity_company_total), 4)
+        if (data := self.coordinator.data) and data.electricity_company_total is not None:
+            return round(data.electricity_company_total, PRICE_DECIMALS)
         return None
 
     @property
     def extra_state_attributes(self) -> dict[str, Any] | None:
         """Return extra attributes."""
-        if self.coordinator.data:
+        if data := self.coordinator.data:
             return {
-                "electricity_company_pris": self.coordinator.data.get("electricity_company_price"),
-                "energiledd": self.coordinator.data.get("energiledd"),
-                "kapasitetsledd_per_kwh": self.coordinator.data.get("kapasitetsledd_per_kwh"),
+                "electricity_company_pris": round(data.electricity_company_price, PRICE_DECIMALS)
+                if data.electricity_company_price is not None
+                else None,
+                "energiledd": round(data.energiledd, PRICE_DECIMALS),
+                "kapasitetsledd_per_kwh": round(data.kapasitetsledd_per_kwh, PRICE_DECIMALS),
             }
         return None
 
@@ -493,16 +515,16 @@ class StromstotteSensor(NettleieBaseSensor):
     @property
     def native_value(self) -> float | None:
         """Return the state."""
-        if self.coordinator.data:
-            return cast("float | None", self.coordinator.data.get("stromstotte"))
+        if data := self.coordinator.data:
+            return round(data.stromstotte, PRICE_DECIMALS)
         return None
 
     @property
     def extra_state_attributes(self) -> dict[str, Any] | None:
         """Return extra attributes."""
-        if self.coordinator.data:
+        if data := self.coordinator.data:
             return {
-                "spotpris": self.coordinator.data.get("spot_price"),
+                "spotpris": round(data.spot_price, PRICE_DECIMALS),
                 "terskel": STROMSTOTTE_LEVEL,
                 "dekningsgrad": "90%",
             }
@@ -530,17 +552,17 @@ class SpotprisEtterStotteSensor(NettleieBaseSensor):
     @property
     def native_value(self) -> float | None:
         """Return the state."""
-        if self.coordinator.data:
-            return cast("float | None", self.coordinator.data.get("spotpris_etter_stotte"))
+        if data := self.coordinator.data:
+            return round(data.spotpris_etter_stotte, PRICE_DECIMALS)
         return None
 
     @property
     def extra_state_attributes(self) -> dict[str, Any] | None:
         """Return extra attributes."""
-        if self.coordinator.data:
+        if data := self.coordinator.data:
             return {
-                "spotpris": self.coordinator.data.get("spot_price"),
-                "stromstotte": self.coordinator.data.get("stromstotte"),
+                "spotpris": round(data.spot_price, PRICE_DECIMALS),
+                "stromstotte": round(data.stromstotte, PRICE_DECIMALS),
             }
         return None
 
@@ -566,20 +588,20 @@ class TotalPrisEtterStotteSensor(NettleieBaseSensor):
     @property
     def native_value(self) -> float | None:
         """Return the state."""
-        if self.coordinator.data:
-            return cast("float | None", self.coordinator.data.get("total_price"))
+        if data := self.coordinator.data:
+            return round(data.total_price, PRICE_DECIMALS)
         return None
 
     @property
     def extra_state_attributes(self) -> dict[str, Any] | None:
         """Return extra attributes."""
-        if self.coordinator.data:
+        if data := self.coordinator.data:
             return {
-                "spotpris": self.coordinator.data.get("spot_price"),
-                "stromstotte": self.coordinator.data.get("stromstotte"),
-                "spotpris_etter_stotte": self.coordinator.data.get("spotpris_etter_stotte"),
-                "energiledd": self.coordinator.data.get("energiledd"),
-                "kapasitetsledd_per_kwh": self.coordinator.data.get("kapasitetsledd_per_kwh"),
+                "spotpris": round(data.spot_price, PRICE_DECIMALS),
+                "stromstotte": round(data.stromstotte, PRICE_DECIMALS),
+                "spotpris_etter_stotte": round(data.spotpris_etter_stotte, PRICE_DECIMALS),
+                "energiledd": round(data.energiledd, PRICE_DECIMALS),
+                "kapasitetsledd_per_kwh": round(data.kapasitetsledd_per_kwh, PRICE_DECIMALS),
             }
         return None
 
@@ -605,23 +627,23 @@ class TotalPrisInklAvgifterSensor(NettleieBaseSensor):
     @property
     def native_value(self) -> float | None:
         """Return the state."""
-        if self.coordinator.data:
-            return cast("float | None", self.coordinator.data.get("total_price_inkl_avgifter"))
+        if data := self.coordinator.data:
+            return round(data.total_price_inkl_avgifter, PRICE_DECIMALS)
         return None
 
     @property
     def extra_state_attributes(self) -> dict[str, Any] | None:
         """Return extra attributes with breakdown."""
-        if self.coordinator.data:
+        if data := self.coordinator.data:
             return {
-                "spotpris": self.coordinator.data.get("spot_price"),
-                "stromstotte": self.coordinator.data.get("stromstotte"),
-                "spotpris_etter_stotte": self.coordinator.data.get("spotpris_etter_stotte"),
-                "energiledd": self.coordinator.data.get("energiledd"),
-                "kapasitetsledd_per_kwh": self.coordinator.data.get("kapasitetsledd_per_kwh"),
-                "forbruksavgift_inkl_mva": self.coordinator.data.get("forbruksavgift_inkl_mva"),
-                "enova_inkl_mva": self.coordinator.data.get("enova_inkl_mva"),
-                "offentlige_avgifter": self.coordinator.data.get("offentlige_avgifter"),
+                "spotpris": round(data.spot_price, PRICE_DECIMALS),
+                "stromstotte": round(data.stromstotte, PRICE_DECIMALS),
+                "spotpris_etter_stotte": round(data.spotpris_etter_stotte, PRICE_DECIMALS),
+                "energiledd": round(data.energiledd, PRICE_DECIMALS),
+                "kapasitetsledd_per_kwh": round(data.kapasitetsledd_per_kwh, PRICE_DECIMALS),
+                "forbruksavgift_inkl_mva": round(data.forbruksavgift_inkl_mva, PRICE_DECIMALS),
+                "enova_inkl_mva": round(data.enova_inkl_mva, PRICE_DECIMALS),
+                "offentlige_avgifter": round(data.offentlige_avgifter, PRICE_DECIMALS),
                 "bruk": "Bruk denne sensoren i Energy Dashboard for korrekt totalpris",
             }
         return None
@@ -648,19 +670,20 @@ class TotalPrisNorgesprisSensor(NettleieBaseSensor):
     @property
     def native_value(self) -> float | None:
         """Return the state."""
-        if self.coordinator.data:
-            return cast("float | None", self.coordinator.data.get("total_pris_norgespris"))
+        if data := self.coordinator.data:
+            return round(data.total_pris_norgespris, PRICE_DECIMALS)
         return None
 
     @property
     def extra_state_attributes(self) -> dict[str, Any] | None:
         """Return extra attributes."""
-        if self.coordinator.data:
+        if data := self.coordinator.data:
             return {
-                "norgespris": self.coordinator.data.get("norgespris"),
-                "norgespris_stromstotte": self.coordinator.data.get("norgespris_stromstotte"),
-                "energiledd": self.coordinator.data.get("energiledd"),
-                "kapasitetsledd_per_kwh": self.coordinator.data.get("kapasitetsledd_per_kwh"),
+                "norgespris": round(data.norgespris, PRICE_DECIMALS),
+                "norgespris_stromstotte": data.norgespris_stromstotte,
+                "energiledd": round(data.energiledd, PRICE_DECIMALS),
+                "kapasitetsledd_per_kwh": round(data.kapasitetsledd_per_kwh, PRICE_DECIMALS),
+                "maks_kwh_per_maaned": data.norgespris_max_kwh,
                 "note": "Norgespris er fast 50 øre/kWh fra Elhub",
             }
         return None
@@ -687,23 +710,23 @@ class PrisforskjellNorgesprisSensor(NettleieBaseSensor):
     @property
     def native_value(self) -> float | None:
         """Return the state."""
-        if self.coordinator.data:
-            return cast("float | None", self.coordinator.data.get("kroner_spart_per_kwh"))
+        if data := self.coordinator.data:
+            return round(data.kroner_spart_per_kwh, PRICE_DECIMALS)
         return None
 
     @property
     def extra_state_attributes(self) -> dict[str, Any] | None:
         """Return extra attributes."""
-        if self.coordinator.data:
-            norgespris = self.coordinator.data.get("norgespris")
-            norgespris_stromstotte = self.coordinator.data.get("norgespris_stromstotte")
+        if data := self.coordinator.data:
+            norgespris = round(data.norgespris, PRICE_DECIMALS)
+            norgespris_stromstotte = data.norgespris_stromstotte
             norgespris_etter_stotte: float | None = None
             if norgespris is not None and norgespris_stromstotte is not None:
                 norgespris_etter_stotte = norgespris - norgespris_stromstotte
             return {
-                "din_pris_etter_stotte": self.coordinator.data.get("spotpris_etter_stotte"),
+                "din_pris_etter_stotte": round(data.spotpris_etter_stotte, PRICE_DECIMALS),
                 "norgespris_etter_stotte": norgespris_etter_stotte,
-                "differens_per_kwh": self.coordinator.data.get("kroner_spart_per_kwh"),
+                "differens_per_kwh": round(data.kroner_spart_per_kwh, PRICE_DECIMALS),
                 "note": "Norgespris er fast 50 øre/kWh fra Elhub",
             }
         return None
@@ -724,12 +747,66 @@ class NorgesprisAktivSensor(NettleieBaseSensor):
     @property
     def native_value(self) -> str | None:
         """Return 'Ja' if Norgespris is active, 'Nei' otherwise."""
-        if self.coordinator.data:
-            has_norgespris = self.coordinator.data.get("har_norgespris", False)
+        if data := self.coordinator.data:
+            has_norgespris = data.har_norgespris
             return "Ja" if has_norgespris else "Nei"
         return None
 
 
+class NorgesprisDifferanseSensor(NettleieBaseSensor):
+    """Sensor for spot price vs Norgespris cost of the energy used, month or year to date.
+
+    Positive: Norgespris would have been (or is) cheaper.
+    """
+
+    _device_group: str = DEVICE_NORGESPRIS
+    _attr_device_class: SensorDeviceClass = SensorDeviceClass.MONETARY
+    _attr_native_unit_of_measurement: str = "kr"
+    _attr_state_class: SensorStateClass = SensorStateClass.TOTAL
+    _attr_icon: str = "mdi:scale-balance"
+    _attr_suggested_display_precision: int = 0
+    _kwh: Callable[[CoordinatorSnapshot], float]
+    _spot_kr: Callable[[CoordinatorSnapshot], float]
+    _norgespris_kr: Callable[[CoordinatorSnapshot], float]
+    _difference_kr: Callable[[CoordinatorSnapshot], float]
+
+    def __init__(self, coordinator: NettleieCoordinator, entry: ConfigEntry, period: str) -> None:
+        """Initialize the sensor for period "month" or "year"."""
+        key = "norgespris_differanse_maaned" if period == "month" else "norgespris_differanse_aar"
+        super().__init__(coordinator, entry, key, key)
+        # Bind the period's snapshot attributes once
+        self._kwh = attrgetter(f"comparison_{period}_kwh")
+        self._spot_kr = attrgetter(f"comparison_{period}_spot_kr")
+        self._norgespris_kr = attrgetter(f"comparison_{period}_norgespris_kr")
+        self._difference_kr = attrgetter(f"comparison_{period}_difference_kr")
+        self._attr_native_unit_of_measurement = "kr"
+        self._attr_state_class = SensorStateClass.TOTAL
+        self._attr_icon = "mdi:scale-balance"
+        self._attr_suggested_display_precision = 0
+
+    @property
+    def native_value(self) -> float | None:
+        """Return spot price cost minus Norgespris cost."""
+        if data := self.coordinator.data:
+            return round(self._difference_kr(data), KR_DECIMALS)
+        return None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return both costs and the consumption they cover."""
+        if data := self.coordinator.data:
+            spot_kr = round(self._spot_kr(data), KR_DECIMALS)
+            norgespris_kr = round(self._norgespris_kr(data), KR_DECIMALS)
+            return {
+                "kostnad_spotpris_kr": spot_kr,
+                "kostnad_norgespris_kr": norgespris_kr,
+                "betalt_kr": norgespris_kr if data.har_norgespris else spot_kr,
+                "forbruk_kwh": round(self._kwh(data), KWH_DECIMALS),
+                "merknad": "Strømpris for forbruket, summert per intervall. Nettleie og avgifter er like og ikke med.",
+            }
+        return None
+
+
 # =============================================================================
 # Fakturasammenligning - Separate sensorer for hver fakturalinje
 # =============================================================================
@@ -756,17 +833,17 @@ class EnergileddDagSensor(NettleieBaseSensor):
     @property
     def native_value(self) -> float | None:
         """Return the state."""
-        if self.coordinator.data:
-            return cast("float | None", self.coordinator.data.get("energiledd_dag"))
+        if data := self.coordinator.data:
+            return data.energiledd_dag
         return None
 
     @property
     def extra_state_attributes(self) -> dict[str, Any] | None:
         """Return extra attributes."""
-        if self.coordinator.data:
+        if data := self.coordinator.data:
             avgiftssone = self._entry.data.get(CONF_AVGIFTSSONE, AVGIFTSSONE_STANDARD)
             mva_sats = get_mva_sats(avgiftssone)
-            energiledd_dag = self.coordinator.data.get("energiledd_dag", 0)
+            energiledd_dag = data.energiledd_dag
             # Beregn pris eks. avgifter for fakturasammenligning
             forbruksavgift = get_forbruksavgift(avgiftssone, datetime.now().month)
             energiledd_eks_avgifter = energiledd_dag - forbruksavgift - ENOVA_AVGIFT
@@ -801,17 +878,17 @@ class EnergileddNattSensor(NettleieBaseSensor):
     @property
     def native_value(self) -> float | None:
         """Return the state."""
-        if self.coordinator.data:
-            return cast("float | None", self.coordinator.data.get("energiledd_natt"))
+        if data := self.coordinator.data:
+            return data.energiledd_natt
         return None
 
     @property
     def extra_state_attributes(self) -> dict[str, Any] | None:
         """Return extra attributes."""
-        if self.coordinator.data:
+        if data := self.coordinator.data:
             avgiftssone = self._entry.data.get(CONF_AVGIFTSSONE, AVGIFTSSONE_STANDARD)
             mva_sats = get_mva_sats(avgiftssone)
-            energiledd_natt = self.coordinator.data.get("energiledd_natt", 0)
+            energiledd_natt = data.energiledd_natt
             # Beregn pris eks. avgifter for fakturasammenligning
             forbruksavgift = get_forbruksavgift(avgiftssone, datetime.now().month)
             energiledd_eks_avgifter = energiledd_natt - forbruksavgift - ENOVA_AVGIFT
@@ -936,17 +1013,17 @@ class StromstotteKwhSensor(NettleieBaseSensor):
     @property
     def native_value(self) -> str | None:
         """Return 'Ja' if strømstøtte is active, 'Nei' otherwise."""
-        if self.coordinator.data:
-            stromstotte = self.coordinator.data.get("stromstotte", 0)
+        if data := self.coordinator.data:
+            stromstotte = round(data.stromstotte, PRICE_DECIMALS)
             return "Ja" if stromstotte > 0 else "Nei"
         return None
 
     @property
     def extra_state_attributes(self) -> dict[str, Any] | None:
         """Return attributes."""
-        if self.coordinator.data:
-            spot_price = self.coordinator.data.get("spot_price", 0)
-            stromstotte = self.coordinator.data.get("stromstotte", 0)
+        if data := self.coordinator.data:
+            spot_price = round(data.spot_price, PRICE_DECIMALS)
+            stromstotte = round(data.stromstotte, PRICE_DECIMALS)
             return {
                 "spotpris": spot_price,
                 "terskel": STROMSTOTTE_LEVEL,
@@ -970,17 +1047,17 @@ class TariffSensor(NettleieBaseSensor):
     @property
     def native_value(self) -> str | None:
         """Return current tariff: 'dag' or 'natt'."""
-        if self.coordinator.data:
-            is_day = self.coordinator.data.get("is_day_rate")
+        if data := self.coordinator.data:
+            is_day = data.is_day_rate
             return "dag" if is_day else "natt"
         return None
 
     @property
     def extra_state_attributes(self) -> dict[str, Any] | None:
         """Return attributes with schedule info."""
-        if self.coordinator.data:
+        if data := self.coordinator.data:
             return {
-                "is_day_rate": self.coordinator.data.get("is_day_rate"),
+                "is_day_rate": data.is_day_rate,
                 "dag_periode": "Hverdager 06:00-22:00 (ikke helligdager)",
                 "natt_periode": "22:00-06:00, helger og helligdager",
                 "bruk": "Bruk denne sensoren til å styre utility_meter tariff-bytte",
@@ -1029,8 +1106,8 @@ class MaanedligForbrukDagSensor(MaanedligBaseSensor):
     @property
     def native_value(self) -> float | None:
         """Return monthly day consumption."""
-        if self.coordinator.data:
-            return cast("float | None", self.coordinator.data.get("monthly_consumption_dag_kwh"))
+        if data := self.coordinator.data:
+            return round(data.monthly_consumption_dag_kwh, KWH_DECIMALS)
         return None
 
 
@@ -1054,8 +1131,8 @@ class MaanedligForbrukNattSensor(MaanedligBaseSensor):
     @property
     def native_value(self) -> float | None:
         """Return monthly night consumption."""
-        if self.coordinator.data:
-            return cast("float | None", self.coordinator.data.get("monthly_consumption_natt_kwh"))
+        if data := self.coordinator.data:
+            return round(data.monthly_consumption_natt_kwh, KWH_DECIMALS)
         return None
 
 
@@ -1079,17 +1156,17 @@ class MaanedligForbrukTotalSensor(MaanedligBaseSensor):
     @property
     def native_value(self) -> float | None:
         """Return total monthly consumption."""
-        if self.coordinator.data:
-            return cast("float | None", self.coordinator.data.get("monthly_consumption_total_kwh"))
+        if data := self.coordinator.data:
+            return round(data.monthly_consumption_total_kwh, KWH_DECIMALS)
         return None
 
     @property
     def extra_state_attributes(self) -> dict[str, Any] | None:
         """Return consumption breakdown."""
-        if self.coordinator.data:
+        if data := self.coordinator.data:
             return {
-                "dag_kwh": self.coordinator.data.get("monthly_consumption_dag_kwh"),
-                "natt_kwh": self.coordinator.data.get("monthly_consumption_natt_kwh"),
+                "dag_kwh": round(data.monthly_consumption_dag_kwh, KWH_DECIMALS),
+                "natt_kwh": round(data.monthly_consumption_natt_kwh, KWH_DECIMALS),
             }
         return None
 
@@ -1113,34 +1190,21 @@ class MaanedligNettleieSensor(MaanedligBaseSensor):
 
     @property
     def native_value(self) -> float | None:
-        """Calculate monthly grid rent cost."""
-        if self.coordinator.data:
-            dag_kwh = self.coordinator.data.get("monthly_consumption_dag_kwh", 0)
-            natt_kwh = self.coordinator.data.get("monthly_consumption_natt_kwh", 0)
-            dag_pris = self.coordinator.data.get("energiledd_dag", 0)
-            natt_pris = self.coordinator.data.get("energiledd_natt", 0)
-            kapasitet = self.coordinator.data.get("kapasitetsledd", 0)
+        """Return monthly grid rent cost (energiledd booked per interval + kapasitetsledd)."""
+        if data := self.coordinator.data:
             return round(
-                (cast("float", dag_kwh) * cast("float", dag_pris))
-                + (cast("float", natt_kwh) * cast("float", natt_pris))
-                + cast("float", kapasitet),
-                2,
+                data.monthly_energiledd_dag_kr + data.monthly_energiledd_natt_kr + data.kapasitetsledd, KR_DECIMALS
             )
         return None
 
     @property
     def extra_state_attributes(self) -> dict[str, Any] | None:
         """Return cost breakdown."""
-        if self.coordinator.data:
-            dag_kwh = self.coordinator.data.get("monthly_consumption_dag_kwh", 0)
-            natt_kwh = self.coordinator.data.get("monthly_consumption_natt_kwh", 0)
-            dag_pris = self.coordinator.data.get("energiledd_dag", 0)
-            natt_pris = self.coordinator.data.get("energiledd_natt", 0)
-            kapasitet = self.coordinator.data.get("kapasitetsledd", 0)
+        if data := self.coordinator.data:
             return {
-                "energiledd_dag_kr": round(dag_kwh * dag_pris, 2),
-                "energiledd_natt_kr": round(natt_kwh * natt_pris, 2),
-                "kapasitetsledd_kr": kapasitet,
+                "energiledd_dag_kr": round(data.monthly_energiledd_dag_kr, KR_DECIMALS),
+                "energiledd_natt_kr": round(data.monthly_energiledd_natt_kr, KR_DECIMALS),
+                "kapasitetsledd_kr": data.kapasitetsledd,
             }
         return None
 
@@ -1166,45 +1230,28 @@ class MaanedligAvgifterSensor(MaanedligBaseSensor):
 
     @property
     def native_value(self) -> float | None:
-        """Calculate monthly public fees."""
-        if self.coordinator.data:
-            total_kwh = self.coordinator.data.get("monthly_consumption_total_kwh", 0)
-            month = datetime.now().month
-            forbruksavgift = get_forbruksavgift(self._avgiftssone, month)
-            mva_sats = get_mva_sats(self._avgiftssone)
-
-            # Avgifter inkl. mva
-            forbruksavgift_inkl = forbruksavgift * (1 + mva_sats)
-            enova_inkl = ENOVA_AVGIFT * (1 + mva_sats)
-
-            return round(cast("float", total_kwh) * (forbruksavgift_inkl + enova_inkl), 2)
+        """Return monthly public fees inkl. mva, booked per interval."""
+        if data := self.coordinator.data:
+            return round(data.monthly_forbruksavgift_kr + data.monthly_enova_kr, KR_DECIMALS)
         return None
 
     @property
     def extra_state_attributes(self) -> dict[str, Any] | None:
         """Return fee breakdown."""
-        if self.coordinator.data:
-            total_kwh = self.coordinator.data.get("monthly_consumption_total_kwh", 0)
-            month = datetime.now().month
-            forbruksavgift = get_forbruksavgift(self._avgiftssone, month)
-            mva_sats = get_mva_sats(self._avgiftssone)
-
-            forbruksavgift_inkl = forbruksavgift * (1 + mva_sats)
-            enova_inkl = ENOVA_AVGIFT * (1 + mva_sats)
-
+        if data := self.coordinator.data:
             return {
-                "forbruksavgift_kr": round(total_kwh * forbruksavgift_inkl, 2),
-                "enovaavgift_kr": round(total_kwh * enova_inkl, 2),
+                "forbruksavgift_kr": round(data.monthly_forbruksavgift_kr, KR_DECIMALS),
+                "enovaavgift_kr": round(data.monthly_enova_kr, KR_DECIMALS),
                 "avgiftssone": self._avgiftssone,
             }
         return None
 
 
 class MaanedligStromstotteSensor(MaanedligBaseSensor):
-    """Sensor for estimated monthly electricity subsidy.
+    """Sensor for monthly electricity subsidy.
 
-    Note: This is an estimate based on current subsidy rate.
-    Actual subsidy is calculated hourly by grid company.
+    Summed per interval from the spot price in effect, like the grid
+    company's hourly calculation.
     """
 
     _attr_device_class: SensorDeviceClass = SensorDeviceClass.MONETARY
@@ -1223,21 +1270,22 @@ class MaanedligStromstotteSensor(MaanedligBaseSensor):
 
     @property
     def native_value(self) -> float | None:
-        """Estimate monthly subsidy (rough calculation)."""
-        if self.coordinator.data:
-            total_kwh = self.coordinator.data.get("monthly_consumption_total_kwh", 0)
-            stromstotte_per_kwh = self.coordinator.data.get("stromstotte", 0)
-            return round(cast("float", total_kwh) * cast("float", stromstotte_per_kwh), 2)
+        """Return monthly subsidy month to date."""
+        if data := self.coordinator.data:
+            return round(data.monthly_stromstotte_kr, KR_DECIMALS)
         return None
 
     @property
     def extra_state_attributes(self) -> dict[str, Any] | None:
         """Return subsidy info."""
-        if self.coordinator.data:
+        if data := self.coordinator.data:
             return {
-                "merknad": "Estimat basert på gjeldende strømstøtte-sats. Faktisk støtte beregnes time-for-time.",
-                "stromstotte_per_kwh": self.coordinator.data.get("stromstotte"),
-                "har_norgespris": self.coordinator.data.get("har_norgespris"),
+                "merknad": "Summert time for time med spotprisen som gjaldt.",
+                "stromstotte_kwh": round(data.monthly_stromstotte_kwh, KWH_DECIMALS),
+                "stromstotte_per_kwh": round(data.stromstotte, PRICE_DECIMALS),
+                "har_norgespris": data.har_norgespris,
+                "maks_kwh_per_maaned": data.monthly_cap_kwh,
+                "gjenstaende_kwh": round(data.monthly_cap_remaining_kwh, KWH_DECIMALS),
             }
         return None
 
@@ -1263,63 +1311,208 @@ class MaanedligTotalSensor(MaanedligBaseSensor):
 
     @property
     def native_value(self) -> float | None:
-        """Calculate total monthly cost."""
-        if self.coordinator.data:
-            dag_kwh = self.coordinator.data.get("monthly_consumption_dag_kwh", 0)
-            natt_kwh = self.coordinator.data.get("monthly_consumption_natt_kwh", 0)
-            total_kwh = dag_kwh + natt_kwh
-            dag_pris = self.coordinator.data.get("energiledd_dag", 0)
-            natt_pris = self.coordinator.data.get("energiledd_natt", 0)
-            kapasitet = self.coordinator.data.get("kapasitetsledd", 0)
-            stromstotte = self.coordinator.data.get("stromstotte", 0)
-
-            month = datetime.now().month
-            forbruksavgift = get_forbruksavgift(self._avgiftssone, month)
-            mva_sats = get_mva_sats(self._avgiftssone)
-
-            # Nettleie
-            nettleie = (
-                (cast("float", dag_kwh) * cast("float", dag_pris))
-                + (cast("float", natt_kwh) * cast("float", natt_pris))
-                + cast("float", kapasitet)
-            )
+        """Return total monthly cost."""
+        if data := self.coordinator.data:
+            return round(data.monthly_total_kr, KR_DECIMALS)
+        return None
 
-            # Avgifter inkl. mva
-            avgifter = cast("float", total_kwh) * ((forbruksavgift + ENOVA_AVGIFT) * (1 + mva_sats))
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return cost breakdown."""
+        if data := self.coordinator.data:
+            return {
+                "nettleie_kr": round(data.monthly_nettleie_kr, KR_DECIMALS),
+                "avgifter_kr": round(data.monthly_avgifter_kr, KR_DECIMALS),
+                "stromstotte_kr": round(data.monthly_stromstotte_kr, KR_DECIMALS),
+                "mva_kr": round(data.monthly_mva_kr, KR_DECIMALS),
+                "forbruk_dag_kwh": round(data.monthly_consumption_dag_kwh, 1),
+                "forbruk_natt_kwh": round(data.monthly_consumption_natt_kwh, 1),
+                "forbruk_total_kwh": round(data.monthly_consumption_total_kwh, 1),
+            }
+        return None
+
+
+class PeriodeKostnadSensor(MaanedligBaseSensor):
+    """Sensor for cost (nettleie + avgifter - strømstøtte) year to date or the last 12 months.
+
+    Sums the closed-month summaries and the running month.
+    """
 
-            # Strømstøtte (fratrekk)
-            stotte = cast("float", total_kwh) * cast("float", stromstotte)
+    _attr_device_class: SensorDeviceClass = SensorDeviceClass.MONETARY
+    _attr_native_unit_of_measurement: str = "kr"
+    _attr_state_class: SensorStateClass = SensorStateClass.TOTAL
+    _attr_icon: str = "mdi:calendar-range"
+    _attr_suggested_display_precision: int = 0
+    _period: str
+    _total_kr: Callable[[CoordinatorSnapshot], float]
+
+    def __init__(self, coordinator: NettleieCoordinator, entry: ConfigEntry, period: str) -> None:
+        """Initialize the sensor for period "year_to_date" or "rolling_12"."""
+        key = "kostnad_hittil_i_aar" if period == "year_to_date" else "kostnad_siste_12_maaneder"
+        super().__init__(coordinator, entry, key, key)
+        self._period = period
+        self._total_kr = attrgetter(f"{period}_total_kr")
+        self._attr_native_unit_of_measurement = "kr"
+        self._attr_state_class = SensorStateClass.TOTAL
+        self._attr_icon = "mdi:calendar-range"
+        self._attr_suggested_display_precision = 0
 
-            return round(nettleie + avgifter - stotte, 2)
+    @property
+    def native_value(self) -> float | None:
+        """Return the cost for the period."""
+        if data := self.coordinator.data:
+            return round(self._total_kr(data), KR_DECIMALS)
         return None
 
     @property
     def extra_state_attributes(self) -> dict[str, Any] | None:
-        """Return cost breakdown."""
-        if self.coordinator.data:
-            dag_kwh = self.coordinator.data.get("monthly_consumption_dag_kwh", 0)
-            natt_kwh = self.coordinator.data.get("monthly_consumption_natt_kwh", 0)
-            total_kwh = dag_kwh + natt_kwh
-            dag_pris = self.coordinator.data.get("energiledd_dag", 0)
-            natt_pris = self.coordinator.data.get("energiledd_natt", 0)
-            kapasitet = self.coordinator.data.get("kapasitetsledd", 0)
-            stromstotte = self.coordinator.data.get("stromstotte", 0)
-
-            month = datetime.now().month
-            forbruksavgift = get_forbruksavgift(self._avgiftssone, month)
-            mva_sats = get_mva_sats(self._avgiftssone)
-
-            nettleie = (dag_kwh * dag_pris) + (natt_kwh * natt_pris) + kapasitet
-            avgifter = total_kwh * ((forbruksavgift + ENOVA_AVGIFT) * (1 + mva_sats))
-            stotte = total_kwh * stromstotte
+        """Return cost breakdown, strømpris and consumption for the period."""
+        if data := self.coordinator.data:
+            totals = data.period(self._period)
+            return {
+                "nettleie_kr": totals["nettleie_kr"],
+                "avgifter_kr": totals["avgifter_kr"],
+                "stromstotte_kr": totals["stromstotte_kr"],
+                "strompris_kr": totals["spot_kr"],
+                "forbruk_kwh": round(totals["kwh"], 1),
+                "maaneder": totals["months"],
+            }
+        return None
+
+
+class StromkostnadSensor(MaanedligBaseSensor):
+    """Sensor for energy cost (strømpris + energiledd + avgifter - strømstøtte) today or this year.
+
+    Read from the running rollups; kapasitetsledd is per month and not included.
+    """
 
+    _attr_device_class: SensorDeviceClass = SensorDeviceClass.MONETARY
+    _attr_native_unit_of_measurement: str = "kr"
+    _attr_state_class: SensorStateClass = SensorStateClass.TOTAL
+    _attr_icon: str = "mdi:cash-clock"
+    _attr_suggested_display_precision: int = 2
+    _period: str
+    _previous_key: str
+    _total_kr: Callable[[CoordinatorSnapshot], float]
+
+    def __init__(self, coordinator: NettleieCoordinator, entry: ConfigEntry, period: str) -> None:
+        """Initialize the sensor for period "today" or "this_year"."""
+        key = "stromkostnad_i_dag" if period == "today" else "stromkostnad_i_aar"
+        super().__init__(coordinator, entry, key, key)
+        self._period = period
+        self._previous_key = "i_gaar_kr" if period == "today" else "i_fjor_kr"
+        self._total_kr = attrgetter(f"{period}_total_kr")
+        self._attr_native_unit_of_measurement = "kr"
+        self._attr_state_class = SensorStateClass.TOTAL
+        self._attr_icon = "mdi:cash-clock"
+        self._attr_suggested_display_precision = 2
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the energy cost for the period so far."""
+        if data := self.coordinator.data:
+            return round(self._total_kr(data), KR_DECIMALS)
+        return None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return cost lines, consumption and peak for the period, and the previous period's cost."""
+        if data := self.coordinator.data:
+            totals = data.period(self._period)
             return {
-                "nettleie_kr": round(nettleie, 2),
-                "avgifter_kr": round(avgifter, 2),
-                "stromstotte_kr": round(stotte, 2),
-                "forbruk_dag_kwh": round(dag_kwh, 1),
-                "forbruk_natt_kwh": round(natt_kwh, 1),
-                "forbruk_total_kwh": round(total_kwh, 1),
+                "strompris_kr": totals["spot_kr"],
+                "energiledd_kr": totals["energiledd_kr"],
+                "avgifter_kr": totals["avgifter_kr"],
+                "stromstotte_kr": totals["stromstotte_kr"],
+                "forbruk_kwh": round(totals["kwh"], 2),
+                "toppeffekt_kw": totals["peak_kw"],
+                self._previous_key: totals["previous_total_kr"],
+            }
+        return None
+
+
+class AkkumulertKostnadSensor(MaanedligBaseSensor):
+    """Sensor for the cost of one component since the counter started.
+
+    Increases by exactly what each booked interval cost (kapasitetsledd when
+    the month is closed), for the Energy Dashboard. Strømpris and total fall
+    with a negative spot price, so they are TOTAL; the others only increase.
+    """
+
+    _attr_device_class: SensorDeviceClass = SensorDeviceClass.MONETARY
+    _attr_native_unit_of_measurement: str = "kr"
+    _attr_state_class: SensorStateClass = SensorStateClass.TOTAL_INCREASING
+    _attr_icon: str = "mdi:cash-plus"
+    _attr_suggested_display_precision: int = 2
+    _value: Callable[[CoordinatorSnapshot], float]
+
+    def __init__(self, coordinator: NettleieCoordinator, entry: ConfigEntry, component: str) -> None:
+        """Initialize the sensor for a component in cumulative.COMPONENTS."""
+        key = f"akkumulert_{component}"
+        super().__init__(coordinator, entry, key, key)
+        self._value = attrgetter(f"cumulative_{component}_kr")
+        self._attr_native_unit_of_measurement = "kr"
+        self._attr_state_class = (
+            SensorStateClass.TOTAL if component in ("strompris", "total") else SensorStateClass.TOTAL_INCREASING
+        )
+        self._attr_icon = "mdi:cash-plus"
+        self._attr_suggested_display_precision = 2
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the cost so far."""
+        if data := self.coordinator.data:
+            return round(self._value(data), KR_DECIMALS)
+        return None
+
+
+class PrognoseSensor(MaanedligBaseSensor):
+    """Sensor for the forecast month-end bill (median of the simulations).
+
+    Unknown until a day of consumption has been measured. The bill is an
+    estimate that moves up and down, so it has no state class.
+    """
+
+    _attr_device_class: SensorDeviceClass = SensorDeviceClass.MONETARY
+    _attr_native_unit_of_measurement: str = "kr"
+    _attr_icon: str = "mdi:crystal-ball"
+    _attr_suggested_display_precision: int = 0
+
+    def __init__(self, coordinator: NettleieCoordinator, entry: ConfigEntry) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, entry, "prognose_maaned", "prognose_maaned")
+        self._attr_native_unit_of_measurement = "kr"
+        self._attr_icon = "mdi:crystal-ball"
+        self._attr_suggested_display_precision = 0
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the forecast bill for the month."""
+        if (data := self.coordinator.data) and data.forecast_bill_kr is not None:
+            return round(data.forecast_bill_kr, KR_DECIMALS)
+        return None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the 10-90 % interval, energy and the chance of each kapasitetstrinn."""
+        if not (data := self.coordinator.data):
+            return None
+        low, high, kwh = data.forecast_bill_low_kr, data.forecast_bill_high_kr, data.forecast_kwh
+        if low is not None and high is not None and kwh is not None:
+            ranges = trinn_ranges(self.coordinator.kapasitetstrinn)
+            return {
+                "lav_kr": round(low, KR_DECIMALS),
+                "hoy_kr": round(high, KR_DECIMALS),
+                "forbruk_kwh": round(kwh, 2),
+                "kapasitetstrinn": data.forecast_trinn_nummer,
+                "sannsynlighet_trinn": {
+                    f"{nummer} ({interval})": round(probability * 100, 1)
+                    for nummer, (interval, probability) in enumerate(
+                        zip(ranges, data.forecast_trinn_probabilities, strict=False), start=1
+                    )
+                    if probability > 0
+                },
+                "simuleringer": data.forecast_simulations,
             }
         return None
 
@@ -1365,15 +1558,15 @@ class ForrigeMaanedForbrukDagSensor(ForrigeMaanedBaseSensor):
     @property
     def native_value(self) -> float | None:
         """Return previous month day consumption."""
-        if self.coordinator.data:
-            return cast("float | None", self.coordinator.data.get("previous_month_consumption_dag_kwh"))
+        if data := self.coordinator.data:
+            return round(data.previous_month_consumption_dag_kwh, KWH_DECIMALS)
         return None
 
     @property
     def extra_state_attributes(self) -> dict[str, Any] | None:
         """Return the month name."""
-        if self.coordinator.data:
-            return {"måned": self.coordinator.data.get("previous_month_name")}
+        if data := self.coordinator.data:
+            return {"måned": data.previous_month_name}
         return None
 
 
@@ -1397,15 +1590,15 @@ class ForrigeMaanedForbrukNattSensor(ForrigeMaanedBaseSensor):
     @property
     def native_value(self) -> float | None:
         """Return previous month night consumption."""
-        if self.coordinator.data:
-            return cast("float | None", self.coordinator.data.get("previous_month_consumption_natt_kwh"))
+        if data := self.coordinator.data:
+            return round(data.previous_month_consumption_natt_kwh, KWH_DECIMALS)
         return None
 
     @property
     def extra_state_attributes(self) -> dict[str, Any] | None:
         """Return the month name."""
-        if self.coordinator.data:
-            return {"måned": self.coordinator.data.get("previous_month_name")}
+        if data := self.coordinator.data:
+            return {"måned": data.previous_month_name}
         return None
 
 
@@ -1429,18 +1622,18 @@ class ForrigeMaanedForbrukTotalSensor(ForrigeMaanedBaseSensor):
     @property
     def native_value(self) -> float | None:
         """Return previous month total consumption."""
-        if self.coordinator.data:
-            return cast("float | None", self.coordinator.data.get("previous_month_consumption_total_kwh"))
+        if data := self.coordinator.data:
+            return round(data.previous_month_consumption_total_kwh, KWH_DECIMALS)
         return None
 
     @property
     def extra_state_attributes(self) -> dict[str, Any] | None:
         """Return consumption breakdown."""
-        if self.coordinator.data:
+        if data := self.coordinator.data:
             return {
-                "måned": self.coordinator.data.get("previous_month_name"),
-                "dag_kwh": self.coordinator.data.get("previous_month_consumption_dag_kwh"),
-                "natt_kwh": self.coordinator.data.get("previous_month_consumption_natt_kwh"),
+                "måned": data.previous_month_name,
+                "dag_kwh": round(data.previous_month_consumption_dag_kwh, KWH_DECIMALS),
+                "natt_kwh": round(data.previous_month_consumption_natt_kwh, KWH_DECIMALS),
             }
         return None
 
@@ -1464,60 +1657,21 @@ class ForrigeMaanedNettleieSensor(ForrigeMaanedBaseSensor):
 
     @property
     def native_value(self) -> float | None:
-        """Calculate previous month grid rent cost."""
-        if self.coordinator.data:
-            dag_kwh = self.coordinator.data.get("previous_month_consumption_dag_kwh", 0)
-            natt_kwh = self.coordinator.data.get("previous_month_consumption_natt_kwh", 0)
-            dag_pris = self.coordinator.data.get("energiledd_dag", 0)
-            natt_pris = self.coordinator.data.get("energiledd_natt", 0)
-
-            # Get kapasitetsledd from previous month's top 3
-            top_3 = self.coordinator.data.get("previous_month_top_3", {})
-            if top_3:
-                avg_power = sum(top_3.values()) / len(top_3)
-                kapasitet = self._get_kapasitetsledd_for_avg(avg_power)
-            else:
-                kapasitet = 0
-
-            return round(
-                (cast("float", dag_kwh) * cast("float", dag_pris))
-                + (cast("float", natt_kwh) * cast("float", natt_pris))
-                + cast("float", kapasitet),
-                2,
-            )
+        """Return previous month grid rent cost (energiledd + kapasitetsledd)."""
+        if data := self.coordinator.data:
+            return round(data.previous_month_nettleie_kr, KR_DECIMALS)
         return None
 
-    def _get_kapasitetsledd_for_avg(self, avg_power: float) -> int:
-        """Get kapasitetsledd based on average power."""
-        kapasitetstrinn = self.coordinator.kapasitetstrinn
-        for threshold, price in kapasitetstrinn:
-            if avg_power <= threshold:
-                return cast("int", price)
-        return cast("int", kapasitetstrinn[-1][1]) if kapasitetstrinn else 0
-
     @property
     def extra_state_attributes(self) -> dict[str, Any] | None:
         """Return cost breakdown."""
-        if self.coordinator.data:
-            dag_kwh = self.coordinator.data.get("previous_month_consumption_dag_kwh", 0)
-            natt_kwh = self.coordinator.data.get("previous_month_consumption_natt_kwh", 0)
-            dag_pris = self.coordinator.data.get("energiledd_dag", 0)
-            natt_pris = self.coordinator.data.get("energiledd_natt", 0)
-
-            top_3 = self.coordinator.data.get("previous_month_top_3", {})
-            if top_3:
-                avg_power = sum(top_3.values()) / len(top_3)
-                kapasitet = self._get_kapasitetsledd_for_avg(avg_power)
-            else:
-                avg_power = 0
-                kapasitet = 0
-
+        if data := self.coordinator.data:
             return {
-                "måned": self.coordinator.data.get("previous_month_name"),
-                "energiledd_dag_kr": round(dag_kwh * dag_pris, 2),
-                "energiledd_natt_kr": round(natt_kwh * natt_pris, 2),
-                "kapasitetsledd_kr": kapasitet,
-                "snitt_topp_3_kw": round(avg_power, 2),
+                "måned": data.previous_month_name,
+                "energiledd_dag_kr": round(data.previous_month_energiledd_dag_kr, KR_DECIMALS),
+                "energiledd_natt_kr": round(data.previous_month_energiledd_natt_kr, KR_DECIMALS),
+                "kapasitetsledd_kr": data.previous_month_kapasitetsledd,
+                "snitt_topp_3_kw": round(data.previous_month_avg_top_3_kw, KW_DECIMALS),
             }
         return None
 
@@ -1542,18 +1696,99 @@ class ForrigeMaanedToppforbrukSensor(ForrigeMaanedBaseSensor):
     @property
     def native_value(self) -> float | None:
         """Return previous month average top 3 power."""
-        if self.coordinator.data:
-            return cast("float | None", self.coordinator.data.get("previous_month_avg_top_3_kw"))
+        if data := self.coordinator.data:
+            return round(data.previous_month_avg_top_3_kw, KW_DECIMALS)
         return None
 
     @property
     def extra_state_attributes(self) -> dict[str, Any] | None:
         """Return top 3 days breakdown."""
-        if self.coordinator.data:
-            top_3 = self.coordinator.data.get("previous_month_top_3", {})
-            attrs: dict[str, Any] = {"måned": self.coordinator.data.get("previous_month_name")}
+        if data := self.coordinator.data:
+            top_3 = data.previous_month_top_3
+            attrs: dict[str, Any] = {"måned": data.previous_month_name}
             for i, (date, kw) in enumerate(sorted(top_3.items(), key=lambda x: x[1], reverse=True), 1):
                 attrs[f"topp_{i}_dato"] = date
-                attrs[f"topp_{i}_kw"] = round(kw, 2)
+                attrs[f"topp_{i}_kw"] = round(kw, KW_DECIMALS)
             return attrs
         return None
+
+
+# =============================================================================
+# YTELSE - Diagnostikk-sensorer for coordinator (deaktivert som standard)
+# =============================================================================
+
+
+class OppdateringstidSensor(NettleieBaseSensor):
+    """Sensor for average coordinator update latency."""
+
+    _attr_device_class: SensorDeviceClass = SensorDeviceClass.DURATION
+    _attr_entity_category: EntityCategory = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default: bool = False
+    _attr_native_unit_of_measurement: str = "ms"
+    _attr_state_class: SensorStateClass = SensorStateClass.MEASUREMENT
+    _attr_icon: str = "mdi:timer-outline"
+    _attr_suggested_display_precision: int = 2
+
+    def __init__(self, coordinator: NettleieCoordinator, entry: ConfigEntry) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, entry, "oppdateringstid", "oppdateringstid")
+
+    @property
+    def native_value(self) -> float:
+        """Return mean update latency in ms."""
+        return round(self.coordinator.stats.update_latency.mean * 1000, 3)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return latency distribution and hot-path counters."""
+        stats = self.coordinator.stats
+        return {
+            **stats.update_latency.as_dict(),
+            "oppdateringer": stats.updates,
+            "hoppet_over": stats.skipped_updates,
+            "state_lesinger": stats.state_reads,
+            "sensor_skrivinger": stats.sensor_writes,
+        }
+
+
+class LagringerSensor(NettleieBaseSensor):
+    """Sensor for number of storage saves since start."""
+
+    _attr_entity_category: EntityCategory = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default: bool = False
+    _attr_state_class: SensorStateClass = SensorStateClass.TOTAL_INCREASING
+    _attr_icon: str = "mdi:content-save-outline"
+
+    def __init__(self, coordinator: NettleieCoordinator, entry: ConfigEntry) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, entry, "lagringer", "lagringer")
+
+    @property
+    def native_value(self) -> int:
+        """Return number of storage saves."""
+        return self.coordinator.stats.saves
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return time spent in storage saves."""
+        return self.coordinator.stats.save_latency.as_dict()
+
+
+class StorsteGapSensor(NettleieBaseSensor):
+    """Sensor for the largest gap between two power samples."""
+
+    _attr_device_class: SensorDeviceClass = SensorDeviceClass.DURATION
+    _attr_entity_category: EntityCategory = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default: bool = False
+    _attr_native_unit_of_measurement: str = "s"
+    _attr_state_class: SensorStateClass = SensorStateClass.MEASUREMENT
+    _attr_icon: str = "mdi:timer-sand"
+
+    def __init__(self, coordinator: NettleieCoordinator, entry: ConfigEntry) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, entry, "storste_gap", "storste_gap")
+
+    @property
+    def native_value(self) -> float:
+        """Return largest sample gap in seconds."""
+        return round(self.coordinator.stats.max_sample_gap_s, 1)
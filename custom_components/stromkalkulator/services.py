@@ -0,0 +1,204 @@
+"""Services for Strømkalkulator."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+import voluptuous as vol
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import SupportsResponse
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .importer import DEFAULT_TIMEZONE, TIMESTAMPS_LOCAL, TIMESTAMPS_UTC, ConsumptionImportError
+from .pricefeed import PriceSourceError
+from .reconcile import INVOICE_LINES, Invoice
+
+if TYPE_CHECKING:
+    from datetime import datetime
+
+    from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse
+
+    from .coordinator import NettleieCoordinator
+
+SERVICE_RECONCILE_INVOICE = "reconcile_invoice"
+SERVICE_IMPORT_CONSUMPTION = "import_consumption"
+SERVICE_GET_MONTHLY_SUMMARIES = "get_monthly_summaries"
+SERVICE_QUERY_RANGE = "query_range"
+
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_MONTH = "month"
+ATTR_INKL_MVA = "inkl_mva"
+ATTR_PATH = "path"
+ATTR_TIMEZONE = "timezone"
+ATTR_TIMESTAMPS = "timestamps"
+ATTR_PRICE_FILE = "price_file"
+ATTR_YEAR = "year"
+ATTR_START = "start"
+ATTR_END = "end"
+
+RECONCILE_INVOICE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): str,
+        vol.Required(ATTR_MONTH): vol.Match(r"^\d{4}-(0[1-9]|1[0-2])$"),
+        vol.Optional(ATTR_INKL_MVA, default=True): bool,
+        **{vol.Optional(line): vol.Coerce(float) for line in INVOICE_LINES},
+    }
+)
+
+IMPORT_CONSUMPTION_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): str,
+        vol.Required(ATTR_PATH): str,
+        vol.Optional(ATTR_TIMEZONE, default=DEFAULT_TIMEZONE): str,
+        vol.Optional(ATTR_TIMESTAMPS, default=TIMESTAMPS_LOCAL): vol.In([TIMESTAMPS_LOCAL, TIMESTAMPS_UTC]),
+        vol.Optional(ATTR_PRICE_FILE): str,
+    }
+)
+
+GET_MONTHLY_SUMMARIES_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): str,
+        vol.Optional(ATTR_YEAR): vol.Coerce(int),
+    }
+)
+
+QUERY_RANGE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): str,
+        vol.Required(ATTR_START): cv.datetime,
+        vol.Required(ATTR_END): cv.datetime,
+    }
+)
+
+
+def _get_coordinator(hass: HomeAssistant, call: ServiceCall) -> NettleieCoordinator:
+    """Get the coordinator for the config entry in the call (or the only one loaded)."""
+    entries = [entry for entry in hass.config_entries.async_entries(DOMAIN) if entry.state is ConfigEntryState.LOADED]
+    entry_id = call.data.get(ATTR_CONFIG_ENTRY_ID)
+    if entry_id is not None:
+        entries = [entry for entry in entries if entry.entry_id == entry_id]
+    if len(entries) != 1:
+        raise ServiceValidationError(
+            translation_domain=DOMAIN,
+            translation_key="config_entry_not_found" if entries == [] else "config_entry_ambiguous",
+        )
+    coordinator: NettleieCoordinator = entries[0].runtime_data
+    return coordinator
+
+
+async def _async_reconcile_invoice(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Compare invoice line items with the stored hourly cost ledger."""
+    coordinator = _get_coordinator(hass, call)
+    data: dict[str, Any] = {key: value for key, value in call.data.items() if key != ATTR_CONFIG_ENTRY_ID}
+    invoice = Invoice.from_dict(data)
+    result = await coordinator.async_reconcile_invoice(invoice)
+    if result is None:
+        raise ServiceValidationError(
+            translation_domain=DOMAIN,
+            translation_key="ledger_month_missing",
+            translation_placeholders={"month": invoice.month},
+        )
+    return result.as_dict()
+
+
+async def _async_import_consumption(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Import an hourly consumption export (CSV/XLSX from Elhub or the grid company)."""
+    coordinator = _get_coordinator(hass, call)
+    path: str = call.data[ATTR_PATH]
+    price_file: str | None = call.data.get(ATTR_PRICE_FILE)
+    for checked in (path, price_file):
+        if checked is not None and not hass.config.is_allowed_path(checked):
+            raise ServiceValidationError(
+                translation_domain=DOMAIN,
+                translation_key="path_not_allowed",
+                translation_placeholders={"path": checked},
+            )
+    try:
+        return await coordinator.async_import_consumption(
+            path, call.data[ATTR_TIMEZONE], call.data[ATTR_TIMESTAMPS], price_file
+        )
+    except (ConsumptionImportError, PriceSourceError, OSError) as err:
+        raise HomeAssistantError(
+            translation_domain=DOMAIN,
+            translation_key="import_failed",
+            translation_placeholders={"path": path, "error": str(err)},
+        ) from err
+
+
+async def _async_get_monthly_summaries(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Return the stored closed-month summaries with year-to-date and rolling 12-month totals."""
+    coordinator = _get_coordinator(hass, call)
+    return coordinator.monthly_summaries(call.data.get(ATTR_YEAR))
+
+
+def _local(value: datetime) -> datetime:
+    """A service datetime as naive local time (without a zone it already is)."""
+    if value.tzinfo is None:
+        return value
+    local: datetime = dt_util.as_local(value)
+    return local.replace(tzinfo=None)
+
+
+async def _async_query_range(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Return energy, cost lines and the peak hour between start and end."""
+    coordinator = _get_coordinator(hass, call)
+    start = _local(call.data[ATTR_START])
+    end = _local(call.data[ATTR_END])
+    if end <= start:
+        raise ServiceValidationError(
+            translation_domain=DOMAIN,
+            translation_key="range_invalid",
+            translation_placeholders={"start": start.isoformat(), "end": end.isoformat()},
+        )
+    return await coordinator.async_query_range(start, end)
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration's services."""
+
+    async def reconcile_invoice(call: ServiceCall) -> ServiceResponse:
+        return await _async_reconcile_invoice(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_RECONCILE_INVOICE,
+        reconcile_invoice,
+        schema=RECONCILE_INVOICE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    async def import_consumption(call: ServiceCall) -> ServiceResponse:
+        return await _async_import_consumption(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_IMPORT_CONSUMPTION,
+        import_consumption,
+        schema=IMPORT_CONSUMPTION_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def get_monthly_summaries(call: ServiceCall) -> ServiceResponse:
+        return await _async_get_monthly_summaries(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_MONTHLY_SUMMARIES,
+        get_monthly_summaries,
+        schema=GET_MONTHLY_SUMMARIES_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    async def query_range(call: ServiceCall) -> ServiceResponse:
+        return await _async_query_range(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_QUERY_RANGE,
+        query_range,
+        schema=QUERY_RANGE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
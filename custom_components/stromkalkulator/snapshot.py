@@ -0,0 +1,273 @@
+"""Immutable snapshot of one coordinator update.
+
+The coordinator publishes a CoordinatorSnapshot instead of a dict: one
+slotted object per update holding the unrounded values. The update itself
+rounds nothing: sensors read the attributes directly and round to the
+decimals below when they write their state.
+
+The top-3 days are read-only mappings, so no consumer can change what was
+published.
+
+Looking a value up by name (snapshot["spot_price"], snapshot.get(...)) and
+as_dict() return rounded values, for diagnostics and other dict-style
+consumers. The top-3 days are returned as a copy (a plain dict).
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Final
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+# Decimals shown per unit
+PRICE_DECIMALS: Final[int] = 4  # NOK/kWh
+KWH_DECIMALS: Final[int] = 3
+KW_DECIMALS: Final[int] = 2
+KR_DECIMALS: Final[int] = 2
+
+
+@dataclass(frozen=True, slots=True)
+class CoordinatorSnapshot:
+    """Values calculated in one coordinator update (unrounded)."""
+
+    # Prices now (NOK/kWh)
+    energiledd: float
+    energiledd_dag: float
+    energiledd_natt: float
+    kapasitetsledd: int
+    kapasitetstrinn_nummer: int
+    kapasitetstrinn_intervall: str
+    kapasitetsledd_per_kwh: float
+    spot_price: float
+    stromstotte: float
+    spotpris_etter_stotte: float
+    norgespris: float
+    norgespris_stromstotte: float
+    total_pris_norgespris: float
+    kroner_spart_per_kwh: float
+    total_price: float
+    total_price_uten_stotte: float
+    total_price_inkl_avgifter: float
+    forbruksavgift_inkl_mva: float
+    enova_inkl_mva: float
+    offentlige_avgifter: float
+    electricity_company_price: float | None
+    electricity_company_total: float | None
+    # Power and kapasitetstrinn
+    current_power_kw: float
+    avg_top_3_kw: float
+    top_3_days: Mapping[str, float]
+    is_day_rate: bool
+    # Configuration
+    tso: str
+    har_norgespris: bool
+    fritidsbolig: bool
+    monthly_cap_kwh: int
+    monthly_cap_remaining_kwh: float
+    norgespris_max_kwh: int
+    avgiftssone: str
+    # Monthly consumption
+    monthly_consumption_dag_kwh: float
+    monthly_consumption_natt_kwh: float
+    monthly_consumption_total_kwh: float
+    # Previous month, for invoice verification
+    previous_month_consumption_dag_kwh: float
+    previous_month_consumption_natt_kwh: float
+    previous_month_consumption_total_kwh: float
+    previous_month_top_3: Mapping[str, float]
+    previous_month_avg_top_3_kw: float
+    previous_month_name: str | None
+    previous_month_energiledd_dag_kr: float
+    previous_month_energiledd_natt_kr: float
+    previous_month_kapasitetsledd: int
+    previous_month_nettleie_kr: float
+    # Month-to-date costs from the ledger (exact per interval)
+    monthly_energiledd_dag_kr: float
+    monthly_energiledd_natt_kr: float
+    monthly_spot_kr: float
+    monthly_stromstotte_kr: float
+    monthly_stromstotte_kwh: float
+    monthly_forbruksavgift_kr: float
+    monthly_enova_kr: float
+    monthly_mva_kr: float
+    monthly_nettleie_kr: float
+    monthly_avgifter_kr: float
+    monthly_total_kr: float
+    # Spot price vs Norgespris for the energy used (positive: Norgespris is cheaper)
+    comparison_month_kwh: float
+    comparison_month_spot_kr: float
+    comparison_month_norgespris_kr: float
+    comparison_month_difference_kr: float
+    comparison_year_kwh: float
+    comparison_year_spot_kr: float
+    comparison_year_norgespris_kr: float
+    comparison_year_difference_kr: float
+    # Year to date and the last 12 months: closed-month summaries plus the running month
+    year_to_date_months: int
+    year_to_date_kwh: float
+    year_to_date_nettleie_kr: float
+    year_to_date_avgifter_kr: float
+    year_to_date_stromstotte_kr: float
+    year_to_date_spot_kr: float
+    year_to_date_total_kr: float
+    rolling_12_months: int
+    rolling_12_kwh: float
+    rolling_12_nettleie_kr: float
+    rolling_12_avgifter_kr: float
+    rolling_12_stromstotte_kr: float
+    rolling_12_spot_kr: float
+    rolling_12_total_kr: float
+    # Today and this year from the running rollups (no kapasitetsledd); previous: yesterday, last year
+    today_kwh: float
+    today_spot_kr: float
+    today_energiledd_kr: float
+    today_avgifter_kr: float
+    today_stromstotte_kr: float
+    today_total_kr: float
+    today_peak_kw: float
+    today_bookings: int
+    today_previous_total_kr: float
+    this_year_kwh: float
+    this_year_spot_kr: float
+    this_year_energiledd_kr: float
+    this_year_avgifter_kr: float
+    this_year_stromstotte_kr: float
+    this_year_total_kr: float
+    this_year_peak_kw: float
+    this_year_bookings: int
+    this_year_previous_total_kr: float
+    # Cumulative cost per component since the counters started (only what was booked)
+    cumulative_nettleie_kr: float
+    cumulative_strompris_kr: float
+    cumulative_avgifter_kr: float
+    cumulative_stromstotte_kr: float
+    cumulative_total_kr: float
+    # Month-end forecast (None until a day has been measured); probabilities per kapasitetstrinn
+    forecast_bill_kr: float | None
+    forecast_bill_low_kr: float | None
+    forecast_bill_high_kr: float | None
+    forecast_kwh: float | None
+    forecast_trinn_nummer: int | None
+    forecast_trinn_probabilities: tuple[float, ...]
+    forecast_simulations: int
+
+    def __getitem__(self, name: str) -> Any:
+        """Value by name, rounded for presentation."""
+        try:
+            value = getattr(self, name)
+        except AttributeError:
+            raise KeyError(name) from None
+        if isinstance(value, MappingProxyType):
+            return dict(value)
+        decimals = DECIMALS.get(name)
+        if decimals is None or value is None:
+            return value
+        return round(value, decimals)
+
+    def get(self, name: str, default: Any = None) -> Any:
+        """Value by name, rounded for presentation (default if there is no such value)."""
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def as_dict(self) -> dict[str, Any]:
+        """All values by name, rounded for presentation (diagnostics)."""
+        return {name: self[name] for name in FIELD_NAMES}
+
+    def period(self, period: str) -> dict[str, Any]:
+        """Totals of a period (one of PERIODS) by name without the prefix, rounded for presentation."""
+        prefix = len(period) + 1
+        return {name[prefix:]: self[name] for name in PERIOD_FIELDS[period]}
+
+
+FIELD_NAMES: Final[tuple[str, ...]] = tuple(field.name for field in fields(CoordinatorSnapshot))
+
+# Totals per period, as {period}_{name}
+PERIODS: Final[tuple[str, ...]] = ("year_to_date", "rolling_12", "today", "this_year")
+PERIOD_FIELDS: Final[dict[str, tuple[str, ...]]] = {
+    period: tuple(name for name in FIELD_NAMES if name.startswith(f"{period}_")) for period in PERIODS
+}
+_PERIOD_NAMES: Final[tuple[str, ...]] = tuple(name for names in PERIOD_FIELDS.values() for name in names)
+
+# Decimals per value; values not listed are shown as they are
+DECIMALS: Final[dict[str, int]] = {
+    **dict.fromkeys(
+        (
+            "energiledd",
+            "kapasitetsledd_per_kwh",
+            "spot_price",
+            "stromstotte",
+            "spotpris_etter_stotte",
+            "norgespris",
+            "total_pris_norgespris",
+            "kroner_spart_per_kwh",
+            "total_price",
+            "total_price_uten_stotte",
+            "total_price_inkl_avgifter",
+            "forbruksavgift_inkl_mva",
+            "enova_inkl_mva",
+            "offentlige_avgifter",
+            "electricity_company_price",
+            "electricity_company_total",
+        ),
+        PRICE_DECIMALS,
+    ),
+    **dict.fromkeys(
+        ("current_power_kw", "avg_top_3_kw", "previous_month_avg_top_3_kw", "today_peak_kw", "this_year_peak_kw"),
+        KW_DECIMALS,
+    ),
+    **dict.fromkeys(
+        (
+            "monthly_cap_remaining_kwh",
+            "monthly_consumption_dag_kwh",
+            "monthly_consumption_natt_kwh",
+            "monthly_consumption_total_kwh",
+            "previous_month_consumption_dag_kwh",
+            "previous_month_consumption_natt_kwh",
+            "previous_month_consumption_total_kwh",
+            "monthly_stromstotte_kwh",
+            "comparison_month_kwh",
+            "comparison_year_kwh",
+            "forecast_kwh",
+            *(name for name in _PERIOD_NAMES if name.endswith("_kwh")),
+        ),
+        KWH_DECIMALS,
+    ),
+    **dict.fromkeys(
+        (
+            "monthly_energiledd_dag_kr",
+            "monthly_energiledd_natt_kr",
+            "monthly_spot_kr",
+            "monthly_stromstotte_kr",
+            "monthly_forbruksavgift_kr",
+            "monthly_enova_kr",
+            "monthly_mva_kr",
+            "monthly_nettleie_kr",
+            "monthly_avgifter_kr",
+            "monthly_total_kr",
+            "previous_month_energiledd_dag_kr",
+            "previous_month_energiledd_natt_kr",
+            "previous_month_nettleie_kr",
+            "comparison_month_spot_kr",
+            "comparison_month_norgespris_kr",
+            "comparison_month_difference_kr",
+            "comparison_year_spot_kr",
+            "comparison_year_norgespris_kr",
+            "comparison_year_difference_kr",
+            "cumulative_nettleie_kr",
+            "cumulative_strompris_kr",
+            "cumulative_avgifter_kr",
+            "cumulative_stromstotte_kr",
+            "cumulative_total_kr",
+            "forecast_bill_kr",
+            "forecast_bill_low_kr",
+            "forecast_bill_high_kr",
+            *(name for name in _PERIOD_NAMES if name.endswith("_kr")),
+        ),
+        KR_DECIMALS,
+    ),
+}
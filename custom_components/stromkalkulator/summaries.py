@@ -0,0 +1,329 @@
+"""Summaries of closed months in a bounded ring buffer.
+
+When a month closes, its totals are condensed into one MonthSummary: kWh
+per tariff, the three highest daily peaks, kapasitetstrinn and the cost
+lines of the ledger. The last SUMMARY_MONTHS summaries are kept, the
+oldest dropping out as a new month is added.
+
+Year-to-date and rolling 12-month totals are sums of at most twelve
+summaries plus the running month, never of hourly or interval data. The
+sums over closed months are cached until the buffer changes.
+
+Amounts are fixed-point integers as in the ledger (µWh and µøre, see
+fixedpoint.py). For storage every summary is packed into a fixed-size
+little-endian record and the buffer is base64 encoded behind a version
+byte, about 5.5 kB for 36 months.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import bisect
+import struct
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Final
+
+from .fixedpoint import UORE_PER_KR, uore_to_kr, uwh_to_kwh
+from .monthstate import TARIFF_DAG, TARIFF_NATT
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Mapping
+
+    from .ledger import CostLedger
+    from .monthstate import MonthState
+
+# Closed months kept (three years)
+SUMMARY_MONTHS: Final[int] = 36
+# Daily peaks kept per month (kapasitetsledd is set by the three highest)
+SUMMARY_PEAKS: Final[int] = 3
+
+# Ledger sums kept per month, in storage order
+SUMMARY_SUMS: Final[tuple[str, ...]] = (
+    "energiledd_dag",
+    "energiledd_natt",
+    "spot",
+    "stromstotte",
+    "stromstotte_kwh",
+    "forbruksavgift",
+    "enova",
+    "mva",
+)
+
+# Storage layout: version byte, then one record per month: month index
+# (year * 12 + month - 1), µWh dag and natt, peak days and kW,
+# kapasitetstrinn and kapasitetsledd (kr), the ledger sums
+FORMAT_VERSION: Final[int] = 1
+_RECORD: Final[struct.Struct] = struct.Struct(f"<H2q{SUMMARY_PEAKS}B{SUMMARY_PEAKS}dBI{len(SUMMARY_SUMS)}q")
+
+
+def month_index(month: str) -> int:
+    """Months since year 0 for "YYYY-MM"."""
+    return int(month[:4]) * 12 + int(month[5:7]) - 1
+
+
+def month_from_index(index: int) -> str:
+    """ "YYYY-MM" for a month index."""
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def previous_month(month: str, count: int = 1) -> str:
+    """The month count months before month ("YYYY-MM")."""
+    return month_from_index(month_index(month) - count)
+
+
+@dataclass(frozen=True, slots=True)
+class PeriodTotals:
+    """Energy and cost lines summed over whole or running months."""
+
+    months: int = 0
+    kwh_uwh: int = 0
+    nettleie_uore: int = 0  # energiledd + kapasitetsledd
+    avgifter_uore: int = 0  # forbruksavgift + Enova, inkl. mva
+    stromstotte_uore: int = 0
+    spot_uore: int = 0  # strømpris paid
+
+    @classmethod
+    def of_month(cls, kwh_uwh: int, sums: Mapping[str, int], kapasitetsledd: int) -> PeriodTotals:
+        """Totals of one month from its ledger sums and kapasitetsledd (kr)."""
+        return cls(
+            1,
+            kwh_uwh,
+            sums["energiledd_dag"] + sums["energiledd_natt"] + kapasitetsledd * UORE_PER_KR,
+            sums["forbruksavgift"] + sums["enova"],
+            sums["stromstotte"],
+            sums["spot"],
+        )
+
+    @classmethod
+    def month_to_date(cls, month: MonthState, ledger: CostLedger, kapasitetsledd: int) -> PeriodTotals:
+        """Totals of the running month, with its current kapasitetsledd."""
+        return cls.of_month(month.tariff_uwh[TARIFF_DAG] + month.tariff_uwh[TARIFF_NATT], ledger.sums, kapasitetsledd)
+
+    def __add__(self, other: PeriodTotals) -> PeriodTotals:
+        """Sum of two periods."""
+        return PeriodTotals(
+            self.months + other.months,
+            self.kwh_uwh + other.kwh_uwh,
+            self.nettleie_uore + other.nettleie_uore,
+            self.avgifter_uore + other.avgifter_uore,
+            self.stromstotte_uore + other.stromstotte_uore,
+            self.spot_uore + other.spot_uore,
+        )
+
+    @property
+    def kwh(self) -> float:
+        """Energy in kWh."""
+        return uwh_to_kwh(self.kwh_uwh)
+
+    @property
+    def nettleie_kr(self) -> float:
+        """Energiledd and kapasitetsledd in kr."""
+        return uore_to_kr(self.nettleie_uore)
+
+    @property
+    def avgifter_kr(self) -> float:
+        """Forbruksavgift and Enova in kr."""
+        return uore_to_kr(self.avgifter_uore)
+
+    @property
+    def stromstotte_kr(self) -> float:
+        """Strømstøtte in kr."""
+        return uore_to_kr(self.stromstotte_uore)
+
+    @property
+    def spot_kr(self) -> float:
+        """Strømpris paid in kr."""
+        return uore_to_kr(self.spot_uore)
+
+    @property
+    def total_kr(self) -> float:
+        """Nettleie + avgifter - strømstøtte in kr (as the monthly total sensor)."""
+        return uore_to_kr(self.nettleie_uore + self.avgifter_uore - self.stromstotte_uore)
+
+
+@dataclass(frozen=True, slots=True)
+class MonthSummary:
+    """Totals of one closed month."""
+
+    month: str  # "YYYY-MM"
+    dag_uwh: int
+    natt_uwh: int
+    peaks: tuple[tuple[int, float], ...]  # (day of month, kW), highest first
+    kapasitetstrinn: int
+    kapasitetsledd: int  # kr for the month
+    sums: tuple[int, ...]  # ledger sums in SUMMARY_SUMS order
+
+    @classmethod
+    def from_month(
+        cls, month: MonthState, ledger: CostLedger | None, kapasitetstrinn: int, kapasitetsledd: int
+    ) -> MonthSummary:
+        """Condense a month and its cost ledger (no ledger: no cost lines)."""
+        peaks = tuple((int(date[8:10]), kw) for date, kw in month.top_days(SUMMARY_PEAKS).items())
+        sums = tuple(ledger.sums[name] for name in SUMMARY_SUMS) if ledger else (0,) * len(SUMMARY_SUMS)
+        return cls(
+            month.month,
+            month.tariff_uwh[TARIFF_DAG],
+            month.tariff_uwh[TARIFF_NATT],
+            peaks,
+            kapasitetstrinn,
+            kapasitetsledd,
+            sums,
+        )
+
+    def cost(self, name: str) -> int:
+        """A ledger sum by name (µøre, or µWh for stromstotte_kwh)."""
+        return self.sums[SUMMARY_SUMS.index(name)]
+
+    @property
+    def ledger_sums(self) -> dict[str, int]:
+        """The month's sums by ledger total name (kwh_dag, kwh_natt and the cost lines)."""
+        return {"kwh_dag": self.dag_uwh, "kwh_natt": self.natt_uwh, **dict(zip(SUMMARY_SUMS, self.sums, strict=True))}
+
+    @property
+    def top_days(self) -> dict[str, float]:
+        """The highest daily peaks, {"YYYY-MM-DD": kW}."""
+        return {f"{self.month}-{day:02d}": kw for day, kw in self.peaks}
+
+    @property
+    def totals(self) -> PeriodTotals:
+        """The month as period totals."""
+        return PeriodTotals.of_month(self.dag_uwh + self.natt_uwh, self.ledger_sums, self.kapasitetsledd)
+
+    def as_dict(self) -> dict[str, Any]:
+        """The summary in kWh and kr (service responses)."""
+        avg_top_3_kw = sum(kw for _, kw in self.peaks) / len(self.peaks) if self.peaks else 0.0
+        return {
+            "month": self.month,
+            "forbruk_dag_kwh": round(uwh_to_kwh(self.dag_uwh), 3),
+            "forbruk_natt_kwh": round(uwh_to_kwh(self.natt_uwh), 3),
+            "forbruk_total_kwh": round(uwh_to_kwh(self.dag_uwh + self.natt_uwh), 3),
+            "topp_3": self.top_days,
+            "snitt_topp_3_kw": round(avg_top_3_kw, 2),
+            "kapasitetstrinn": self.kapasitetstrinn,
+            "kapasitetsledd_kr": self.kapasitetsledd,
+            **{
+                f"{name}_kr": round(uore_to_kr(self.cost(name)), 2)
+                for name in SUMMARY_SUMS
+                if name != "stromstotte_kwh"
+            },
+            "stromstotte_kwh": round(uwh_to_kwh(self.cost("stromstotte_kwh")), 3),
+            "total_kr": round(self.totals.total_kr, 2),
+        }
+
+    def pack(self) -> bytes:
+        """One fixed-size storage record."""
+        days = [day for day, _ in self.peaks] + [0] * (SUMMARY_PEAKS - len(self.peaks))
+        kws = [kw for _, kw in self.peaks] + [0.0] * (SUMMARY_PEAKS - len(self.peaks))
+        return _RECORD.pack(
+            month_index(self.month),
+            self.dag_uwh,
+            self.natt_uwh,
+            *days,
+            *kws,
+            self.kapasitetstrinn,
+            self.kapasitetsledd,
+            *self.sums,
+        )
+
+    @classmethod
+    def unpack(cls, record: bytes) -> MonthSummary:
+        """A summary from a record written by pack."""
+        values = _RECORD.unpack(record)
+        days = values[3 : 3 + SUMMARY_PEAKS]
+        kws = values[3 + SUMMARY_PEAKS : 3 + 2 * SUMMARY_PEAKS]
+        rest = 3 + 2 * SUMMARY_PEAKS
+        return cls(
+            month_from_index(values[0]),
+            values[1],
+            values[2],
+            tuple((day, kw) for day, kw in zip(days, kws, strict=True) if day),
+            values[rest],
+            values[rest + 1],
+            tuple(values[rest + 2 :]),
+        )
+
+
+class MonthSummaries:
+    """The most recent closed months, oldest first."""
+
+    __slots__ = ("_stored", "_totals", "summaries")
+
+    def __init__(self, capacity: int = SUMMARY_MONTHS) -> None:
+        """Initialize an empty buffer holding at most capacity months."""
+        self.summaries: deque[MonthSummary] = deque(maxlen=capacity)
+        self._totals: dict[tuple[str, str], PeriodTotals] = {}
+        self._stored: dict[str, str] | None = None
+
+    def __len__(self) -> int:
+        """Number of months held."""
+        return len(self.summaries)
+
+    def __iter__(self) -> Iterator[MonthSummary]:
+        """Summaries, oldest first."""
+        return iter(self.summaries)
+
+    def get(self, month: str) -> MonthSummary | None:
+        """The summary of a month, if held."""
+        for summary in reversed(self.summaries):
+            if summary.month == month:
+                return summary
+        return None
+
+    def add(self, summary: MonthSummary) -> None:
+        """Add or replace a month's summary, dropping the oldest when full."""
+        summaries = self.summaries
+        if not summaries or summary.month > summaries[-1].month:
+            summaries.append(summary)
+        else:
+            months = [held.month for held in summaries]
+            position = bisect.bisect_left(months, summary.month)
+            if position < len(months) and months[position] == summary.month:
+                summaries[position] = summary
+            elif len(summaries) < (summaries.maxlen or 0):
+                summaries.insert(position, summary)
+            elif position > 0:
+                # Full: a month older than the newest pushes out the oldest
+                summaries.popleft()
+                summaries.insert(position - 1, summary)
+            else:
+                return
+        self._totals.clear()
+        self._stored = None
+
+    def totals(self, first: str, last: str) -> PeriodTotals:
+        """Sum of the held months from first to last ("YYYY-MM", inclusive)."""
+        key = (first, last)
+        totals = self._totals.get(key)
+        if totals is None:
+            totals = PeriodTotals()
+            for summary in self.summaries:
+                if first <= summary.month <= last:
+                    totals += summary.totals
+            self._totals[key] = totals
+        return totals
+
+    def as_dict(self) -> dict[str, str]:
+        """The packed buffer for storage."""
+        if self._stored is None:
+            packed = bytes((FORMAT_VERSION,)) + b"".join(summary.pack() for summary in self.summaries)
+            self._stored = {"data": base64.b64encode(packed).decode("ascii")}
+        return self._stored
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any] | None) -> MonthSummaries:
+        """Restore a buffer from storage (empty if missing or unusable)."""
+        summaries = cls()
+        text = (data or {}).get("data")
+        if not isinstance(text, str):
+            return summaries
+        try:
+            packed = base64.b64decode(text, validate=True)
+        except (binascii.Error, ValueError):
+            return summaries
+        if not packed or packed[0] != FORMAT_VERSION or (len(packed) - 1) % _RECORD.size:
+            return summaries
+        for offset in range(1, len(packed), _RECORD.size):
+            summaries.add(MonthSummary.unpack(packed[offset : offset + _RECORD.size]))
+        return summaries
@@ -0,0 +1,48 @@
+"""Dag/natt tariff per clock hour, precomputed per month.
+
+Energiledd switches tariff at 06:00 and 22:00 on weekdays, and weekends and
+holidays are natt all day, so the tariff is constant within a clock hour.
+A TariffCalendar holds the tariff of every hour in a month. Norway's UTC
+offsets are whole hours, so hour n of the month starts at start_ts + n hours
+in epoch seconds, also across DST, and a lookup is one index calculation.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+SECONDS_PER_HOUR: int = 3600
+
+
+class TariffCalendar:
+    """Tariff (dag or natt) for every clock hour of one month."""
+
+    __slots__ = ("_day", "end_ts", "month", "start_ts")
+
+    def __init__(self, month_start: datetime, is_day_rate: Callable[[datetime], bool]) -> None:
+        """Precompute the tariff of each hour.
+
+        Args:
+            month_start: Naive local midnight on the first of the month
+            is_day_rate: Tariff rule for a naive local time
+        """
+        next_month = (month_start.replace(day=28) + timedelta(days=4)).replace(day=1)
+        self.month = month_start.strftime("%Y-%m")
+        self.start_ts = month_start.timestamp()
+        self.end_ts = next_month.timestamp()
+        hours = round((self.end_ts - self.start_ts) / SECONDS_PER_HOUR)
+        self._day = bytes(
+            is_day_rate(datetime.fromtimestamp(self.start_ts + hour * SECONDS_PER_HOUR)) for hour in range(hours)
+        )
+
+    def __contains__(self, ts: float) -> bool:
+        """Whether an epoch timestamp is in this month."""
+        return self.start_ts <= ts < self.end_ts
+
+    def is_day(self, ts: float) -> bool:
+        """Tariff at an epoch timestamp in this month (True for dag)."""
+        return bool(self._day[int((ts - self.start_ts) // SECONDS_PER_HOUR)])
@@ -3,9 +3,15 @@
 
 Replaces personal information with realistic fake data.
 Reads replacement mappings from .anonymize_config.json (gitignored).
+
+All mappings are compiled into one regex (longest match first) and each
+file is streamed line by line, so large archives are processed in one pass
+with output that does not depend on the order of the config.
 """
 
 import json
+import re
+from collections.abc import Callable, Iterable, Iterator
 from pathlib import Path
 
 
@@ -23,21 +29,49 @@ def load_config() -> dict:
     return json.loads(config_path.read_text(encoding="utf-8"))
 
 
-def anonymize_file(filepath: Path, replacements: dict[str, str]) -> str:
-    """Anonymize a single file and return the anonymized content."""
-    content = filepath.read_text(encoding="utf-8")
+def compile_replacements(replacements: dict[str, str]) -> Callable[[str], str]:
+    """Build a function that applies all replacements in one regex pass.
+
+    All originals are joined into one alternation, longest first, so
+    "Ola Nordmann" wins over "Ola" regardless of the order in the config, and
+    replaced text is never matched again. Originals of equal length are
+    sorted, so the output does not depend on dict order.
+
+    Originals are matched within a line; the files are streamed line by line.
+
+    Raises:
+        ValueError: An original spans several lines
+    """
+    originals = sorted((original for original in replacements if original), key=lambda o: (-len(o), o))
+    if not originals:
+        return lambda text: text
+    for original in originals:
+        if "\n" in original:
+            raise ValueError(f"replacement spans several lines: {original!r}")
+    pattern = re.compile("|".join(re.escape(original) for original in originals))
+    return lambda text: pattern.sub(lambda match: replacements[match.group()], text)
+
 
-    for original, replacement in replacements.items():
-        content = content.replace(original, replacement)
+def anonymize_lines(lines: Iterable[str], anonymize: Callable[[str], str]) -> Iterator[str]:
+    """Anonymize lines one at a time."""
+    for line in lines:
+        yield anonymize(line)
 
-    return content
+
+def anonymize_file(source: Path, target: Path, anonymize: Callable[[str], str]) -> None:
+    """Stream source to target line by line, anonymizing each line."""
+    with source.open(encoding="utf-8") as infile, target.open("w", encoding="utf-8") as outfile:
+        outfile.writelines(anonymize_lines(infile, anonymize))
 
 
 def main() -> None:
     """Anonymize all invoice text files."""
     config = load_config()
-    replacements = config.get("replacements", {})
-    filename_mappings = config.get("filename_mappings", {})
+    try:
+        anonymize = compile_replacements(config.get("replacements", {}))
+        rename = compile_replacements(config.get("filename_mappings", {}))
+    except ValueError as err:
+        raise SystemExit(f"ERROR: {err}") from None
 
     fakturaer_dir = Path(__file__).parent.parent / "Fakturaer"
     output_dir = Path(__file__).parent.parent / "docs" / "fakturaer"
@@ -45,7 +79,8 @@ def main() -> None:
     # Create output directory
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    txt_files = list(fakturaer_dir.glob("*.txt"))
+    # Sorted, so runs are reproducible
+    txt_files = sorted(fakturaer_dir.glob("*.txt"))
 
     if not txt_files:
         print("No .txt files found in Fakturaer/")
@@ -53,27 +88,15 @@ def main() -> None:
 
     for txt_file in txt_files:
         print(f"Anonymizing {txt_file.name}...")
-        anonymized = anonymize_file(txt_file, replacements)
-
-        # Create anonymized filename using mappings
-        output_name = txt_file.name
-        for old_pattern, new_pattern in filename_mappings.items():
-            output_name = output_name.replace(old_pattern, new_pattern)
-
-        output_path = output_dir / output_name
-        output_path.write_text(anonymized, encoding="utf-8")
+        output_path = output_dir / rename(txt_file.name)
+        anonymize_file(txt_file, output_path, anonymize)
         print(f"  -> {output_path}")
 
-    # Also copy REFERANSE.md if it exists
+    # Also copy REFERANSE.md if it exists, with invoice numbers anonymized
     ref_file = fakturaer_dir / "REFERANSE.md"
     if ref_file.exists():
-        ref_content = ref_file.read_text(encoding="utf-8")
-        # Anonymize invoice numbers in reference
-        for old_pattern, new_pattern in filename_mappings.items():
-            ref_content = ref_content.replace(old_pattern, new_pattern)
-
         output_ref = output_dir / "REFERANSE.md"
-        output_ref.write_text(ref_content, encoding="utf-8")
+        anonymize_file(ref_file, output_ref, rename)
         print(f"  -> {output_ref}")
 
     print("\nDone! Anonymized files in docs/fakturaer/")
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Read an hourly consumption export (Elhub or grid company, CSV/XLSX).
+
+Prints a summary per month (hours, kWh, highest hour, average of the top 3
+daily peaks used for kapasitetstrinn) and can write the normalized hourly
+series as CSV (hour start in UTC, kWh) for other tools.
+
+Uses custom_components/stromkalkulator/importer.py, which only needs the
+standard library, so Home Assistant does not have to be installed.
+
+Usage:
+    python scripts/import_consumption.py elhub_forbruk.csv
+    python scripts/import_consumption.py forbruk.xlsx --timestamps utc --out timer.csv
+"""
+
+import argparse
+import importlib.util
+import sys
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+COMPONENT_DIR = Path(__file__).parent.parent / "custom_components" / "stromkalkulator"
+
+
+def load_importer():
+    """Load importer.py without importing the Home Assistant package."""
+    spec = importlib.util.spec_from_file_location("stromkalkulator_importer", COMPONENT_DIR / "importer.py")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def main() -> None:
+    """Summarize an export and optionally write the hourly series."""
+    importer = load_importer()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", type=Path, help="CSV or XLSX export")
+    parser.add_argument("--timezone", default=importer.DEFAULT_TIMEZONE, help="Time zone of local timestamps")
+    parser.add_argument(
+        "--timestamps",
+        choices=[importer.TIMESTAMPS_LOCAL, importer.TIMESTAMPS_UTC],
+        default=importer.TIMESTAMPS_LOCAL,
+        help="Whether timestamps without an offset are local time or UTC",
+    )
+    parser.add_argument("--out", type=Path, help="Write hourly series as CSV (start_utc,kwh)")
+    args = parser.parse_args()
+
+    stats = importer.ImportStats()
+    tz = ZoneInfo(args.timezone)
+    months: dict[str, dict] = {}
+    out = args.out.open("w", encoding="utf-8") if args.out else None
+    try:
+        if out:
+            out.write("start_utc,kwh\n")
+        for start, kwh in importer.read_consumption(args.path, args.timezone, args.timestamps, stats):
+            if out:
+                out.write(f"{start.isoformat()},{kwh:.3f}\n")
+            # Summaries per local month and day
+            local = start.astimezone(tz)
+            month = months.setdefault(local.strftime("%Y-%m"), {"hours": 0, "kwh": 0.0, "max": 0.0, "days": {}})
+            month["hours"] += 1
+            month["kwh"] += kwh
+            month["max"] = max(month["max"], kwh)
+            day = local.strftime("%Y-%m-%d")
+            month["days"][day] = max(month["days"].get(day, 0.0), kwh)
+    except importer.ConsumptionImportError as err:
+        print(f"ERROR: {err}")
+        raise SystemExit(1) from err
+    finally:
+        if out:
+            out.close()
+
+    print(f"{'Måned':<8} {'Timer':>6} {'kWh':>10} {'Maks kWh/h':>11} {'Topp-3 snitt':>13}")
+    for name, month in sorted(months.items()):
+        top_3 = sorted(month["days"].values(), reverse=True)[:3]
+        avg_top_3 = sum(top_3) / len(top_3) if top_3 else 0.0
+        print(f"{name:<8} {month['hours']:>6} {month['kwh']:>10.3f} {month['max']:>11.3f} {avg_top_3:>13.3f}")
+    print(f"\n{stats.rows} rader, {stats.hours} timer, {stats.skipped} hoppet over")
+    if args.out:
+        print(f"Timeserie skrevet til {args.out}")
+
+
+if __name__ == "__main__":
+    main()
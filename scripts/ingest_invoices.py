@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""Ingest invoice PDFs: convert, anonymize and parse into test fixtures.
+
+Pipeline per PDF in Fakturaer/:
+1. pdftotext -layout (in a process pool, one PDF per worker)
+2. Anonymize with all replacements from .anonymize_config.json in one regex pass
+3. Parse the invoice lines (energiledd, strømstønad, kapasitet, avgifter)
+
+Outputs the anonymized text to docs/fakturaer/ and the parsed lines as JSON to
+tests/fixtures/fakturaer/, where the reconciliation tests read them with
+Invoice.from_dict.
+
+PDFs are hashed (SHA-256) and skipped when neither the PDF nor the
+anonymization config changed since the last run (cache in
+Fakturaer/.ingest_cache.json). A PDF that fails is reported and tried again
+next run; the others are cached as they complete.
+
+Usage:
+    python scripts/ingest_invoices.py            # only new/changed PDFs
+    python scripts/ingest_invoices.py --force    # everything
+    python scripts/ingest_invoices.py --fixtures-from docs/fakturaer
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import subprocess
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import TextIO
+
+from anonymize_invoices import anonymize_lines, compile_replacements, load_config
+
+ROOT = Path(__file__).parent.parent
+FAKTURAER_DIR = ROOT / "Fakturaer"
+OUTPUT_DIR = ROOT / "docs" / "fakturaer"
+FIXTURES_DIR = ROOT / "tests" / "fixtures" / "fakturaer"
+CACHE_FILE = FAKTURAER_DIR / ".ingest_cache.json"
+
+# "1 107,173", "-11,054", "415" (space as thousands separator, decimal comma or point)
+NUMBER = r"-?\d{1,3}(?:[ \xa0]\d{3})+(?:[.,]\d+)?|-?\d+(?:[.,]\d+)?"
+KWH = re.compile(rf"({NUMBER})\s*kWh\b")
+ORE = re.compile(rf"({NUMBER})\s*øre/kWh")
+ANY_NUMBER = re.compile(NUMBER)
+PERIOD = re.compile(r"periode\W*(\d{2})\.(\d{2})\.(\d{2}|\d{4})\b", re.IGNORECASE)
+
+# Invoice line label -> Invoice field prefix; the first matching label wins
+LINE_LABELS = (
+    (re.compile(r"energiledd\s+dag", re.IGNORECASE), "energiledd_dag"),
+    (re.compile(r"energiledd\s+natt", re.IGNORECASE), "energiledd_natt"),
+    (re.compile(r"strømstønad|strømstøtte", re.IGNORECASE), "stromstotte"),
+    (re.compile(r"kapasitet", re.IGNORECASE), "kapasitet"),
+    (re.compile(r"forbruksavgift", re.IGNORECASE), "forbruksavgift"),
+    (re.compile(r"enova", re.IGNORECASE), "enova"),
+)
+
+_anonymize: Callable[[str], str] = compile_replacements({})
+
+
+def to_float(value: str) -> float:
+    """Parse a Norwegian number ("1 107,173" -> 1107.173)."""
+    return float(value.replace(" ", "").replace("\xa0", "").replace(",", "."))
+
+
+def parse_invoice(lines: Iterable[str]) -> dict:
+    """Parse invoice lines from invoice text (pdftotext output or the Markdown copies).
+
+    Only lines with a quantity (kWh or kr/mnd) are used, so summary lines
+    like "Midlert. strømstønad  -122,39 kr" do not count. Strømstønad is a
+    deduction on the invoice and is returned as a positive amount, like in
+    the ledger.
+
+    Returns:
+        Mapping with "month" and the Invoice fields found
+    """
+    invoice: dict = {}
+    for line in lines:
+        if "month" not in invoice and (period := PERIOD.search(line)):
+            _day, month, year = period.groups()
+            invoice["month"] = f"{int(year) + 2000 if len(year) == 2 else int(year)}-{month}"
+        if "kWh" not in line and "kr/mnd" not in line:
+            continue
+        prefix = next((prefix for label, prefix in LINE_LABELS if label.search(line)), None)
+        if prefix is None or f"{prefix}_kr" in invoice:
+            continue
+        # Label first (it may hold numbers, "Kapasitet 5-10 kW"), amount is the last number
+        numbers = ANY_NUMBER.findall(line.replace("|", " "))
+        if not numbers:
+            continue
+        invoice[f"{prefix}_kr"] = to_float(numbers[-1])
+        if prefix in ("energiledd_dag", "energiledd_natt", "stromstotte") and (kwh := KWH.search(line)):
+            invoice[f"{prefix}_kwh"] = to_float(kwh.group(1))
+        if prefix == "stromstotte":
+            invoice["stromstotte_kr"] = abs(invoice["stromstotte_kr"])
+            if ore := ORE.search(line):
+                invoice["stromstotte_ore"] = abs(to_float(ore.group(1)))
+    return invoice
+
+
+def _init_worker(replacements: dict[str, str]) -> None:
+    """Compile the replacements once per worker process."""
+    global _anonymize
+    _anonymize = compile_replacements(replacements)
+
+
+def process_pdf(pdf: Path, output: Path) -> dict:
+    """Convert, anonymize and parse one PDF (runs in a worker process).
+
+    pdftotext output is streamed line by line through the anonymizer to the
+    output file and the parser.
+    """
+    with (
+        subprocess.Popen(["pdftotext", "-layout", str(pdf), "-"], stdout=subprocess.PIPE, encoding="utf-8") as proc,
+        output.open("w", encoding="utf-8") as outfile,
+    ):
+        invoice = parse_invoice(_written(anonymize_lines(proc.stdout, _anonymize), outfile))
+    if proc.returncode:
+        raise subprocess.CalledProcessError(proc.returncode, proc.args)
+    return invoice
+
+
+def _written(lines: Iterable[str], outfile: TextIO) -> Iterator[str]:
+    """Write each line to outfile and pass it on."""
+    for line in lines:
+        outfile.write(line)
+        yield line
+
+
+def file_hash(path: Path) -> str:
+    """SHA-256 of a file, read in blocks."""
+    digest = hashlib.sha256()
+    with path.open("rb") as file:
+        for block in iter(lambda: file.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_fixture(name: str, source: str, invoice: dict) -> Path | None:
+    """Write parsed invoice lines as a JSON fixture (skipped without a month)."""
+    if "month" not in invoice:
+        print(f"  WARNING: no period found in {source}, no fixture written")
+        return None
+    FIXTURES_DIR.mkdir(parents=True, exist_ok=True)
+    path = FIXTURES_DIR / f"{name}.json"
+    fixture = {"source": source, "month": invoice["month"], "inkl_mva": True}
+    fixture.update(sorted((key, value) for key, value in invoice.items() if key != "month"))
+    path.write_text(json.dumps(fixture, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    return path
+
+
+def fixtures_from(directory: Path) -> None:
+    """Parse already anonymized invoices (.md/.txt) into fixtures."""
+    for path in sorted(directory.glob("*_Faktura_*")):
+        if path.suffix in (".md", ".txt"):
+            with path.open(encoding="utf-8") as file:
+                output = write_fixture(path.stem, path.name, parse_invoice(file))
+            if output:
+                print(f"{path.name} -> {output.relative_to(ROOT)}")
+
+
+def main() -> None:
+    """Run the pipeline for new and changed PDFs."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--force", action="store_true", help="Process all PDFs, ignoring the cache")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="Worker processes")
+    parser.add_argument("--fixtures-from", type=Path, help="Only parse anonymized invoices in this directory")
+    args = parser.parse_args()
+
+    if args.fixtures_from:
+        fixtures_from(args.fixtures_from)
+        return
+
+    config = load_config()
+    replacements: dict[str, str] = config.get("replacements", {})
+    filename_mappings: dict[str, str] = config.get("filename_mappings", {})
+    try:
+        compile_replacements(replacements)
+        rename = compile_replacements(filename_mappings)
+    except ValueError as err:
+        raise SystemExit(f"ERROR: {err}") from None
+    # A changed config must re-anonymize every PDF
+    config_hash = hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()
+
+    cache = json.loads(CACHE_FILE.read_text(encoding="utf-8")) if CACHE_FILE.exists() else {}
+    todo: dict[Path, str] = {}
+    for pdf in sorted(FAKTURAER_DIR.glob("*.pdf")):
+        digest = file_hash(pdf)
+        entry = cache.get(pdf.name)
+        if args.force or entry != {"pdf": digest, "config": config_hash}:
+            todo[pdf] = digest
+    if not todo:
+        print("All PDFs up to date")
+        return
+
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    failed = 0
+    try:
+        with ProcessPoolExecutor(max_workers=args.jobs, initializer=_init_worker, initargs=(replacements,)) as pool:
+            futures = {}
+            for pdf in todo:
+                output = OUTPUT_DIR / f"{rename(pdf.stem)}.txt"
+                futures[pool.submit(process_pdf, pdf, output)] = (pdf, output)
+            for future in as_completed(futures):
+                pdf, output = futures[future]
+                try:
+                    invoice = future.result()
+                except (OSError, subprocess.CalledProcessError) as err:
+                    print(f"{pdf.name}: FAILED ({err})")
+                    failed += 1
+                    continue
+                print(f"{pdf.name} -> {output.relative_to(ROOT)}")
+                if fixture := write_fixture(output.stem, output.name, invoice):
+                    print(f"  -> {fixture.relative_to(ROOT)}")
+                cache[pdf.name] = {"pdf": todo[pdf], "config": config_hash}
+    finally:
+        # Completed PDFs are cached even if the run is interrupted
+        CACHE_FILE.write_text(json.dumps(cache, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    print(f"\nProcessed {len(todo) - failed} PDF(s), {failed} failed. Review docs/fakturaer/ before committing.")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,12 +2,22 @@
 
 from __future__ import annotations
 
+import asyncio
+import json
+import os
 import sys
+import time
+from datetime import datetime, timedelta
 from pathlib import Path
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any
 from unittest.mock import MagicMock
 
 import pytest
 
+if TYPE_CHECKING:
+    from custom_components.stromkalkulator.snapshot import CoordinatorSnapshot
+
 # Add custom_components to path so we can import without Home Assistant
 sys.path.insert(0, str(Path(__file__).parent.parent / "custom_components"))
 
@@ -22,7 +32,127 @@ sys.modules["homeassistant.helpers.issue_registry"] = MagicMock()
 sys.modules["homeassistant.helpers.storage"] = MagicMock()
 sys.modules["homeassistant.helpers.update_coordinator"] = MagicMock()
 sys.modules["homeassistant.helpers.entity"] = MagicMock()
+sys.modules["homeassistant.helpers.event"] = MagicMock()
 sys.modules["homeassistant.components.sensor"] = MagicMock()
+sys.modules["homeassistant.exceptions"] = MagicMock()
+sys.modules["homeassistant.helpers.config_validation"] = MagicMock()
+sys.modules["homeassistant.util"] = MagicMock()
+sys.modules["voluptuous"] = MagicMock()
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]) -> None:
+    """Skip tests that time or measure memory unless --benchmark-enable or --benchmark-only is given.
+
+    Latency and allocations depend on the interpreter and the machine, so they
+    are not part of the default run.
+    """
+    if config.getoption("benchmark_enable", False) or config.getoption("benchmark_only", False):
+        return
+    skip = pytest.mark.skip(reason="benchmark: run with --benchmark-enable")
+    for item in items:
+        if "benchmark" in getattr(item, "fixturenames", ()):
+            item.add_marker(skip)
+
+
+class _DataUpdateCoordinator:
+    """Minimal DataUpdateCoordinator so NettleieCoordinator can run in tests."""
+
+    def __class_getitem__(cls, item: Any) -> type:
+        return cls
+
+    def __init__(self, hass: Any, logger: Any, *, name: str, update_interval: timedelta) -> None:
+        self.hass = hass
+        self.logger = logger
+        self.name = name
+        self.update_interval = update_interval
+        self.data: Any = None
+
+
+class _CoordinatorEntity:
+    """Minimal CoordinatorEntity so sensor entities can be instantiated in tests."""
+
+    def __class_getitem__(cls, item: Any) -> type:
+        return cls
+
+    def __init__(self, coordinator: Any) -> None:
+        self.coordinator = coordinator
+
+    def _handle_coordinator_update(self) -> None:
+        self.async_write_ha_state()  # type: ignore[attr-defined]
+
+
+class _SensorEntity:
+    """Minimal SensorEntity base."""
+
+    extra_state_attributes: Any = None
+
+    def async_write_ha_state(self) -> None:
+        pass
+
+
+class _HomeAssistantError(Exception):
+    """HomeAssistantError that keeps its translation key, so tests can check which error was raised."""
+
+    def __init__(
+        self,
+        *args: Any,
+        translation_domain: str | None = None,
+        translation_key: str | None = None,
+        translation_placeholders: dict[str, str] | None = None,
+    ) -> None:
+        super().__init__(*args)
+        self.translation_domain = translation_domain
+        self.translation_key = translation_key
+        self.translation_placeholders = translation_placeholders
+
+
+class _ServiceValidationError(_HomeAssistantError):
+    """ServiceValidationError (invalid service call data)."""
+
+
+sys.modules["homeassistant.helpers.update_coordinator"].DataUpdateCoordinator = _DataUpdateCoordinator
+sys.modules["homeassistant.helpers.update_coordinator"].CoordinatorEntity = _CoordinatorEntity
+sys.modules["homeassistant.components.sensor"].SensorEntity = _SensorEntity
+sys.modules["homeassistant.core"].callback = lambda func: func
+sys.modules["homeassistant.exceptions"].HomeAssistantError = _HomeAssistantError
+sys.modules["homeassistant.exceptions"].ServiceValidationError = _ServiceValidationError
+sys.modules["homeassistant.util"].dt = SimpleNamespace(as_local=lambda value: value.astimezone())
+
+
+class FakeStore:
+    """Stand-in for homeassistant.helpers.storage.Store that counts writes."""
+
+    def __init__(self, hass: Any = None, version: int = 1, key: str = "") -> None:
+        self.key = key
+        self.data: dict[str, Any] | None = None
+        self.saves = 0
+        self.bytes_written = 0
+        self.delayed_saves = 0
+        self._data_func: Any = None
+
+    async def async_load(self) -> dict[str, Any] | None:
+        return self.data
+
+    async def async_save(self, data: dict[str, Any]) -> None:
+        # Serialize like the real Store does, so the cost is part of the measurement
+        payload = json.dumps(data)
+        self.saves += 1
+        self.bytes_written += len(payload)
+        self.data = json.loads(payload)
+
+    def async_delay_save(self, data_func: Any, delay: float = 0) -> None:
+        # The real Store coalesces delayed writes; only record the latest request
+        self.delayed_saves += 1
+        self._data_func = data_func
+
+    def flush(self) -> None:
+        """Write a pending delayed save (what HA does when the delay expires)."""
+        if self._data_func is not None:
+            self.data = json.loads(json.dumps(self._data_func()))
+            self._data_func = None
+
+
+sys.modules["homeassistant.helpers.storage"].Store = FakeStore
 
 
 @pytest.fixture
@@ -57,3 +187,128 @@ def sample_spot_prices():
         "high": 2.00,  # Høy pris
         "extreme": 5.00,  # Ekstrem pris
     }
+
+
+# =============================================================================
+# Coordinator harness - drives NettleieCoordinator without Home Assistant
+# =============================================================================
+
+
+class FakeStates:
+    """Stand-in for hass.states that counts reads."""
+
+    def __init__(self) -> None:
+        self._states: dict[str, SimpleNamespace] = {}
+        self.reads = 0
+
+    def get(self, entity_id: str | None) -> SimpleNamespace | None:
+        self.reads += 1
+        return self._states.get(entity_id) if entity_id else None
+
+    def set(self, entity_id: str, state: Any, attributes: dict[str, Any] | None = None) -> None:
+        self._states[entity_id] = SimpleNamespace(state=str(state), attributes=attributes or {})
+
+
+async def _run_inline(func: Any, *args: Any) -> Any:
+    """Stand-in for hass.async_add_executor_job (runs in the test's thread)."""
+    return func(*args)
+
+
+class CoordinatorHarness:
+    """Runs NettleieCoordinator._async_update_data on a simulated clock.
+
+    The process time zone is set to Europe/Oslo while the harness is open, so
+    naive local times convert to the right epoch seconds across DST, like in HA.
+    """
+
+    POWER_SENSOR = "sensor.power"
+    SPOT_SENSOR = "sensor.nordpool"
+
+    def __init__(self, coordinator_module: Any, start: datetime, entry_data: dict[str, Any]) -> None:
+        self.now = start
+        harness = self
+
+        class _Clock(datetime):
+            @classmethod
+            def now(cls, tz: Any = None) -> datetime:  # type: ignore[override]
+                return harness.now
+
+        self._module = coordinator_module
+        self._real_datetime = coordinator_module.datetime
+        coordinator_module.datetime = _Clock
+        self._real_tz = os.environ.get("TZ")
+        os.environ["TZ"] = "Europe/Oslo"
+        time.tzset()
+
+        self.states = FakeStates()
+        self.hass = SimpleNamespace(
+            states=self.states,
+            config=SimpleNamespace(components=set(), path=lambda *parts: os.path.join("/config", *parts)),
+            async_add_executor_job=_run_inline,
+        )
+        data = {
+            "power_sensor": self.POWER_SENSOR,
+            "spot_price_sensor": self.SPOT_SENSOR,
+            "tso": "bkk",
+            **entry_data,
+        }
+        self.entry = SimpleNamespace(data=data, entry_id="test_entry")
+        self.coordinator = coordinator_module.NettleieCoordinator(self.hass, self.entry)
+        self.store: FakeStore = self.coordinator._store
+        self.ledger_store: FakeStore = self.coordinator._ledger_store
+        # Batches of cost statistics sent to the recorder (when "recorder" is loaded)
+        self.statistics: list[list[tuple[float, int, int]]] = []
+        self.coordinator._add_cost_statistics = self.statistics.append
+        self.loop = asyncio.new_event_loop()
+
+    def set_power(self, watts: float) -> None:
+        self.states.set(self.POWER_SENSOR, watts)
+
+    def set_spot(self, nok_per_kwh: float) -> None:
+        self.states.set(self.SPOT_SENSOR, nok_per_kwh)
+
+    def tick(self, seconds: float = 60.0) -> CoordinatorSnapshot:
+        """Advance the clock and run one coordinator update."""
+        return self.update_at(self.now + timedelta(seconds=seconds))
+
+    def update_at(self, now: datetime) -> CoordinatorSnapshot:
+        """Set the clock to now (local, naive) and run one coordinator update."""
+        self.now = now
+        data: CoordinatorSnapshot = self.loop.run_until_complete(self.coordinator._async_update_data())
+        self.coordinator.data = data
+        return data
+
+    def create_entities(self) -> list[Any]:
+        """Create all sensor entities through sensor.async_setup_entry."""
+        from custom_components.stromkalkulator import sensor
+
+        entities: list[Any] = []
+        self.entry.runtime_data = self.coordinator
+        self.loop.run_until_complete(sensor.async_setup_entry(self.hass, self.entry, entities.extend))
+        return entities
+
+    def close(self) -> None:
+        self.loop.close()
+        self._module.datetime = self._real_datetime
+        if self._real_tz is None:
+            os.environ.pop("TZ", None)
+        else:
+            os.environ["TZ"] = self._real_tz
+        time.tzset()
+
+
+@pytest.fixture
+def coordinator_harness():
+    """Factory for CoordinatorHarness instances (closed after the test)."""
+    from custom_components.stromkalkulator import coordinator as coordinator_module
+
+    harnesses: list[CoordinatorHarness] = []
+
+    def _make(start: datetime | None = None, **entry_data: Any) -> CoordinatorHarness:
+        harness = CoordinatorHarness(coordinator_module, start or datetime(2026, 1, 5), entry_data)
+        harnesses.append(harness)
+        return harness
+
+    yield _make
+    for harness in harnesses:
+        harness.close()
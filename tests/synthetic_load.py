@@ -0,0 +1,297 @@
+"""Deterministic synthetic load and spot-price generator for replay tests.
+
+Produces one calendar month of power samples and 15-minute spot prices in
+Europe/Oslo local time (so DST months have 743 or 745 hours), with:
+- household profiles (base load, heating season, morning/evening peaks)
+- EV charging sessions in the evening
+- weekends and holidays (helligdager) with a later, flatter day profile
+- 15-minute spot prices with daily shape and seeded noise
+
+The same seed always produces the same month. `reference_totals` computes the
+monthly figures straight from the generated arrays, independent of the
+coordinator, so replays can be checked against it.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+from array import array
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, timedelta
+from typing import TYPE_CHECKING
+from zoneinfo import ZoneInfo
+
+from custom_components.stromkalkulator.const import (
+    ENOVA_AVGIFT,
+    HELLIGDAGER_BEVEGELIGE,
+    HELLIGDAGER_FASTE,
+    STROMSTOTTE_LEVEL,
+    STROMSTOTTE_RATE,
+    get_forbruksavgift,
+    get_mva_sats,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+OSLO = ZoneInfo("Europe/Oslo")
+PRICE_INTERVAL_S = 900  # 15-minutters spotpris
+
+
+@dataclass(frozen=True)
+class LoadProfile:
+    """Parameters for a synthetic household."""
+
+    name: str
+    base_w: float  # Grunnlast (kjøleskap, standby, varmtvann)
+    heating_w: float  # Ekstra last midt på vinteren
+    morning_w: float
+    evening_w: float
+    ev_kw: float = 0.0  # Ladeeffekt elbil (0 = ingen elbil)
+    ev_sessions_per_week: float = 0.0
+    ev_session_kwh: float = 0.0
+
+
+PROFILES: dict[str, LoadProfile] = {
+    "leilighet": LoadProfile("leilighet", base_w=250, heating_w=600, morning_w=1500, evening_w=2000),
+    "enebolig": LoadProfile("enebolig", base_w=450, heating_w=2200, morning_w=2500, evening_w=3500),
+    "enebolig_elbil": LoadProfile(
+        "enebolig_elbil",
+        base_w=450,
+        heating_w=2200,
+        morning_w=2500,
+        evening_w=3500,
+        ev_kw=7.4,
+        ev_sessions_per_week=4,
+        ev_session_kwh=25,
+    ),
+}
+
+
+@dataclass
+class SyntheticMonth:
+    """One month of generated samples (UTC epoch seconds) and 15-minute prices."""
+
+    year: int
+    month: int
+    profile: LoadProfile
+    step_s: int
+    timestamps: array  # UTC epoch seconds per sample
+    power_w: array  # Effekt per sample
+    price_start: float  # UTC epoch of the first price interval
+    prices: array  # NOK/kWh inkl. mva per 15 minutter
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def days(self) -> float:
+        return (self.timestamps[-1] + self.step_s - self.timestamps[0]) / 86400
+
+    def local_time(self, i: int) -> datetime:
+        """Naive local time of sample i (what datetime.now() returns in HA).
+
+        fold is kept, so the repeated hour in October maps back to the right epoch.
+        """
+        return datetime.fromtimestamp(self.timestamps[i], OSLO).replace(tzinfo=None)
+
+    def spot_at(self, i: int) -> float:
+        """Spot price in effect at sample i."""
+        return self.prices[int((self.timestamps[i] - self.price_start) // PRICE_INTERVAL_S)]
+
+    def write_prices(self, path: Path) -> Path:
+        """Write the prices as a price file (start in UTC, NOK/kWh), for offline replay."""
+        lines = ["start,pris"]
+        for i, price in enumerate(self.prices):
+            start = datetime.fromtimestamp(self.price_start + i * PRICE_INTERVAL_S, UTC)
+            lines.append(f"{start.isoformat()},{price:.6f}")
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        return path
+
+
+def is_holiday(day: date) -> bool:
+    """Weekend or Norwegian public holiday."""
+    return (
+        day.weekday() >= 5
+        or day.strftime("%m-%d") in HELLIGDAGER_FASTE
+        or day.strftime("%Y-%m-%d") in HELLIGDAGER_BEVEGELIGE
+    )
+
+
+def is_day_rate(local: datetime) -> bool:
+    """Dag-tariff: hverdager 06-22 utenom helligdager."""
+    return not is_holiday(local.date()) and 6 <= local.hour < 22
+
+
+def _month_bounds(year: int, month: int) -> tuple[datetime, datetime]:
+    start = datetime(year, month, 1, tzinfo=OSLO)
+    end = datetime(year + (month == 12), month % 12 + 1, 1, tzinfo=OSLO)
+    return start, end
+
+
+def _season_factor(month: int) -> float:
+    """1.0 midt på vinteren, 0.0 midt på sommeren."""
+    return (1 + math.cos((month - 1) / 12 * 2 * math.pi)) / 2
+
+
+def _generate_prices(rng: random.Random, start: datetime, end: datetime, month: int) -> array:
+    """15-minute spot prices with daily shape, weekend dip and AR(1) noise."""
+    level = 0.35 + 0.9 * _season_factor(month)
+    prices = array("d")
+    noise = 0.0
+    t = start.astimezone(UTC)
+    stop = end.astimezone(UTC)
+    while t < stop:
+        local = t.astimezone(OSLO)
+        hour = local.hour + local.minute / 60
+        shape = 1 + 0.35 * math.exp(-((hour - 8) ** 2) / 3) + 0.45 * math.exp(-((hour - 18) ** 2) / 4)
+        shape -= 0.25 * math.exp(-((hour - 3) ** 2) / 6)
+        if is_holiday(local.date()):
+            shape *= 0.85
+        noise = 0.9 * noise + rng.gauss(0, 0.08)
+        prices.append(max(-0.05, level * shape + noise))
+        t += timedelta(seconds=PRICE_INTERVAL_S)
+    return prices
+
+
+def generate_month(
+    year: int,
+    month: int,
+    profile: LoadProfile | str = "enebolig",
+    *,
+    step_s: int = 60,
+    seed: int = 0,
+) -> SyntheticMonth:
+    """Generate a deterministic month of power samples and spot prices."""
+    if isinstance(profile, str):
+        profile = PROFILES[profile]
+    rng = random.Random(f"{seed}-{year}-{month}-{profile.name}")
+    start, end = _month_bounds(year, month)
+    prices = _generate_prices(rng, start, end, month)
+
+    # EV sessions: (start_epoch, end_epoch) per local day
+    ev_sessions: list[tuple[float, float]] = []
+    if profile.ev_kw > 0:
+        day = start.date()
+        while day < end.date():
+            if rng.random() < profile.ev_sessions_per_week / 7:
+                plug_in = datetime(day.year, day.month, day.day, 17, tzinfo=OSLO) + timedelta(
+                    minutes=rng.randrange(0, 6 * 60)
+                )
+                duration_h = profile.ev_session_kwh / profile.ev_kw * rng.uniform(0.6, 1.2)
+                ev_start = plug_in.timestamp()
+                ev_sessions.append((ev_start, ev_start + duration_h * 3600))
+            day += timedelta(days=1)
+
+    season = _season_factor(month)
+    timestamps = array("d")
+    power_w = array("d")
+    first = start.timestamp()
+    last = end.timestamp()
+    ev_index = 0
+    t = first
+    while t < last:
+        local = datetime.fromtimestamp(t, OSLO)
+        hour = local.hour + local.minute / 60 + local.second / 3600
+        if is_holiday(local.date()):
+            morning = 0.8 * profile.morning_w * math.exp(-((hour - 10) ** 2) / 2)
+            midday = 0.4 * profile.evening_w * math.exp(-((hour - 14) ** 2) / 6)
+        else:
+            morning = profile.morning_w * math.exp(-((hour - 7) ** 2) / 0.6)
+            midday = 0.0
+        evening = profile.evening_w * math.exp(-((hour - 18.5) ** 2) / 2.5)
+        heating = profile.heating_w * season * (0.7 + 0.3 * math.cos((hour - 5) / 24 * 2 * math.pi))
+        power = profile.base_w + heating + morning + midday + evening + rng.gauss(0, 80)
+
+        while ev_index < len(ev_sessions) and ev_sessions[ev_index][1] <= t:
+            ev_index += 1
+        if ev_index < len(ev_sessions) and ev_sessions[ev_index][0] <= t:
+            power += profile.ev_kw * 1000
+
+        timestamps.append(t)
+        power_w.append(max(50.0, power))
+        t += step_s
+
+    return SyntheticMonth(
+        year=year,
+        month=month,
+        profile=profile,
+        step_s=step_s,
+        timestamps=timestamps,
+        power_w=power_w,
+        price_start=first,
+        prices=prices,
+    )
+
+
+def _kapasitetsledd(avg_kw: float, kapasitetstrinn: list[tuple[float, int]]) -> int:
+    for threshold, price in kapasitetstrinn:
+        if avg_kw <= threshold:
+            return price
+    return kapasitetstrinn[-1][1]
+
+
+def reference_totals(
+    data: SyntheticMonth,
+    *,
+    energiledd_dag: float,
+    energiledd_natt: float,
+    kapasitetstrinn: list[tuple[float, int]],
+    avgiftssone: str = "standard",
+    method: str = "trapezoidal",
+    price_arrays: bool = False,
+) -> dict[str, float]:
+    """Monthly figures computed directly from the generated arrays.
+
+    Uses the same convention as the coordinator: the interval from sample
+    i-1 to sample i (real elapsed time, so DST is handled correctly) is
+    integrated with the trapezoidal or left rule and booked on the tariff and
+    day of its start. It is priced at the spot price published at sample i
+    (the sensor state), or with price_arrays at the price of its start.
+    Samples start at midnight and the step divides an hour, so no interval
+    crosses a clock hour.
+    """
+    ts = data.timestamps
+    kw = [p / 1000 for p in data.power_w]
+    locals_ = [data.local_time(i) for i in range(len(ts))]
+    day_rate = [is_day_rate(t) for t in locals_]
+    if method == "left":
+        energy = [0.0] + [kw[i - 1] * (ts[i] - ts[i - 1]) / 3600 for i in range(1, len(ts))]
+    else:
+        energy = [0.0] + [(kw[i - 1] + kw[i]) / 2 * (ts[i] - ts[i - 1]) / 3600 for i in range(1, len(ts))]
+    spot = [data.spot_at(i) for i in range(len(ts))]
+    # Interval i starts at sample i-1 (interval 0 is empty)
+    day_rate = [False, *day_rate[:-1]]
+    if price_arrays:
+        spot = [0.0, *spot[:-1]]
+
+    dag_kwh = math.fsum(e for e, d in zip(energy, day_rate, strict=True) if d)
+    natt_kwh = math.fsum(e for e, d in zip(energy, day_rate, strict=True) if not d)
+
+    daily_max: dict[str, float] = {}
+    for t, p in zip(locals_, kw, strict=True):
+        key = t.strftime("%Y-%m-%d")
+        if p > daily_max.get(key, 0.0):
+            daily_max[key] = p
+    top_3 = sorted(daily_max.values(), reverse=True)[:3]
+    avg_top_3 = sum(top_3) / len(top_3)
+    kapasitet = _kapasitetsledd(avg_top_3, kapasitetstrinn)
+
+    mva = get_mva_sats(avgiftssone)
+    avgift_per_kwh = (get_forbruksavgift(avgiftssone, data.month) + ENOVA_AVGIFT) * (1 + mva)
+    total_kwh = dag_kwh + natt_kwh
+
+    return {
+        "dag_kwh": dag_kwh,
+        "natt_kwh": natt_kwh,
+        "total_kwh": total_kwh,
+        "avg_top_3_kw": avg_top_3,
+        "kapasitetsledd": kapasitet,
+        "nettleie_kr": dag_kwh * energiledd_dag + natt_kwh * energiledd_natt + kapasitet,
+        "avgifter_kr": total_kwh * avgift_per_kwh,
+        "spot_kr": math.fsum(e * s for e, s in zip(energy, spot, strict=True)),
+        "stromstotte_kr": math.fsum(
+            e * max(0.0, (s - STROMSTOTTE_LEVEL) * STROMSTOTTE_RATE) for e, s in zip(energy, spot, strict=True)
+        ),
+    }
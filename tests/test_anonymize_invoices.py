@@ -0,0 +1,51 @@
+"""Tests for the invoice anonymizer in scripts/anonymize_invoices.py.
+
+Tests coverage:
+- Longest original wins, whatever the order in the config
+- Equal-length originals give the same output in any order
+- Replaced text is not matched again
+- Originals spanning several lines are rejected with ValueError
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from anonymize_invoices import anonymize_lines, compile_replacements
+
+TEXT = "Ola Nordmann, Ola og Kari bor i Storgata 1\n"
+
+
+def test_longest_original_wins_in_any_order():
+    forward = {"Ola": "Per", "Ola Nordmann": "Per Hansen"}
+    backward = dict(reversed(forward.items()))
+    expected = "Per Hansen, Per og Kari bor i Storgata 1\n"
+    assert compile_replacements(forward)(TEXT) == expected
+    assert compile_replacements(backward)(TEXT) == expected
+
+
+def test_equal_length_ties_do_not_depend_on_order():
+    # "Ola N" and "a Nor" overlap and are the same length; the first sorted wins
+    forward = {"Ola N": "X", "a Nor": "Y"}
+    backward = dict(reversed(forward.items()))
+    assert compile_replacements(forward)(TEXT) == compile_replacements(backward)(TEXT)
+    assert compile_replacements(forward)(TEXT) == "Xordmann, Ola og Kari bor i Storgata 1\n"
+
+
+def test_replacement_is_not_matched_again():
+    anonymize = compile_replacements({"Kari": "Ola", "Ola": "Per"})
+    assert list(anonymize_lines([TEXT], anonymize)) == ["Per Nordmann, Per og Ola bor i Storgata 1\n"]
+
+
+def test_empty_config_keeps_text():
+    assert compile_replacements({})(TEXT) == TEXT
+
+
+def test_multiline_original_rejected():
+    with pytest.raises(ValueError, match="several lines"):
+        compile_replacements({"Storgata 1\n5000 Bergen": "Gate 2"})
@@ -0,0 +1,142 @@
+"""Benchmarks for the coordinator hot path.
+
+Drives NettleieCoordinator._async_update_data with a mocked hass.states at
+realistic sample rates (1 Hz and 0.5 Hz power streams) and measures:
+- storage writes and state reads per simulated hour (always run)
+- per-tick latency (pytest-benchmark)
+- allocations per tick (tracemalloc)
+
+Latency and allocations depend on the interpreter and the machine, so those
+tests only run with --benchmark-enable (see conftest.py). Latency baselines
+are stored by pytest-benchmark:
+
+    pytest tests/test_benchmark_coordinator.py --benchmark-enable --benchmark-autosave
+    pytest tests/test_benchmark_coordinator.py --benchmark-enable --benchmark-compare --benchmark-compare-fail=mean:25%
+
+Counters and allocations are compared against tests/benchmark_baseline.json.
+Regenerate it after an intended change with STROMKALKULATOR_UPDATE_BASELINE=1
+(and --benchmark-enable for the allocations). The simulated stream is 2 hours
+by default; set STROMKALKULATOR_BENCH_HOURS=744 for a full month.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+BASELINE_PATH = Path(__file__).parent / "benchmark_baseline.json"
+BENCH_HOURS = float(os.environ.get("STROMKALKULATOR_BENCH_HOURS", "2"))
+UPDATE_BASELINE = os.environ.get("STROMKALKULATOR_UPDATE_BASELINE") == "1"
+
+# Allocations are noisier than counters; allow some slack before failing
+ALLOC_TOLERANCE = 1.25
+ALLOC_SLACK_KIB = 16.0
+
+SAMPLE_RATES_HZ = [1.0, 0.5]
+START = datetime(2026, 1, 5)  # Monday
+
+
+def household_power_w(t: datetime) -> float:
+    """Deterministic household load: base load + morning/evening peaks + ripple."""
+    hour = t.hour + t.minute / 60
+    base = 450.0
+    morning = 2500.0 * math.exp(-((hour - 7.5) ** 2) / 0.5)
+    evening = 3500.0 * math.exp(-((hour - 18.0) ** 2) / 2.0)
+    ripple = 150.0 * math.sin(t.second / 60 * 2 * math.pi)
+    return base + morning + evening + ripple
+
+
+def _load_baseline() -> dict[str, dict[str, float]]:
+    if BASELINE_PATH.exists():
+        data: dict[str, dict[str, float]] = json.loads(BASELINE_PATH.read_text(encoding="utf-8"))
+        return data
+    return {}
+
+
+def _check_against_baseline(key: str, measured: dict[str, float]) -> None:
+    """Fail if any measured counter is above its stored baseline."""
+    baseline = _load_baseline()
+    if UPDATE_BASELINE:
+        baseline.setdefault(key, {}).update(measured)
+        BASELINE_PATH.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        return
+    if key not in baseline:
+        pytest.skip(f"No baseline for {key}; run with STROMKALKULATOR_UPDATE_BASELINE=1")
+    for name, value in measured.items():
+        limit = baseline[key][name]
+        if name.startswith("alloc"):
+            limit = limit * ALLOC_TOLERANCE + ALLOC_SLACK_KIB
+        assert value <= limit, f"{key}.{name} regressed: {value} > {limit}"
+
+
+def _run_stream(harness, step: float, ticks: int) -> None:
+    for _ in range(ticks):
+        harness.set_power(household_power_w(harness.now))
+        harness.tick(step)
+
+
+@pytest.mark.parametrize("rate_hz", SAMPLE_RATES_HZ)
+def test_stream_counters(coordinator_harness, rate_hz):
+    """Replay a power stream and check storage writes and state reads."""
+    harness = coordinator_harness(START)
+    harness.set_spot(1.20)
+    ticks = int(BENCH_HOURS * 3600 * rate_hz)
+    _run_stream(harness, 1 / rate_hz, ticks)
+    measured = {
+        "storage_writes_per_hour": round(harness.store.saves / (ticks / rate_hz / 3600), 1),
+        "state_reads_per_tick": round(harness.states.reads / ticks, 2),
+    }
+    _check_against_baseline(f"{rate_hz:g}hz", measured)
+
+
+@pytest.mark.parametrize("rate_hz", SAMPLE_RATES_HZ)
+def test_tick_latency(benchmark, coordinator_harness, rate_hz):
+    """Latency of a single coordinator update in a live power stream."""
+    harness = coordinator_harness(START)
+    harness.set_spot(1.20)
+    step = 1 / rate_hz
+
+    def tick() -> None:
+        harness.set_power(household_power_w(harness.now))
+        harness.tick(step)
+
+    # Warm up: first update loads storage
+    for _ in range(10):
+        tick()
+
+    benchmark(tick)
+    benchmark.extra_info["rate_hz"] = rate_hz
+    benchmark.extra_info["storage_writes"] = harness.store.saves
+
+
+@pytest.mark.parametrize("rate_hz", SAMPLE_RATES_HZ)
+def test_simulated_stream(benchmark, coordinator_harness, rate_hz):
+    """Replay a power stream and record its duration and allocations."""
+    harness = coordinator_harness(START)
+    harness.set_spot(1.20)
+    step = 1 / rate_hz
+    ticks = int(BENCH_HOURS * 3600 * rate_hz)
+
+    benchmark.pedantic(_run_stream, args=(harness, step, ticks), rounds=1, iterations=1)
+
+    # Allocations over a short window once state is warm
+    alloc_ticks = 500
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    _run_stream(harness, step, alloc_ticks)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    measured = {
+        "alloc_peak_kib": round((peak - before) / 1024, 1),
+        "alloc_retained_kib": round(max(current - before, 0) / 1024, 1),
+    }
+    benchmark.extra_info.update(measured)
+    _check_against_baseline(f"{rate_hz:g}hz", measured)
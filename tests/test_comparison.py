@@ -0,0 +1,114 @@
+"""Tests for the spot price vs Norgespris comparison (comparison.py).
+
+Tests coverage:
+- Splitting an interval at the monthly cap
+- Month and year rollover, late bookings from the previous month
+- Fixed-point totals
+- Coordinator: both regimes accumulated per interval with strømstøtte, persisted
+- Sensors for month and year to date
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+import pytest
+
+from custom_components.stromkalkulator.comparison import RegimeComparison, split_at_cap
+from custom_components.stromkalkulator.const import NORGESPRIS_INKL_MVA_STANDARD, STROMSTOTTE_LEVEL, STROMSTOTTE_RATE
+from custom_components.stromkalkulator.fixedpoint import UWH_PER_KWH
+
+
+class TestSplitAtCap:
+    """Test splitting consumption at a monthly cap."""
+
+    @pytest.mark.parametrize(
+        ("used", "kwh", "expected"),
+        [(0.0, 2.0, (2.0, 0.0)), (999.0, 2.0, (1.0, 1.0)), (1000.0, 2.0, (0.0, 2.0)), (1500.0, 2.0, (0.0, 2.0))],
+    )
+    def test_split(self, used, kwh, expected):
+        assert split_at_cap(used, kwh, 1000) == expected
+
+
+class TestRegimeComparison:
+    """Test the running month and year totals."""
+
+    def test_month_rollover_keeps_year(self):
+        comparison = RegimeComparison()
+        comparison.add("2026-01", 10.0, 12.0, 5.0)
+        comparison.add("2026-02", 1.0, 2.0, 0.5)
+        assert comparison.month == "2026-02"
+        assert comparison.month_difference_kr == pytest.approx(1.5)
+        assert comparison.year_kwh == pytest.approx(11.0)
+        assert comparison.year_difference_kr == pytest.approx(8.5)
+
+    def test_year_rollover(self):
+        comparison = RegimeComparison()
+        comparison.add("2025-12", 10.0, 12.0, 5.0)
+        comparison.roll("2026-01")
+        assert comparison.month_kwh == 0
+        assert comparison.year_kwh == 0
+
+    def test_late_booking_counts_for_year_only(self):
+        comparison = RegimeComparison()
+        comparison.add("2026-02", 1.0, 1.0, 1.0)
+        comparison.add("2026-01", 2.0, 3.0, 1.0)
+        assert comparison.month_kwh == pytest.approx(1.0)
+        assert comparison.year_kwh == pytest.approx(3.0)
+        assert comparison.year_difference_kr == pytest.approx(2.0)
+
+    def test_round_trip(self):
+        comparison = RegimeComparison()
+        comparison.add("2026-03", 4.0, 5.0, 2.0)
+        assert RegimeComparison.from_dict(comparison.as_dict()) == comparison
+        assert RegimeComparison.from_dict(None) == RegimeComparison()
+
+    def test_totals_are_fixed_point(self):
+        comparison = RegimeComparison()
+        for _ in range(100_000):
+            comparison.add("2026-01", 0.1, 0.1, 0.05)
+        assert comparison.month_uwh == 10_000 * UWH_PER_KWH
+        assert comparison.month_kwh == 10_000.0
+        assert comparison.month_difference_kr == 5_000.0
+
+
+def test_coordinator_accumulates_both_regimes(coordinator_harness):
+    """An hour at 2 kW and spot 2 NOK: spot price minus strømstøtte vs Norgespris."""
+    harness = coordinator_harness(datetime(2026, 1, 5, 12, 0))
+    harness.set_spot(2.0)
+    harness.set_power(2000)
+    for _ in range(61):
+        data = harness.tick(60)
+
+    kwh = 2.0
+    spot_kr = kwh * (2.0 - (2.0 - STROMSTOTTE_LEVEL) * STROMSTOTTE_RATE)
+    norgespris_kr = kwh * NORGESPRIS_INKL_MVA_STANDARD
+    assert data["comparison_month_kwh"] == pytest.approx(kwh)
+    assert data["comparison_month_spot_kr"] == pytest.approx(spot_kr, abs=0.01)
+    assert data["comparison_month_norgespris_kr"] == pytest.approx(norgespris_kr, abs=0.01)
+    assert data["comparison_year_difference_kr"] == pytest.approx(spot_kr - norgespris_kr, abs=0.01)
+
+    # Persisted with the coordinator's data
+    stored = harness.store.data["norgespris_comparison"]
+    assert stored["month"] == "2026-01"
+    assert isinstance(stored["year_uwh"], int)
+    assert RegimeComparison.from_dict(stored).year_kwh == pytest.approx(kwh)
+
+
+def test_comparison_sensors(coordinator_harness):
+    """Month and year sensors show the difference and what was paid."""
+    harness = coordinator_harness(datetime(2026, 1, 5, 12, 0), har_norgespris=True)
+    harness.set_spot(0.3)
+    harness.set_power(1000)
+    for _ in range(61):
+        harness.tick(60)
+    sensors = {
+        sensor._attr_translation_key: sensor
+        for sensor in harness.create_entities()
+        if sensor._attr_translation_key.startswith("norgespris_differanse")
+    }
+    month = sensors["norgespris_differanse_maaned"]
+    # 1 kWh at spot 0.30 vs Norgespris 0.50: spot price would have been 0.20 kr cheaper
+    assert month.native_value == pytest.approx(-0.2, abs=0.01)
+    assert month.extra_state_attributes["betalt_kr"] == pytest.approx(0.5, abs=0.01)
+    assert sensors["norgespris_differanse_aar"].native_value == pytest.approx(-0.2, abs=0.01)
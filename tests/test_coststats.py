@@ -0,0 +1,221 @@
+"""Tests for the hourly cost statistics for the Energy Dashboard (coststats.py).
+
+Tests coverage:
+- Hours per month across DST, the repeated hour counted once
+- Kapasitetsledd spread over the month's hours to the exact µøre
+- Incremental pushes, the month computed again when kapasitetsledd changes
+- Month change with the final kapasitetsledd, storage round trip
+- Energiledd corrected: ledger rows and sums booked again
+- Coordinator: one batch per closed hour, none without the recorder,
+  trinn change and corrected energiledd re-imported in batch
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from datetime import datetime
+
+import pytest
+
+from custom_components.stromkalkulator.coststats import CostStatistics, hourly_costs, month_bounds, row_cost
+from custom_components.stromkalkulator.fixedpoint import UORE_PER_KR, kr_to_uore
+from custom_components.stromkalkulator.ledger import CostLedger, IntervalPrices
+
+PRICES = IntervalPrices(energiledd=0.4, spot=1.0, stromstotte=0.1, forbruksavgift=0.1, enova=0.01, mva_sats=0.25)
+UORE = UORE_PER_KR
+
+
+@pytest.fixture
+def oslo():
+    """Run with local time in Europe/Oslo."""
+    previous = os.environ.get("TZ")
+    os.environ["TZ"] = "Europe/Oslo"
+    time.tzset()
+    yield
+    if previous is None:
+        os.environ.pop("TZ", None)
+    else:
+        os.environ["TZ"] = previous
+    time.tzset()
+
+
+def _ts(*args: int) -> float:
+    return datetime(*args).timestamp()
+
+
+def _share(kapasitetsledd: int, position: int, hours: int) -> int:
+    total = kapasitetsledd * UORE
+    return total * (position + 1) // hours - total * position // hours
+
+
+class TestHourlyCosts:
+    """Test the cost per hour."""
+
+    def test_hours_per_month(self, oslo):
+        for month, hours in (("2026-01", 744), ("2026-02", 672), ("2026-03", 743), ("2026-10", 745)):
+            start, end = month_bounds(month)
+            assert round((end - start) / 3600) == hours
+        assert month_bounds("2026-12")[1] == _ts(2027, 1, 1)
+
+    def test_kapasitetsledd_sums_exactly(self, oslo):
+        start, end = month_bounds("2026-10")
+        costs = list(hourly_costs({}, "2026-10", start, end, 415))
+        assert len(costs) == 745
+        assert sum(cost for _, cost in costs) == 415 * UORE
+        assert [ts for ts, _ in costs[:2]] == [start, start + 3600]
+
+    def test_repeated_hour_counted_once(self, oslo):
+        ledger = CostLedger("2026-10")
+        ledger.add(datetime(2026, 10, 25, 2, 30), False, 2.0, PRICES)
+        start, end = month_bounds("2026-10")
+        costs = dict(hourly_costs(ledger.rows, "2026-10", start, end, 0))
+        # 02:00-03:00 local time twice: 00:00 and 01:00 UTC
+        first = _ts(2026, 10, 25, 2, 0)
+        assert costs[first] == row_cost(ledger.rows["2026-10-25T02"])
+        assert costs[first + 3600] == 0
+        assert sum(costs.values()) == costs[first]
+
+    def test_row_cost(self):
+        ledger = CostLedger("2026-01")
+        ledger.add(datetime(2026, 1, 5, 10, 0), True, 2.0, PRICES)
+        # Strømpris + energiledd + avgifter inkl. mva - strømstøtte
+        assert row_cost(ledger.rows["2026-01-05T10"]) == kr_to_uore(2.0 * (1.0 + 0.4 + 0.11 * 1.25 - 0.1))
+
+
+class TestCostStatistics:
+    """Test what is pushed and when."""
+
+    def test_incremental_then_restart(self, oslo):
+        ledger = CostLedger("2026-01")
+        ledger.add(datetime(2026, 1, 1, 1, 0), False, 3.0, PRICES)
+        kapasitetsledd = {"2026-01": 415}
+        statistics = CostStatistics("2026-01")
+
+        first = statistics.collect(_ts(2026, 1, 1, 3, 10), {"2026-01": ledger}.get, kapasitetsledd.get)
+        assert [ts for ts, _, _ in first] == [_ts(2026, 1, 1, hour) for hour in range(3)]
+        assert first[1][1] == row_cost(ledger.rows["2026-01-01T01"]) + _share(415, 1, 744)
+        assert not statistics.due(_ts(2026, 1, 1, 3, 50))
+        assert statistics.collect(_ts(2026, 1, 1, 3, 50), {"2026-01": ledger}.get, kapasitetsledd.get) == []
+
+        second = statistics.collect(_ts(2026, 1, 1, 5, 0), {"2026-01": ledger}.get, kapasitetsledd.get)
+        assert [ts for ts, _, _ in second] == [_ts(2026, 1, 1, 3), _ts(2026, 1, 1, 4)]
+        assert second[0][2] == first[-1][2] + second[0][1]
+
+        # A higher trinn: the month is computed again from its first hour
+        kapasitetsledd["2026-01"] = 600
+        third = statistics.collect(_ts(2026, 1, 1, 6, 0), {"2026-01": ledger}.get, kapasitetsledd.get)
+        assert len(third) == 6
+        assert third[0] == (_ts(2026, 1, 1), _share(600, 0, 744), _share(600, 0, 744))
+        assert third[-1][2] == sum(cost for _, cost, _ in third)
+
+    def test_month_change_with_final_kapasitetsledd(self, oslo):
+        statistics = CostStatistics("2026-01")
+        trinn = {"2026-01": 415, "2026-02": 250}
+        statistics.collect(_ts(2026, 1, 31, 23, 30), {}.get, trinn.get)
+        # January closed on a higher trinn than it was pushed with
+        trinn["2026-01"] = 600
+        batch = statistics.collect(_ts(2026, 2, 1, 1, 0), {}.get, trinn.get)
+        assert len(batch) == 744 + 1
+        assert batch[743][2] == 600 * UORE
+        assert batch[-1] == (_ts(2026, 2, 1), _share(250, 0, 672), 600 * UORE + _share(250, 0, 672))
+        assert statistics.month == "2026-02"
+        assert statistics.base_uore == 600 * UORE
+
+    def test_month_no_longer_measured_keeps_kapasitetsledd(self, oslo):
+        statistics = CostStatistics("2026-01")
+        statistics.collect(_ts(2026, 1, 1, 2, 0), {}.get, {"2026-01": 415}.get)
+        statistics.collect(_ts(2026, 1, 1, 3, 0), {}.get, {}.get)
+        assert statistics.kapasitetsledd == 415
+        assert statistics.sum_uore == sum(_share(415, hour, 744) for hour in range(3))
+
+    def test_storage_round_trip(self, oslo):
+        statistics = CostStatistics("2026-01")
+        statistics.collect(_ts(2026, 1, 2, 0, 0), {}.get, {"2026-01": 155}.get)
+        restored = CostStatistics.from_dict(statistics.as_dict(), "2026-03")
+        assert restored.as_dict() == statistics.as_dict()
+        assert CostStatistics.from_dict(None, "2026-03").next_ts == _ts(2026, 3, 1)
+
+
+def test_reprice_energiledd():
+    ledger = CostLedger("2026-01")
+    ledger.add(datetime(2026, 1, 5, 10, 0), True, 2.0, PRICES)
+    ledger.add(datetime(2026, 1, 5, 23, 0), False, 1.0, PRICES)
+    mva = ledger.sums["mva"]
+    changes = ledger.reprice_energiledd(0.5, 0.4, 0.25)
+    # Only the day hour changed: 2 kWh * 0.1 kr more, of which 1/5 mva
+    assert changes == [("2026-01-05T10", (0, 0, kr_to_uore(0.2), 0, 0, 0, 0, 0, 0, kr_to_uore(0.04)))]
+    assert ledger.sums["energiledd_dag"] == kr_to_uore(1.0)
+    assert ledger.sums["mva"] == mva + kr_to_uore(0.04)
+    assert ledger.rows["2026-01-05T10"][2] == pytest.approx(1.0)
+
+
+def _run(harness, hours: int) -> None:
+    for _ in range(hours * 6):
+        harness.tick(600)
+
+
+def test_coordinator_pushes_closed_hours(coordinator_harness):
+    start = datetime(2026, 1, 5, 10, 0)
+    harness = coordinator_harness(start)
+    harness.set_power(6000)
+    harness.set_spot(1.0)
+    harness.update_at(start)
+    _run(harness, 1)
+    # No recorder: nothing is sent
+    assert harness.statistics == []
+
+    harness.hass.config.components.add("recorder")
+    harness.tick(600)
+    (batch,) = harness.statistics
+    # Every hour of the month up to 11:00, with the 415 kr trinn (6 kW)
+    assert len(batch) == 4 * 24 + 11
+    assert batch[0][0] == datetime(2026, 1, 1).timestamp()
+    hour = batch[-1]
+    row = harness.coordinator._ledger.rows["2026-01-05T10"]
+    assert hour[1] == row_cost(row) + _share(415, 4 * 24 + 10, 744)
+    assert hour[2] == sum(cost for _, cost, _ in batch)
+
+    # One batch per closed hour
+    _run(harness, 1)
+    assert len(harness.statistics) == 2
+    assert len(harness.statistics[1]) == 1
+
+    # Higher peak, higher trinn: the month is sent again
+    harness.set_power(12000)
+    _run(harness, 1)
+    last = harness.statistics[-1]
+    assert last[0][0] == datetime(2026, 1, 1).timestamp()
+    assert len(last) == 4 * 24 + 13
+    assert last[0][1] == _share(600, 0, 744)
+
+
+def test_coordinator_corrected_energiledd(coordinator_harness):
+    start = datetime(2026, 1, 5, 10, 0)
+    first = coordinator_harness(start)
+    first.hass.config.components.add("recorder")
+    first.set_power(6000)
+    first.set_spot(1.0)
+    first.update_at(start)
+    _run(first, 2)
+    first.ledger_store.flush()
+    bookings = first.coordinator.data.today_bookings
+
+    second = coordinator_harness(first.now, energiledd_dag=0.5)
+    second.hass.config.components.add("recorder")
+    second.store.data = first.store.data
+    second.ledger_store.data = first.ledger_store.data
+    second.set_power(0)
+    second.set_spot(1.0)
+    data = second.update_at(second.now)
+
+    assert data.monthly_energiledd_dag_kr == pytest.approx(12 * 0.5, abs=0.01)
+    assert data.today_energiledd_kr == pytest.approx(12 * 0.5, abs=0.01)
+    assert data.today_bookings == bookings
+    # The month is imported again at the corrected energiledd
+    (batch,) = second.statistics
+    assert batch[0][0] == datetime(2026, 1, 1).timestamp()
+    row = second.coordinator._ledger.rows["2026-01-05T10"]
+    assert batch[-2][1] == row_cost(row) + _share(415, 4 * 24 + 10, 744)
+    second.ledger_store.flush()
+    assert second.ledger_store.data["energiledd"][0] == 0.5
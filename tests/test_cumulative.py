@@ -0,0 +1,122 @@
+"""Tests for the cumulative cost counters (cumulative.py).
+
+Tests coverage:
+- Booked ledger sums added per component, total after strømstøtte
+- Kapasitetsledd added when the month closes, and what a late booking raises it by
+- Storage round trip
+- Coordinator: counters follow the ledger exactly and never fall when the
+  spot price changes, kapasitetsledd at the month change, persisted
+- Sensors and state classes
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+import pytest
+
+from custom_components.stromkalkulator.cumulative import COMPONENTS, CumulativeCost
+from custom_components.stromkalkulator.fixedpoint import UORE_PER_KR, uore_to_kr
+from custom_components.stromkalkulator.ledger import CostLedger, IntervalPrices
+
+PRICES = IntervalPrices(energiledd=0.4, spot=1.0, stromstotte=0.1, forbruksavgift=0.1, enova=0.01, mva_sats=0.25)
+
+
+class TestCumulativeCost:
+    """Test the counters."""
+
+    def test_add_booked(self):
+        ledger = CostLedger("2026-01")
+        cumulative = CumulativeCost()
+        cumulative.add(ledger.add(datetime(2026, 1, 5, 10, 0), True, 2.0, PRICES))
+        cumulative.add(ledger.add(datetime(2026, 1, 5, 23, 0), False, 1.0, PRICES))
+        cumulative.add(ledger.add(datetime(2026, 1, 5, 23, 0), False, 0.0, PRICES))
+        sums = ledger.sums
+        assert cumulative.energiledd_uore == sums["energiledd_dag"] + sums["energiledd_natt"]
+        assert cumulative.spot_uore == sums["spot"]
+        assert cumulative.avgifter_uore == sums["forbruksavgift"] + sums["enova"]
+        assert cumulative.stromstotte_uore == sums["stromstotte"]
+        assert cumulative.total_kr == pytest.approx(3.0 * (0.4 + 1.0 + 0.11 * 1.25 - 0.1))
+
+    def test_close_month(self):
+        cumulative = CumulativeCost()
+        cumulative.close_month("2026-01", 415)
+        assert cumulative.nettleie_kr == 415
+        # A late booking raised January's trinn
+        cumulative.close_month("2026-01", 600)
+        cumulative.close_month("2026-01", 415)
+        assert cumulative.kapasitetsledd_uore == 600 * UORE_PER_KR
+        cumulative.close_month("2026-02", 250)
+        cumulative.close_month("2026-01", 770)
+        assert cumulative.nettleie_kr == 850
+        assert cumulative.total_kr == 850
+
+    def test_storage_round_trip(self):
+        cumulative = CumulativeCost(energiledd_uore=5, spot_uore=-3, stromstotte_uore=1)
+        cumulative.close_month("2026-01", 155)
+        assert CumulativeCost.from_dict(cumulative.as_dict()) == cumulative
+        assert CumulativeCost.from_dict(None) == CumulativeCost()
+
+
+def test_coordinator_counts_booked_cost(coordinator_harness):
+    start = datetime(2026, 1, 5, 10, 0)
+    harness = coordinator_harness(start)
+    harness.set_power(6000)
+    harness.set_spot(1.0)
+    harness.update_at(start)
+    previous = 0.0
+    for spot in (1.0, 3.0, 0.5, 2.0):
+        harness.set_spot(spot)
+        for _ in range(3):
+            data = harness.tick(600)
+            # The month total is recomputed; the counter only adds what was booked
+            assert data.cumulative_total_kr >= previous
+            previous = data.cumulative_total_kr
+
+    sums = harness.coordinator._ledger.sums
+    assert data.cumulative_strompris_kr == uore_to_kr(sums["spot"])
+    assert data.cumulative_stromstotte_kr == uore_to_kr(sums["stromstotte"])
+    assert data.cumulative_nettleie_kr == uore_to_kr(sums["energiledd_dag"] + sums["energiledd_natt"])
+    # The month total is nettleie and avgifter after strømstøtte, without strømpris
+    assert data.cumulative_total_kr == pytest.approx(
+        data.monthly_total_kr - data.kapasitetsledd + data.cumulative_strompris_kr, abs=1e-6
+    )
+
+    # Persisted with the coordinator's data
+    restarted = coordinator_harness(harness.now)
+    restarted.store.data = harness.store.data
+    restarted.set_power(0)
+    restarted.set_spot(1.0)
+    assert restarted.update_at(harness.now).cumulative_total_kr == data.cumulative_total_kr
+
+
+def test_coordinator_adds_kapasitetsledd_at_month_change(coordinator_harness):
+    start = datetime(2026, 1, 31, 22, 0)
+    harness = coordinator_harness(start)
+    harness.set_power(6000)
+    harness.set_spot(1.0)
+    harness.update_at(start)
+    for _ in range(12):
+        before = harness.tick(600)
+        if harness.now.month == 2:
+            break
+    # Two hours booked into January (a Saturday), then its 5-10 kW trinn when it closes
+    assert before.cumulative_nettleie_kr == pytest.approx(
+        12 * harness.coordinator.energiledd_natt + harness.coordinator._get_kapasitetsledd(6.0)[0], abs=0.01
+    )
+
+
+def test_sensors(coordinator_harness):
+    from custom_components.stromkalkulator.sensor import SensorStateClass
+
+    harness = coordinator_harness(datetime(2026, 1, 5, 10, 0))
+    harness.set_power(3000)
+    harness.set_spot(1.0)
+    harness.update_at(harness.now)
+    data = harness.tick(600)
+    sensors = {sensor._attr_translation_key: sensor for sensor in harness.create_entities()}
+    for component in COMPONENTS:
+        sensor = sensors[f"akkumulert_{component}"]
+        assert sensor.native_value == round(getattr(data, f"cumulative_{component}_kr"), 2)
+        expected = SensorStateClass.TOTAL if component in ("strompris", "total") else SensorStateClass.TOTAL_INCREASING
+        assert sensor._attr_state_class == expected
@@ -0,0 +1,146 @@
+"""Tests for the month-end forecast (forecast.py).
+
+Tests coverage:
+- Energy and peak from each hour to midnight of a measured day
+- Measured days by weekday, all days when a weekday has too few
+- Simulated bill and kapasitetstrinn: exact with identical days, certain
+  trinn when the past peaks decide it, reproducible within the hour
+- Coordinator: no forecast without measured days, the days after today
+  simulated once a day, sensor and attributes
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime
+
+import pytest
+
+from custom_components.stromkalkulator.forecast import (
+    DayProfile,
+    DaySample,
+    MonthSimulation,
+    measured_days,
+    trinn_ranges,
+)
+from custom_components.stromkalkulator.monthstate import MonthState
+
+TRINN = [(2.0, 100), (5.0, 200), (10.0, 300), (float("inf"), 500)]
+EVENING = [1.0] * 18 + [3.0] + [1.0] * 5
+
+
+def _day(hourly: list[float] = EVENING, peak_kw: float = 3.5) -> DaySample:
+    return DaySample.from_hours(hourly, peak_kw)
+
+
+class TestDaySample:
+    """Test what is left of a measured day."""
+
+    def test_rest_of_day(self):
+        sample = _day()
+        assert sample.rest_kwh[0] == 26.0
+        assert sample.rest_kwh[19] == 5.0
+        assert sample.rest_kwh[24] == 0.0
+        # The peak falls in the hour that uses the most (18)
+        assert sample.rest_peak_kw[0] == 3.5
+        assert sample.rest_peak_kw[18] == 3.5
+        assert sample.rest_peak_kw[19] == 1.0
+
+    def test_measured_days(self):
+        month = MonthState("2026-02")
+        for day in (2, 3, 5):
+            for hour in range(24):
+                month.add_energy(datetime(2026, 2, day, hour), True, 1.0)
+            month.add_peak(day, 2.0)
+        days = list(measured_days(month, before_day=5))
+        # 2 and 3 February 2026 are a Monday and a Tuesday; the 5th is not before day 5
+        assert [weekday for weekday, _ in days] == [0, 1]
+        assert days[0][1].rest_kwh[0] == 24.0
+
+    def test_pool_falls_back_to_all_days(self):
+        monday, tuesday = _day(peak_kw=2.0), _day(peak_kw=4.0)
+        profile = DayProfile([(0, monday), (0, monday), (1, tuesday)])
+        assert profile.pool(0) == [monday, monday]
+        assert profile.pool(1) == [monday, monday, tuesday]
+
+
+class TestMonthSimulation:
+    """Test the simulated month."""
+
+    def test_identical_days_give_exact_bill(self):
+        profile = DayProfile([(weekday, _day()) for weekday in range(7)])
+        simulation = MonthSimulation(profile, date(2026, 2, 10), 28, [3.0] * 9, simulations=500)
+        forecast = simulation.forecast(datetime(2026, 2, 10, 12, 30), 3.5, 250.0, 400.0, 1.5, TRINN)
+        # Rest of today: half of hour 12, then hours 13-23, then 18 days of 26 kWh
+        remaining = 0.5 + 13.0 + 18 * 26.0
+        assert forecast.kwh == pytest.approx(250.0 + remaining)
+        # Three peaks of 3.5 kW: the 2-5 kW trinn
+        assert forecast.bill_kr == pytest.approx(400.0 + remaining * 1.5 + 200)
+        assert forecast.bill_low_kr == forecast.bill_high_kr == forecast.bill_kr
+        assert forecast.trinn_nummer == 2
+        assert forecast.trinn_probabilities == (0.0, 1.0, 0.0, 0.0)
+        assert forecast.simulations == 500
+
+    def test_past_peaks_decide_the_trinn(self):
+        profile = DayProfile([(weekday, _day(peak_kw=peak)) for weekday in range(7) for peak in (1.0, 4.0)])
+        simulation = MonthSimulation(profile, date(2026, 2, 10), 28, [12.0, 11.0, 13.0, 2.0])
+        forecast = simulation.forecast(datetime(2026, 2, 10, 8, 0), 0.0, 100.0, 150.0, 1.5, TRINN)
+        assert forecast.trinn_nummer == 4
+        assert forecast.trinn_probabilities == (0.0, 0.0, 0.0, 1.0)
+
+    def test_uncertain_trinn_and_reproducible(self):
+        profile = DayProfile([(weekday, _day(peak_kw=peak)) for weekday in range(7) for peak in (1.0, 4.0, 8.0)])
+        # Today and two more days left: their peaks decide the trinn
+        now = datetime(2026, 2, 26, 0, 0)
+        first = MonthSimulation(profile, now.date(), 28, [1.0] * 25).forecast(now, 0.0, 100.0, 150.0, 1.5, TRINN)
+        assert sum(first.trinn_probabilities) == pytest.approx(1.0)
+        assert max(first.trinn_probabilities) < 1.0
+        assert first.bill_low_kr <= first.bill_kr <= first.bill_high_kr
+        assert first.trinn_probabilities[first.trinn_nummer - 1] == max(first.trinn_probabilities)
+        # Same day and hour, same forecast
+        again = MonthSimulation(profile, now.date(), 28, [1.0] * 25).forecast(now, 0.0, 100.0, 150.0, 1.5, TRINN)
+        assert again == first
+
+    def test_key_for(self):
+        assert MonthSimulation.key_for(date(2026, 2, 3), [2.0, 0.0]) == (date(2026, 2, 3), (2.0, 0.0, 0.0))
+        assert MonthSimulation.key_for(date(2026, 2, 5), [1.0, 5.0, 3.0, 4.0])[1] == (5.0, 4.0, 3.0)
+
+    def test_trinn_ranges(self):
+        assert trinn_ranges(TRINN) == ["0-2 kW", "2-5 kW", "5-10 kW", ">10 kW"]
+
+
+def test_coordinator_forecast(coordinator_harness):
+    start = datetime(2026, 1, 5, 0, 0)
+    harness = coordinator_harness(start)
+    harness.set_power(3000)
+    harness.set_spot(1.0)
+    data = harness.update_at(start)
+    # Nothing measured yet
+    assert data.forecast_bill_kr is None
+    assert data.forecast_trinn_probabilities == ()
+
+    for _ in range(24 * 6 + 1):
+        data = harness.tick(600)
+    coordinator = harness.coordinator
+    simulation = coordinator._simulation
+    assert simulation is not None
+    assert data.forecast_bill_kr is not None
+    assert data.forecast_trinn_nummer == 2
+    # A steady 3 kW from 5 January: every simulated day is 72 kWh
+    assert data.forecast_kwh == pytest.approx(27 * 72, rel=0.01)
+    assert data.forecast_bill_kr > data.monthly_total_kr
+
+    # The days after today are simulated once a day, the rest of today every hour
+    for _ in range(6):
+        data = harness.tick(600)
+    assert coordinator._simulation is simulation
+    for _ in range(24 * 6):
+        harness.tick(600)
+    assert coordinator._simulation is not simulation
+
+    sensor = next(sensor for sensor in harness.create_entities() if sensor._attr_translation_key == "prognose_maaned")
+    data = coordinator.data
+    assert sensor.native_value == round(data.forecast_bill_kr, 2)
+    attributes = sensor.extra_state_attributes
+    assert attributes["kapasitetstrinn"] == 2
+    assert attributes["sannsynlighet_trinn"] == {"2 (2-5 kW)": 100.0}
+    assert attributes["simuleringer"] == 2000
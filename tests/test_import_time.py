@@ -0,0 +1,73 @@
+"""Import-time budget for the integration package.
+
+Home Assistant imports the package (and platforms such as diagnostics and
+repairs) on paths that never touch the TSO table or the sensor entities.
+These tests run a fresh interpreter with `python -X importtime` and fail if
+the heavy modules sneak back into the cold import or the budget is exceeded.
+
+Run with: pytest tests/test_import_time.py -v
+"""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).parent.parent
+
+# Cumulative cold-import budget in microseconds (Home Assistant is mocked,
+# so this measures our own modules only). Today it is well under 10 ms.
+IMPORT_BUDGET_US = 25_000
+
+# Modules that must only load once a config entry is actually set up
+HEAVY_MODULES = ("stromkalkulator.tso", "stromkalkulator.sensor", "stromkalkulator.coordinator")
+
+
+def _importtime(module: str) -> dict[str, int]:
+    """Import module in a fresh interpreter and return {module: cumulative_us}."""
+    code = f"import tests.conftest; import {module}"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, _self_us, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|").split("|"))
+        timings[name] = int(cumulative_us)
+    return timings
+
+
+@pytest.mark.parametrize("module", ["stromkalkulator", "stromkalkulator.diagnostics", "stromkalkulator.repairs"])
+def test_heavy_modules_not_imported(module):
+    """Package, diagnostics and repairs import without the TSO table or sensors."""
+    timings = _importtime(module)
+    assert module in timings
+    for heavy in HEAVY_MODULES:
+        assert heavy not in timings, f"{module} pulls in {heavy}"
+
+
+def test_const_tso_list_is_lazy():
+    """const.TSO_LIST is still available, but tso.py loads on first access."""
+    code = (
+        "import sys, tests.conftest; import stromkalkulator.const as c; "
+        "assert 'stromkalkulator.tso' not in sys.modules; "
+        "assert 'bkk' in c.TSO_LIST; "
+        "assert 'stromkalkulator.tso' in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, check=True)
+
+
+def test_cold_import_within_budget():
+    """Cold import of the package stays within the budget."""
+    timings = _importtime("stromkalkulator.diagnostics")
+    assert timings["stromkalkulator"] < IMPORT_BUDGET_US, (
+        f"Cold import took {timings['stromkalkulator']} us (budget {IMPORT_BUDGET_US} us)"
+    )
@@ -0,0 +1,200 @@
+"""Tests for the consumption export importer (importer.py).
+
+Tests coverage:
+- Elhub/grid-company CSV layouts (delimiter, decimal comma, preamble, 15-minute rows)
+- Time zone and DST (repeated and skipped hour, offsets, UTC exports)
+- XLSX (shared strings, Excel date serials)
+- Rows are streamed (a generator is consumed lazily)
+- Coordinator: import priced into history, compared with measured months, used for reconciliation
+"""
+
+from __future__ import annotations
+
+import zipfile
+from datetime import UTC, datetime, timedelta
+from itertools import islice
+
+import pytest
+
+from custom_components.stromkalkulator.importer import (
+    TIMESTAMPS_UTC,
+    ConsumptionImportError,
+    ImportStats,
+    hourly,
+    parse_rows,
+    read_consumption,
+)
+from custom_components.stromkalkulator.reconcile import Invoice
+
+ELHUB_CSV = """Målepunkt-ID;707057500000000000
+Periode;01.01.2026 - 02.01.2026
+
+Fra;Til;KWH 60 Forbruk;Kvalitet
+01.01.2026 00:00;01.01.2026 01:00;1,250;Målt
+01.01.2026 01:00;01.01.2026 02:00;0,750;Målt
+"""
+
+
+def _utc(*args: int) -> datetime:
+    return datetime(*args, tzinfo=UTC)
+
+
+class TestCsv:
+    """Test CSV exports."""
+
+    def test_elhub_layout(self, tmp_path):
+        path = tmp_path / "elhub.csv"
+        path.write_text(ELHUB_CSV, encoding="utf-8")
+        stats = ImportStats()
+        rows = list(read_consumption(path, stats=stats))
+        # Oslo is UTC+1 in January
+        assert rows == [(_utc(2025, 12, 31, 23), 1.25), (_utc(2026, 1, 1, 0), 0.75)]
+        assert stats.rows == 2
+        assert stats.months == {"2025-12", "2026-01"}
+        assert stats.kwh == pytest.approx(2.0)
+
+    def test_comma_separated_iso(self, tmp_path):
+        path = tmp_path / "nettselskap.csv"
+        path.write_text("Tidspunkt,Forbruk (kWh)\n2026-01-05T12:00:00+01:00,2.5\n", encoding="utf-8")
+        assert list(read_consumption(path)) == [(_utc(2026, 1, 5, 11), 2.5)]
+
+    def test_quarter_hours_summed_per_hour(self):
+        rows = [["Fra", "Volum"]] + [[f"05.01.2026 12:{m:02d}", "0,5"] for m in (0, 15, 30, 45)]
+        rows.append(["05.01.2026 13:00", "1"])
+        assert list(hourly(parse_rows(rows))) == [(_utc(2026, 1, 5, 11), 2.0), (_utc(2026, 1, 5, 12), 1.0)]
+
+    def test_utc_export(self):
+        rows = [["Start", "kWh"], ["2026-01-05 12:00", "1"]]
+        assert list(parse_rows(rows, timestamps=TIMESTAMPS_UTC)) == [(_utc(2026, 1, 5, 12), 1.0)]
+
+    def test_bad_values_are_skipped(self):
+        stats = ImportStats()
+        rows = [["Fra", "kWh"], ["05.01.2026 12:00", "-"], ["ikke en dato", "1"], ["05.01.2026 13:00", "1 234,5"]]
+        assert list(parse_rows(rows, stats=stats)) == [(_utc(2026, 1, 5, 12), 1234.5)]
+        assert stats.skipped == 2
+
+    def test_no_header(self):
+        with pytest.raises(ConsumptionImportError):
+            list(parse_rows([["a", "b"], ["1", "2"]]))
+
+    def test_rows_are_streamed(self):
+        def endless():
+            yield ["Fra", "kWh"]
+            start = datetime(2026, 1, 5)
+            for i in range(10**9):
+                yield [(start + timedelta(hours=i)).strftime("%d.%m.%Y %H:%M"), "1"]
+
+        assert len(list(islice(hourly(parse_rows(endless())), 5))) == 5
+
+
+class TestDst:
+    """Test DST handling for local timestamps."""
+
+    def test_repeated_hour_by_order(self):
+        rows = [["Fra", "kWh"]] + [[f"25.10.2026 {h}:00", "1"] for h in ("01", "02", "02", "03")]
+        starts = [start for start, _ in parse_rows(rows)]
+        assert starts == [_utc(2026, 10, 24, 23), _utc(2026, 10, 25, 0), _utc(2026, 10, 25, 1), _utc(2026, 10, 25, 2)]
+
+    def test_skipped_hour(self):
+        stats = ImportStats()
+        rows = [["Fra", "kWh"]] + [[f"29.03.2026 {h}:00", "1"] for h in ("01", "02", "03")]
+        starts = [start for start, _ in parse_rows(rows, stats=stats)]
+        assert starts == [_utc(2026, 3, 29, 0), _utc(2026, 3, 29, 1)]
+        assert stats.skipped == 1
+
+    def test_other_timezone(self):
+        rows = [["Fra", "kWh"], ["05.01.2026 12:00", "1"]]
+        assert list(parse_rows(rows, timezone="Europe/London")) == [(_utc(2026, 1, 5, 12), 1.0)]
+
+
+def _write_xlsx(path, rows):
+    """Write a minimal XLSX with shared strings for text cells."""
+    ns = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+    shared: list[str] = []
+    xml_rows = []
+    for r, row in enumerate(rows, 1):
+        cells = []
+        for c, value in enumerate(row):
+            ref = f"{chr(ord('A') + c)}{r}"
+            if isinstance(value, str):
+                shared.append(value)
+                cells.append(f'<c r="{ref}" t="s"><v>{len(shared) - 1}</v></c>')
+            else:
+                cells.append(f'<c r="{ref}"><v>{value}</v></c>')
+        xml_rows.append(f'<row r="{r}">{"".join(cells)}</row>')
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr(
+            "xl/worksheets/sheet1.xml",
+            f'<worksheet xmlns="{ns}"><sheetData>{"".join(xml_rows)}</sheetData></worksheet>',
+        )
+        strings = "".join(f"<si><t>{s}</t></si>" for s in shared)
+        archive.writestr("xl/sharedStrings.xml", f'<sst xmlns="{ns}">{strings}</sst>')
+
+
+class TestXlsx:
+    """Test XLSX exports."""
+
+    def test_date_serials_and_shared_strings(self, tmp_path):
+        path = tmp_path / "forbruk.xlsx"
+        # 46027.5 = 2026-01-05 12:00
+        _write_xlsx(
+            path,
+            [["Fra dato", "Til dato", "Forbruk kWh"], [46027.5, 46027.541666, 2.25], ["05.01.2026 13:00", "", "1,5"]],
+        )
+        assert list(read_consumption(path)) == [(_utc(2026, 1, 5, 11), 2.25), (_utc(2026, 1, 5, 12), 1.5)]
+
+    def test_not_a_zip(self, tmp_path):
+        path = tmp_path / "forbruk.xlsx"
+        path.write_text("nope")
+        with pytest.raises(ConsumptionImportError):
+            list(read_consumption(path))
+
+
+class TestCoordinatorImport:
+    """Test importing into the coordinator's history store."""
+
+    def _export(self, tmp_path, start: datetime, hours: int, kwh: float = 2.0):
+        path = tmp_path / "elhub.csv"
+        lines = ["Fra;Til;KWH 60 Forbruk"]
+        for i in range(hours):
+            t = start + timedelta(hours=i)
+            value = f"{kwh:.3f}".replace(".", ",")
+            lines.append(f"{t:%d.%m.%Y %H:%M};{t + timedelta(hours=1):%d.%m.%Y %H:%M};{value}")
+        path.write_text("\n".join(lines), encoding="utf-8")
+        return path
+
+    def test_import_to_history_and_reconcile(self, coordinator_harness, tmp_path):
+        harness = coordinator_harness(datetime(2026, 1, 5, 12, 0))
+        coordinator = harness.coordinator
+        path = self._export(tmp_path, datetime(2025, 12, 1), 31 * 24)
+        result = harness.loop.run_until_complete(
+            coordinator.async_import_consumption(str(path), "Europe/Oslo", "local")
+        )
+
+        assert result["months"] == {"2025-12": {"hours": 744, "kwh": pytest.approx(1488.0)}}
+        assert result["comparison"] == []
+        assert "2025-12" in coordinator._history_store.data["months"]
+
+        invoice = Invoice("2025-12", energiledd_dag_kwh=0.0, kapasitet_kr=155)
+        reconciliation = harness.loop.run_until_complete(coordinator.async_reconcile_invoice(invoice))
+        assert reconciliation is not None
+        assert reconciliation.line("kapasitet_kr").diff == 0
+        # 23 weekdays minus 1. and 2. juledag, 16 day hours each
+        assert reconciliation.line("energiledd_dag_kwh").calculated == pytest.approx(21 * 16 * 2.0)
+
+    def test_import_compared_with_measured_month(self, coordinator_harness, tmp_path):
+        harness = coordinator_harness(datetime(2026, 1, 5, 12, 0))
+        harness.set_spot(1.0)
+        harness.set_power(2000)
+        for _ in range(61):
+            harness.tick(60)
+
+        path = self._export(tmp_path, datetime(2026, 1, 5, 12, 0), 1)
+        result = harness.loop.run_until_complete(
+            harness.coordinator.async_import_consumption(str(path), "Europe/Oslo", "local")
+        )
+        assert [c["month"] for c in result["comparison"]] == ["2026-01"]
+        lines = {line["line"]: line for line in result["comparison"][0]["lines"]}
+        assert "stromstotte_kr" not in lines
+        # 2 kW measured for an hour vs 2 kWh in the export
+        assert lines["energiledd_dag_kwh"]["diff"] == pytest.approx(0, abs=0.05)
@@ -0,0 +1,58 @@
+"""Tests for the invoice parser in scripts/ingest_invoices.py.
+
+Tests coverage:
+- The anonymized invoices in docs/fakturaer/ parse to the committed fixtures
+- Numbers with space as thousands separator, amount taken last on the line
+- Summary lines without a quantity are ignored, strømstønad made positive
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from ingest_invoices import parse_invoice, to_float  # noqa: E402
+
+FIXTURES = Path(__file__).parent / "fixtures" / "fakturaer"
+
+
+@pytest.mark.parametrize("name", sorted(path.stem for path in FIXTURES.glob("*.json")))
+def test_anonymized_invoice_matches_fixture(name):
+    fixture = json.loads((FIXTURES / f"{name}.json").read_text(encoding="utf-8"))
+    with (ROOT / "docs" / "fakturaer" / fixture["source"]).open(encoding="utf-8") as file:
+        invoice = parse_invoice(file)
+    expected = {key: value for key, value in fixture.items() if key not in ("source", "inkl_mva")}
+    assert invoice == expected
+
+
+def test_to_float():
+    assert to_float("1 107,173") == 1107.173
+    assert to_float("-11,054") == -11.054
+    assert to_float("1\xa0554,721") == 1554.721
+
+
+def test_invoice_lines():
+    invoice = parse_invoice(
+        [
+            "**Periode:** 01.12.25 - 01.01.26\n",
+            "| Midlert. strømstønad | -122,39 kr   |\n",
+            "| Energiledd dag       | 667,422 kWh   | 35,963 øre/kWh  | 240,03    |\n",
+            "| Midlert. strømstønad | 1 107,173 kWh | -11,054 øre/kWh | -122,39   |\n",
+            "| Kapasitet 5-10 kW    | 31 dager      | 415 kr/mnd      | 415,00    |\n",
+        ]
+    )
+    assert invoice == {
+        "month": "2025-12",
+        "energiledd_dag_kr": 240.03,
+        "energiledd_dag_kwh": 667.422,
+        "stromstotte_kr": 122.39,
+        "stromstotte_kwh": 1107.173,
+        "stromstotte_ore": 11.054,
+        "kapasitet_kr": 415.0,
+    }
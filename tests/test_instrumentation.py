@@ -0,0 +1,124 @@
+"""Tests for hot-path runtime counters (instrumentation.py).
+
+Tests coverage:
+- Histogram buckets, mean and quantiles
+- HotPathStats counters and JSON-serializable snapshot
+- Coordinator counts updates, saves, state reads, skipped updates and gaps
+- Sensor state writes and the optional diagnostic sensors
+"""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from custom_components.stromkalkulator.instrumentation import Histogram, HotPathStats
+
+
+class TestHistogram:
+    """Test fixed-bucket histogram."""
+
+    def test_empty(self):
+        hist = Histogram()
+        assert hist.mean == 0.0
+        assert hist.quantile(0.95) == 0.0
+        assert hist.as_dict()["count"] == 0
+
+    def test_buckets_and_quantiles(self):
+        hist = Histogram(bounds=(0.001, 0.01))
+        for _ in range(90):
+            hist.record(0.0005)
+        for _ in range(9):
+            hist.record(0.005)
+        hist.record(0.5)
+        assert hist.counts == [90, 9, 1]
+        assert hist.mean == pytest.approx((90 * 0.0005 + 9 * 0.005 + 0.5) / 100)
+        assert hist.quantile(0.5) == 0.001
+        assert hist.quantile(0.95) == 0.01
+        assert hist.quantile(1.0) == 0.5
+        assert hist.max == 0.5
+
+    def test_as_dict_in_ms(self):
+        hist = Histogram(bounds=(0.001, 0.01))
+        hist.record(0.002)
+        summary = hist.as_dict()
+        assert summary["mean_ms"] == 2.0
+        assert summary["max_ms"] == 2.0
+        assert summary["buckets"] == {"<=1 ms": 0, "<=10 ms": 1, ">10 ms": 0}
+
+
+class TestHotPathStats:
+    """Test coordinator counters."""
+
+    def test_record(self):
+        stats = HotPathStats()
+        stats.record_update(0.001)
+        stats.record_update(0.003)
+        stats.record_save(0.01)
+        stats.record_gap(60)
+        stats.record_gap(30)
+        assert stats.updates == 2
+        assert stats.saves == 1
+        assert stats.max_sample_gap_s == 60
+        assert stats.update_latency.mean == pytest.approx(0.002)
+
+    def test_as_dict_is_json_serializable(self):
+        stats = HotPathStats()
+        stats.record_update(0.001)
+        data = json.loads(json.dumps(stats.as_dict()))
+        assert data["updates"] == 1
+        assert set(data) >= {"state_reads", "sensor_writes", "skipped_updates", "update_latency", "save_latency"}
+
+
+class TestCoordinatorStats:
+    """Test that the coordinator fills the counters."""
+
+    def test_updates_reads_and_saves(self, coordinator_harness):
+        harness = coordinator_harness()
+        harness.set_power(2000)
+        harness.set_spot(1.0)
+        for _ in range(10):
+            harness.tick(60)
+        stats = harness.coordinator.stats
+        assert stats.updates == 10
+        assert stats.saves == harness.store.saves
+        assert stats.state_reads == harness.states.reads
+        assert stats.max_sample_gap_s == 60
+        assert stats.skipped_updates == 0
+
+    def test_unavailable_power_counts_as_skipped(self, coordinator_harness):
+        harness = coordinator_harness()
+        harness.set_spot(1.0)
+        harness.states.set(harness.POWER_SENSOR, "unavailable")
+        harness.tick(60)
+        assert harness.coordinator.stats.skipped_updates == 1
+
+    def test_largest_gap(self, coordinator_harness):
+        harness = coordinator_harness()
+        harness.set_power(1000)
+        harness.set_spot(1.0)
+        harness.tick(60)
+        harness.tick(600)
+        harness.tick(60)
+        assert harness.coordinator.stats.max_sample_gap_s == 600
+
+    def test_sensor_writes_and_diagnostic_sensors(self, coordinator_harness):
+        harness = coordinator_harness()
+        harness.set_power(1000)
+        harness.set_spot(1.0)
+        harness.tick(60)
+        harness.tick(60)
+        entities = harness.create_entities()
+        for entity in entities:
+            entity._handle_coordinator_update()
+        stats = harness.coordinator.stats
+        assert stats.sensor_writes == len(entities)
+
+        by_key = {entity._attr_unique_id.removeprefix("test_entry_"): entity for entity in entities}
+        assert by_key["oppdateringstid"].native_value >= 0
+        assert by_key["oppdateringstid"].extra_state_attributes["oppdateringer"] == 2
+        assert by_key["lagringer"].native_value == stats.saves
+        assert by_key["storste_gap"].native_value == 60.0
+        for key in ("oppdateringstid", "lagringer", "storste_gap"):
+            assert by_key[key]._attr_entity_registry_enabled_default is False
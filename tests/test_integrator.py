@@ -0,0 +1,201 @@
+"""Tests for gap-aware Riemann integration (integrator.py).
+
+Tests coverage:
+- Trapezoidal and left rule
+- Gap cap (returns None so the caller backfills)
+- Intervals split at whole hours (add_split)
+- Recorder history integration split at whole hours
+- Coordinator: gaps backfilled from recorder, restart gap, no history
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from custom_components.stromkalkulator.const import (
+    CONF_INTEGRATION_METHOD,
+    CONF_MAX_GAP_MINUTES,
+    INTEGRATION_LEFT,
+    INTEGRATION_TRAPEZOIDAL,
+)
+from custom_components.stromkalkulator.integrator import PowerIntegrator, integrate_history
+
+T0 = datetime(2026, 1, 5, 12, 0)
+
+
+class TestPowerIntegrator:
+    """Test the per-sample integrator."""
+
+    def test_first_sample_gives_zero(self):
+        integrator = PowerIntegrator()
+        assert integrator.add(T0, 5.0) == 0.0
+        assert integrator.last_time == T0
+
+    def test_trapezoidal(self):
+        integrator = PowerIntegrator(INTEGRATION_TRAPEZOIDAL)
+        integrator.add(T0, 2.0)
+        assert integrator.add(T0 + timedelta(minutes=6), 4.0) == pytest.approx(0.3)
+
+    def test_left(self):
+        integrator = PowerIntegrator(INTEGRATION_LEFT)
+        integrator.add(T0, 2.0)
+        assert integrator.add(T0 + timedelta(minutes=6), 4.0) == pytest.approx(0.2)
+
+    def test_gap_over_cap_returns_none(self):
+        integrator = PowerIntegrator(max_gap_s=600)
+        integrator.add(T0, 2.0)
+        assert integrator.add(T0 + timedelta(minutes=40), 2.0) is None
+        # The late sample is the new starting point
+        assert integrator.add(T0 + timedelta(minutes=41), 2.0) == pytest.approx(2 / 60)
+
+    def test_gap_equal_to_cap_is_integrated(self):
+        integrator = PowerIntegrator(max_gap_s=600)
+        integrator.add(T0, 3.0)
+        assert integrator.add(T0 + timedelta(minutes=10), 3.0) == pytest.approx(0.5)
+
+    def test_clock_backwards_gives_zero(self):
+        integrator = PowerIntegrator()
+        integrator.add(T0, 2.0)
+        assert integrator.add(T0 - timedelta(minutes=1), 2.0) == 0.0
+
+    def test_unknown_method(self):
+        with pytest.raises(ValueError):
+            PowerIntegrator("simpson")
+
+    def test_store_roundtrip(self):
+        integrator = PowerIntegrator()
+        assert integrator.as_dict() is None
+        integrator.add(T0, 1.5)
+        restored = PowerIntegrator()
+        restored.restore(integrator.as_dict())
+        assert restored.last_time == T0
+        assert restored.add(T0 + timedelta(minutes=1), 1.5) == pytest.approx(1.5 / 60)
+
+
+class TestAddSplit:
+    """Test splitting an interval at whole hours."""
+
+    def test_within_hour_is_one_segment(self):
+        integrator = PowerIntegrator()
+        assert integrator.add_split(T0, 2.0) == []
+        assert integrator.add_split(T0 + timedelta(minutes=6), 4.0) == [(T0.timestamp(), pytest.approx(0.3))]
+
+    def test_trapezoid_split_at_interpolated_power(self):
+        start = T0 - timedelta(minutes=30)
+        integrator = PowerIntegrator(max_gap_s=7200)
+        integrator.add_split(start, 0.0)
+        segments = integrator.add_split(start + timedelta(minutes=90), 6.0)
+        # 0 -> 2 kW over the first 30 min, 2 -> 6 kW over the next hour
+        assert segments == [(start.timestamp(), pytest.approx(0.5)), (T0.timestamp(), pytest.approx(4.0))]
+
+    def test_left_rule_split(self):
+        integrator = PowerIntegrator(INTEGRATION_LEFT, max_gap_s=7200)
+        integrator.add_split(T0 - timedelta(minutes=15), 4.0)
+        segments = integrator.add_split(T0 + timedelta(minutes=15), 0.0)
+        assert [kwh for _, kwh in segments] == [pytest.approx(1.0), pytest.approx(1.0)]
+
+    def test_gap_returns_none(self):
+        integrator = PowerIntegrator(max_gap_s=600)
+        integrator.add_split(T0, 2.0)
+        assert integrator.add_split(T0 + timedelta(minutes=40), 2.0) is None
+
+
+class TestIntegrateHistory:
+    """Test recorder history integration."""
+
+    def test_hold_until_next_change(self):
+        start = 1_000 * 3600.0
+        pieces = list(integrate_history([(start, 2.0), (start + 1800, 4.0)], start + 3600))
+        assert sum(kwh for _, _, kwh in pieces) == pytest.approx(1.0 + 2.0)
+
+    def test_split_at_whole_hours(self):
+        start = 1_000 * 3600.0 + 1800
+        pieces = list(integrate_history([(start, 1.0)], start + 2 * 3600))
+        assert [(b - a) for a, b, _ in pieces] == [1800, 3600, 1800]
+        assert pieces[1][0] % 3600 == 0
+
+    def test_empty(self):
+        assert list(integrate_history([], 0.0)) == []
+
+
+class TestCoordinatorGaps:
+    """Test gap handling in the coordinator."""
+
+    def _harness(self, coordinator_harness, **entry_data):
+        harness = coordinator_harness(T0, **{CONF_MAX_GAP_MINUTES: 15, **entry_data})
+        harness.set_spot(1.0)
+        harness.set_power(2000)
+        harness.tick(60)
+        return harness
+
+    def test_short_gap_uses_trapezoid(self, coordinator_harness):
+        harness = self._harness(coordinator_harness)
+        harness.set_power(4000)
+        data = harness.tick(600)
+        assert data["monthly_consumption_total_kwh"] == pytest.approx(0.5, abs=0.001)
+
+    def test_left_rule_from_config(self, coordinator_harness):
+        harness = self._harness(coordinator_harness, **{CONF_INTEGRATION_METHOD: INTEGRATION_LEFT})
+        harness.set_power(4000)
+        data = harness.tick(600)
+        assert data["monthly_consumption_total_kwh"] == pytest.approx(2 / 6, abs=0.001)
+
+    def test_long_gap_backfilled_from_history(self, coordinator_harness):
+        harness = self._harness(coordinator_harness)
+        coordinator = harness.coordinator
+        gap_start = harness.now
+        requested = []
+
+        async def history(start, end):
+            requested.append((start, end))
+            # 1 kW for 20 minutes, then a 9 kW peak for 20 minutes
+            return [(start.timestamp(), 1.0), (start.timestamp() + 1200, 9.0)]
+
+        coordinator._async_power_history = history
+        harness.set_power(500)
+        data = harness.tick(40 * 60)
+
+        assert requested == [(gap_start, harness.now)]
+        assert data["monthly_consumption_total_kwh"] == pytest.approx(1 / 3 + 3, abs=0.001)
+        assert data["top_3_days"] == {"2026-01-05": 9.0}
+
+    def test_long_gap_without_history_is_not_smeared(self, coordinator_harness):
+        harness = self._harness(coordinator_harness)
+        harness.set_power(5000)
+        data = harness.tick(40 * 60)
+        # Previously 5 kW * 40 min = 3.33 kWh would have been booked in one tick
+        assert data["monthly_consumption_total_kwh"] == 0.0
+        data = harness.tick(60)
+        assert data["monthly_consumption_total_kwh"] == pytest.approx(5 / 60, abs=0.001)
+
+    def test_unavailable_samples_extend_the_gap(self, coordinator_harness):
+        harness = self._harness(coordinator_harness)
+        harness.states.set(harness.POWER_SENSOR, "unavailable")
+        for _ in range(5):
+            harness.tick(60)
+        harness.set_power(2000)
+        data = harness.tick(60)
+        # 6 minutes at 2 kW bridged by the trapezoid once the sensor is back
+        assert data["monthly_consumption_total_kwh"] == pytest.approx(0.2, abs=0.001)
+
+    def test_restart_gap_detected_from_store(self, coordinator_harness):
+        first = self._harness(coordinator_harness)
+        stored = first.store.data
+
+        second = coordinator_harness(T0 + timedelta(minutes=41), **{CONF_MAX_GAP_MINUTES: 15})
+        second.store.data = stored
+        requested = []
+
+        async def history(start, end):
+            requested.append((start, end))
+            return [(start.timestamp(), 3.0)]
+
+        second.coordinator._async_power_history = history
+        second.set_spot(1.0)
+        second.set_power(3000)
+        data = second.update_at(second.now)
+
+        assert requested and requested[0][1] == second.now
+        assert data["monthly_consumption_total_kwh"] == pytest.approx(2.0, abs=0.001)
@@ -0,0 +1,218 @@
+"""Tests for the per-interval cost ledger (ledger.py).
+
+Tests coverage:
+- Cost components and mva booked per interval, rows per clock hour
+- Seeding from consumption booked before the ledger existed
+- Fixed-point sums and storage roundtrip
+- Coordinator: month-to-date totals, month change, delayed saves, restart
+- Replay of a synthetic month: monthly cost sensors equal the reference
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from custom_components.stromkalkulator.const import STROMSTOTTE_LEVEL, STROMSTOTTE_RATE
+from custom_components.stromkalkulator.fixedpoint import UWH_PER_KWH
+from custom_components.stromkalkulator.ledger import (
+    ROW_KWH,
+    ROW_SPOT,
+    ROW_STOTTE_KWH,
+    CostLedger,
+    IntervalPrices,
+    hour_key,
+)
+
+from .synthetic_load import generate_month, reference_totals
+
+T0 = datetime(2026, 1, 5, 12, 0)
+PRICES = IntervalPrices(energiledd=0.40, spot=2.0, stromstotte=0.5, forbruksavgift=0.0713, enova=0.01, mva_sats=0.25)
+
+
+class TestCostLedger:
+    """Test the ledger accumulators."""
+
+    def test_add_books_components(self):
+        ledger = CostLedger("2026-01")
+        ledger.add(T0, True, 2.0, PRICES)
+        totals = ledger.totals
+        assert totals["kwh_dag"] == 2.0
+        assert totals["energiledd_dag"] == pytest.approx(0.8)
+        assert totals["spot"] == pytest.approx(4.0)
+        assert totals["stromstotte"] == pytest.approx(1.0)
+        assert totals["stromstotte_kwh"] == 2.0
+        # Avgifter are eks. mva in const.py; the ledger adds mva
+        assert totals["forbruksavgift"] == pytest.approx(2.0 * 0.0713 * 1.25)
+        assert ledger.avgifter == pytest.approx(2.0 * 0.0813 * 1.25)
+
+    def test_mva_share(self):
+        ledger = CostLedger("2026-01")
+        ledger.add(T0, False, 1.0, PRICES)
+        gross = 0.40 + 2.0 - 0.5 + 0.0813 * 1.25
+        assert ledger.totals["mva"] == pytest.approx(gross * 0.2)
+
+    def test_no_mva_zone(self):
+        ledger = CostLedger("2026-01")
+        prices = IntervalPrices(0.3, 1.0, 0.0, 0.0, 0.01, 0.0)
+        ledger.add(T0, True, 1.0, prices)
+        assert ledger.totals["mva"] == 0.0
+        assert ledger.totals["stromstotte_kwh"] == 0.0
+
+    def test_rows_per_clock_hour(self):
+        ledger = CostLedger("2026-01")
+        ledger.add(T0, True, 1.0, PRICES)
+        ledger.add(T0 + timedelta(minutes=30), True, 0.5, PRICES)
+        ledger.add(T0 + timedelta(hours=1), True, 0.25, PRICES)
+        assert list(ledger.rows) == ["2026-01-05T12", "2026-01-05T13"]
+        row = ledger.rows[hour_key(T0)]
+        assert row[ROW_KWH] == pytest.approx(1.5)
+        assert row[ROW_SPOT] == pytest.approx(3.0)
+        assert row[ROW_STOTTE_KWH] == pytest.approx(1.5)
+
+    def test_zero_kwh_is_ignored(self):
+        ledger = CostLedger("2026-01")
+        ledger.add(T0, True, 0.0, PRICES)
+        assert ledger.rows == {}
+
+    def test_seed_leaves_out_spot(self):
+        ledger = CostLedger("2026-01")
+        ledger.seed(10.0, 5.0, PRICES, PRICES)
+        assert ledger.totals["kwh_dag"] == 10.0
+        assert ledger.energiledd == pytest.approx(6.0)
+        assert ledger.totals["spot"] == 0.0
+        assert ledger.rows == {}
+
+    def test_store_roundtrip(self):
+        ledger = CostLedger("2026-01")
+        ledger.add(T0, True, 1.0, PRICES)
+        restored = CostLedger.from_dict(ledger.as_dict())
+        assert restored is not None
+        assert restored.month == "2026-01"
+        assert restored.totals == ledger.totals
+        assert restored.rows == ledger.rows
+        assert CostLedger.from_dict(None) is None
+
+    def test_sums_are_fixed_point(self):
+        ledger = CostLedger("2026-01")
+        for _ in range(36_000):
+            ledger.add(T0, True, 0.001, PRICES)
+        assert all(isinstance(value, int) for value in ledger.sums.values())
+        assert ledger.sums["kwh_dag"] == 36 * UWH_PER_KWH
+        assert ledger.totals["kwh_dag"] == 36.0
+        assert ledger.totals["spot"] == 72.0
+        assert isinstance(ledger.as_dict()["sums"]["spot"], int)
+
+
+class TestCoordinatorLedger:
+    """Test the ledger in the coordinator."""
+
+    def test_costs_use_price_of_each_interval(self, coordinator_harness):
+        harness = coordinator_harness(T0)
+        harness.set_power(6000)
+        harness.set_spot(0.5)
+        harness.tick(600)
+        harness.set_spot(2.0)
+        harness.tick(600)
+        data = harness.tick(600)
+
+        # 1 kWh per 10 minutes; the first sample starts the integration
+        assert data["monthly_spot_kr"] == pytest.approx(0.5 * 0 + 2.0 * 2, abs=0.01)
+        expected_stotte = 2 * (2.0 - STROMSTOTTE_LEVEL) * STROMSTOTTE_RATE
+        assert data["monthly_stromstotte_kr"] == pytest.approx(expected_stotte, abs=0.01)
+        assert data["monthly_stromstotte_kwh"] == pytest.approx(2.0, abs=0.001)
+        assert data["monthly_energiledd_dag_kr"] == pytest.approx(2 * harness.coordinator.energiledd_dag, abs=0.01)
+
+    def test_norgespris_has_no_stromstotte(self, coordinator_harness):
+        harness = coordinator_harness(T0, har_norgespris=True)
+        harness.set_power(6000)
+        harness.set_spot(3.0)
+        harness.tick(600)
+        data = harness.tick(600)
+        assert data["monthly_stromstotte_kr"] == 0.0
+
+    def test_month_change_starts_new_ledger(self, coordinator_harness):
+        start = datetime(2026, 1, 31, 23, 40)
+        harness = coordinator_harness(start)
+        harness.set_power(6000)
+        harness.set_spot(1.0)
+        harness.update_at(start)
+        harness.tick(600)
+        data = harness.update_at(datetime(2026, 2, 1, 0, 0))
+        # The interval ending at the month change belongs to January
+        assert data["monthly_spot_kr"] == 0.0
+        previous = harness.coordinator._previous_ledger
+        assert previous is not None and previous.month == "2026-01"
+        assert previous.totals["kwh_natt"] == pytest.approx(2.0, abs=0.001)
+        data = harness.tick(600)
+        assert data["monthly_spot_kr"] == pytest.approx(1.0, abs=0.01)
+
+    def test_ledger_saves_are_delayed(self, coordinator_harness):
+        harness = coordinator_harness(T0)
+        harness.set_power(3000)
+        harness.set_spot(1.0)
+        for _ in range(10):
+            harness.tick(60)
+        assert harness.ledger_store.saves == 0
+        assert harness.ledger_store.delayed_saves > 0
+        harness.ledger_store.flush()
+        assert harness.ledger_store.data["current"]["month"] == "2026-01"
+
+    def test_restart_restores_ledger(self, coordinator_harness):
+        first = coordinator_harness(T0)
+        first.set_power(6000)
+        first.set_spot(2.0)
+        for _ in range(3):
+            first.tick(600)
+        first.ledger_store.flush()
+
+        second = coordinator_harness(first.now)
+        second.store.data = first.store.data
+        second.ledger_store.data = first.ledger_store.data
+        second.set_power(0)
+        second.set_spot(2.0)
+        data = second.update_at(second.now)
+        assert data["monthly_spot_kr"] == pytest.approx(2.0 * 2, abs=0.01)
+
+    def test_upgrade_seeds_ledger_from_consumption(self, coordinator_harness):
+        first = coordinator_harness(T0)
+        first.set_power(6000)
+        first.set_spot(1.0)
+        for _ in range(3):
+            first.tick(600)
+
+        # Store from a version without the ledger
+        second = coordinator_harness(first.now)
+        second.store.data = first.store.data
+        second.set_power(0)
+        second.set_spot(1.0)
+        data = second.update_at(second.now)
+        assert data["monthly_energiledd_dag_kr"] == pytest.approx(2 * second.coordinator.energiledd_dag, abs=0.01)
+        assert data["monthly_spot_kr"] == 0.0
+
+
+def test_replay_monthly_costs_match_reference(coordinator_harness):
+    """Monthly cost sensors equal the reference summed per interval."""
+    month = generate_month(2026, 1, "enebolig", step_s=900)
+    harness = coordinator_harness(month.local_time(0), max_gap_minutes=15)
+    entities = {}
+    for i in range(len(month)):
+        harness.set_power(month.power_w[i])
+        harness.set_spot(month.spot_at(i))
+        harness.update_at(month.local_time(i))
+        if not entities:
+            entities = {entity._attr_translation_key: entity for entity in harness.create_entities()}
+
+    reference = reference_totals(
+        month,
+        energiledd_dag=harness.coordinator.energiledd_dag,
+        energiledd_natt=harness.coordinator.energiledd_natt,
+        kapasitetstrinn=harness.coordinator.kapasitetstrinn,
+    )
+    assert entities["maanedlig_nettleie"].native_value == pytest.approx(reference["nettleie_kr"], abs=0.05)
+    assert entities["maanedlig_avgifter"].native_value == pytest.approx(reference["avgifter_kr"], abs=0.05)
+    assert entities["maanedlig_stromstotte"].native_value == pytest.approx(reference["stromstotte_kr"], abs=0.05)
+    assert harness.coordinator.data["monthly_spot_kr"] == pytest.approx(reference["spot_kr"], abs=0.05)
+    expected_total = reference["nettleie_kr"] + reference["avgifter_kr"] - reference["stromstotte_kr"]
+    assert entities["maanedlig_total"].native_value == pytest.approx(expected_total, abs=0.1)
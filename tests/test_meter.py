@@ -0,0 +1,244 @@
+"""Tests for cumulative kWh register input (meter.py).
+
+Tests coverage:
+- Deltas split at whole hours (and at price intervals) with running hour totals,
+  spread from the last change of a register that updates once an hour
+- Register reset, rollover and implausible jumps
+- Coordinator energy-sensor mode: consumption, hourly peaks, month change
+  (a month that was never measured is not booked, nor its peaks in another year),
+  each piece at the spot price of its interval
+- Replay of a synthetic month through the register gives the reference total
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+import pytest
+
+from custom_components.stromkalkulator.const import CONF_ENERGY_SENSOR
+from custom_components.stromkalkulator.meter import EnergyMeter
+
+from .synthetic_load import generate_month, reference_totals
+
+T0 = datetime(2026, 1, 5, 12, 0)
+ENERGY_SENSOR = "sensor.meter_kwh"
+
+
+class TestEnergyMeter:
+    """Test register deltas."""
+
+    def test_first_reading_gives_nothing(self):
+        meter = EnergyMeter()
+        assert meter.add(T0, 1234.5) == []
+
+    def test_delta_within_hour(self):
+        meter = EnergyMeter()
+        meter.add(T0, 100.0)
+        meter.add(T0 + timedelta(minutes=10), 100.5)
+        pieces = meter.add(T0 + timedelta(minutes=20), 101.5)
+        assert pieces == [(T0, pytest.approx(1.0), pytest.approx(1.5))]
+
+    def test_delta_split_over_hours(self):
+        meter = EnergyMeter()
+        meter.add(T0 + timedelta(minutes=30), 100.0)
+        pieces = meter.add(T0 + timedelta(hours=2), 103.0)
+        assert [p[0] for p in pieces] == [T0, T0 + timedelta(hours=1)]
+        assert [p[1] for p in pieces] == [pytest.approx(1.0), pytest.approx(2.0)]
+        # Running total restarts in the new hour
+        assert pieces[1][2] == pytest.approx(2.0)
+        assert meter.hour_kwh == pytest.approx(2.0)
+
+    def test_delta_split_at_price_intervals(self):
+        meter = EnergyMeter()
+        meter.add(T0 + timedelta(minutes=50), 100.0)
+        pieces = meter.add(T0 + timedelta(minutes=80), 101.5, split_s=900)
+        assert [p[0] for p in pieces] == [
+            T0 + timedelta(minutes=45),
+            T0 + timedelta(hours=1),
+            T0 + timedelta(minutes=75),
+        ]
+        assert [p[1] for p in pieces] == [pytest.approx(0.5), pytest.approx(0.75), pytest.approx(0.25)]
+        # The hour total runs over the intervals of the hour
+        assert [p[2] for p in pieces] == [pytest.approx(0.5), pytest.approx(0.75), pytest.approx(1.0)]
+
+    def test_unchanged_register_keeps_last_change(self):
+        meter = EnergyMeter()
+        meter.add(T0, 100.0)
+        meter.add(T0 + timedelta(minutes=30), 101.0)
+        assert meter.add(T0 + timedelta(minutes=90), 101.0) == []
+        # The next delta is spread from the last change (12:30), not the last reading
+        pieces = meter.add(T0 + timedelta(minutes=150), 102.0)
+        assert [p[0] for p in pieces] == [T0, T0 + timedelta(hours=1), T0 + timedelta(hours=2)]
+        assert [p[1] for p in pieces] == [pytest.approx(0.25), pytest.approx(0.5), pytest.approx(0.25)]
+        assert [p[2] for p in pieces] == [pytest.approx(1.25), pytest.approx(0.5), pytest.approx(0.25)]
+
+    @pytest.mark.parametrize("step_kwh", [2.0, 3.5])
+    def test_register_updated_once_an_hour(self, step_kwh):
+        # Polled every minute, the register changes 30 seconds after each whole hour
+        meter = EnergyMeter()
+        meter.add(T0 + timedelta(seconds=30), 100.0)
+        for minute in range(1, 61):
+            assert meter.add(T0 + timedelta(minutes=minute), 100.0) == []
+        pieces = meter.add(T0 + timedelta(minutes=60, seconds=30), 100.0 + step_kwh)
+        assert [p[0] for p in pieces] == [T0, T0 + timedelta(hours=1)]
+        assert pieces[0][1] == pytest.approx(step_kwh * 3570 / 3600)
+        assert pieces[1][1] == pytest.approx(step_kwh * 30 / 3600)
+
+    def test_reset_to_zero(self):
+        meter = EnergyMeter()
+        meter.add(T0, 5321.0)
+        pieces = meter.add(T0 + timedelta(minutes=1), 0.02)
+        assert sum(p[1] for p in pieces) == pytest.approx(0.02)
+        assert meter.resets == 1
+
+    def test_rollover(self):
+        meter = EnergyMeter()
+        meter.add(T0, 99999.9)
+        pieces = meter.add(T0 + timedelta(minutes=5), 0.1)
+        assert sum(p[1] for p in pieces) == pytest.approx(0.2)
+
+    def test_implausible_jump_discarded(self):
+        meter = EnergyMeter()
+        meter.add(T0, 100.0)
+        assert meter.add(T0 + timedelta(minutes=1), 90_000.0) == []
+        # New value is the starting point
+        pieces = meter.add(T0 + timedelta(minutes=2), 90_000.1)
+        assert sum(p[1] for p in pieces) == pytest.approx(0.1)
+
+    def test_store_roundtrip(self):
+        meter = EnergyMeter()
+        meter.add(T0, 100.0)
+        meter.add(T0 + timedelta(minutes=10), 101.0)
+        restored = EnergyMeter()
+        restored.restore(meter.as_dict())
+        pieces = restored.add(T0 + timedelta(minutes=20), 102.0)
+        assert pieces == [(T0, pytest.approx(1.0), pytest.approx(2.0))]
+
+
+class TestCoordinatorEnergyMode:
+    """Test the coordinator with an energy sensor configured."""
+
+    def _harness(self, coordinator_harness, start=T0):
+        harness = coordinator_harness(start, **{CONF_ENERGY_SENSOR: ENERGY_SENSOR})
+        harness.set_spot(1.0)
+        harness.set_power(0)
+        return harness
+
+    def test_consumption_and_hourly_peak(self, coordinator_harness):
+        harness = self._harness(coordinator_harness)
+        harness.states.set(ENERGY_SENSOR, 1000.0, {"unit_of_measurement": "kWh"})
+        harness.update_at(T0)
+        # 3 kWh during 12:00-13:00, with a short 20 kW spike on the power sensor
+        harness.set_power(20_000)
+        harness.states.set(ENERGY_SENSOR, 1001.5, {"unit_of_measurement": "kWh"})
+        harness.update_at(T0 + timedelta(minutes=30))
+        harness.states.set(ENERGY_SENSOR, 1003.0, {"unit_of_measurement": "kWh"})
+        data = harness.update_at(T0 + timedelta(minutes=60))
+
+        assert data["monthly_consumption_dag_kwh"] == pytest.approx(3.0)
+        # Peak is hourly energy, not the instantaneous power
+        assert data["top_3_days"] == {"2026-01-05": 3.0}
+
+    def test_wh_unit(self, coordinator_harness):
+        harness = self._harness(coordinator_harness)
+        harness.states.set(ENERGY_SENSOR, 1_000_000, {"unit_of_measurement": "Wh"})
+        harness.update_at(T0)
+        harness.states.set(ENERGY_SENSOR, 1_000_500, {"unit_of_measurement": "Wh"})
+        data = harness.update_at(T0 + timedelta(minutes=10))
+        assert data["monthly_consumption_total_kwh"] == pytest.approx(0.5)
+
+    def test_unavailable_meter_is_skipped(self, coordinator_harness):
+        harness = self._harness(coordinator_harness)
+        harness.states.set(ENERGY_SENSOR, 1000.0)
+        harness.update_at(T0)
+        harness.states.set(ENERGY_SENSOR, "unavailable")
+        harness.update_at(T0 + timedelta(minutes=1))
+        harness.states.set(ENERGY_SENSOR, 1000.4)
+        data = harness.update_at(T0 + timedelta(minutes=2))
+        assert harness.coordinator.stats.skipped_updates == 1
+        assert data["monthly_consumption_total_kwh"] == pytest.approx(0.4)
+
+    def test_pieces_priced_per_interval(self, coordinator_harness):
+        from custom_components.stromkalkulator.fixedpoint import uore_to_kr
+
+        harness = self._harness(coordinator_harness)
+        raw = [{"start": T0 + timedelta(minutes=15 * i), "value": 1.0 + i} for i in range(4)]
+        harness.states.set(harness.SPOT_SENSOR, 4.0, {"raw_today": raw})
+        harness.states.set(ENERGY_SENSOR, 1000.0)
+        harness.update_at(T0)
+        # One reading after an hour: 1 kWh in each quarter, at 1, 2, 3 and 4 kr
+        harness.states.set(ENERGY_SENSOR, 1004.0)
+        data = harness.update_at(T0 + timedelta(hours=1))
+        assert uore_to_kr(harness.coordinator._ledger.sums["spot"]) == pytest.approx(10.0)
+        assert data["top_3_days"] == {"2026-01-05": 4.0}
+
+    def test_month_change_books_last_reading_on_previous_month(self, coordinator_harness):
+        start = datetime(2026, 1, 31, 23, 50)
+        harness = self._harness(coordinator_harness, start)
+        harness.states.set(ENERGY_SENSOR, 500.0)
+        harness.update_at(start)
+        harness.states.set(ENERGY_SENSOR, 501.0)
+        data = harness.update_at(datetime(2026, 2, 1, 0, 10))
+        # Half of the delta fell in January
+        assert data["previous_month_consumption_total_kwh"] == pytest.approx(0.5)
+        assert data["monthly_consumption_total_kwh"] == pytest.approx(0.5)
+
+    def test_downtime_over_two_month_changes(self, coordinator_harness):
+        start = datetime(2025, 11, 30, 22, 0)
+        harness = self._harness(coordinator_harness, start)
+        harness.states.set(ENERGY_SENSOR, 500.0)
+        harness.update_at(start)
+        # 1 kWh per hour from 30 November 22:00 to 1 January 02:00 (748 hours)
+        harness.states.set(ENERGY_SENSOR, 1248.0)
+        data = harness.update_at(datetime(2026, 1, 1, 2, 0))
+        # November is the previous month measured; December was never measured and is not booked
+        coordinator = harness.coordinator
+        assert coordinator._previous_month.month == "2025-11"
+        assert data["previous_month_consumption_total_kwh"] == pytest.approx(2.0)
+        assert set(coordinator._previous_ledger.rows) == {"2025-11-30T22", "2025-11-30T23"}
+        assert data["monthly_consumption_total_kwh"] == pytest.approx(2.0)
+
+    def test_peaks_from_same_month_a_year_ago(self, coordinator_harness):
+        harness = self._harness(coordinator_harness)
+        harness.states.set(ENERGY_SENSOR, 1000.0)
+        harness.update_at(T0)
+        # Restored reading from 20 January 2025: about 1 kWh per hour until now
+        year_ago = datetime(2025, 1, 20, 12, 0)
+        hours = round((T0.timestamp() - year_ago.timestamp()) / 3600)
+        harness.coordinator._meter.restore(
+            {"value": 1000.0, "ts": year_ago.timestamp(), "hour_start": year_ago.timestamp(), "hour_kwh": 0.0}
+        )
+        harness.states.set(ENERGY_SENSOR, 1000.0 + hours)
+        data = harness.update_at(T0)
+        # January 2025 is not this month: neither its energy nor its peaks count
+        peaks = harness.coordinator._month.daily_max_kw
+        assert list(peaks[5:]) == [0.0] * 26
+        assert set(data["top_3_days"]) <= {"2026-01-01", "2026-01-02", "2026-01-03", "2026-01-04", "2026-01-05"}
+        assert data["monthly_consumption_total_kwh"] == pytest.approx(4 * 24 + 12, abs=0.1)
+
+
+def test_replay_register_matches_reference(coordinator_harness):
+    """A register built from the synthetic month gives the reference total."""
+    month = generate_month(2026, 1, "enebolig", step_s=900)
+    kw = [p / 1000 for p in month.power_w]
+    ts = month.timestamps
+    energy = [0.0] + [(kw[i - 1] + kw[i]) / 2 * (ts[i] - ts[i - 1]) / 3600 for i in range(1, len(ts))]
+    register = list(accumulate(energy, initial=12_345.0))[1:]
+
+    harness = coordinator_harness(month.local_time(0), **{CONF_ENERGY_SENSOR: ENERGY_SENSOR})
+    harness.set_spot(1.0)
+    data = {}
+    for i in range(len(month)):
+        harness.set_power(month.power_w[i])
+        harness.states.set(ENERGY_SENSOR, register[i])
+        data = harness.update_at(month.local_time(i))
+
+    reference = reference_totals(
+        month,
+        energiledd_dag=harness.coordinator.energiledd_dag,
+        energiledd_natt=harness.coordinator.energiledd_natt,
+        kapasitetstrinn=harness.coordinator.kapasitetstrinn,
+    )
+    assert data["monthly_consumption_total_kwh"] == pytest.approx(reference["total_kwh"], abs=0.002)
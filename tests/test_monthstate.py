@@ -0,0 +1,174 @@
+"""Tests for the array-backed month state (monthstate.py).
+
+Tests coverage:
+- Energy per tariff and hour, daily peaks and the top 3 days
+- Packed storage: constant size, roundtrip, unusable data
+- Fixed-point tariff totals
+- Migration from the dicts stored by earlier versions
+- Coordinator: storage format, restart, upgrade, hourly slots saved with the ledger
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+import pytest
+
+from custom_components.stromkalkulator.monthstate import MonthState
+
+T0 = datetime(2026, 1, 5, 12, 0)
+
+
+class TestMonthState:
+    """Test booking into the arrays."""
+
+    def test_energy_per_tariff_and_hour(self):
+        state = MonthState("2026-01")
+        state.add_energy(T0, True, 1.5)
+        state.add_energy(datetime(2026, 1, 31, 23, 30), False, 0.5)
+        assert state.dag_kwh == 1.5
+        assert state.natt_kwh == 0.5
+        assert state.total_kwh == 2.0
+        assert state.hourly_kwh[4 * 24 + 12] == 1.5
+        assert state.hourly_kwh[-1] == 0.5
+
+    def test_peaks_only_rise(self):
+        state = MonthState("2026-01")
+        assert state.add_peak(5, 3.0)
+        assert not state.add_peak(5, 2.0)
+        assert not state.add_peak(5, 3.0)
+        assert state.daily_max_kw[4] == 3.0
+
+    def test_top_days(self):
+        state = MonthState("2026-02")
+        for day, kw in ((1, 2.0), (3, 5.0), (10, 4.0), (28, 1.0)):
+            state.add_peak(day, kw)
+        assert state.top_days() == {"2026-02-03": 5.0, "2026-02-10": 4.0, "2026-02-01": 2.0}
+        assert MonthState("2026-02").top_days() == {}
+
+
+class TestStorage:
+    """Test the packed storage format."""
+
+    def test_roundtrip(self):
+        state = MonthState("2026-01")
+        state.add_energy(T0, True, 1.234567891)
+        state.add_peak(5, 6.5)
+        restored = MonthState.from_dict(state.as_dict())
+        assert restored is not None
+        assert restored.month == "2026-01"
+        assert restored.dag_kwh == 1.234567891
+        assert restored.top_days() == {"2026-01-05": 6.5}
+        assert restored.restore_hourly(state.hourly_as_dict())
+        assert restored.hourly_kwh[4 * 24 + 12] == pytest.approx(1.234567891)
+
+    def test_constant_size(self):
+        empty = MonthState("2026-01")
+        full = MonthState("2026-01")
+        for day in range(1, 32):
+            full.add_peak(day, day * 0.37)
+            for hour in range(24):
+                full.add_energy(datetime(2026, 1, day, hour), hour >= 6, 0.123)
+        assert len(empty.as_dict()["data"]) == len(full.as_dict()["data"]) < 400
+        assert len(empty.hourly_as_dict()["hourly"]) == len(full.hourly_as_dict()["hourly"])
+
+    def test_encoding_is_reused_until_changed(self):
+        state = MonthState("2026-01")
+        stored = state.as_dict()
+        assert state.as_dict() is stored
+        state.add_peak(1, 1.0)
+        assert state.as_dict() is not stored
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            None,
+            {},
+            {"month": "2026-01"},
+            {"month": "2026-01", "data": "not base64!"},
+            {"month": "2026-01", "data": "AAAA"},
+        ],
+    )
+    def test_unusable_data(self, data):
+        assert MonthState.from_dict(data) is None
+
+    def test_totals_are_fixed_point(self):
+        state = MonthState("2026-01")
+        for _ in range(10_000):
+            state.add_energy(T0, False, 0.1)
+        assert state.natt_kwh == 1000.0
+
+    def test_hourly_for_other_month_is_ignored(self):
+        hourly = MonthState("2025-12").hourly_as_dict()
+        assert not MonthState("2026-01").restore_hourly(hourly)
+
+    def test_from_legacy(self):
+        state = MonthState.from_legacy(
+            "2026-02", {"dag": 50.0, "natt": 25.0}, {"2026-02-01": 3.5, "2026-02-14": 4.0, "2026-01-31": 9.0}
+        )
+        assert state.dag_kwh == 50.0
+        assert state.natt_kwh == 25.0
+        assert state.top_days() == {"2026-02-14": 4.0, "2026-02-01": 3.5}
+
+
+class TestCoordinatorMonthState:
+    """Test the month state in the coordinator."""
+
+    def test_storage_holds_packed_months(self, coordinator_harness):
+        harness = coordinator_harness(T0)
+        harness.set_power(3000)
+        harness.tick(60)
+        harness.tick(60)
+        stored = harness.store.data
+        assert "daily_max_power" not in stored
+        assert "monthly_consumption" not in stored
+        restored = MonthState.from_dict(stored["month_state"])
+        assert restored is not None
+        assert restored.top_days() == {"2026-01-05": 3.0}
+        assert restored.dag_kwh == pytest.approx(0.05)
+
+    def test_restart_restores_month(self, coordinator_harness):
+        first = coordinator_harness(T0)
+        first.set_power(6000)
+        for _ in range(3):
+            first.tick(600)
+        first.ledger_store.flush()
+
+        second = coordinator_harness(first.now)
+        second.store.data = first.store.data
+        second.ledger_store.data = first.ledger_store.data
+        second.set_power(0)
+        data = second.update_at(second.now)
+        assert data["monthly_consumption_dag_kwh"] == pytest.approx(2.0)
+        assert data["top_3_days"] == {"2026-01-05": 6.0}
+        assert second.coordinator._month.hourly_kwh[4 * 24 + 12] == pytest.approx(2.0)
+
+    def test_upgrade_from_dict_storage(self, coordinator_harness):
+        harness = coordinator_harness(T0)
+        harness.store.data = {
+            "daily_max_power": {"2026-01-02": 4.5, "2026-01-03": 5.0},
+            "monthly_consumption": {"dag": 100.0, "natt": 50.0},
+            "current_month": 1,
+            "previous_month_consumption": {"dag": 300.0, "natt": 200.0},
+            "previous_month_top_3": {"2025-12-10": 7.0, "2025-12-11": 6.0, "2025-12-12": 5.0},
+            "previous_month_name": "desember 2025",
+        }
+        harness.set_power(1000)
+        data = harness.update_at(T0)
+        assert data["monthly_consumption_total_kwh"] == pytest.approx(150.0)
+        assert data["top_3_days"] == {"2026-01-03": 5.0, "2026-01-02": 4.5, "2026-01-05": 1.0}
+        assert data["previous_month_consumption_total_kwh"] == pytest.approx(500.0)
+        assert data["previous_month_avg_top_3_kw"] == pytest.approx(6.0)
+
+    def test_month_stored_before_month_change_becomes_previous(self, coordinator_harness):
+        first = coordinator_harness(datetime(2026, 1, 31, 20, 0))
+        first.set_power(2000)
+        first.tick(600)
+        first.tick(600)
+
+        second = coordinator_harness(datetime(2026, 2, 1, 8, 0))
+        second.store.data = first.store.data
+        second.set_power(0)
+        data = second.update_at(second.now)
+        assert data["monthly_consumption_total_kwh"] == 0.0
+        assert data["previous_month_top_3"] == {"2026-01-31": 2.0}
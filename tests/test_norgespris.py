@@ -3,7 +3,7 @@
 Tests the Norgespris fixed-price electricity product:
 - Fixed price based on geographic zone (avgiftssone)
 - No strømstøtte when using Norgespris
-- Max 5000 kWh/month (not enforced in this integration)
+- Max 5000 kWh/month (1000 kWh for fritidsbolig); the interval crossing the cap is split
 
 Priser (fra 1. oktober 2025):
 - Sør-Norge (standard): 40 øre + 25% mva = 50 øre/kWh inkl. mva
@@ -14,6 +14,8 @@ Kilde: https://www.regjeringen.no/no/tema/energi/strom/regjeringens-stromtiltak/
 
 from __future__ import annotations
 
+from datetime import datetime
+
 import pytest
 
 from custom_components.stromkalkulator.const import (
@@ -23,8 +25,12 @@ from custom_components.stromkalkulator.const import (
     NORGESPRIS_EKS_MVA,
     NORGESPRIS_INKL_MVA_NORD,
     NORGESPRIS_INKL_MVA_STANDARD,
+    STROMSTOTTE_LEVEL,
+    STROMSTOTTE_RATE,
+    get_monthly_cap_kwh,
     get_norgespris_inkl_mva,
 )
+from custom_components.stromkalkulator.monthstate import MonthState
 
 # =============================================================================
 # Constants validation
@@ -106,3 +112,65 @@ def test_norgespris_no_stromstotte() -> None:
     har_norgespris = True
     stromstotte = 0 if har_norgespris else 0.5  # Example value
     assert stromstotte == 0
+
+
+# =============================================================================
+# Monthly cap (5000 kWh bolig, 1000 kWh fritidsbolig)
+# =============================================================================
+
+
+@pytest.mark.parametrize(
+    ("har_norgespris", "fritidsbolig", "expected"),
+    [(True, False, 5000), (True, True, 1000), (False, False, 5000), (False, True, 5000)],
+)
+def test_monthly_cap(har_norgespris: bool, fritidsbolig: bool, expected: int) -> None:
+    """Norgespris cap depends on bolig/fritidsbolig; strømstøtte is always 5000 kWh."""
+    assert get_monthly_cap_kwh(har_norgespris, fritidsbolig) == expected
+
+
+def _near_cap(coordinator_harness, used_kwh: float, **entry_data):
+    """Harness at 12:00 with used_kwh booked this month, 4 kW and spot 2 NOK/kWh."""
+    harness = coordinator_harness(datetime(2026, 1, 5, 12, 0), **entry_data)
+    harness.set_spot(2.0)
+    harness.set_power(4000)
+    harness.tick(60)
+    month = MonthState("2026-01")
+    month.add_energy(datetime(2026, 1, 5, 11, 0), True, used_kwh)
+    harness.coordinator._month = month
+    return harness
+
+
+def test_norgespris_cap_splits_interval(coordinator_harness) -> None:
+    """The interval crossing 1000 kWh is booked half at Norgespris, half at spot price."""
+    harness = _near_cap(coordinator_harness, 999.5, har_norgespris=True, fritidsbolig=True)
+    # 4 kW for 15 minutes = 1 kWh, crossing the cap halfway
+    data = harness.tick(900)
+    totals = harness.coordinator._ledger.totals
+    assert totals["kwh_dag"] == pytest.approx(1.0)
+    assert totals["spot"] == pytest.approx(0.5 * NORGESPRIS_INKL_MVA_STANDARD + 0.5 * 2.0)
+    assert totals["stromstotte"] == 0
+    assert data["monthly_cap_kwh"] == 1000
+    assert data["monthly_cap_remaining_kwh"] == 0
+    # Above the cap the price is the spot price again
+    assert data["total_price"] == pytest.approx(2.0 + data["energiledd"] + data["kapasitetsledd_per_kwh"], abs=1e-3)
+
+
+def test_stromstotte_cap_splits_interval(coordinator_harness) -> None:
+    """Strømstøtte is only given for the part of the interval under 5000 kWh."""
+    harness = _near_cap(coordinator_harness, 4999.75)
+    data = harness.tick(900)
+    totals = harness.coordinator._ledger.totals
+    assert totals["stromstotte_kwh"] == pytest.approx(0.25)
+    assert totals["stromstotte"] == pytest.approx(0.25 * (2.0 - STROMSTOTTE_LEVEL) * STROMSTOTTE_RATE)
+    assert totals["spot"] == pytest.approx(2.0)
+    assert data["stromstotte"] == 0
+
+
+def test_norgespris_comparison_above_cap(coordinator_harness) -> None:
+    """Without Norgespris, the comparison uses spot price once the Norgespris cap is passed."""
+    harness = _near_cap(coordinator_harness, 1200.0, fritidsbolig=True)
+    data = harness.tick(60)
+    assert data["norgespris_max_kwh"] == 1000
+    assert data["total_pris_norgespris"] == pytest.approx(
+        2.0 + data["energiledd"] + data["kapasitetsledd_per_kwh"], abs=1e-3
+    )
@@ -0,0 +1,340 @@
+"""Tests for the price feed adapter (pricefeed.py).
+
+Tests coverage:
+- Nord Pool, ENTSO-E and Tibber attribute arrays
+- Mixed hourly and 15-minute prices on one grid, across DST
+- Months of prices on one grid, sparse prices looked up by bisection
+- Fallback to the state outside the arrays and for unavailable sensors
+- Parsing once per published state
+- Price sources: recorder states, price files (CSV, Parquet without pyarrow)
+- Coordinator: prices from the arrays, state change subscription, offline
+  replay from a price file (months long; the sensor kept if the file has too
+  few prices), gap backfill and import priced from history
+"""
+
+from __future__ import annotations
+
+import sys
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from custom_components.stromkalkulator.const import CONF_MAX_GAP_MINUTES, CONF_PRICE_FILE
+from custom_components.stromkalkulator.pricefeed import (
+    PriceFeed,
+    PriceSourceError,
+    build_grid,
+    parse_price_arrays,
+    prices_from_states,
+    read_price_file,
+)
+
+from .synthetic_load import generate_month, reference_totals
+
+OSLO = ZoneInfo("Europe/Oslo")
+DAY = datetime(2026, 1, 5, tzinfo=OSLO)
+
+
+def _state(value, last_changed=None, **attributes):
+    return SimpleNamespace(state=str(value), attributes=attributes, last_changed=last_changed)
+
+
+def _quarters(start: datetime, prices: list[float]) -> list[tuple[datetime, float]]:
+    return [(start + timedelta(minutes=15 * i), price) for i, price in enumerate(prices)]
+
+
+class TestAttributeLayouts:
+    """Test the supported attribute arrays."""
+
+    def test_nordpool(self):
+        raw = [
+            {"start": start, "end": start + timedelta(minutes=15), "value": price}
+            for start, price in _quarters(DAY, [1.0, 2.0, 3.0])
+        ]
+        feed = PriceFeed()
+        feed.update(_state(9.0, raw_today=raw, raw_tomorrow=[], today=[1.0, 2.0, 3.0]))
+        assert feed.interval_s == 900
+        assert feed.price_at((DAY + timedelta(minutes=20)).timestamp()) == 2.0
+
+    def test_entsoe(self):
+        prices = [{"time": start.isoformat(sep=" "), "price": price} for start, price in _quarters(DAY, [0.5, 0.6])]
+        feed = PriceFeed()
+        feed.update(_state(0.5, prices_today=prices, prices=prices))
+        assert feed.price_at((DAY + timedelta(minutes=29)).timestamp()) == 0.6
+
+    def test_tibber(self):
+        today = [
+            {"startsAt": start.isoformat(), "total": price, "level": "NORMAL"}
+            for start, price in _quarters(DAY, [1.1, 1.2])
+        ]
+        feed = PriceFeed()
+        feed.update(_state(1.1, today=today, tomorrow=[]))
+        assert feed.price_at(DAY.timestamp()) == 1.1
+
+    def test_unusable_entries_are_skipped(self):
+        attributes = {
+            "raw_today": [{"start": "not a time", "value": 1.0}, {"start": DAY, "value": None}, "x"],
+            "today": [1.0],
+        }
+        assert parse_price_arrays(attributes) == {}
+
+
+class TestGrid:
+    """Test resampling onto a fixed grid."""
+
+    def test_hourly_next_to_quarters(self):
+        hourly = {DAY.timestamp() + 3600 * i: float(i) for i in range(2)}
+        quarters = {DAY.timestamp() + 7200 + 900 * i: 10.0 + i for i in range(4)}
+        first, step, grid = build_grid(hourly | quarters)
+        assert (first, step) == (DAY.timestamp(), 900)
+        assert list(grid) == [0.0] * 4 + [1.0] * 4 + [10.0, 11.0, 12.0, 13.0]
+
+    def test_dst_day_has_92_quarters(self):
+        start = datetime(2026, 3, 29, tzinfo=OSLO)
+        end = datetime(2026, 3, 30, tzinfo=OSLO)
+        count = int((end.timestamp() - start.timestamp()) // 900)
+        prices = {start.timestamp() + 900 * i: float(i) for i in range(count)}
+        _first, _step, grid = build_grid(prices)
+        assert len(grid) == 92
+
+    def test_too_few_prices(self):
+        assert build_grid({DAY.timestamp(): 1.0}) is None
+
+    def test_months_of_quarters(self):
+        prices = {DAY.timestamp() + 900 * i: float(i % 96) for i in range(120 * 96)}
+        first, step, grid = build_grid(prices)
+        assert (first, step, len(grid)) == (DAY.timestamp(), 900, 120 * 96)
+
+    def test_sparse_prices_by_bisection(self):
+        # Two days of hourly prices a month apart, and one quarter-hour price
+        later = DAY.timestamp() + 30 * 86400
+        prices = {DAY.timestamp() + 3600 * i: float(i) for i in range(24)}
+        prices |= {later + 3600 * i: 100.0 + i for i in range(24)}
+        prices[later + 24 * 3600] = 200.0
+        assert build_grid(prices) is None
+        feed = PriceFeed()
+        feed.load(prices, 7.0)
+        assert feed.interval_s == 3600
+        assert feed.price_at(DAY.timestamp() - 1) == 7.0
+        assert feed.price_at(DAY.timestamp() + 5 * 3600 + 10) == 5.0
+        # A gap keeps the last price before it, like the grid does
+        assert feed.price_at(DAY.timestamp() + 10 * 86400) == 23.0
+        assert feed.price_at(later + 3599) == 100.0
+        assert feed.price_at(later + 24 * 3600 + 3599) == 200.0
+        assert feed.price_at(later + 25 * 3600) == 7.0
+
+
+class TestPriceFeed:
+    """Test lookups and parsing."""
+
+    def test_falls_back_to_state_outside_arrays(self):
+        raw = [{"start": start, "value": price} for start, price in _quarters(DAY, [1.0, 2.0])]
+        feed = PriceFeed()
+        feed.update(_state(7.0, raw_today=raw))
+        assert feed.price_at((DAY - timedelta(minutes=1)).timestamp()) == 7.0
+        assert feed.price_at((DAY + timedelta(minutes=30)).timestamp()) == 7.0
+
+    @pytest.mark.parametrize("value", ["unknown", "unavailable", "n/a"])
+    def test_unavailable_state(self, value):
+        feed = PriceFeed()
+        feed.update(_state(value))
+        assert feed.price_at(DAY.timestamp()) is None
+        assert feed.interval_s is None
+
+    def test_missing_sensor(self):
+        feed = PriceFeed()
+        feed.update(None)
+        assert feed.price_at(DAY.timestamp()) is None
+
+    def test_parses_once_per_state(self):
+        feed = PriceFeed()
+        state = _state(1.0)
+        for _ in range(10):
+            feed.update(state)
+        assert feed.parses == 1
+        feed.update(_state(2.0))
+        assert feed.parses == 2
+        assert feed.price_at(DAY.timestamp()) == 2.0
+
+
+class TestPriceSources:
+    """Test the recorder and file price sources."""
+
+    def test_recorder_states_on_quarter_hours(self):
+        states = [
+            _state(1.0, DAY + timedelta(seconds=2)),
+            _state("unavailable", DAY + timedelta(minutes=5)),
+            _state(2.0, DAY + timedelta(minutes=15, seconds=1)),
+            _state(2.5, DAY + timedelta(minutes=16)),  # correction in the same quarter
+        ]
+        prices = prices_from_states(states)
+        assert prices == {DAY.timestamp(): 1.0, DAY.timestamp() + 900: 2.5}
+
+    def test_recorder_states_with_arrays(self):
+        raw = [{"start": start, "value": price} for start, price in _quarters(DAY, [1.0, 2.0])]
+        states = [_state(1.0, DAY, raw_today=raw), _state(2.0, DAY + timedelta(minutes=15), raw_today=raw)]
+        assert prices_from_states(states) == {DAY.timestamp(): 1.0, DAY.timestamp() + 900: 2.0}
+
+    def test_csv_with_decimal_comma(self, tmp_path):
+        path = tmp_path / "priser.csv"
+        path.write_text("Tidspunkt;NOK/kWh\n05.01.2026 00:00;1,25\n05.01.2026 00:15;-0,01\n", encoding="utf-8")
+        assert read_price_file(path) == {DAY.timestamp(): 1.25, DAY.timestamp() + 900: -0.01}
+
+    def test_file_with_one_price(self, tmp_path):
+        path = tmp_path / "priser.csv"
+        path.write_text("start,pris\n2026-01-05 00:00,1.0\n", encoding="utf-8")
+        with pytest.raises(PriceSourceError, match="two prices"):
+            read_price_file(path)
+
+    def test_file_without_price_column(self, tmp_path):
+        path = tmp_path / "priser.csv"
+        path.write_text("start,kwh\n2026-01-05T00:00:00+01:00,1.0\n", encoding="utf-8")
+        with pytest.raises(PriceSourceError):
+            read_price_file(path)
+
+    def test_parquet_needs_pyarrow(self, tmp_path, monkeypatch):
+        monkeypatch.setitem(sys.modules, "pyarrow", None)
+        monkeypatch.setitem(sys.modules, "pyarrow.parquet", None)
+        path = tmp_path / "priser.parquet"
+        path.write_bytes(b"PAR1")
+        with pytest.raises(PriceSourceError, match="pyarrow"):
+            read_price_file(path)
+
+    def test_load_replaces_prices(self):
+        feed = PriceFeed()
+        feed.update(_state(9.0))
+        feed.load({DAY.timestamp(): 1.0, DAY.timestamp() + 3600: 2.0})
+        assert feed.interval_s == 3600
+        assert feed.price_at(DAY.timestamp() + 4000) == 2.0
+        assert feed.price_at(DAY.timestamp() - 1) is None
+
+
+def test_coordinator_uses_current_quarter(coordinator_harness):
+    """The interval price comes from the arrays, not the (stale) state."""
+    start = datetime(2026, 1, 5, 12, 0)
+    harness = coordinator_harness(start)
+    raw = [{"start": start + timedelta(minutes=15 * i), "value": 1.0 + i} for i in range(4)]
+    harness.states.set(harness.SPOT_SENSOR, 1.0, {"raw_today": raw})
+    data = harness.update_at(start + timedelta(minutes=31))
+    assert data["spot_price"] == 3.0
+
+
+def test_coordinator_tracks_price_sensors(coordinator_harness):
+    """Once subscribed, updates read no price state; events update the feed."""
+    from custom_components.stromkalkulator import coordinator as coordinator_module
+
+    harness = coordinator_harness(datetime(2026, 1, 5, 12, 0), electricity_provider_price_sensor="sensor.provider")
+    harness.set_spot(1.0)
+    harness.states.set("sensor.provider", 1.5)
+    harness.set_power(1000)
+    track = coordinator_module.async_track_state_change_event
+    track.reset_mock()
+    untrack = harness.coordinator.async_track_price_sensors()
+    (_hass, entity_ids, state_changed), _kwargs = track.call_args
+    assert entity_ids == [harness.SPOT_SENSOR, "sensor.provider"]
+
+    reads = harness.states.reads
+    data = harness.tick(60)
+    assert harness.states.reads - reads == 1  # only the power sensor
+    assert data["spot_price"] == 1.0
+    assert data["electricity_company_price"] == 1.5
+
+    state_changed(SimpleNamespace(data={"entity_id": harness.SPOT_SENSOR, "new_state": _state(2.0)}))
+    assert harness.tick(60)["spot_price"] == 2.0
+
+    untrack()
+    harness.set_spot(3.0)
+    assert harness.tick(60)["spot_price"] == 3.0
+
+
+def test_coordinator_replays_offline_from_price_file(coordinator_harness, tmp_path):
+    """A week replayed with prices from a file: no spot sensor, same strømstøtte as the reference."""
+    month = generate_month(2026, 1, "enebolig", step_s=900)
+    week = 7 * 96
+    path = month.write_prices(tmp_path / "priser.csv")
+    harness = coordinator_harness(month.local_time(0), **{CONF_PRICE_FILE: str(path), CONF_MAX_GAP_MINUTES: 15})
+    reads_per_tick = []
+    for i in range(week):
+        reads = harness.states.reads
+        harness.set_power(month.power_w[i])
+        data = harness.update_at(month.local_time(i))
+        reads_per_tick.append(harness.states.reads - reads)
+        assert data["spot_price"] == pytest.approx(month.spot_at(i), abs=1e-4)
+
+    assert set(reads_per_tick) == {1}  # only the power sensor
+    month.timestamps = month.timestamps[:week]
+    month.power_w = month.power_w[:week]
+    coordinator = harness.coordinator
+    reference = reference_totals(
+        month,
+        energiledd_dag=coordinator.energiledd_dag,
+        energiledd_natt=coordinator.energiledd_natt,
+        kapasitetstrinn=coordinator.kapasitetstrinn,
+        price_arrays=True,
+    )
+    assert coordinator._ledger.totals["stromstotte"] == pytest.approx(reference["stromstotte_kr"], abs=0.01)
+
+
+def test_coordinator_uses_months_long_price_file(coordinator_harness, tmp_path):
+    """120 days of 15-minute prices: spot comes from the file, late in the period too."""
+    start = datetime(2025, 10, 1)
+    path = tmp_path / "priser.csv"
+    rows = [f"{start + timedelta(minutes=15 * i):%Y-%m-%d %H:%M},{1.0 + (i % 96) / 100:.2f}" for i in range(120 * 96)]
+    path.write_text("start,pris\n" + "\n".join(rows), encoding="utf-8")
+    harness = coordinator_harness(datetime(2026, 1, 5, 12, 20), **{CONF_PRICE_FILE: str(path)})
+    harness.set_spot(9.0)
+    harness.set_power(2000)
+    data = harness.tick(60)
+    # 12:15 on day 96 is quarter 49 of the day
+    assert data["spot_price"] == pytest.approx(1.49)
+    assert harness.coordinator._spot_from_file
+
+
+@pytest.mark.parametrize("contents", [None, "start,pris\n2026-01-05 00:00,1.0\n"])
+def test_unreadable_price_file_falls_back_to_sensor(coordinator_harness, tmp_path, contents):
+    path = tmp_path / "priser.csv"
+    if contents is not None:
+        path.write_text(contents, encoding="utf-8")
+    harness = coordinator_harness(datetime(2026, 1, 5, 12, 0), **{CONF_PRICE_FILE: str(path)})
+    harness.set_spot(1.5)
+    assert harness.tick(60)["spot_price"] == 1.5
+    assert not harness.coordinator._spot_from_file
+
+
+def test_gap_backfill_priced_from_recorder_history(coordinator_harness):
+    """Each interval in a gap is booked at the spot price recorded for it, not the current one."""
+    start = datetime(2026, 1, 5, 12, 0)
+    harness = coordinator_harness(start, **{CONF_MAX_GAP_MINUTES: 15})
+    harness.hass.config.components.add("recorder")
+    harness.set_spot(1.0)
+    harness.set_power(6000)
+    harness.tick(60)
+    gap_start = harness.now
+
+    async def recorder_states(entity_id, period_start, period_end):
+        if entity_id == harness.SPOT_SENSOR:
+            return [_state(0.1, gap_start), _state(0.5, gap_start + timedelta(minutes=30))]
+        return [_state(6000, gap_start)]
+
+    harness.coordinator._async_recorder_states = recorder_states
+    harness.set_spot(9.0)
+    data = harness.tick(60 * 60)
+
+    # 29 minutes at 0.10 and 31 minutes at 0.50 (the current 9.00 is not used for the gap)
+    assert data["monthly_spot_kr"] == pytest.approx(2.9 * 0.1 + 3.1 * 0.5, abs=0.01)
+
+
+def test_import_priced_from_price_file(coordinator_harness, tmp_path):
+    harness = coordinator_harness(datetime(2026, 1, 5, 12, 0))
+    export = tmp_path / "elhub.csv"
+    export.write_text("Fra;KWH\n01.12.2025 00:00;2,0\n01.12.2025 01:00;3,0\n", encoding="utf-8")
+    prices = tmp_path / "priser.csv"
+    prices.write_text("start,pris\n2025-12-01 00:00,2.0\n2025-12-01 01:00,0.5\n", encoding="utf-8")
+    harness.loop.run_until_complete(
+        harness.coordinator.async_import_consumption(str(export), "Europe/Oslo", "local", str(prices))
+    )
+    totals = harness.loop.run_until_complete(harness.coordinator._async_history())["2025-12"].totals
+    assert totals["spot"] == pytest.approx(2 * 2.0 + 3 * 0.5)
+    assert totals["stromstotte"] == pytest.approx(2 * (2.0 - 0.9625) * 0.9)
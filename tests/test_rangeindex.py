@@ -0,0 +1,216 @@
+"""Tests for the prefix-sum range index (rangeindex.py).
+
+Tests coverage:
+- Column sums and peak hour against a plain scan, for whole and partial hours
+- Truncating and appending again gives the same index as building it anew
+- Hour indexes and ledger row keys
+- Coordinator: query over measured hours, late bookings after a query,
+  imported history, month sensors reading the shared month totals
+"""
+
+from __future__ import annotations
+
+import random
+from datetime import datetime
+
+import pytest
+
+from custom_components.stromkalkulator.ledger import CostLedger, IntervalPrices
+from custom_components.stromkalkulator.rangeindex import (
+    COLUMNS,
+    RangeIndex,
+    hour_index,
+    hour_of_key,
+    key_of_hour,
+    row_values,
+)
+
+PRICES = IntervalPrices(energiledd=0.4, spot=1.0, stromstotte=0.0, forbruksavgift=0.1, enova=0.01, mva_sats=0.25)
+FIRST = hour_index(datetime(2026, 1, 1, 0, 0))
+
+
+def _hours(count: int, seed: int = 7) -> list[tuple[float, ...]]:
+    """Random hour values, some hours empty."""
+    rng = random.Random(seed)
+    return [
+        tuple(rng.uniform(0, 3) for _ in COLUMNS) if rng.random() > 0.2 else (0.0,) * len(COLUMNS) for _ in range(count)
+    ]
+
+
+def _index(hours: list[tuple[float, ...]]) -> RangeIndex:
+    index = RangeIndex(FIRST)
+    for offset, values in enumerate(hours):
+        index.append(FIRST + offset, values)
+    return index
+
+
+def _scan(hours: list[tuple[float, ...]], start: float, end: float) -> list[float]:
+    """Column sums by visiting every hour."""
+    totals = [0.0] * len(COLUMNS)
+    for offset, values in enumerate(hours):
+        share = max(0.0, min(end, FIRST + offset + 1) - max(start, FIRST + offset))
+        for column, value in enumerate(values):
+            totals[column] += value * share
+    return totals
+
+
+class TestRangeIndex:
+    """Test sums and peaks against a plain scan."""
+
+    def test_sums_match_scan(self):
+        hours = _hours(200)
+        index = _index(hours)
+        rng = random.Random(1)
+        for _ in range(300):
+            start = FIRST - 3 + rng.uniform(0, 210)
+            end = start + rng.uniform(0, 60)
+            assert index.sums(start, end) == pytest.approx(_scan(hours, start, end), abs=1e-9)
+
+    def test_partial_hours(self):
+        index = _index([(1.0, 0.0, 0.4, 1.0, 0.0, 0.0, 0.125, 0.0125, 0.0)] * 3)
+        # 10:15 to 10:45 in one hour, then 10:30 to 12:30 across two edges
+        assert index.sums(FIRST + 0.25, FIRST + 0.75)[0] == pytest.approx(0.5)
+        assert index.sums(FIRST + 0.5, FIRST + 2.5)[0] == pytest.approx(2.0)
+        assert index.sums(FIRST + 2, FIRST + 1) == [0.0] * len(COLUMNS)
+
+    def test_peak_matches_scan(self):
+        hours = _hours(300, seed=3)
+        index = _index(hours)
+        kwh = [values[0] + values[1] for values in hours]
+        rng = random.Random(2)
+        for _ in range(300):
+            low = rng.randrange(300)
+            high = rng.randrange(low, 300) + 1
+            hour, peak = index.peak(FIRST + low, FIRST + high)
+            assert peak == max(kwh[low:high])
+            assert kwh[hour - FIRST] == peak
+        assert index.peak(FIRST - 10, FIRST - 5) is None
+
+    def test_truncate_and_append_again(self):
+        hours = _hours(100, seed=5)
+        index = _index(hours)
+        changed = _hours(100, seed=6)[40:]
+        index.truncate(FIRST + 40)
+        assert index.end == FIRST + 40
+        for offset, values in enumerate(changed, 40):
+            index.append(FIRST + offset, values)
+        rebuilt = _index(hours[:40] + changed)
+        assert list(index.kwh) == list(rebuilt.kwh)
+        assert index.sparse == rebuilt.sparse
+        assert index.sums(FIRST + 10.5, FIRST + 90.25) == pytest.approx(rebuilt.sums(FIRST + 10.5, FIRST + 90.25))
+
+    def test_append_pads_gaps_and_keeps_order(self):
+        index = RangeIndex(FIRST)
+        index.append(FIRST + 5, (1.0,) * len(COLUMNS))
+        assert index.end == FIRST + 6
+        assert index.sums(FIRST, FIRST + 5)[0] == 0.0
+        with pytest.raises(ValueError):
+            index.append(FIRST + 2, (1.0,) * len(COLUMNS))
+
+    def test_keys(self):
+        assert key_of_hour(hour_of_key("2026-03-29T02")) == "2026-03-29T02"
+        assert hour_of_key("2026-01-01T00") == FIRST
+
+    def test_row_values_split_tariff(self):
+        ledger = CostLedger("2026-01")
+        ledger.add(datetime(2026, 1, 5, 2, 0), False, 2.0, PRICES)
+        values = row_values(ledger.rows["2026-01-05T02"])
+        assert values[:4] == (0.0, 2.0, pytest.approx(0.8), pytest.approx(2.0))
+
+    def test_query(self):
+        ledger = CostLedger("2026-01")
+        for hour, kwh in ((10, 1.0), (11, 4.0), (12, 2.0)):
+            ledger.add(datetime(2026, 1, 5, hour, 0), True, kwh, PRICES)
+        index = RangeIndex(hour_of_key("2026-01-05T10"))
+        for key, row in ledger.rows.items():
+            index.append(hour_of_key(key), row_values(row))
+        result = index.query(datetime(2026, 1, 5, 10, 30), datetime(2026, 1, 5, 12, 30))
+        assert result["forbruk_kwh"] == 5.5
+        assert result["strompris_kr"] == 5.5
+        assert result["energiledd_kr"] == 2.2
+        assert result["topptime"] == "2026-01-05T11"
+        assert result["toppeffekt_kw"] == 4.0
+        assert result["total_kr"] == pytest.approx(5.5 + 2.2 + 5.5 * 0.11 * 1.25, abs=0.01)
+
+
+def _query(harness, start: datetime, end: datetime) -> dict:
+    return harness.loop.run_until_complete(harness.coordinator.async_query_range(start, end))
+
+
+def test_coordinator_query_follows_bookings(coordinator_harness):
+    start = datetime(2026, 2, 13, 15, 0)
+    harness = coordinator_harness(start)
+    harness.set_power(6000)
+    harness.set_spot(1.0)
+    harness.update_at(start)
+    for _ in range(6):
+        harness.tick(600)
+
+    weekend = (datetime(2026, 2, 13, 0, 0), datetime(2026, 2, 16, 0, 0))
+    first = _query(harness, *weekend)
+    assert first["forbruk_kwh"] == pytest.approx(6.0, abs=0.001)
+    assert first["topptime"] == "2026-02-13T15"
+
+    # Bookings after the query, in the indexed hour and the next
+    harness.set_power(3000)
+    for _ in range(3):
+        harness.tick(600)
+    second = _query(harness, *weekend)
+    # The first interval after the change is booked at the mean of 6 and 3 kW
+    assert second["forbruk_kwh"] == pytest.approx(7.75, abs=0.001)
+    assert second["strompris_kr"] == pytest.approx(7.75, abs=0.01)
+    index = harness.coordinator._range_index
+    assert index is not None
+    assert index.first == hour_of_key("2026-02-13T15")
+
+    # Same as an index built from scratch
+    harness.coordinator._range_index = None
+    assert _query(harness, *weekend) == second
+
+
+def test_coordinator_query_includes_imported_history(coordinator_harness):
+    harness = coordinator_harness(datetime(2026, 3, 2, 12, 0))
+    harness.set_power(0)
+    harness.set_spot(1.0)
+    harness.update_at(harness.now)
+    imported = CostLedger("2025-12")
+    imported.add(datetime(2025, 12, 24, 17, 0), True, 3.0, PRICES)
+    harness.coordinator._history = {"2025-12": imported}
+
+    result = _query(harness, datetime(2025, 12, 24, 0, 0), datetime(2025, 12, 27, 0, 0))
+    assert result["forbruk_kwh"] == 3.0
+    assert result["topptime"] == "2025-12-24T17"
+    assert _query(harness, datetime(2026, 1, 1), datetime(2026, 3, 2))["forbruk_kwh"] == 0.0
+
+
+def test_month_cost_sensors(coordinator_harness):
+    """Both month sensors read nettleie from the coordinator's month totals."""
+    start = datetime(2026, 1, 31, 23, 40)
+    harness = coordinator_harness(start)
+    harness.set_power(6000)
+    harness.set_spot(1.0)
+    harness.update_at(start)
+    harness.tick(600)
+    harness.update_at(datetime(2026, 2, 1, 0, 0))
+    data = harness.tick(600)
+
+    sensors = {sensor._attr_translation_key: sensor for sensor in harness.create_entities()}
+    total = sensors["maanedlig_total"]
+    assert total.native_value == round(
+        data.monthly_energiledd_dag_kr
+        + data.monthly_energiledd_natt_kr
+        + data.kapasitetsledd
+        + data.monthly_forbruksavgift_kr
+        + data.monthly_enova_kr
+        - data.monthly_stromstotte_kr,
+        2,
+    )
+    previous = sensors["forrige_maaned_nettleie"]
+    attributes = previous.extra_state_attributes
+    # January's booked energiledd (natt) and the kapasitetsledd its peak reached
+    assert attributes["energiledd_natt_kr"] == pytest.approx(2 * harness.coordinator.energiledd_natt, abs=0.01)
+    assert attributes["kapasitetsledd_kr"] == harness.coordinator._get_kapasitetsledd(6.0)[0]
+    assert previous.native_value == pytest.approx(
+        attributes["energiledd_dag_kr"] + attributes["energiledd_natt_kr"] + attributes["kapasitetsledd_kr"],
+        abs=0.01,
+    )
@@ -0,0 +1,203 @@
+"""Tests for invoice reconciliation (reconcile.py).
+
+Tests coverage:
+- Invoice lines computed from hourly ledger rows (kWh, kr, strømstøtte øre, kapasitet)
+- BKK invoice lines (inkl. mva) and invoices eks. mva
+- Invoice fixtures parsed by scripts/ingest_invoices.py
+- Coordinator: reconcile current/previous month, replay matches the reference
+- A year of invoices reconciles in milliseconds
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import json
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from custom_components.stromkalkulator.ledger import CostLedger, IntervalPrices
+from custom_components.stromkalkulator.reconcile import INVOICE_LINES, Invoice, ledger_lines, reconcile
+
+from .synthetic_load import generate_month, reference_totals
+
+BKK_2025 = [(2, 155), (5, 250), (10, 415), (15, 600), (20, 770), (25, 940), (50, 1800), (75, 2650), (100, 3500)]
+MVA = 0.25
+FIXTURES = Path(__file__).parent / "fixtures" / "fakturaer"
+
+
+def _fixture(name: str) -> Invoice:
+    """Invoice parsed from an anonymized BKK invoice."""
+    return Invoice.from_dict(json.loads((FIXTURES / f"{name}.json").read_text(encoding="utf-8")))
+
+
+def _december_ledger() -> CostLedger:
+    """Ledger shaped like BKK invoice 63374727 (desember 2025).
+
+    The invoice lines are inkl. mva: forbruksavgift 15.662 øre = 12.53 øre eks. mva.
+
+    31 days with 24 hours each; day hours (08-19) and night hours split the
+    invoice kWh evenly, and one 7 kWh hour per day gives the 5-10 kW trinn.
+    """
+    ledger = CostLedger("2025-12")
+    dag = IntervalPrices(0.35963, 1.0, 0.0, 0.15662 / 1.25, 0.01, MVA)
+    natt = IntervalPrices(0.23738, 1.0, 0.0, 0.15662 / 1.25, 0.01, MVA)
+    start = datetime(2025, 12, 1)
+    dag_per_hour = (667.422 - 31 * 7) / (31 * 12 - 31)
+    natt_per_hour = 887.299 / (31 * 12)
+    for day in range(31):
+        for hour in range(24):
+            when = start + timedelta(days=day, hours=hour)
+            if 8 <= hour < 20:
+                kwh = 7.0 if hour == 8 else dag_per_hour
+                ledger.add(when, True, kwh, dag)
+            else:
+                ledger.add(when, False, natt_per_hour, natt)
+    return ledger
+
+
+class TestLedgerLines:
+    """Test invoice lines computed from the ledger."""
+
+    def test_matches_bkk_invoice(self):
+        ledger = _december_ledger()
+        # The ledger has no spot prices, so strømstøtte is left out
+        invoice = dataclasses.replace(
+            _fixture("BKK_Faktura_desember_2025"), stromstotte_kwh=None, stromstotte_ore=None, stromstotte_kr=None
+        )
+        result = reconcile(ledger, invoice, BKK_2025, MVA)
+        assert result.hours == 31 * 24
+        assert [line.line for line in result.lines] == [
+            "energiledd_dag_kwh",
+            "energiledd_dag_kr",
+            "energiledd_natt_kwh",
+            "energiledd_natt_kr",
+            "kapasitet_kr",
+            "forbruksavgift_kr",
+            "enova_kr",
+        ]
+        for line in result.lines:
+            assert line.diff == pytest.approx(0, abs=0.05), line.line
+        assert result.max_abs_diff_kr < 0.05
+
+    def test_eks_mva_invoice(self):
+        ledger = _december_ledger()
+        invoice = Invoice("2025-12", energiledd_dag_kr=192.02, kapasitet_kr=332.0, inkl_mva=False)
+        result = reconcile(ledger, invoice, BKK_2025, MVA)
+        for line in result.lines:
+            assert line.diff == pytest.approx(0, abs=0.05), line.line
+
+    def test_kapasitet_from_hourly_peaks(self):
+        ledger = CostLedger("2026-01")
+        prices = IntervalPrices(0.4, 1.0, 0.0, 0.0713, 0.01, MVA)
+        # Three days with an 11 kWh hour, split over two intervals in the same hour
+        for day in (5, 6, 7):
+            ledger.add(datetime(2026, 1, day, 17, 0), True, 5.5, prices)
+            ledger.add(datetime(2026, 1, day, 17, 30), True, 5.5, prices)
+        assert ledger_lines(ledger, BKK_2025)["kapasitet_kr"] == 600
+
+    def test_kapasitet_above_last_threshold(self):
+        ledger = CostLedger("2026-01")
+        prices = IntervalPrices(0.4, 1.0, 0.0, 0.0713, 0.01, MVA)
+        for day in (5, 6, 7):
+            ledger.add(datetime(2026, 1, day, 17, 0), True, 120.0, prices)
+        # No threshold above 120 kW: the last trinn, not 0 kr
+        assert ledger_lines(ledger, BKK_2025)["kapasitet_kr"] == 3500
+
+    def test_stromstotte_lines(self):
+        ledger = CostLedger("2025-11")
+        high = IntervalPrices(0.4, 2.0, (2.0 - 0.9625) * 0.9, 0.0, 0.0, MVA)
+        low = IntervalPrices(0.4, 0.5, 0.0, 0.0, 0.0, MVA)
+        ledger.add(datetime(2025, 11, 3, 8), True, 3.0, high)
+        ledger.add(datetime(2025, 11, 3, 9), True, 2.0, low)
+        lines = ledger_lines(ledger, BKK_2025)
+        assert lines["stromstotte_kwh"] == pytest.approx(3.0)
+        assert lines["stromstotte_kr"] == pytest.approx(3.0 * 0.93375)
+        assert lines["stromstotte_ore"] == pytest.approx(93.375)
+
+    def test_empty_ledger(self):
+        lines = ledger_lines(CostLedger("2026-01"), BKK_2025)
+        assert lines["energiledd_dag_kwh"] == 0.0
+        assert lines["stromstotte_ore"] == 0.0
+
+
+class TestInvoice:
+    """Test invoice input."""
+
+    def test_from_dict_ignores_unknown_keys(self):
+        invoice = Invoice.from_dict({"month": "2026-01", "kapasitet_kr": 415, "fakturanummer": "63374727"})
+        assert invoice.kapasitet_kr == 415
+        assert invoice.energiledd_dag_kwh is None
+
+    def test_month_mismatch(self):
+        with pytest.raises(ValueError):
+            reconcile(CostLedger("2026-01"), Invoice("2026-02"), BKK_2025, MVA)
+
+    def test_diff_pct(self):
+        result = reconcile(_december_ledger(), Invoice("2025-12", kapasitet_kr=400.0), BKK_2025, MVA)
+        line = result.line("kapasitet_kr")
+        assert line is not None
+        assert line.diff == pytest.approx(15.0)
+        assert result.as_dict()["lines"][0]["diff_pct"] == pytest.approx(3.75)
+
+    @pytest.mark.parametrize("name", sorted(path.stem for path in FIXTURES.glob("*.json")))
+    def test_parsed_fixtures_are_consistent(self, name):
+        """Parsed invoices: kWh times øre matches the strømstøtte line, and all lines are present."""
+        invoice = _fixture(name)
+        assert all(getattr(invoice, line) is not None for line in INVOICE_LINES), name
+        assert invoice.stromstotte_kwh * invoice.stromstotte_ore / 100 == pytest.approx(
+            invoice.stromstotte_kr, abs=0.01
+        )
+        assert invoice.month.startswith("2025-")
+
+
+def test_coordinator_reconciles_replayed_month(coordinator_harness):
+    """An invoice built from the reference calculation reconciles to ~0 against a replayed month."""
+    month = generate_month(2026, 1, "enebolig", step_s=900)
+    harness = coordinator_harness(month.local_time(0), max_gap_minutes=15)
+    for i in range(len(month)):
+        harness.set_power(month.power_w[i])
+        harness.set_spot(month.spot_at(i))
+        harness.update_at(month.local_time(i))
+    coordinator = harness.coordinator
+    reference = reference_totals(
+        month,
+        energiledd_dag=coordinator.energiledd_dag,
+        energiledd_natt=coordinator.energiledd_natt,
+        kapasitetstrinn=coordinator.kapasitetstrinn,
+    )
+    invoice = Invoice(
+        month="2026-01",
+        energiledd_dag_kwh=reference["dag_kwh"],
+        energiledd_natt_kwh=reference["natt_kwh"],
+        stromstotte_kr=reference["stromstotte_kr"],
+    )
+    result = harness.loop.run_until_complete(coordinator.async_reconcile_invoice(invoice))
+    assert result is not None
+    for line in result.lines:
+        assert line.diff == pytest.approx(0, abs=0.01), line.line
+    assert harness.loop.run_until_complete(coordinator.async_reconcile_invoice(Invoice("2025-06"))) is None
+
+
+def test_year_of_invoices_is_fast():
+    """Reconciling twelve invoices is one pass per month, in milliseconds."""
+    prices = IntervalPrices(0.4, 1.0, 0.1, 0.0713, 0.01, MVA)
+    ledgers = {}
+    for month in range(1, 13):
+        ledger = CostLedger(f"2025-{month:02d}")
+        start = datetime(2025, month, 1)
+        for hour in range(31 * 24):
+            when = start + timedelta(hours=hour)
+            if when.month == month:
+                ledger.add(when, 6 <= when.hour < 22, 1.0 + hour % 5, prices)
+        ledgers[ledger.month] = ledger
+    invoices = [Invoice(month, energiledd_dag_kwh=1.0, kapasitet_kr=415) for month in ledgers]
+
+    started = time.perf_counter()
+    results = [reconcile(ledgers[invoice.month], invoice, BKK_2025, MVA) for invoice in invoices]
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    assert len(results) == 12
+    assert elapsed_ms < 100, f"Reconciling a year took {elapsed_ms:.1f} ms"
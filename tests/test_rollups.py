@@ -0,0 +1,212 @@
+"""Tests for the hour/day/week/month/year rollups (rollups.py).
+
+Tests coverage:
+- Period keys and labels, ISO week across a year change
+- Bookings added to the open hour and folded into its periods at close
+- Late bookings into a closed hour, previous period kept only if adjacent
+- Packed storage round trip
+- Coordinator: cost today and this year, restored after restart, seeded
+  from the ledger and month summaries on upgrade, and the sensors
+"""
+
+from __future__ import annotations
+
+import base64
+from datetime import datetime
+
+import pytest
+
+from custom_components.stromkalkulator.fixedpoint import UWH_PER_KWH
+from custom_components.stromkalkulator.ledger import TOTAL_FIELDS, CostLedger, IntervalPrices
+from custom_components.stromkalkulator.rollups import (
+    TIER_DAY,
+    TIER_HOUR,
+    TIER_MONTH,
+    TIER_WEEK,
+    TIER_YEAR,
+    TIERS,
+    Rollups,
+    period_keys,
+    period_label,
+)
+
+PRICES = IntervalPrices(energiledd=0.4, spot=1.0, stromstotte=0.0, forbruksavgift=0.1, enova=0.01, mva_sats=0.25)
+
+
+def _booked(when: datetime, kwh: float = 1.0) -> tuple[int, ...]:
+    """Ledger sums of one booking on the dag tariff."""
+    return CostLedger(f"{when.year:04d}-{when.month:02d}").add(when, True, kwh, PRICES)
+
+
+class TestPeriods:
+    """Test period keys and labels."""
+
+    def test_keys_and_labels(self):
+        keys = period_keys(datetime(2026, 1, 7, 13, 25))
+        labels = [period_label(tier, key) for tier, key in enumerate(keys)]
+        assert labels == ["2026-01-07T13", "2026-01-07", "2026-W02", "2026-01", "2026"]
+
+    def test_iso_week_across_year_change(self):
+        week = period_keys(datetime(2026, 1, 1, 0, 0))[TIER_WEEK]
+        assert week == period_keys(datetime(2025, 12, 29, 12, 0))[TIER_WEEK]
+        assert period_label(TIER_WEEK, week) == "2026-W01"
+
+
+class TestRollups:
+    """Test folding and routing of bookings."""
+
+    def test_open_hour_folded_at_close(self):
+        start = datetime(2026, 1, 5, 13, 0)
+        rollups = Rollups(start)
+        rollups.add(datetime(2026, 1, 5, 13, 10), _booked(start))
+        rollups.add_peak(datetime(2026, 1, 5, 13, 10), 6.0)
+        assert rollups.current[TIER_HOUR].bookings == 1
+        assert rollups.current[TIER_DAY].bookings == 0
+        assert rollups.running(TIER_DAY).kwh == 1.0
+
+        rollups.roll(datetime(2026, 1, 5, 14, 0))
+        assert rollups.current[TIER_HOUR].bookings == 0
+        assert rollups.previous[TIER_HOUR].kwh == 1.0
+        for tier in range(TIER_DAY, len(TIERS)):
+            assert rollups.current[tier].kwh == 1.0
+            assert rollups.current[tier].peak_kw == 6.0
+        day = rollups.running(TIER_DAY)
+        assert day.spot_kr == pytest.approx(1.0)
+        assert day.energiledd_kr == pytest.approx(0.4)
+        assert day.total_kr == pytest.approx(1.0 + 0.4 + 0.11 * 1.25)
+
+    def test_late_booking_into_closed_hour(self):
+        rollups = Rollups(datetime(2026, 1, 5, 23, 0))
+        rollups.add(datetime(2026, 1, 5, 23, 50), _booked(datetime(2026, 1, 5, 23, 50)))
+        rollups.roll(datetime(2026, 1, 6, 0, 5))
+        rollups.add(datetime(2026, 1, 5, 23, 55), _booked(datetime(2026, 1, 5, 23, 55), 2.0))
+        assert rollups.previous[TIER_HOUR].kwh == 3.0
+        assert rollups.previous[TIER_DAY].kwh == 3.0
+        assert rollups.current[TIER_DAY].kwh == 0.0
+        assert rollups.current[TIER_MONTH].kwh == 3.0
+
+        # Older than the previous day: only the periods still held get it
+        rollups.add(datetime(2026, 1, 4, 12, 0), _booked(datetime(2026, 1, 4, 12, 0)))
+        assert rollups.previous[TIER_DAY].kwh == 3.0
+        assert rollups.current[TIER_MONTH].kwh == 4.0
+
+    def test_previous_period_only_if_adjacent(self):
+        rollups = Rollups(datetime(2026, 1, 5, 12, 0))
+        rollups.add(datetime(2026, 1, 5, 12, 0), _booked(datetime(2026, 1, 5, 12, 0)))
+        rollups.roll(datetime(2026, 1, 7, 9, 0))
+        assert rollups.previous[TIER_DAY].key == period_keys(datetime(2026, 1, 6))[TIER_DAY]
+        assert rollups.previous[TIER_DAY].kwh == 0.0
+        assert rollups.current[TIER_WEEK].kwh == 1.0
+        rollups.roll(datetime(2026, 2, 1, 0, 0))
+        assert rollups.previous[TIER_MONTH].kwh == 1.0
+        assert rollups.current[TIER_YEAR].kwh == 1.0
+
+    def test_storage_round_trip(self):
+        now = datetime(2026, 1, 5, 13, 0)
+        rollups = Rollups(now)
+        rollups.add(now, _booked(now))
+        rollups.add_peak(now, 4.0)
+        stored = rollups.as_dict()
+        assert len(base64.b64decode(stored["data"])) == 1 + 10 * (24 + 8 * len(TOTAL_FIELDS))
+
+        restored = Rollups.from_dict(stored, datetime(2026, 1, 5, 15, 0))
+        assert restored is not None
+        assert restored.current[TIER_DAY].kwh == 1.0
+        assert restored.current[TIER_DAY].peak_kw == 4.0
+        assert restored.current[TIER_HOUR].key == period_keys(datetime(2026, 1, 5, 15, 0))[TIER_HOUR]
+
+    @pytest.mark.parametrize("stored", [None, {}, {"data": "not base64!"}, {"data": "AgAA"}])
+    def test_unusable_storage(self, stored):
+        assert Rollups.from_dict(stored, datetime(2026, 1, 5)) is None
+
+
+def _run_over_midnight(harness, start: datetime) -> None:
+    """Book 1 kWh (6 kW for 10 min) before and after midnight."""
+    harness.set_power(6000)
+    harness.set_spot(1.0)
+    harness.update_at(start)
+    harness.tick(600)
+    harness.update_at(start.replace(hour=0, minute=0) + (datetime(2026, 1, 2) - datetime(2026, 1, 1)))
+    harness.tick(600)
+
+
+def test_coordinator_today_and_this_year(coordinator_harness):
+    start = datetime(2025, 12, 31, 23, 40)
+    harness = coordinator_harness(start)
+    _run_over_midnight(harness, start)
+    data = harness.update_at(harness.now)
+
+    assert data.today_kwh == pytest.approx(1.0, abs=0.001)
+    assert data.this_year_kwh == pytest.approx(1.0, abs=0.001)
+    assert data.today_peak_kw == pytest.approx(6.0)
+    assert data.today_spot_kr == pytest.approx(1.0, abs=0.01)
+    # Yesterday (and last year) got the two intervals before midnight
+    assert data.today_previous_total_kr == pytest.approx(2 * data.today_total_kr, abs=0.01)
+    assert data.this_year_previous_total_kr == data.today_previous_total_kr
+    assert data.today_total_kr == pytest.approx(
+        data.today_spot_kr + data.today_energiledd_kr + data.today_avgifter_kr - data.today_stromstotte_kr
+    )
+
+
+def test_rollups_restored_after_restart(coordinator_harness):
+    first = coordinator_harness(datetime(2026, 3, 10, 12, 0))
+    first.set_power(6000)
+    first.set_spot(1.0)
+    first.tick(0)
+    first.tick(600)
+    first.ledger_store.flush()
+
+    second = coordinator_harness(first.now)
+    second.store.data = first.store.data
+    second.ledger_store.data = first.ledger_store.data
+    second.set_power(0)
+    second.set_spot(1.0)
+    data = second.update_at(second.now)
+    assert data.today_kwh == pytest.approx(1.0, abs=0.001)
+    assert data.today_bookings == 1
+
+
+def test_upgrade_seeds_month_and_year(coordinator_harness):
+    """Without stored rollups the year starts from the ledger and this year's summaries."""
+    first = coordinator_harness(datetime(2026, 2, 28, 23, 40))
+    first.set_power(6000)
+    first.set_spot(1.0)
+    first.tick(0)
+    first.tick(600)
+    first.update_at(datetime(2026, 3, 1, 0, 0))
+    first.tick(600)
+    first.ledger_store.flush()
+    del first.ledger_store.data["rollups"]
+
+    second = coordinator_harness(first.now)
+    second.store.data = first.store.data
+    second.ledger_store.data = first.ledger_store.data
+    second.set_power(0)
+    second.set_spot(1.0)
+    data = second.update_at(second.now)
+    assert data.this_year_kwh == pytest.approx(3.0, abs=0.001)
+    assert data.this_year_peak_kw == pytest.approx(6.0)
+    # The day is not seeded
+    assert data.today_kwh == 0.0
+    rollups = second.coordinator._rollups
+    assert rollups.current[TIER_MONTH].sums[0] + rollups.current[TIER_MONTH].sums[1] == pytest.approx(
+        UWH_PER_KWH, rel=0.001
+    )
+
+
+def test_sensors(coordinator_harness):
+    start = datetime(2026, 1, 5, 23, 40)
+    harness = coordinator_harness(start)
+    _run_over_midnight(harness, start)
+    data = harness.update_at(harness.now)
+
+    sensors = {sensor._attr_translation_key: sensor for sensor in harness.create_entities()}
+    today = sensors["stromkostnad_i_dag"]
+    assert today.native_value == data["today_total_kr"]
+    attributes = today.extra_state_attributes
+    assert attributes["forbruk_kwh"] == 1.0
+    assert attributes["toppeffekt_kw"] == 6.0
+    assert attributes["i_gaar_kr"] == data["today_previous_total_kr"]
+    year = sensors["stromkostnad_i_aar"]
+    assert year.native_value == pytest.approx(3 * today.native_value, abs=0.02)
+    assert "i_fjor_kr" in year.extra_state_attributes
@@ -0,0 +1,171 @@
+"""Tests for the integration's services (services.py).
+
+Tests coverage:
+- Config entry: the only loaded one, by id, none loaded or several without an id
+- reconcile_invoice: result per line, month without a stored ledger
+- import_consumption: paths outside allowlist_external_dirs, unreadable file, response
+- get_monthly_summaries and query_range: response shape, zone-aware times, empty range
+"""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+
+from custom_components.stromkalkulator import services
+from custom_components.stromkalkulator.services import (
+    _async_get_monthly_summaries,
+    _async_import_consumption,
+    _async_query_range,
+    _async_reconcile_invoice,
+    _get_coordinator,
+)
+
+
+def _entry(entry_id: str, coordinator: Any, loaded: bool = True) -> SimpleNamespace:
+    state = services.ConfigEntryState.LOADED if loaded else services.ConfigEntryState.NOT_LOADED
+    return SimpleNamespace(entry_id=entry_id, state=state, runtime_data=coordinator)
+
+
+def _hass(*entries: SimpleNamespace, allowed: str = "/") -> SimpleNamespace:
+    return SimpleNamespace(
+        config_entries=SimpleNamespace(async_entries=lambda domain: list(entries)),
+        config=SimpleNamespace(is_allowed_path=lambda path: path.startswith(allowed)),
+    )
+
+
+def _call(**data: Any) -> SimpleNamespace:
+    return SimpleNamespace(data=data)
+
+
+def _export(tmp_path, start: datetime, hours: int, kwh: float = 2.0):
+    path = tmp_path / "elhub.csv"
+    lines = ["Fra;Til;KWH 60 Forbruk"]
+    for i in range(hours):
+        t = start + timedelta(hours=i)
+        value = f"{kwh:.3f}".replace(".", ",")
+        lines.append(f"{t:%d.%m.%Y %H:%M};{t + timedelta(hours=1):%d.%m.%Y %H:%M};{value}")
+    path.write_text("\n".join(lines), encoding="utf-8")
+    return path
+
+
+def _import_call(path, **data: Any) -> SimpleNamespace:
+    return _call(path=str(path), timezone="Europe/Oslo", timestamps="local", **data)
+
+
+class TestConfigEntry:
+    """Test which coordinator a service call goes to."""
+
+    def test_only_loaded_entry(self):
+        first, second = object(), object()
+        hass = _hass(_entry("a", first), _entry("b", second, loaded=False))
+        assert _get_coordinator(hass, _call()) is first
+
+    def test_entry_by_id(self):
+        first, second = object(), object()
+        hass = _hass(_entry("a", first), _entry("b", second))
+        assert _get_coordinator(hass, _call(config_entry_id="b")) is second
+
+    def test_no_loaded_entry(self):
+        for hass, call in (
+            (_hass(), _call()),
+            (_hass(_entry("a", object(), loaded=False)), _call()),
+            (_hass(_entry("a", object())), _call(config_entry_id="b")),
+        ):
+            with pytest.raises(ServiceValidationError) as err:
+                _get_coordinator(hass, call)
+            assert err.value.translation_key == "config_entry_not_found"
+
+    def test_several_entries_without_id(self):
+        hass = _hass(_entry("a", object()), _entry("b", object()))
+        with pytest.raises(ServiceValidationError) as err:
+            _get_coordinator(hass, _call())
+        assert err.value.translation_key == "config_entry_ambiguous"
+
+
+class TestServices:
+    """Test the service handlers against a running coordinator."""
+
+    @pytest.fixture
+    def harness(self, coordinator_harness):
+        return coordinator_harness(datetime(2026, 1, 5, 12, 0))
+
+    def _run(self, harness, handler, hass, call) -> Any:
+        return harness.loop.run_until_complete(handler(hass, call))
+
+    def test_import_and_reconcile(self, harness, tmp_path):
+        hass = _hass(_entry("a", harness.coordinator), allowed=str(tmp_path))
+        path = _export(tmp_path, datetime(2025, 12, 1), 31 * 24)
+        result = self._run(harness, _async_import_consumption, hass, _import_call(path))
+        assert result["months"] == {"2025-12": {"hours": 744, "kwh": pytest.approx(1488.0)}}
+        assert result["comparison"] == []
+
+        call = _call(config_entry_id="a", month="2025-12", inkl_mva=True, kapasitet_kr=155.0)
+        result = self._run(harness, _async_reconcile_invoice, hass, call)
+        assert result["month"] == "2025-12"
+        assert result["hours"] == 744
+        lines = {line["line"]: line for line in result["lines"]}
+        assert lines["kapasitet_kr"]["invoice"] == 155.0
+        assert lines["kapasitet_kr"]["diff"] == 0
+
+    def test_reconcile_month_not_stored(self, harness):
+        hass = _hass(_entry("a", harness.coordinator))
+        with pytest.raises(ServiceValidationError) as err:
+            self._run(harness, _async_reconcile_invoice, hass, _call(month="2024-06", kapasitet_kr=155.0))
+        assert err.value.translation_key == "ledger_month_missing"
+        assert err.value.translation_placeholders == {"month": "2024-06"}
+
+    def test_import_path_not_allowed(self, harness, tmp_path):
+        hass = _hass(_entry("a", harness.coordinator), allowed=str(tmp_path))
+        allowed = _export(tmp_path, datetime(2025, 12, 1), 1)
+        for call in (
+            _import_call("/etc/passwd"),
+            _import_call(allowed, price_file="/etc/prices.csv"),
+        ):
+            with pytest.raises(ServiceValidationError) as err:
+                self._run(harness, _async_import_consumption, hass, call)
+            assert err.value.translation_key == "path_not_allowed"
+        assert err.value.translation_placeholders == {"path": "/etc/prices.csv"}
+        assert harness.coordinator._history_store.data is None
+
+    def test_import_failed(self, harness, tmp_path):
+        hass = _hass(_entry("a", harness.coordinator), allowed=str(tmp_path))
+        missing = tmp_path / "missing.csv"
+        with pytest.raises(HomeAssistantError) as err:
+            self._run(harness, _async_import_consumption, hass, _import_call(missing))
+        assert not isinstance(err.value, ServiceValidationError)
+        assert err.value.translation_key == "import_failed"
+        assert err.value.translation_placeholders["path"] == str(missing)
+
+    def test_monthly_summaries(self, harness):
+        hass = _hass(_entry("a", harness.coordinator))
+        result = self._run(harness, _async_get_monthly_summaries, hass, _call(year=2025))
+        assert set(result) == {"months", "year_to_date", "rolling_12"}
+        assert result["months"] == []
+
+    def test_query_range(self, harness):
+        harness.set_spot(1.0)
+        harness.set_power(2000)
+        for _ in range(61):
+            harness.tick(60)
+        hass = _hass(_entry("a", harness.coordinator))
+        # 11:00-14:00 UTC is 12:00-15:00 in Oslo
+        call = _call(start=datetime(2026, 1, 5, 11, 0, tzinfo=UTC), end=datetime(2026, 1, 5, 14, 0, tzinfo=UTC))
+        result = self._run(harness, _async_query_range, hass, call)
+        assert result["start"] == "2026-01-05T12:00:00"
+        assert result["end"] == "2026-01-05T15:00:00"
+        assert result["forbruk_kwh"] == pytest.approx(2.0, abs=0.05)
+        assert result["topptime"] is not None
+        assert result["total_kr"] > 0
+
+    def test_query_range_invalid(self, harness):
+        hass = _hass(_entry("a", harness.coordinator))
+        start = datetime(2026, 1, 5, 12, 0)
+        for end in (start, start - timedelta(hours=1)):
+            with pytest.raises(ServiceValidationError) as err:
+                self._run(harness, _async_query_range, hass, _call(start=start, end=end))
+            assert err.value.translation_key == "range_invalid"
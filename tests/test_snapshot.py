@@ -0,0 +1,89 @@
+"""Tests for the coordinator snapshot (snapshot.py).
+
+Tests coverage:
+- Immutable and slotted (top-3 days read-only, copied on lookup), values stored unrounded
+- Rounding by name (snapshot["key"], get) and as_dict for diagnostics
+- Sensors round at the presentation edge
+"""
+
+from __future__ import annotations
+
+import dataclasses
+from datetime import datetime
+
+import pytest
+
+from custom_components.stromkalkulator.snapshot import DECIMALS, FIELD_NAMES, CoordinatorSnapshot
+
+T0 = datetime(2026, 1, 5, 12, 0)
+
+
+@pytest.fixture
+def snapshot(coordinator_harness) -> CoordinatorSnapshot:
+    """Snapshot after 20 minutes at 1.234 kW and spot 1.23456 NOK/kWh."""
+    harness = coordinator_harness(T0)
+    harness.set_power(1234)
+    harness.set_spot(1.23456)
+    for _ in range(20):
+        harness.tick(60)
+    return harness.coordinator.data
+
+
+class TestSnapshot:
+    """Test the snapshot object."""
+
+    def test_immutable_and_slotted(self, snapshot):
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            snapshot.spot_price = 0.0  # type: ignore[misc]
+        assert not hasattr(snapshot, "__dict__")
+
+    def test_top_3_days_read_only(self, snapshot):
+        published = dict(snapshot.top_3_days)
+        assert published
+        for name in ("top_3_days", "previous_month_top_3"):
+            with pytest.raises(TypeError):
+                getattr(snapshot, name)["2026-01-31"] = 99.0  # type: ignore[index]
+        # Lookups by name return a copy
+        copy = snapshot["top_3_days"]
+        assert type(copy) is dict
+        copy.clear()
+        snapshot.as_dict()["top_3_days"]["2026-01-31"] = 99.0
+        assert snapshot.top_3_days == published
+        assert snapshot.get("top_3_days") == published
+
+    def test_values_are_unrounded(self, snapshot):
+        assert snapshot.spot_price == 1.23456
+        assert snapshot["spot_price"] == 1.2346
+        assert snapshot.current_power_kw == 1.234
+        assert snapshot["current_power_kw"] == 1.23
+
+    def test_lookup_by_name(self, snapshot):
+        assert snapshot["tso"] == snapshot.tso
+        assert snapshot.get("monthly_consumption_dag_kwh") == round(snapshot.monthly_consumption_dag_kwh, 3)
+        assert snapshot.get("missing", 1) == 1
+        with pytest.raises(KeyError):
+            snapshot["missing"]
+
+    def test_as_dict(self, snapshot):
+        data = snapshot.as_dict()
+        assert tuple(data) == FIELD_NAMES
+        assert data["spot_price"] == 1.2346
+        assert data["electricity_company_price"] is None
+
+    def test_rounded_fields_exist(self):
+        assert set(DECIMALS) <= set(FIELD_NAMES)
+
+
+def test_sensors_round_at_presentation_edge(coordinator_harness):
+    harness = coordinator_harness(T0)
+    harness.set_power(1234)
+    harness.set_spot(1.23456)
+    for _ in range(20):
+        harness.tick(60)
+    data = harness.coordinator.data
+    sensors = {sensor._attr_translation_key: sensor for sensor in harness.create_entities()}
+    total = sensors["total_pris_etter_stotte"]
+    assert total.native_value == data["total_price"]
+    assert total.extra_state_attributes["spotpris"] == 1.2346
+    assert sensors["maanedlig_forbruk_total"].native_value == data["monthly_consumption_total_kwh"]
+    assert sensors["gjs_forbruk"].native_value == data["avg_top_3_kw"]
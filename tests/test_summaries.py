@@ -0,0 +1,235 @@
+"""Tests for the closed-month summaries (summaries.py).
+
+Tests coverage:
+- Summary of a month and its ledger, packed storage record
+- Ring buffer: oldest month dropped, replace and insert, cached period sums
+- Coordinator: summary at month change, late bookings, year to date and
+  rolling 12 months across a year change, persisted with the ledgers
+- Sensors and the service response
+"""
+
+from __future__ import annotations
+
+import base64
+from datetime import datetime
+
+import pytest
+
+from custom_components.stromkalkulator.fixedpoint import UORE_PER_KR, UWH_PER_KWH
+from custom_components.stromkalkulator.ledger import CostLedger, IntervalPrices
+from custom_components.stromkalkulator.monthstate import MonthState
+from custom_components.stromkalkulator.summaries import (
+    SUMMARY_MONTHS,
+    SUMMARY_SUMS,
+    MonthSummaries,
+    MonthSummary,
+    PeriodTotals,
+    month_from_index,
+    previous_month,
+)
+
+PRICES = IntervalPrices(energiledd=0.4, spot=1.0, stromstotte=0.0, forbruksavgift=0.1, enova=0.01, mva_sats=0.25)
+
+
+def _summary(month: str, kwh: int = 100, kapasitetsledd: int = 300) -> MonthSummary:
+    """A summary with kwh on the dag tariff and 1 kr energiledd per kWh."""
+    sums = tuple(kwh * UORE_PER_KR if name == "energiledd_dag" else 0 for name in SUMMARY_SUMS)
+    return MonthSummary(month, kwh * UWH_PER_KWH, 0, ((3, 5.0),), 3, kapasitetsledd, sums)
+
+
+def _months(first: str, count: int) -> list[str]:
+    """count consecutive months from first."""
+    return [previous_month(first, -offset) for offset in range(count)]
+
+
+class TestMonthSummary:
+    """Test condensing a month."""
+
+    def test_from_month_and_ledger(self):
+        month = MonthState("2026-01")
+        ledger = CostLedger("2026-01")
+        when = datetime(2026, 1, 5, 12, 0)
+        month.add_energy(when, True, 10.0)
+        month.add_energy(datetime(2026, 1, 6, 2, 0), False, 4.0)
+        for day, kw in ((5, 6.0), (6, 4.0), (7, 5.0), (8, 1.0)):
+            month.add_peak(day, kw)
+        ledger.add(when, True, 10.0, PRICES)
+
+        summary = MonthSummary.from_month(month, ledger, 2, 250)
+        assert summary.dag_uwh == 10 * UWH_PER_KWH
+        assert summary.natt_uwh == 4 * UWH_PER_KWH
+        assert summary.top_days == {"2026-01-05": 6.0, "2026-01-07": 5.0, "2026-01-06": 4.0}
+        assert summary.cost("spot") == ledger.sums["spot"]
+        totals = summary.totals
+        assert totals.kwh == 14.0
+        assert totals.nettleie_kr == pytest.approx(10 * 0.4 + 250)
+        assert totals.spot_kr == pytest.approx(10.0)
+
+    def test_without_ledger(self):
+        month = MonthState("2025-12")
+        month.add_energy(datetime(2025, 12, 1, 12, 0), True, 1.0)
+        summary = MonthSummary.from_month(month, None, 1, 100)
+        assert set(summary.sums) == {0}
+        assert summary.totals.total_kr == 100.0
+
+    def test_pack_round_trip(self):
+        summary = _summary("2024-02")
+        assert MonthSummary.unpack(summary.pack()) == summary
+        assert len(_summary("2026-12", kwh=10**6).pack()) == len(summary.pack())
+
+    def test_as_dict(self):
+        data = _summary("2026-03").as_dict()
+        assert data["month"] == "2026-03"
+        assert data["forbruk_total_kwh"] == 100.0
+        assert data["energiledd_dag_kr"] == 100.0
+        assert data["topp_3"] == {"2026-03-03": 5.0}
+        assert data["total_kr"] == 400.0
+
+
+class TestMonthSummaries:
+    """Test the ring buffer."""
+
+    def test_month_helpers(self):
+        assert previous_month("2026-01") == "2025-12"
+        assert previous_month("2026-03", 11) == "2025-04"
+        assert month_from_index(2026 * 12) == "2026-01"
+
+    def test_oldest_month_dropped(self):
+        summaries = MonthSummaries()
+        months = _months("2022-01", SUMMARY_MONTHS + 4)
+        for month in months:
+            summaries.add(_summary(month))
+        assert len(summaries) == SUMMARY_MONTHS
+        assert [summary.month for summary in summaries] == months[4:]
+
+    def test_replace_and_insert(self):
+        summaries = MonthSummaries(capacity=3)
+        for month in ("2026-01", "2026-03"):
+            summaries.add(_summary(month))
+        summaries.add(_summary("2026-03", kwh=7))
+        summaries.add(_summary("2026-02"))
+        assert [summary.month for summary in summaries] == ["2026-01", "2026-02", "2026-03"]
+        assert summaries.get("2026-03").totals.kwh == 7.0
+
+        # Full: an older month than all held is not kept
+        summaries.add(_summary("2025-12"))
+        assert summaries.get("2025-12") is None
+        summaries.add(_summary("2026-04"))
+        assert [summary.month for summary in summaries] == ["2026-02", "2026-03", "2026-04"]
+
+    def test_period_totals_are_cached_until_changed(self):
+        summaries = MonthSummaries()
+        for month in _months("2025-11", 4):
+            summaries.add(_summary(month))
+        year = summaries.totals("2026-01", "2026-02")
+        assert year == PeriodTotals(2, 200 * UWH_PER_KWH, 800 * UORE_PER_KR, 0, 0, 0)
+        assert summaries.totals("2026-01", "2026-02") is year
+        summaries.add(_summary("2026-02", kwh=50))
+        assert summaries.totals("2026-01", "2026-02").kwh == 150.0
+        assert summaries.totals("2027-01", "2026-12") == PeriodTotals()
+
+    def test_storage_round_trip(self):
+        summaries = MonthSummaries()
+        for month in _months("2023-07", SUMMARY_MONTHS):
+            summaries.add(_summary(month))
+        stored = summaries.as_dict()
+        assert summaries.as_dict() is stored
+        restored = MonthSummaries.from_dict(stored)
+        assert list(restored) == list(summaries)
+        assert len(base64.b64decode(stored["data"])) == 1 + SUMMARY_MONTHS * len(_summary("2026-01").pack())
+
+    @pytest.mark.parametrize("stored", [None, {}, {"data": "not base64!"}, {"data": "AgAA"}])
+    def test_unusable_storage_is_empty(self, stored):
+        assert len(MonthSummaries.from_dict(stored)) == 0
+
+
+def test_coordinator_year_change(coordinator_harness):
+    """December is summarized at the month change; the year total restarts, the 12 months do not."""
+    start = datetime(2025, 12, 31, 23, 40)
+    harness = coordinator_harness(start)
+    harness.set_power(6000)
+    harness.set_spot(1.0)
+    harness.update_at(start)
+    harness.tick(600)
+    data = harness.update_at(datetime(2026, 1, 1, 0, 0))
+
+    # The interval ending at the month change is booked late and updates December
+    summary = harness.coordinator._summaries.get("2025-12")
+    assert summary is not None
+    assert summary.natt_uwh == 2 * UWH_PER_KWH
+    assert summary.top_days == {"2025-12-31": 6.0}
+    assert summary.cost("spot") == 2 * UORE_PER_KR
+
+    data = harness.tick(600)
+    assert data.year_to_date_months == 1
+    assert data["year_to_date_kwh"] == pytest.approx(1.0, abs=0.001)
+    assert data.rolling_12_months == 2
+    assert data["rolling_12_kwh"] == pytest.approx(3.0, abs=0.001)
+    assert data["rolling_12_spot_kr"] == pytest.approx(3.0, abs=0.01)
+    # The running month's kapasitetsledd counts once, as does December's
+    assert data.rolling_12_nettleie_kr - data.year_to_date_nettleie_kr == pytest.approx(
+        summary.totals.nettleie_kr, abs=0.01
+    )
+
+
+def test_summaries_persist_with_ledgers(coordinator_harness):
+    first = coordinator_harness(datetime(2026, 1, 31, 23, 50))
+    first.set_power(3000)
+    first.set_spot(1.0)
+    first.tick(0)
+    first.update_at(datetime(2026, 2, 1, 0, 10))
+    assert "summaries" not in first.store.data
+    first.ledger_store.flush()
+
+    second = coordinator_harness(first.now)
+    second.store.data = first.store.data
+    second.ledger_store.data = first.ledger_store.data
+    second.set_power(0)
+    second.set_spot(1.0)
+    data = second.update_at(second.now)
+    assert [summary.month for summary in second.coordinator._summaries] == ["2026-01"]
+    assert data.year_to_date_months == 2
+
+
+def test_upgrade_summarizes_previous_month(coordinator_harness):
+    """A previous month stored before summaries were kept is summarized on load."""
+    first = coordinator_harness(datetime(2026, 2, 28, 23, 40))
+    first.set_power(3000)
+    first.set_spot(1.0)
+    first.tick(0)
+    first.tick(600)
+    first.update_at(datetime(2026, 3, 1, 0, 0))
+    first.ledger_store.flush()
+    del first.ledger_store.data["summaries"]
+
+    second = coordinator_harness(first.now)
+    second.store.data = first.store.data
+    second.ledger_store.data = first.ledger_store.data
+    second.set_power(0)
+    second.update_at(second.now)
+    summary = second.coordinator._summaries.get("2026-02")
+    assert summary is not None
+    assert summary.totals.kwh == pytest.approx(1.0, abs=0.001)
+
+
+def test_sensors_and_service_response(coordinator_harness):
+    start = datetime(2026, 1, 31, 23, 40)
+    harness = coordinator_harness(start)
+    harness.set_power(6000)
+    harness.set_spot(1.0)
+    harness.update_at(start)
+    harness.tick(600)
+    harness.update_at(datetime(2026, 2, 1, 0, 0))
+    data = harness.tick(600)
+
+    sensors = {sensor._attr_translation_key: sensor for sensor in harness.create_entities()}
+    year = sensors["kostnad_hittil_i_aar"]
+    assert year.native_value == data["year_to_date_total_kr"]
+    assert year.extra_state_attributes["maaneder"] == 2
+    assert year.extra_state_attributes["forbruk_kwh"] == pytest.approx(3.0, abs=0.1)
+    assert sensors["kostnad_siste_12_maaneder"].native_value == data["rolling_12_total_kr"]
+
+    response = harness.coordinator.monthly_summaries()
+    assert [month["month"] for month in response["months"]] == ["2026-01"]
+    assert response["year_to_date"] == data.period("year_to_date")
+    assert harness.coordinator.monthly_summaries(2025)["months"] == []
@@ -0,0 +1,77 @@
+"""Tests for the precomputed dag/natt calendar (tariff.py).
+
+Tests coverage:
+- Tariff per clock hour: weekdays, weekends, holidays, DST months
+- Coordinator: an interval across 06:00 or a month change split on both sides
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+import pytest
+
+from custom_components.stromkalkulator.const import CONF_MAX_GAP_MINUTES
+from custom_components.stromkalkulator.tariff import TariffCalendar
+
+
+def _is_day_rate(when: datetime) -> bool:
+    """Weekday 06-22, like the coordinator without holidays."""
+    return when.weekday() < 5 and 6 <= when.hour < 22
+
+
+class TestTariffCalendar:
+    """Test the hourly tariff calendar."""
+
+    def test_day_and_night_hours(self):
+        calendar = TariffCalendar(datetime(2026, 1, 1), _is_day_rate)
+        assert calendar.month == "2026-01"
+        assert not calendar.is_day(datetime(2026, 1, 5, 5, 59).timestamp())
+        assert calendar.is_day(datetime(2026, 1, 5, 6, 0).timestamp())
+        assert calendar.is_day(datetime(2026, 1, 5, 21, 59).timestamp())
+        assert not calendar.is_day(datetime(2026, 1, 5, 22, 0).timestamp())
+        assert not calendar.is_day(datetime(2026, 1, 10, 12, 0).timestamp())  # Saturday
+
+    def test_month_bounds(self):
+        calendar = TariffCalendar(datetime(2026, 2, 1), _is_day_rate)
+        assert datetime(2026, 2, 1).timestamp() in calendar
+        assert datetime(2026, 2, 28, 23, 59).timestamp() in calendar
+        assert datetime(2026, 3, 1).timestamp() not in calendar
+
+    @pytest.mark.parametrize("month", [3, 10])
+    def test_dst_month_follows_local_time(self, month):
+        calendar = TariffCalendar(datetime(2026, month, 1), _is_day_rate)
+        # Monday after the DST change (last Sunday of the month)
+        assert calendar.is_day(datetime(2026, month, 30, 6, 0).timestamp())
+        assert not calendar.is_day(datetime(2026, month, 30, 5, 0).timestamp())
+        assert not calendar.is_day(datetime(2026, month, 30, 22, 0).timestamp())
+
+    def test_coordinator_rule_includes_holidays(self, coordinator_harness):
+        coordinator = coordinator_harness(datetime(2026, 5, 1, 12, 0)).coordinator
+        assert not coordinator._is_day_at(datetime(2026, 5, 1, 12, 0).timestamp())  # 1. mai
+        assert coordinator._is_day_at(datetime(2026, 5, 4, 12, 0).timestamp())
+
+
+class TestCoordinatorSplit:
+    """Test intervals across tariff and month boundaries in the coordinator."""
+
+    def test_interval_across_six_is_split(self, coordinator_harness):
+        start = datetime(2026, 1, 5, 5, 50)
+        harness = coordinator_harness(start, **{CONF_MAX_GAP_MINUTES: 30})
+        harness.set_power(6000)
+        harness.update_at(start)
+        data = harness.update_at(datetime(2026, 1, 5, 6, 10))
+        assert data["monthly_consumption_natt_kwh"] == pytest.approx(1.0)
+        assert data["monthly_consumption_dag_kwh"] == pytest.approx(1.0)
+
+    def test_interval_across_month_change_is_split(self, coordinator_harness):
+        start = datetime(2026, 1, 31, 23, 50)
+        harness = coordinator_harness(start, **{CONF_MAX_GAP_MINUTES: 30})
+        harness.set_power(6000)
+        harness.set_spot(1.0)
+        harness.update_at(start)
+        data = harness.update_at(datetime(2026, 2, 1, 0, 10))
+        assert data["monthly_consumption_total_kwh"] == pytest.approx(1.0)
+        previous = harness.coordinator._previous_ledger
+        assert previous is not None and previous.month == "2026-01"
+        assert previous.totals["kwh_natt"] == pytest.approx(1.0)
@@ -0,0 +1,192 @@
+"""End-to-end throughput tests with a synthetic month of load.
+
+Replays a generated month (tests/synthetic_load.py) through the coordinator
+and all sensor entities at accelerated speed, reports events per second and
+CPU time per simulated day, and checks the final monthly figures against a
+reference calculation done directly on the generated arrays.
+
+Run with: pytest tests/test_throughput.py -v -s
+Set STROMKALKULATOR_REPLAY_STEP=60 to replay at the coordinator's real 1-minute rate.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from dataclasses import dataclass
+from typing import Any
+
+import pytest
+
+from custom_components.stromkalkulator.const import CONF_MAX_GAP_MINUTES, DEFAULT_MAX_GAP_MINUTES
+from custom_components.stromkalkulator.tso import TSO_LIST
+
+from .synthetic_load import (
+    PRICE_INTERVAL_S,
+    PROFILES,
+    SyntheticMonth,
+    generate_month,
+    is_day_rate,
+    reference_totals,
+)
+
+# 15-minute steps keep the default run fast; the coordinator logic is rate-independent
+REPLAY_STEP_S = int(os.environ.get("STROMKALKULATOR_REPLAY_STEP", "900"))
+
+BKK = TSO_LIST["bkk"]
+
+
+@dataclass
+class ReplayReport:
+    """Result of replaying a synthetic month."""
+
+    events: int
+    wall_s: float
+    cpu_s: float
+    simulated_days: float
+    data: dict[str, Any]
+
+    @property
+    def events_per_s(self) -> float:
+        return self.events / self.wall_s
+
+    @property
+    def cpu_ms_per_day(self) -> float:
+        return self.cpu_s / self.simulated_days * 1000
+
+
+def _gap_cap(month: SyntheticMonth) -> dict[str, Any]:
+    """Entry data with a gap cap that lets every replay step be integrated directly."""
+    return {CONF_MAX_GAP_MINUTES: max(DEFAULT_MAX_GAP_MINUTES, month.step_s / 60)}
+
+
+def replay(harness: Any, month: SyntheticMonth) -> ReplayReport:
+    """Feed every sample to the coordinator and read every entity, like HA would."""
+    entities: list[Any] = []
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    data: dict[str, Any] = {}
+    for i in range(len(month)):
+        harness.set_power(month.power_w[i])
+        harness.set_spot(month.spot_at(i))
+        data = harness.update_at(month.local_time(i))
+        if not entities:
+            entities = harness.create_entities()
+        for entity in entities:
+            entity.native_value  # noqa: B018
+            entity.extra_state_attributes  # noqa: B018
+    return ReplayReport(
+        events=len(month),
+        wall_s=time.perf_counter() - wall_start,
+        cpu_s=time.process_time() - cpu_start,
+        simulated_days=month.days,
+        data=data,
+    )
+
+
+def _print_report(label: str, report: ReplayReport, reference: dict[str, float]) -> None:
+    data = report.data
+    print(
+        f"\n{label}: {report.events} events, {report.events_per_s:,.0f} events/s, "
+        f"{report.cpu_ms_per_day:.1f} ms CPU per simulated day"
+    )
+    for key, ref in (
+        ("monthly_consumption_dag_kwh", reference["dag_kwh"]),
+        ("monthly_consumption_natt_kwh", reference["natt_kwh"]),
+        ("avg_top_3_kw", reference["avg_top_3_kw"]),
+        ("kapasitetsledd", reference["kapasitetsledd"]),
+    ):
+        print(f"  {key:32} coordinator={data[key]:>10.3f} reference={ref:>10.3f} diff={data[key] - ref:+.3f}")
+
+
+# =============================================================================
+# Generator
+# =============================================================================
+
+
+def test_generator_is_deterministic():
+    """Same seed gives identical samples and prices."""
+    a = generate_month(2026, 1, "enebolig_elbil", step_s=600, seed=7)
+    b = generate_month(2026, 1, "enebolig_elbil", step_s=600, seed=7)
+    c = generate_month(2026, 1, "enebolig_elbil", step_s=600, seed=8)
+    assert a.power_w == b.power_w
+    assert a.prices == b.prices
+    assert a.power_w != c.power_w
+
+
+@pytest.mark.parametrize(("month", "hours"), [(1, 744), (3, 743), (10, 745)])
+def test_generator_follows_dst(month, hours):
+    """Months with DST transitions have 743 or 745 hours of samples and prices."""
+    data = generate_month(2026, month, "leilighet", step_s=3600)
+    assert len(data) == hours
+    assert len(data.prices) == hours * 3600 // PRICE_INTERVAL_S
+
+
+def test_generator_ev_peaks():
+    """EV charging lifts the daily peaks well above the household without EV."""
+    plain = reference_totals(
+        generate_month(2026, 1, "enebolig", step_s=600),
+        energiledd_dag=BKK["energiledd_dag"],
+        energiledd_natt=BKK["energiledd_natt"],
+        kapasitetstrinn=BKK["kapasitetstrinn"],
+    )
+    ev = reference_totals(
+        generate_month(2026, 1, "enebolig_elbil", step_s=600),
+        energiledd_dag=BKK["energiledd_dag"],
+        energiledd_natt=BKK["energiledd_natt"],
+        kapasitetstrinn=BKK["kapasitetstrinn"],
+    )
+    assert ev["avg_top_3_kw"] > plain["avg_top_3_kw"] + 5
+    assert ev["kapasitetsledd"] > plain["kapasitetsledd"]
+
+
+def test_generator_holiday_profile():
+    """Easter 2026 (skjærtorsdag - 2. påskedag) is booked entirely as natt/helg."""
+    data = generate_month(2026, 4, "enebolig", step_s=3600)
+    easter = [data.local_time(i) for i in range(len(data)) if 2 <= data.local_time(i).day <= 6]
+    assert not any(is_day_rate(t) for t in easter)
+
+
+# =============================================================================
+# Replay through coordinator and entities
+# =============================================================================
+
+
+@pytest.mark.parametrize("profile", sorted(PROFILES))
+def test_replay_january_matches_reference(coordinator_harness, profile):
+    """A month without DST matches the reference calculation exactly."""
+    month = generate_month(2026, 1, profile, step_s=REPLAY_STEP_S)
+    harness = coordinator_harness(month.local_time(0), **_gap_cap(month))
+    report = replay(harness, month)
+    reference = reference_totals(
+        month,
+        energiledd_dag=harness.coordinator.energiledd_dag,
+        energiledd_natt=harness.coordinator.energiledd_natt,
+        kapasitetstrinn=harness.coordinator.kapasitetstrinn,
+    )
+    _print_report(f"januar 2026 / {profile}", report, reference)
+
+    data = report.data
+    assert data["monthly_consumption_dag_kwh"] == pytest.approx(reference["dag_kwh"], abs=0.002)
+    assert data["monthly_consumption_natt_kwh"] == pytest.approx(reference["natt_kwh"], abs=0.002)
+    assert data["avg_top_3_kw"] == pytest.approx(reference["avg_top_3_kw"], abs=0.01)
+    assert data["kapasitetsledd"] == reference["kapasitetsledd"]
+
+
+@pytest.mark.parametrize("month_number", [3, 10])
+def test_replay_dst_month_matches_reference(coordinator_harness, month_number):
+    """DST months match the reference (elapsed time is real time, not wall-clock time)."""
+    month = generate_month(2026, month_number, "enebolig", step_s=REPLAY_STEP_S)
+    harness = coordinator_harness(month.local_time(0), **_gap_cap(month))
+    report = replay(harness, month)
+    reference = reference_totals(
+        month,
+        energiledd_dag=harness.coordinator.energiledd_dag,
+        energiledd_natt=harness.coordinator.energiledd_natt,
+        kapasitetstrinn=harness.coordinator.kapasitetstrinn,
+    )
+    _print_report(f"{month_number:02d}/2026 (DST)", report, reference)
+
+    assert report.data["monthly_consumption_total_kwh"] == pytest.approx(reference["total_kwh"], abs=0.002)
+    assert report.data["monthly_consumption_dag_kwh"] == pytest.approx(reference["dag_kwh"], abs=0.002)
+    assert report.data["kapasitetsledd"] == reference["kapasitetsledd"]
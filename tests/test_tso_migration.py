@@ -92,6 +92,22 @@ async def test_migrate_storage_file_renames(tmp_path):
     assert new_file.read_text() == '{"data": "test"}'
 
 
+@pytest.mark.asyncio
+async def test_migrate_storage_file_renames_ledger(tmp_path):
+    """Cost ledger storage file follows the TSO key."""
+    from stromkalkulator.__init__ import _migrate_storage_file
+
+    storage_dir = tmp_path / ".storage"
+    storage_dir.mkdir()
+    (storage_dir / "stromkalkulator_norgesnett").write_text("{}")
+    (storage_dir / "stromkalkulator_norgesnett_ledger").write_text('{"data": "ledger"}')
+
+    await _migrate_storage_file(str(storage_dir), "norgesnett", "glitre")
+
+    assert (storage_dir / "stromkalkulator_glitre_ledger").read_text() == '{"data": "ledger"}'
+    assert not (storage_dir / "stromkalkulator_norgesnett_ledger").exists()
+
+
 @pytest.mark.asyncio
 async def test_migrate_storage_file_no_old_file(tmp_path):
     """No error when old storage file doesn't exist."""
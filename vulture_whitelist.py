@@ -26,6 +26,8 @@ _attr_state_class
 _attr_icon
 _attr_suggested_display_precision
 _attr_entity_category
+_attr_entity_registry_enabled_default
+_handle_coordinator_update
 _device_group
 
 # Used in Home Assistant